@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from .agents import *
+from .lazy import lazy_getattr
 
 __all__ = agents.__all__ + [
     "scml2019",
@@ -9,3 +10,4 @@ __all__ = agents.__all__ + [
     "scml2023",
     "contrib",
 ]
+__getattr__ = lazy_getattr(__name__, dict(), __all__[len(agents.__all__) :])
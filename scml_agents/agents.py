@@ -1,19 +1,367 @@
 from __future__ import annotations
 
-from inspect import ismodule
-from typing import Literal, overload
+from importlib import import_module
+from typing import TYPE_CHECKING, Literal, overload
 
-from negmas.helpers import get_class, get_full_type_name
-from negmas.situated import Agent
-
-import scml_agents.scml2019 as scml2019
-import scml_agents.scml2020 as scml2020
-import scml_agents.scml2021 as scml2021
-import scml_agents.scml2022 as scml2022
-import scml_agents.scml2023 as scml2023
+if TYPE_CHECKING:
+    from negmas.situated import Agent
 
 __all__ = ["get_agents"]
 
+# The main agent (MAIN_AGENT) of every team package (relative to scml_agents) and the agents it exports (__all__).
+# get_agents works with these names and imports an agent's module only if its class is requested.
+_MAIN_AGENTS: dict[str, str] = {
+    "scml2019.fj2": "scml_agents.scml2019.fj2.FJ2FactoryManager",
+    "scml2019.rapt_fm": "scml_agents.scml2019.rapt_fm.RaptFactoryManager",
+    "scml2019.iffm": "scml_agents.scml2019.iffm.InsuranceFraudFactoryManager",
+    "scml2019.saha": "scml_agents.scml2019.saha.SAHAFactoryManager",
+    "scml2019.cheap_buyer": "scml_agents.scml2019.cheap_buyer.cheapbuyer.CheapBuyerFactoryManager",
+    "scml2019.nvm": "scml_agents.scml2019.nvm.nmv_agent.NVMFactoryManager",
+    "scml2019.monopoly": "scml_agents.scml2019.monopoly.Monopoly",
+    "scml2019.psfm": "scml_agents.scml2019.psfm.PenaltySabotageFactoryManager",
+    "scml2021.standard.bossagent": "scml_agents.scml2021.standard.bossagent.boss_agent.CharliesAgent",
+    "scml2021.standard.iyibiteam": "scml_agents.scml2021.standard.iyibiteam.agent.IYIBIAgent",
+    "scml2021.standard.team_41": "scml_agents.scml2021.standard.team_41.sorcery.SorceryAgent",
+    "scml2021.standard.team_44": "scml_agents.scml2021.standard.team_44.agent68.Agent68",
+    "scml2021.standard.team_45": "scml_agents.scml2021.standard.team_45.stingy.StingyAgent",
+    "scml2021.standard.team_46": "scml_agents.scml2021.standard.team_46.solid.SolidAgent",
+    "scml2021.standard.team_49": "scml_agents.scml2021.standard.team_49.agent.E3BIUagent",
+    "scml2021.standard.team_53": "scml_agents.scml2021.standard.team_53.my_paibiu.MyPaibiuAgent",
+    "scml2021.standard.team_67": "scml_agents.scml2021.standard.team_67.polymorphic_agent.PolymorphicAgent",
+    "scml2021.standard.team_78": "scml_agents.scml2021.standard.team_78.yiy_agent.YIYAgent",
+    "scml2021.standard.team_82": "scml_agents.scml2021.standard.team_82.perry.PerryTheAgent",
+    "scml2021.standard.team_91": "scml_agents.scml2021.standard.team_91.bluewolf.BlueWolf",
+    "scml2021.standard.team_may": "scml_agents.scml2021.standard.team_may.m4.M4",
+    "scml2021.standard.team_mediocre": "scml_agents.scml2021.standard.team_mediocre.mediocre.Mediocre",
+    "scml2021.standard.wabisabikoalas": "scml_agents.scml2021.standard.wabisabikoalas.artisan_kangaroo.ArtisanKangaroo",
+    "scml2021.oneshot.staghunter": "scml_agents.scml2021.oneshot.staghunter.myagent2.StagHunterV7",
+    "scml2021.oneshot.team_50": "scml_agents.scml2021.oneshot.team_50.sagiagent.Agent74",
+    "scml2021.oneshot.team_51": "scml_agents.scml2021.oneshot.team_51.qlagent_extended_state.QlAgent",
+    "scml2021.oneshot.team_54": "scml_agents.scml2021.oneshot.team_54.sopranos.TheSopranos78",
+    "scml2021.oneshot.team_55": "scml_agents.scml2021.oneshot.team_55.agent.Zilberan",
+    "scml2021.oneshot.team_61": "scml_agents.scml2021.oneshot.team_61.agents.BondAgent",
+    "scml2021.oneshot.team_62": "scml_agents.scml2021.oneshot.team_62.uc_oneshot_agent_v3_4.UcOneshotAgent3_4",
+    "scml2021.oneshot.team_72": "scml_agents.scml2021.oneshot.team_72.agent97.Agent97",
+    "scml2021.oneshot.team_73": "scml_agents.scml2021.oneshot.team_73.oneshot_agents.Gentle",
+    "scml2021.oneshot.team_86": "scml_agents.scml2021.oneshot.team_86.agent112.Agent112",
+    "scml2021.oneshot.team_90": "scml_agents.scml2021.oneshot.team_90.run.PDPSyncAgent",
+    "scml2021.oneshot.team_corleone": "scml_agents.scml2021.oneshot.team_corleone.godfather.godfather.GoldfishParetoEmpiricalGodfatherAgent",
+    "scml2022.standard.bossagent": "scml_agents.scml2022.standard.bossagent.charlies.CharliesAgent",
+    "scml2022.standard.team_100": "scml_agents.scml2022.standard.team_100.skyagent.SkyAgent",
+    "scml2022.standard.team_137": "scml_agents.scml2022.standard.team_137.lobster.Lobster",
+    "scml2022.standard.team_9": "scml_agents.scml2022.standard.team_9.salesagent.SalesAgent",
+    "scml2022.standard.team_99": "scml_agents.scml2022.standard.team_99.smartagent.SmartAgent",
+    "scml2022.standard.team_may": "scml_agents.scml2022.standard.team_may.m5.M5",
+    "scml2022.standard.wabisabikoalas": "scml_agents.scml2022.standard.wabisabikoalas.artisan_kangaroo.ArtisanKangaroo",
+    "scml2022.collusion.bossagent": "scml_agents.scml2022.collusion.bossagent.charlies.CharliesAgentCollusion",
+    "scml2022.collusion.team_may": "scml_agents.scml2022.collusion.team_may.m5.M5Collusion",
+    "scml2022.oneshot.team_102": "scml_agents.scml2022.oneshot.team_102.agents.GentleS",
+    "scml2022.oneshot.team_103": "scml_agents.scml2022.oneshot.team_103.agent.MMMPersonalized",
+    "scml2022.oneshot.team_105": "scml_agents.scml2022.oneshot.team_105.agent.AdaptivePercentile",
+    "scml2022.oneshot.team_106": "scml_agents.scml2022.oneshot.team_106.moving_average_agent.AdamAgent",
+    "scml2022.oneshot.team_107": "scml_agents.scml2022.oneshot.team_107.regression_agent.EVEAgent",
+    "scml2022.oneshot.team_123": "scml_agents.scml2022.oneshot.team_123.neko.Neko",
+    "scml2022.oneshot.team_124": "scml_agents.scml2022.oneshot.team_124.agent.LearningAdaptiveAgent",
+    "scml2022.oneshot.team_126": "scml_agents.scml2022.oneshot.team_126.agents_learning.AgentSAS",
+    "scml2022.oneshot.team_131": "scml_agents.scml2022.oneshot.team_131.agentrm.AgentRM",
+    "scml2022.oneshot.team_134": "scml_agents.scml2022.oneshot.team_134.agent119.PatientAgent",
+    "scml2022.oneshot.team_62": "scml_agents.scml2022.oneshot.team_62.uc_oneshot_agent_v3_4.UcOneshotAgent3_4",
+    "scml2022.oneshot.team_94": "scml_agents.scml2022.oneshot.team_94.qlagent3.AdaptiveQlAgent",
+    "scml2022.oneshot.team_96": "scml_agents.scml2022.oneshot.team_96.agent125.Agent125",
+    "scml2023.standard.team_140": "scml_agents.scml2023.standard.team_140.agents.AgentVSC",
+    "scml2023.standard.team_150": "scml_agents.scml2023.standard.team_150.sdh.AgentSDH",
+    "scml2023.collusion.team_140": "scml_agents.scml2023.collusion.team_140.agents.AgentVSC",
+    "scml2023.collusion.team_150": "scml_agents.scml2023.collusion.team_150.sdh.AgentSDH",
+    "scml2023.oneshot.team_102": "scml_agents.scml2023.oneshot.team_102.sources.agent.RLIndAgent",
+    "scml2023.oneshot.team_123": "scml_agents.scml2023.oneshot.team_123.neko23.AgentNeko23",
+    "scml2023.oneshot.team_126": "scml_agents.scml2023.oneshot.team_126.agents_learning.AgentSAS",
+    "scml2023.oneshot.team_127": "scml_agents.scml2023.oneshot.team_127.agents.PHLA",
+    "scml2023.oneshot.team_134": "scml_agents.scml2023.oneshot.team_134.matching_agent.MatchingAgent",
+    "scml2023.oneshot.team_139": "scml_agents.scml2023.oneshot.team_139.two_one_five.TwoOneFive",
+    "scml2023.oneshot.team_143": "scml_agents.scml2023.oneshot.team_143.kanbe.KanbeAgent",
+    "scml2023.oneshot.team_144": "scml_agents.scml2023.oneshot.team_144.cc_agent.CCAgent",
+    "scml2023.oneshot.team_145": "scml_agents.scml2023.oneshot.team_145.forest_agent.ForestAgent",
+    "scml2023.oneshot.team_148": "scml_agents.scml2023.oneshot.team_148.agents.AgentVSCforOneShot",
+    "scml2023.oneshot.team_149": "scml_agents.scml2023.oneshot.team_149.agents.Shochan",
+    "scml2023.oneshot.team_151": "scml_agents.scml2023.oneshot.team_151.nego_agent.NegoAgent",
+    "scml2023.oneshot.team_poli_usp": "scml_agents.scml2023.oneshot.team_poli_usp.quantity_oriented_agent.QuantityOrientedAgent",
+}
+
+_TEAM_AGENTS: dict[str, tuple[str, ...]] = {
+    "scml2020.a_sengupta": ("scml_agents.scml2020.a_sengupta.Merchant",),
+    "scml2020.agent0x111": ("scml_agents.scml2020.agent0x111.ASMASH",),
+    "scml2020.bargent": ("scml_agents.scml2020.bargent.BARGentCovid19",),
+    "scml2020.biu_th": ("scml_agents.scml2020.biu_th.THBiuAgent",),
+    "scml2020.monty_hall": ("scml_agents.scml2020.monty_hall.MontyHall",),
+    "scml2020.past_frauds": ("scml_agents.scml2020.past_frauds.MhiranoAgent",),
+    "scml2020.team_10": ("scml_agents.scml2020.team_10.UnicornAgent",),
+    "scml2020.team_15": ("scml_agents.scml2020.team_15.SteadyMgr",),
+    "scml2020.team_17": ("scml_agents.scml2020.team_17.WhAgent",),
+    "scml2020.team_18": ("scml_agents.scml2020.team_18.MercuAgent",),
+    "scml2020.team_19": ("scml_agents.scml2020.team_19.Ashgent",),
+    "scml2020.team_20": ("scml_agents.scml2020.team_20.CrescentAgent",),
+    "scml2020.team_22": ("scml_agents.scml2020.team_22.SavingAgent",),
+    "scml2020.team_25": ("scml_agents.scml2020.team_25.Agent30",),
+    "scml2020.team_27": ("scml_agents.scml2020.team_27.AgentProjectGC",),
+    "scml2020.team_29": ("scml_agents.scml2020.team_29.BIUDODY",),
+    "scml2020.team_32": ("scml_agents.scml2020.team_32.BeerAgent",),
+    "scml2020.team_may": ("scml_agents.scml2020.team_may.MMM",),
+    "scml2020.threadfield": ("scml_agents.scml2020.threadfield.GreedyFactoryManager2",),
+    "scml2021.standard.bossagent": (
+        "scml_agents.scml2021.standard.bossagent.boss_agent.CharliesAgent",
+    ),
+    "scml2021.standard.iyibiteam": (
+        "scml_agents.scml2021.standard.iyibiteam.agent.IYIBIAgent",
+    ),
+    "scml2021.standard.team_41": (
+        "scml_agents.scml2021.standard.team_41.a.SteadyMgr",
+        "scml_agents.scml2021.standard.team_41.Augur_agent.AugurAgent",
+        "scml_agents.scml2021.standard.team_41.sorcery.SorceryAgent",
+    ),
+    "scml2021.standard.team_44": (
+        "scml_agents.scml2021.standard.team_44.agent68.Agent68",
+    ),
+    "scml2021.standard.team_45": (
+        "scml_agents.scml2021.standard.team_45.stingy.StingyAgent",
+    ),
+    "scml2021.standard.team_46": (
+        "scml_agents.scml2021.standard.team_46.solid.SolidAgent",
+    ),
+    "scml2021.standard.team_49": (
+        "scml_agents.scml2021.standard.team_49.agent.E3BIUagent",
+    ),
+    "scml2021.standard.team_53": (
+        "scml_agents.scml2021.standard.team_53.my_paibiu.MyPaibiuAgent",
+    ),
+    "scml2021.standard.team_67": (
+        "scml_agents.scml2021.standard.team_67.polymorphic_agent.PolymorphicAgent",
+    ),
+    "scml2021.standard.team_78": (
+        "scml_agents.scml2021.standard.team_78.yiy_agent.YIYAgent",
+    ),
+    "scml2021.standard.team_82": (
+        "scml_agents.scml2021.standard.team_82.perry.PerryTheAgent",
+    ),
+    "scml2021.standard.team_91": (
+        "scml_agents.scml2021.standard.team_91.bluewolf.BlueWolf",
+    ),
+    "scml2021.standard.team_may": ("scml_agents.scml2021.standard.team_may.m4.M4",),
+    "scml2021.standard.team_mediocre": (
+        "scml_agents.scml2021.standard.team_mediocre.mediocre.Mediocre",
+    ),
+    "scml2021.standard.wabisabikoalas": (
+        "scml_agents.scml2021.standard.wabisabikoalas.artisan_kangaroo.ArtisanKangaroo",
+    ),
+    "scml2021.oneshot.staghunter": (
+        "scml_agents.scml2021.oneshot.staghunter.myagent.StagHunterTough",
+        "scml_agents.scml2021.oneshot.staghunter.myagent2.StagHunterV7",
+    ),
+    "scml2021.oneshot.team_50": (
+        "scml_agents.scml2021.oneshot.team_50.sagiagent.Agent74",
+    ),
+    "scml2021.oneshot.team_51": (
+        "scml_agents.scml2021.oneshot.team_51.qlagent_extended_state.QlAgent",
+    ),
+    "scml2021.oneshot.team_54": (
+        "scml_agents.scml2021.oneshot.team_54.sopranos.TheSopranos78",
+    ),
+    "scml2021.oneshot.team_55": (
+        "scml_agents.scml2021.oneshot.team_55.agent.Zilberan",
+        "scml_agents.scml2021.oneshot.team_55.worker_agents.SimpleAgent",
+        "scml_agents.scml2021.oneshot.team_55.worker_agents.BetterAgent",
+        "scml_agents.scml2021.oneshot.team_55.worker_agents.AdaptiveAgent",
+        "scml_agents.scml2021.oneshot.team_55.worker_agents.LearningAgent",
+        "scml_agents.scml2021.oneshot.team_55.worker_agents.ImprovedLearningAgent",
+    ),
+    "scml2021.oneshot.team_61": (
+        "scml_agents.scml2021.oneshot.team_61.agents.SimpleAgent",
+        "scml_agents.scml2021.oneshot.team_61.agents.BetterAgent",
+        "scml_agents.scml2021.oneshot.team_61.agents.BondAgent",
+    ),
+    "scml2021.oneshot.team_62": (
+        "scml_agents.scml2021.oneshot.team_62.uc_oneshot_agent_v3_4.UcOneshotAgent3_4",
+    ),
+    "scml2021.oneshot.team_72": (
+        "scml_agents.scml2021.oneshot.team_72.agent97.Agent97",
+        "scml_agents.scml2021.oneshot.team_72.learning_agent.SimpleAgent",
+        "scml_agents.scml2021.oneshot.team_72.learning_agent.BetterAgent",
+        "scml_agents.scml2021.oneshot.team_72.learning_agent.AdaptiveAgent",
+        "scml_agents.scml2021.oneshot.team_72.learning_agent.LearningAgent",
+    ),
+    "scml2021.oneshot.team_73": (
+        "scml_agents.scml2021.oneshot.team_73.past_agents.SimpleAgent",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.BetterAgent",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AdaptiveAgent",
+        "scml_agents.scml2021.oneshot.team_73.oneshot_agents.Gentle",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.SimpleAgent",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.BetterAgent",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AdaptiveAgent",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT064",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT063",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT062",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT061",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT060",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT056",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT055",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT054",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT053",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT052",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT051",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT050",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT049",
+        "scml_agents.scml2021.oneshot.team_73.past_agents.AgentT048",
+    ),
+    "scml2021.oneshot.team_86": (
+        "scml_agents.scml2021.oneshot.team_86.agent112.SimpleAgent",
+        "scml_agents.scml2021.oneshot.team_86.agent112.BetterAgent",
+        "scml_agents.scml2021.oneshot.team_86.agent112.Agent112",
+    ),
+    "scml2021.oneshot.team_90": (
+        "scml_agents.scml2021.oneshot.team_90.run.PDPSyncAgent",
+    ),
+    "scml2021.oneshot.team_corleone": (
+        "scml_agents.scml2021.oneshot.team_corleone.godfather.godfather.GoldfishParetoEmpiricalGodfatherAgent",
+    ),
+    "scml2022.standard.bossagent": (
+        "scml_agents.scml2022.standard.bossagent.charlies.CharliesAgent",
+    ),
+    "scml2022.standard.team_100": (
+        "scml_agents.scml2022.standard.team_100.skyagent.SkyAgent",
+    ),
+    "scml2022.standard.team_137": (
+        "scml_agents.scml2022.standard.team_137.lobster.Lobster",
+    ),
+    "scml2022.standard.team_9": (
+        "scml_agents.scml2022.standard.team_9.salesagent.SalesAgent",
+    ),
+    "scml2022.standard.team_99": (
+        "scml_agents.scml2022.standard.team_99.smartagent.SmartAgent",
+    ),
+    "scml2022.standard.team_may": ("scml_agents.scml2022.standard.team_may.m5.M5",),
+    "scml2022.standard.wabisabikoalas": (
+        "scml_agents.scml2022.standard.wabisabikoalas.artisan_kangaroo.ArtisanKangaroo",
+    ),
+    "scml2022.collusion.bossagent": (
+        "scml_agents.scml2022.collusion.bossagent.charlies.CharliesAgentCollusion",
+    ),
+    "scml2022.collusion.team_may": (
+        "scml_agents.scml2022.collusion.team_may.m5.M5Collusion",
+    ),
+    "scml2022.oneshot.team_102": (
+        "scml_agents.scml2022.oneshot.team_102.agents.GentleS",
+        "scml_agents.scml2022.oneshot.team_102.agents.LearningSyncAgent",
+    ),
+    "scml2022.oneshot.team_103": (
+        "scml_agents.scml2022.oneshot.team_103.agent.MMMPersonalized",
+    ),
+    "scml2022.oneshot.team_105": (
+        "scml_agents.scml2022.oneshot.team_105.agent.AdaptivePercentile",
+    ),
+    "scml2022.oneshot.team_106": (
+        "scml_agents.scml2022.oneshot.team_106.moving_average_agent.AdamAgent",
+    ),
+    "scml2022.oneshot.team_107": (
+        "scml_agents.scml2022.oneshot.team_107.regression_agent.EVEAgent",
+    ),
+    "scml2022.oneshot.team_123": ("scml_agents.scml2022.oneshot.team_123.neko.Neko",),
+    "scml2022.oneshot.team_124": (
+        "scml_agents.scml2022.oneshot.team_124.agent.LearningAdaptiveAgent",
+    ),
+    "scml2022.oneshot.team_126": (
+        "scml_agents.scml2022.oneshot.team_126.agents_learning.AgentSAS",
+    ),
+    "scml2022.oneshot.team_131": (
+        "scml_agents.scml2022.oneshot.team_131.agentrm.AgentRM",
+    ),
+    "scml2022.oneshot.team_134": (
+        "scml_agents.scml2022.oneshot.team_134.agent119.PatientAgent",
+    ),
+    "scml2022.oneshot.team_62": (
+        "scml_agents.scml2022.oneshot.team_62.uc_oneshot_agent_v3_4.UcOneshotAgent3_4",
+    ),
+    "scml2022.oneshot.team_94": (
+        "scml_agents.scml2022.oneshot.team_94.qlagent3.AdaptiveQlAgent",
+    ),
+    "scml2022.oneshot.team_96": (
+        "scml_agents.scml2022.oneshot.team_96.agent125.Agent125",
+    ),
+    "scml2023.standard.team_140": (
+        "scml_agents.scml2023.standard.team_140.agents.AgentVSC",
+    ),
+    "scml2023.standard.team_150": (
+        "scml_agents.scml2023.standard.team_150.sdh.AgentSDH",
+    ),
+    "scml2023.collusion.team_140": (
+        "scml_agents.scml2023.collusion.team_140.agents.AgentVSC",
+    ),
+    "scml2023.collusion.team_150": (
+        "scml_agents.scml2023.collusion.team_150.sdh.AgentSDH",
+    ),
+    "scml2023.oneshot.team_102": (
+        "scml_agents.scml2023.oneshot.team_102.sources.agent.RLIndAgent",
+    ),
+    "scml2023.oneshot.team_123": (
+        "scml_agents.scml2023.oneshot.team_123.neko23.AgentNeko23",
+        "scml_agents.scml2023.oneshot.team_123.neko23.AgentNeko23Random",
+    ),
+    "scml2023.oneshot.team_126": (
+        "scml_agents.scml2023.oneshot.team_126.agents_learning.AgentSAS",
+    ),
+    "scml2023.oneshot.team_127": ("scml_agents.scml2023.oneshot.team_127.agents.PHLA",),
+    "scml2023.oneshot.team_134": (
+        "scml_agents.scml2023.oneshot.team_134.matching_agent.MatchingAgent",
+    ),
+    "scml2023.oneshot.team_139": (
+        "scml_agents.scml2023.oneshot.team_139.two_one_five.TwoOneFive",
+    ),
+    "scml2023.oneshot.team_143": (
+        "scml_agents.scml2023.oneshot.team_143.kanbe.KanbeAgent",
+    ),
+    "scml2023.oneshot.team_144": (
+        "scml_agents.scml2023.oneshot.team_144.cc_agent.CCAgent",
+    ),
+    "scml2023.oneshot.team_145": (
+        "scml_agents.scml2023.oneshot.team_145.forest_agent.ForestAgent",
+    ),
+    "scml2023.oneshot.team_148": (
+        "scml_agents.scml2023.oneshot.team_148.agents.AgentVSCforOneShot",
+    ),
+    "scml2023.oneshot.team_149": (
+        "scml_agents.scml2023.oneshot.team_149.agents.Shochan",
+    ),
+    "scml2023.oneshot.team_151": (
+        "scml_agents.scml2023.oneshot.team_151.nego_agent.NegoAgent",
+    ),
+    "scml2023.oneshot.team_poli_usp": (
+        "scml_agents.scml2023.oneshot.team_poli_usp.quantity_oriented_agent.QuantityOrientedAgent",
+    ),
+}
+
+
+def _team_agents(*teams: str) -> tuple[str, ...]:
+    """Full names of the agents exported by the given team packages"""
+    return tuple(_ for team in teams for _ in _TEAM_AGENTS[team])
+
+
+def _track_agents(*tracks: str) -> tuple[str, ...]:
+    """Full names of the agents exported by all teams of the given tracks (e.g. scml2021.oneshot)"""
+    return _team_agents(
+        *(
+            team
+            for track in tracks
+            for team in sorted(_TEAM_AGENTS)
+            if team.rpartition(".")[0] == track
+        )
+    )
+
+
+def _import_agent(name: str | tuple) -> type[Agent] | tuple:
+    """Imports the class with the given full name (or a tuple of them) importing only the module defining it"""
+    if isinstance(name, tuple):
+        return tuple(_import_agent(_) for _ in name)
+    module, _, class_name = name.rpartition(".")
+    return getattr(import_module(module), class_name)
+
 
 @overload
 def get_agents(
@@ -95,701 +443,503 @@ def get_agents(
     if isinstance(version, int) and version == 2019:
         if track in ("any", "all") and not winners_only:
             classes = (
-                scml2019.FJ2FactoryManager,
-                scml2019.RaptFactoryManager,
-                scml2019.InsuranceFraudFactoryManager,
-                scml2019.SAHAFactoryManager,
-                scml2019.CheapBuyerFactoryManager,
-                scml2019.NVMFactoryManager,
-                scml2019.Monopoly,
-                scml2019.PenaltySabotageFactoryManager,
+                _MAIN_AGENTS["scml2019.fj2"],
+                _MAIN_AGENTS["scml2019.rapt_fm"],
+                _MAIN_AGENTS["scml2019.iffm"],
+                _MAIN_AGENTS["scml2019.saha"],
+                _MAIN_AGENTS["scml2019.cheap_buyer"],
+                _MAIN_AGENTS["scml2019.nvm"],
+                _MAIN_AGENTS["scml2019.monopoly"],
+                _MAIN_AGENTS["scml2019.psfm"],
             )
         if track in ("std", "standard", "collusion") and not winners_only:
             classes = (
-                scml2019.FJ2FactoryManager,
-                scml2019.RaptFactoryManager,
-                scml2019.InsuranceFraudFactoryManager,
-                scml2019.SAHAFactoryManager,
-                scml2019.CheapBuyerFactoryManager,
-                scml2019.NVMFactoryManager,
+                _MAIN_AGENTS["scml2019.fj2"],
+                _MAIN_AGENTS["scml2019.rapt_fm"],
+                _MAIN_AGENTS["scml2019.iffm"],
+                _MAIN_AGENTS["scml2019.saha"],
+                _MAIN_AGENTS["scml2019.cheap_buyer"],
+                _MAIN_AGENTS["scml2019.nvm"],
             )
         if track == "sabotage" and not winners_only:
             # track is sabotage. Monopoly and PSFM (to be added)
             classes = (
-                scml2019.Monopoly,
-                scml2019.PenaltySabotageFactoryManager,
+                _MAIN_AGENTS["scml2019.monopoly"],
+                _MAIN_AGENTS["scml2019.psfm"],
             )
         elif track in ("std", "standard") and winners_only:
             classes = (
-                scml2019.InsuranceFraudFactoryManager,
-                scml2019.NVMFactoryManager,
-                scml2019.SAHAFactoryManager,
+                _MAIN_AGENTS["scml2019.iffm"],
+                _MAIN_AGENTS["scml2019.nvm"],
+                _MAIN_AGENTS["scml2019.saha"],
             )
         elif track in ("any", "all") and winners_only:
             classes = (
-                scml2019.InsuranceFraudFactoryManager,
-                scml2019.NVMFactoryManager,
-                scml2019.SAHAFactoryManager,
-                scml2019.FJ2FactoryManager,
+                _MAIN_AGENTS["scml2019.iffm"],
+                _MAIN_AGENTS["scml2019.nvm"],
+                _MAIN_AGENTS["scml2019.saha"],
+                _MAIN_AGENTS["scml2019.fj2"],
             )
         elif track in ("col", "collusion") and winners_only:
             classes = (
-                scml2019.InsuranceFraudFactoryManager,
-                scml2019.NVMFactoryManager,
-                scml2019.FJ2FactoryManager,
+                _MAIN_AGENTS["scml2019.iffm"],
+                _MAIN_AGENTS["scml2019.nvm"],
+                _MAIN_AGENTS["scml2019.fj2"],
             )
         elif track in ("sabotage",) and winners_only:
             classes = tuple()
     elif isinstance(version, int) and version == 2020:
         if track in ("std", "standard") and finalists_only:
-            classes = tuple(
-                sum(
-                    (
-                        [f"{_.__name__}.{a}" for a in _.__all__]
-                        for _ in (
-                            scml2020.team_may,
-                            scml2020.team_22,
-                            scml2020.team_25,
-                            scml2020.team_15,
-                            scml2020.a_sengupta,
-                            scml2020.monty_hall,
-                            scml2020.team_17,
-                            scml2020.team_10,
-                            scml2020.threadfield,
-                            scml2020.team_20,
-                            scml2020.biu_th,
-                            scml2020.team_32,
-                        )
-                    ),
-                    [],
-                )
+            classes = _team_agents(
+                "scml2020.team_may",
+                "scml2020.team_22",
+                "scml2020.team_25",
+                "scml2020.team_15",
+                "scml2020.a_sengupta",
+                "scml2020.monty_hall",
+                "scml2020.team_17",
+                "scml2020.team_10",
+                "scml2020.threadfield",
+                "scml2020.team_20",
+                "scml2020.biu_th",
+                "scml2020.team_32",
             )
         elif track in ("col", "collusion") and finalists_only:
-            classes = tuple(
-                sum(
-                    (
-                        [f"{_.__name__}.{a}" for a in _.__all__]
-                        for _ in (
-                            scml2020.team_17,
-                            scml2020.team_may,
-                            scml2020.team_25,
-                            scml2020.team_15,
-                            scml2020.a_sengupta,
-                            scml2020.team_20,
-                        )
-                    ),
-                    [],
-                )
+            classes = _team_agents(
+                "scml2020.team_17",
+                "scml2020.team_may",
+                "scml2020.team_25",
+                "scml2020.team_15",
+                "scml2020.a_sengupta",
+                "scml2020.team_20",
             )
         elif (
             track in ("any", "all", "std", "standard", "collusion") and not winners_only
         ):
-            classes = tuple(
-                sum(
-                    (
-                        [f"{_.__name__}.{a}" for a in _.__all__]
-                        for _ in (
-                            scml2020.team_may,
-                            scml2020.team_22,
-                            scml2020.team_25,
-                            scml2020.team_15,
-                            scml2020.bargent,
-                            scml2020.agent0x111,
-                            scml2020.a_sengupta,
-                            scml2020.past_frauds,
-                            scml2020.monty_hall,
-                            scml2020.team_19,
-                            scml2020.team_17,
-                            scml2020.team_10,
-                            scml2020.threadfield,
-                            scml2020.team_29,
-                            scml2020.team_20,
-                            scml2020.team_27,
-                            scml2020.team_18,
-                            scml2020.biu_th,
-                            scml2020.team_32,
-                        )
-                    ),
-                    [],
-                )
+            classes = _team_agents(
+                "scml2020.team_may",
+                "scml2020.team_22",
+                "scml2020.team_25",
+                "scml2020.team_15",
+                "scml2020.bargent",
+                "scml2020.agent0x111",
+                "scml2020.a_sengupta",
+                "scml2020.past_frauds",
+                "scml2020.monty_hall",
+                "scml2020.team_19",
+                "scml2020.team_17",
+                "scml2020.team_10",
+                "scml2020.threadfield",
+                "scml2020.team_29",
+                "scml2020.team_20",
+                "scml2020.team_27",
+                "scml2020.team_18",
+                "scml2020.biu_th",
+                "scml2020.team_32",
             )
         elif track in ("std", "standard") and winners_only:
-            classes = tuple(
-                sum(
-                    (
-                        [f"{_.__name__}.{a}" for a in _.__all__]
-                        for _ in (
-                            scml2020.team_15,
-                            scml2020.team_25,
-                        )
-                    ),
-                    [],
-                )
-            )
+            classes = _team_agents("scml2020.team_15", "scml2020.team_25")
         elif track in ("any", "all") and winners_only:
-            classes = tuple(
-                sum(
-                    (
-                        [f"{_.__name__}.{a}" for a in _.__all__]
-                        for _ in (
-                            scml2020.team_15,
-                            scml2020.team_may,
-                            scml2020.team_25,
-                            scml2020.a_sengupta,
-                        )
-                    ),
-                    [],
-                )
+            classes = _team_agents(
+                "scml2020.team_15",
+                "scml2020.team_may",
+                "scml2020.team_25",
+                "scml2020.a_sengupta",
             )
         elif track in ("col", "collusion") and winners_only:
-            classes = tuple(
-                sum(
-                    (
-                        [f"{_.__name__}.{a}" for a in _.__all__]
-                        for _ in (
-                            scml2020.team_may,
-                            scml2020.a_sengupta,
-                        )
-                    ),
-                    [],
-                )
-            )
+            classes = _team_agents("scml2020.team_may", "scml2020.a_sengupta")
     elif isinstance(version, int) and version == 2021:
         if bird_only:
-            classes = (scml2021.oneshot.team_corleone.MAIN_AGENT,)
+            classes = (_MAIN_AGENTS["scml2021.oneshot.team_corleone"],)
         elif track in ("std", "standard") and winners_only:
             classes = (
-                (scml2021.standard.team_may.MAIN_AGENT,),
-                (scml2021.standard.bossagent.MAIN_AGENT,),
-                (scml2021.standard.wabisabikoalas.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2021.standard.team_may"],),
+                (_MAIN_AGENTS["scml2021.standard.bossagent"],),
+                (_MAIN_AGENTS["scml2021.standard.wabisabikoalas"],),
             )
         elif track in ("col", "collusion") and winners_only:
             classes = (
-                (scml2021.standard.team_may.MAIN_AGENT,),
-                (scml2021.standard.bossagent.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2021.standard.team_may"],),
+                (_MAIN_AGENTS["scml2021.standard.bossagent"],),
             )
         elif track in ("one", "oneshot") and winners_only:
             classes = (
-                (scml2021.oneshot.team_86.MAIN_AGENT,),
-                (scml2021.oneshot.team_73.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2021.oneshot.team_86"],),
+                (_MAIN_AGENTS["scml2021.oneshot.team_73"],),
                 (
-                    scml2021.oneshot.team_50.MAIN_AGENT,
-                    scml2021.oneshot.team_62.MAIN_AGENT,
+                    _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                    _MAIN_AGENTS["scml2021.oneshot.team_62"],
                 ),
             )
         elif track in ("any", "all") and winners_only:
             classes = (
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
-                scml2021.oneshot.team_86.MAIN_AGENT,
-                scml2021.oneshot.team_73.MAIN_AGENT,
-                scml2021.oneshot.team_50.MAIN_AGENT,
-                scml2021.oneshot.team_62.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2021.oneshot.team_86"],
+                _MAIN_AGENTS["scml2021.oneshot.team_73"],
+                _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                _MAIN_AGENTS["scml2021.oneshot.team_62"],
             )
         elif track in ("std", "standard") and finalists_only:
             classes = (
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
-                scml2021.standard.team_mediocre.MAIN_AGENT,
-                scml2021.standard.team_53.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2021.standard.team_mediocre"],
+                _MAIN_AGENTS["scml2021.standard.team_53"],
             )
         elif track in ("col", "collusion") and finalists_only:
             classes = (
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
-                scml2021.standard.team_mediocre.MAIN_AGENT,
-                scml2021.standard.team_53.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2021.standard.team_mediocre"],
+                _MAIN_AGENTS["scml2021.standard.team_53"],
             )
         elif track in ("oneshot", "one") and finalists_only:
             classes = (
-                scml2021.oneshot.team_86.MAIN_AGENT,
-                scml2021.oneshot.team_50.MAIN_AGENT,
-                scml2021.oneshot.team_73.MAIN_AGENT,
-                scml2021.oneshot.team_62.MAIN_AGENT,
-                scml2021.oneshot.team_54.MAIN_AGENT,
-                scml2021.oneshot.staghunter.MAIN_AGENT,
-                scml2021.oneshot.team_corleone.MAIN_AGENT,
-                scml2021.oneshot.team_55.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.oneshot.team_86"],
+                _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                _MAIN_AGENTS["scml2021.oneshot.team_73"],
+                _MAIN_AGENTS["scml2021.oneshot.team_62"],
+                _MAIN_AGENTS["scml2021.oneshot.team_54"],
+                _MAIN_AGENTS["scml2021.oneshot.staghunter"],
+                _MAIN_AGENTS["scml2021.oneshot.team_corleone"],
+                _MAIN_AGENTS["scml2021.oneshot.team_55"],
             )
         elif track in ("all", "any") and finalists_only:
             classes = (
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
-                scml2021.standard.team_mediocre.MAIN_AGENT,
-                scml2021.standard.team_53.MAIN_AGENT,
-                scml2021.oneshot.team_86.MAIN_AGENT,
-                scml2021.oneshot.team_50.MAIN_AGENT,
-                scml2021.oneshot.team_73.MAIN_AGENT,
-                scml2021.oneshot.team_62.MAIN_AGENT,
-                scml2021.oneshot.team_54.MAIN_AGENT,
-                scml2021.oneshot.staghunter.MAIN_AGENT,
-                scml2021.oneshot.team_corleone.MAIN_AGENT,
-                scml2021.oneshot.team_55.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2021.standard.team_mediocre"],
+                _MAIN_AGENTS["scml2021.standard.team_53"],
+                _MAIN_AGENTS["scml2021.oneshot.team_86"],
+                _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                _MAIN_AGENTS["scml2021.oneshot.team_73"],
+                _MAIN_AGENTS["scml2021.oneshot.team_62"],
+                _MAIN_AGENTS["scml2021.oneshot.team_54"],
+                _MAIN_AGENTS["scml2021.oneshot.staghunter"],
+                _MAIN_AGENTS["scml2021.oneshot.team_corleone"],
+                _MAIN_AGENTS["scml2021.oneshot.team_55"],
             )
         elif track in ("std", "standard") and qualified_only:
             classes = (
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.iyibiteam.MAIN_AGENT,
-                scml2021.standard.team_41.MAIN_AGENT,
-                scml2021.standard.team_44.MAIN_AGENT,
-                scml2021.standard.team_45.MAIN_AGENT,
-                scml2021.standard.team_46.MAIN_AGENT,
-                scml2021.standard.team_49.MAIN_AGENT,
-                scml2021.standard.team_53.MAIN_AGENT,
-                scml2021.standard.team_67.MAIN_AGENT,
-                scml2021.standard.team_78.MAIN_AGENT,
-                scml2021.standard.team_82.MAIN_AGENT,
-                scml2021.standard.team_91.MAIN_AGENT,
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.team_mediocre.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.iyibiteam"],
+                _MAIN_AGENTS["scml2021.standard.team_41"],
+                _MAIN_AGENTS["scml2021.standard.team_44"],
+                _MAIN_AGENTS["scml2021.standard.team_45"],
+                _MAIN_AGENTS["scml2021.standard.team_46"],
+                _MAIN_AGENTS["scml2021.standard.team_49"],
+                _MAIN_AGENTS["scml2021.standard.team_53"],
+                _MAIN_AGENTS["scml2021.standard.team_67"],
+                _MAIN_AGENTS["scml2021.standard.team_78"],
+                _MAIN_AGENTS["scml2021.standard.team_82"],
+                _MAIN_AGENTS["scml2021.standard.team_91"],
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.team_mediocre"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
             )
         elif track in ("col", "collusion") and qualified_only:
             classes = (
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.iyibiteam.MAIN_AGENT,
-                scml2021.standard.team_41.MAIN_AGENT,
-                scml2021.standard.team_44.MAIN_AGENT,
-                scml2021.standard.team_45.MAIN_AGENT,
-                scml2021.standard.team_46.MAIN_AGENT,
-                scml2021.standard.team_49.MAIN_AGENT,
-                scml2021.standard.team_53.MAIN_AGENT,
-                scml2021.standard.team_67.MAIN_AGENT,
-                scml2021.standard.team_78.MAIN_AGENT,
-                scml2021.standard.team_82.MAIN_AGENT,
-                scml2021.standard.team_91.MAIN_AGENT,
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.team_mediocre.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.iyibiteam"],
+                _MAIN_AGENTS["scml2021.standard.team_41"],
+                _MAIN_AGENTS["scml2021.standard.team_44"],
+                _MAIN_AGENTS["scml2021.standard.team_45"],
+                _MAIN_AGENTS["scml2021.standard.team_46"],
+                _MAIN_AGENTS["scml2021.standard.team_49"],
+                _MAIN_AGENTS["scml2021.standard.team_53"],
+                _MAIN_AGENTS["scml2021.standard.team_67"],
+                _MAIN_AGENTS["scml2021.standard.team_78"],
+                _MAIN_AGENTS["scml2021.standard.team_82"],
+                _MAIN_AGENTS["scml2021.standard.team_91"],
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.team_mediocre"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
             )
         elif track in ("oneshot", "one") and qualified_only:
             classes = (
-                scml2021.oneshot.staghunter.MAIN_AGENT,
-                scml2021.oneshot.team_50.MAIN_AGENT,
-                scml2021.oneshot.team_51.MAIN_AGENT,
-                scml2021.oneshot.team_54.MAIN_AGENT,
-                scml2021.oneshot.team_55.MAIN_AGENT,
-                scml2021.oneshot.team_62.MAIN_AGENT,
-                scml2021.oneshot.team_72.MAIN_AGENT,
-                scml2021.oneshot.team_73.MAIN_AGENT,
-                scml2021.oneshot.team_86.MAIN_AGENT,
-                scml2021.oneshot.team_90.MAIN_AGENT,
-                scml2021.oneshot.team_corleone.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.oneshot.staghunter"],
+                _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                _MAIN_AGENTS["scml2021.oneshot.team_51"],
+                _MAIN_AGENTS["scml2021.oneshot.team_54"],
+                _MAIN_AGENTS["scml2021.oneshot.team_55"],
+                _MAIN_AGENTS["scml2021.oneshot.team_62"],
+                _MAIN_AGENTS["scml2021.oneshot.team_72"],
+                _MAIN_AGENTS["scml2021.oneshot.team_73"],
+                _MAIN_AGENTS["scml2021.oneshot.team_86"],
+                _MAIN_AGENTS["scml2021.oneshot.team_90"],
+                _MAIN_AGENTS["scml2021.oneshot.team_corleone"],
             )
         elif track in ("all", "any") and qualified_only:
             classes = (
-                scml2021.standard.bossagent.MAIN_AGENT,
-                scml2021.standard.iyibiteam.MAIN_AGENT,
-                scml2021.standard.team_41.MAIN_AGENT,
-                scml2021.standard.team_44.MAIN_AGENT,
-                scml2021.standard.team_45.MAIN_AGENT,
-                scml2021.standard.team_46.MAIN_AGENT,
-                scml2021.standard.team_49.MAIN_AGENT,
-                scml2021.standard.team_53.MAIN_AGENT,
-                scml2021.standard.team_67.MAIN_AGENT,
-                scml2021.standard.team_78.MAIN_AGENT,
-                scml2021.standard.team_82.MAIN_AGENT,
-                scml2021.standard.team_91.MAIN_AGENT,
-                scml2021.standard.team_may.MAIN_AGENT,
-                scml2021.standard.team_mediocre.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
-                scml2021.oneshot.staghunter.MAIN_AGENT,
-                scml2021.oneshot.team_50.MAIN_AGENT,
-                scml2021.oneshot.team_51.MAIN_AGENT,
-                scml2021.oneshot.team_54.MAIN_AGENT,
-                scml2021.oneshot.team_55.MAIN_AGENT,
-                scml2021.oneshot.team_62.MAIN_AGENT,
-                scml2021.oneshot.team_72.MAIN_AGENT,
-                scml2021.oneshot.team_73.MAIN_AGENT,
-                scml2021.oneshot.team_86.MAIN_AGENT,
-                scml2021.oneshot.team_90.MAIN_AGENT,
-                scml2021.oneshot.team_corleone.MAIN_AGENT,
+                _MAIN_AGENTS["scml2021.standard.bossagent"],
+                _MAIN_AGENTS["scml2021.standard.iyibiteam"],
+                _MAIN_AGENTS["scml2021.standard.team_41"],
+                _MAIN_AGENTS["scml2021.standard.team_44"],
+                _MAIN_AGENTS["scml2021.standard.team_45"],
+                _MAIN_AGENTS["scml2021.standard.team_46"],
+                _MAIN_AGENTS["scml2021.standard.team_49"],
+                _MAIN_AGENTS["scml2021.standard.team_53"],
+                _MAIN_AGENTS["scml2021.standard.team_67"],
+                _MAIN_AGENTS["scml2021.standard.team_78"],
+                _MAIN_AGENTS["scml2021.standard.team_82"],
+                _MAIN_AGENTS["scml2021.standard.team_91"],
+                _MAIN_AGENTS["scml2021.standard.team_may"],
+                _MAIN_AGENTS["scml2021.standard.team_mediocre"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2021.oneshot.staghunter"],
+                _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                _MAIN_AGENTS["scml2021.oneshot.team_51"],
+                _MAIN_AGENTS["scml2021.oneshot.team_54"],
+                _MAIN_AGENTS["scml2021.oneshot.team_55"],
+                _MAIN_AGENTS["scml2021.oneshot.team_62"],
+                _MAIN_AGENTS["scml2021.oneshot.team_72"],
+                _MAIN_AGENTS["scml2021.oneshot.team_73"],
+                _MAIN_AGENTS["scml2021.oneshot.team_86"],
+                _MAIN_AGENTS["scml2021.oneshot.team_90"],
+                _MAIN_AGENTS["scml2021.oneshot.team_corleone"],
             )
         elif track in ("std", "col", "standard", "collusion"):
-            classes = tuple(
-                sum(
-                    (
-                        [
-                            eval(f"scml2021.standard.{_}.{a}")
-                            for a in eval(f"scml2021.standard.{_}").__all__
-                        ]
-                        for _ in dir(scml2021.standard)
-                        if ismodule(eval(f"scml2021.standard.{_}"))
-                    ),
-                    [],
-                )
-            )
+            classes = _track_agents("scml2021.standard")
         elif track in ("one", "oneshot"):
-            classes = tuple(
-                sum(
-                    (
-                        [
-                            eval(f"scml2021.oneshot.{_}.{a}")
-                            for a in eval(f"scml2021.oneshot.{_}").__all__
-                        ]
-                        for _ in dir(scml2021.oneshot)
-                        if ismodule(eval(f"scml2021.oneshot.{_}"))
-                    ),
-                    [],
-                )
-            )
+            classes = _track_agents("scml2021.oneshot")
         elif track in ("any", "all"):
-            classes = tuple(
-                sum(
-                    [
-                        [
-                            eval(f"scml2021.standard.{_}.{a}")
-                            for a in eval(f"scml2021.standard.{_}").__all__
-                        ]
-                        for _ in dir(scml2021.standard)
-                        if ismodule(eval(f"scml2021.standard.{_}"))
-                    ]
-                    + [
-                        [
-                            eval(f"scml2021.oneshot.{_}.{a}")
-                            for a in eval(f"scml2021.oneshot.{_}").__all__
-                        ]
-                        for _ in dir(scml2021.oneshot)
-                        if ismodule(eval(f"scml2021.oneshot.{_}"))
-                    ],
-                    [],
-                )
-            )
+            classes = _track_agents("scml2021.standard", "scml2021.oneshot")
     elif isinstance(version, int) and version == 2022:
         if bird_only:
             classes = tuple()
         elif track in ("std", "standard") and winners_only:
             classes = (
-                (scml2022.standard.team_137.MAIN_AGENT,),
-                (scml2022.standard.team_may.MAIN_AGENT,),
-                (scml2022.standard.wabisabikoalas.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2022.standard.team_137"],),
+                (_MAIN_AGENTS["scml2022.standard.team_may"],),
+                (_MAIN_AGENTS["scml2022.standard.wabisabikoalas"],),
             )
         elif track in ("col", "collusion") and winners_only:
-            classes = ((scml2022.collusion.team_may.MAIN_AGENT,),)
+            classes = ((_MAIN_AGENTS["scml2022.collusion.team_may"],),)
         elif track in ("one", "oneshot") and winners_only:
             classes = (
-                (scml2022.oneshot.team_134.MAIN_AGENT,),
-                (scml2022.oneshot.team_102.MAIN_AGENT,),
-                (scml2022.oneshot.team_126.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2022.oneshot.team_134"],),
+                (_MAIN_AGENTS["scml2022.oneshot.team_102"],),
+                (_MAIN_AGENTS["scml2022.oneshot.team_126"],),
             )
         elif track in ("any", "all") and winners_only:
             classes = (
-                scml2022.standard.team_137.MAIN_AGENT,
-                scml2022.standard.team_may.MAIN_AGENT,
-                scml2022.standard.wabisabikoalas.MAIN_AGENT,
-                scml2022.collusion.team_may.MAIN_AGENT,
-                scml2022.oneshot.team_134.MAIN_AGENT,
-                scml2022.oneshot.team_102.MAIN_AGENT,
-                scml2022.oneshot.team_126.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.standard.team_137"],
+                _MAIN_AGENTS["scml2022.standard.team_may"],
+                _MAIN_AGENTS["scml2022.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2022.collusion.team_may"],
+                _MAIN_AGENTS["scml2022.oneshot.team_134"],
+                _MAIN_AGENTS["scml2022.oneshot.team_102"],
+                _MAIN_AGENTS["scml2022.oneshot.team_126"],
             )
         elif track in ("std", "standard") and finalists_only:
             classes = (
-                scml2022.standard.team_137.MAIN_AGENT,
-                scml2022.standard.team_may.MAIN_AGENT,
-                scml2022.standard.wabisabikoalas.MAIN_AGENT,
-                scml2022.standard.team_100.MAIN_AGENT,
-                scml2022.standard.bossagent.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.standard.team_137"],
+                _MAIN_AGENTS["scml2022.standard.team_may"],
+                _MAIN_AGENTS["scml2022.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2022.standard.team_100"],
+                _MAIN_AGENTS["scml2022.standard.bossagent"],
             )
         elif track in ("col", "collusion") and finalists_only:
             classes = (
-                scml2022.collusion.team_may.MAIN_AGENT,
-                scml2022.collusion.bossagent.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.collusion.team_may"],
+                _MAIN_AGENTS["scml2022.collusion.bossagent"],
             )
         elif track in ("oneshot", "one") and finalists_only:
             classes = (
-                scml2022.oneshot.team_134.MAIN_AGENT,
-                scml2022.oneshot.team_102.MAIN_AGENT,
-                scml2022.oneshot.team_126.MAIN_AGENT,
-                scml2022.oneshot.team_106.MAIN_AGENT,
-                scml2022.oneshot.team_107.MAIN_AGENT,
-                scml2022.oneshot.team_124.MAIN_AGENT,
-                scml2022.oneshot.team_131.MAIN_AGENT,
-                scml2022.oneshot.team_123.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.oneshot.team_134"],
+                _MAIN_AGENTS["scml2022.oneshot.team_102"],
+                _MAIN_AGENTS["scml2022.oneshot.team_126"],
+                _MAIN_AGENTS["scml2022.oneshot.team_106"],
+                _MAIN_AGENTS["scml2022.oneshot.team_107"],
+                _MAIN_AGENTS["scml2022.oneshot.team_124"],
+                _MAIN_AGENTS["scml2022.oneshot.team_131"],
+                _MAIN_AGENTS["scml2022.oneshot.team_123"],
             )
         elif track in ("all", "any") and finalists_only:
             classes = (
-                scml2022.standard.team_137.MAIN_AGENT,
-                scml2022.standard.team_may.MAIN_AGENT,
-                scml2022.standard.wabisabikoalas.MAIN_AGENT,
-                scml2022.standard.team_100.MAIN_AGENT,
-                scml2022.standard.bossagent.MAIN_AGENT,
-                scml2022.oneshot.team_134.MAIN_AGENT,
-                scml2022.oneshot.team_102.MAIN_AGENT,
-                scml2022.oneshot.team_126.MAIN_AGENT,
-                scml2022.oneshot.team_106.MAIN_AGENT,
-                scml2022.oneshot.team_107.MAIN_AGENT,
-                scml2022.oneshot.team_124.MAIN_AGENT,
-                scml2022.oneshot.team_131.MAIN_AGENT,
-                scml2022.oneshot.team_123.MAIN_AGENT,
-                scml2022.collusion.team_may.MAIN_AGENT,
-                scml2022.collusion.bossagent.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.standard.team_137"],
+                _MAIN_AGENTS["scml2022.standard.team_may"],
+                _MAIN_AGENTS["scml2022.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2022.standard.team_100"],
+                _MAIN_AGENTS["scml2022.standard.bossagent"],
+                _MAIN_AGENTS["scml2022.oneshot.team_134"],
+                _MAIN_AGENTS["scml2022.oneshot.team_102"],
+                _MAIN_AGENTS["scml2022.oneshot.team_126"],
+                _MAIN_AGENTS["scml2022.oneshot.team_106"],
+                _MAIN_AGENTS["scml2022.oneshot.team_107"],
+                _MAIN_AGENTS["scml2022.oneshot.team_124"],
+                _MAIN_AGENTS["scml2022.oneshot.team_131"],
+                _MAIN_AGENTS["scml2022.oneshot.team_123"],
+                _MAIN_AGENTS["scml2022.collusion.team_may"],
+                _MAIN_AGENTS["scml2022.collusion.bossagent"],
             )
         elif track in ("std", "standard") and qualified_only:
             classes = (
-                scml2022.standard.team_137.MAIN_AGENT,
-                scml2022.standard.team_may.MAIN_AGENT,
-                scml2022.standard.wabisabikoalas.MAIN_AGENT,
-                scml2022.standard.team_100.MAIN_AGENT,
-                scml2022.standard.bossagent.MAIN_AGENT,
-                scml2022.standard.team_9.MAIN_AGENT,
-                scml2022.standard.team_99.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.standard.team_137"],
+                _MAIN_AGENTS["scml2022.standard.team_may"],
+                _MAIN_AGENTS["scml2022.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2022.standard.team_100"],
+                _MAIN_AGENTS["scml2022.standard.bossagent"],
+                _MAIN_AGENTS["scml2022.standard.team_9"],
+                _MAIN_AGENTS["scml2022.standard.team_99"],
             )
         elif track in ("col", "collusion") and qualified_only:
             classes = (
-                scml2022.collusion.team_may.MAIN_AGENT,
-                scml2022.collusion.bossagent.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.collusion.team_may"],
+                _MAIN_AGENTS["scml2022.collusion.bossagent"],
             )
         elif track in ("oneshot", "one") and qualified_only:
             classes = (
-                scml2022.oneshot.team_134.MAIN_AGENT,
-                scml2022.oneshot.team_102.MAIN_AGENT,
-                scml2022.oneshot.team_126.MAIN_AGENT,
-                scml2022.oneshot.team_106.MAIN_AGENT,
-                scml2022.oneshot.team_107.MAIN_AGENT,
-                scml2022.oneshot.team_124.MAIN_AGENT,
-                scml2022.oneshot.team_131.MAIN_AGENT,
-                scml2022.oneshot.team_123.MAIN_AGENT,
-                scml2022.oneshot.team_94.MAIN_AGENT,
-                scml2022.oneshot.team_96.MAIN_AGENT,
-                scml2022.oneshot.team_105.MAIN_AGENT,
-                scml2022.oneshot.team_103.MAIN_AGENT,
-                scml2022.oneshot.team_62.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.oneshot.team_134"],
+                _MAIN_AGENTS["scml2022.oneshot.team_102"],
+                _MAIN_AGENTS["scml2022.oneshot.team_126"],
+                _MAIN_AGENTS["scml2022.oneshot.team_106"],
+                _MAIN_AGENTS["scml2022.oneshot.team_107"],
+                _MAIN_AGENTS["scml2022.oneshot.team_124"],
+                _MAIN_AGENTS["scml2022.oneshot.team_131"],
+                _MAIN_AGENTS["scml2022.oneshot.team_123"],
+                _MAIN_AGENTS["scml2022.oneshot.team_94"],
+                _MAIN_AGENTS["scml2022.oneshot.team_96"],
+                _MAIN_AGENTS["scml2022.oneshot.team_105"],
+                _MAIN_AGENTS["scml2022.oneshot.team_103"],
+                _MAIN_AGENTS["scml2022.oneshot.team_62"],
             )
         elif track in ("all", "any") and qualified_only:
             classes = (
-                scml2022.oneshot.team_134.MAIN_AGENT,
-                scml2022.oneshot.team_102.MAIN_AGENT,
-                scml2022.oneshot.team_126.MAIN_AGENT,
-                scml2022.oneshot.team_106.MAIN_AGENT,
-                scml2022.oneshot.team_107.MAIN_AGENT,
-                scml2022.oneshot.team_124.MAIN_AGENT,
-                scml2022.oneshot.team_131.MAIN_AGENT,
-                scml2022.oneshot.team_123.MAIN_AGENT,
-                scml2022.oneshot.team_94.MAIN_AGENT,
-                scml2022.oneshot.team_96.MAIN_AGENT,
-                scml2022.oneshot.team_105.MAIN_AGENT,
-                scml2022.oneshot.team_103.MAIN_AGENT,
-                scml2022.oneshot.team_62.MAIN_AGENT,
-                scml2021.oneshot.team_86.MAIN_AGENT,
-                scml2021.oneshot.team_50.MAIN_AGENT,
-                scml2022.standard.team_137.MAIN_AGENT,
-                scml2022.standard.team_may.MAIN_AGENT,
-                scml2022.standard.wabisabikoalas.MAIN_AGENT,
-                scml2022.standard.team_100.MAIN_AGENT,
-                scml2022.standard.bossagent.MAIN_AGENT,
-                scml2022.standard.team_9.MAIN_AGENT,
-                scml2022.standard.team_99.MAIN_AGENT,
-                scml2021.standard.wabisabikoalas.MAIN_AGENT,
-                scml2022.collusion.team_may.MAIN_AGENT,
-                scml2022.collusion.bossagent.MAIN_AGENT,
+                _MAIN_AGENTS["scml2022.oneshot.team_134"],
+                _MAIN_AGENTS["scml2022.oneshot.team_102"],
+                _MAIN_AGENTS["scml2022.oneshot.team_126"],
+                _MAIN_AGENTS["scml2022.oneshot.team_106"],
+                _MAIN_AGENTS["scml2022.oneshot.team_107"],
+                _MAIN_AGENTS["scml2022.oneshot.team_124"],
+                _MAIN_AGENTS["scml2022.oneshot.team_131"],
+                _MAIN_AGENTS["scml2022.oneshot.team_123"],
+                _MAIN_AGENTS["scml2022.oneshot.team_94"],
+                _MAIN_AGENTS["scml2022.oneshot.team_96"],
+                _MAIN_AGENTS["scml2022.oneshot.team_105"],
+                _MAIN_AGENTS["scml2022.oneshot.team_103"],
+                _MAIN_AGENTS["scml2022.oneshot.team_62"],
+                _MAIN_AGENTS["scml2021.oneshot.team_86"],
+                _MAIN_AGENTS["scml2021.oneshot.team_50"],
+                _MAIN_AGENTS["scml2022.standard.team_137"],
+                _MAIN_AGENTS["scml2022.standard.team_may"],
+                _MAIN_AGENTS["scml2022.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2022.standard.team_100"],
+                _MAIN_AGENTS["scml2022.standard.bossagent"],
+                _MAIN_AGENTS["scml2022.standard.team_9"],
+                _MAIN_AGENTS["scml2022.standard.team_99"],
+                _MAIN_AGENTS["scml2021.standard.wabisabikoalas"],
+                _MAIN_AGENTS["scml2022.collusion.team_may"],
+                _MAIN_AGENTS["scml2022.collusion.bossagent"],
             )
         elif track in ("std", "col", "standard", "collusion"):
-            classes = tuple(
-                sum(
-                    (
-                        [
-                            eval(f"scml2022.standard.{_}.{a}")
-                            for a in eval(f"scml2022.standard.{_}").__all__
-                        ]
-                        for _ in dir(scml2022.standard)
-                        if ismodule(eval(f"scml2022.standard.{_}"))
-                    ),
-                    [],
-                )
-            )
+            classes = _track_agents("scml2022.standard")
         elif track in ("one", "oneshot"):
-            classes = tuple(
-                sum(
-                    (
-                        [
-                            eval(f"scml2022.oneshot.{_}.{a}")
-                            for a in eval(f"scml2022.oneshot.{_}").__all__
-                        ]
-                        for _ in dir(scml2022.oneshot)
-                        if ismodule(eval(f"scml2022.oneshot.{_}"))
-                    ),
-                    [],
-                )
-            )
+            classes = _track_agents("scml2022.oneshot")
         elif track in ("any", "all"):
-            classes = tuple(
-                sum(
-                    [
-                        [
-                            eval(f"scml2022.standard.{_}.{a}")
-                            for a in eval(f"scml2022.standard.{_}").__all__
-                        ]
-                        for _ in dir(scml2022.standard)
-                        if ismodule(eval(f"scml2022.standard.{_}"))
-                    ]
-                    + [
-                        [
-                            eval(f"scml2022.collusion.{_}.{a}")
-                            for a in eval(f"scml2022.collusion.{_}").__all__
-                        ]
-                        for _ in dir(scml2022.collusion)
-                        if ismodule(eval(f"scml2022.collusion.{_}"))
-                    ]
-                    + [
-                        [
-                            eval(f"scml2022.oneshot.{_}.{a}")
-                            for a in eval(f"scml2022.oneshot.{_}").__all__
-                        ]
-                        for _ in dir(scml2022.oneshot)
-                        if ismodule(eval(f"scml2022.oneshot.{_}"))
-                    ],
-                    [],
-                )
+            classes = _track_agents(
+                "scml2022.standard", "scml2022.collusion", "scml2022.oneshot"
             )
     elif isinstance(version, int) and version == 2023:
         if bird_only:
             classes = tuple()
         elif track in ("std", "standard") and winners_only:
-            classes = ((scml2023.standard.team_150.MAIN_AGENT,),)
+            classes = ((_MAIN_AGENTS["scml2023.standard.team_150"],),)
         elif track in ("col", "collusion") and winners_only:
-            classes = ((scml2023.collusion.team_150.MAIN_AGENT,),)
+            classes = ((_MAIN_AGENTS["scml2023.collusion.team_150"],),)
         elif track in ("one", "oneshot") and winners_only:
             classes = (
-                (scml2023.oneshot.team_poli_usp.MAIN_AGENT,),
-                (scml2023.oneshot.team_144.MAIN_AGENT,),
-                (scml2023.oneshot.team_143.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2023.oneshot.team_poli_usp"],),
+                (_MAIN_AGENTS["scml2023.oneshot.team_144"],),
+                (_MAIN_AGENTS["scml2023.oneshot.team_143"],),
             )
         elif track in ("any", "all") and winners_only:
             classes = (
-                (scml2023.oneshot.team_poli_usp.MAIN_AGENT,),
-                (scml2023.oneshot.team_144.MAIN_AGENT,),
-                (scml2023.oneshot.team_143.MAIN_AGENT,),
-                (scml2023.collusion.team_150.MAIN_AGENT,),
+                (_MAIN_AGENTS["scml2023.oneshot.team_poli_usp"],),
+                (_MAIN_AGENTS["scml2023.oneshot.team_144"],),
+                (_MAIN_AGENTS["scml2023.oneshot.team_143"],),
+                (_MAIN_AGENTS["scml2023.collusion.team_150"],),
             )
         elif track in ("std", "standard") and (finalists_only or qualified_only):
             classes = (
-                scml2023.standard.team_150.MAIN_AGENT,
-                scml2023.standard.team_140.MAIN_AGENT,
+                _MAIN_AGENTS["scml2023.standard.team_150"],
+                _MAIN_AGENTS["scml2023.standard.team_140"],
             )
         elif track in ("col", "collusion") and (finalists_only or qualified_only):
             classes = (
-                scml2023.collusion.team_150.MAIN_AGENT,
-                scml2023.collusion.team_140.MAIN_AGENT,
+                _MAIN_AGENTS["scml2023.collusion.team_150"],
+                _MAIN_AGENTS["scml2023.collusion.team_140"],
             )
         elif track in ("oneshot", "one") and finalists_only:
             classes = (
-                scml2023.oneshot.team_poli_usp.MAIN_AGENT,
-                scml2023.oneshot.team_144.MAIN_AGENT,
-                scml2023.oneshot.team_143.MAIN_AGENT,
-                scml2023.oneshot.team_148.MAIN_AGENT,
-                scml2023.oneshot.team_145.MAIN_AGENT,
-                scml2023.oneshot.team_127.MAIN_AGENT,
-                scml2023.oneshot.team_126.MAIN_AGENT,
-                scml2023.oneshot.team_151.MAIN_AGENT,
+                _MAIN_AGENTS["scml2023.oneshot.team_poli_usp"],
+                _MAIN_AGENTS["scml2023.oneshot.team_144"],
+                _MAIN_AGENTS["scml2023.oneshot.team_143"],
+                _MAIN_AGENTS["scml2023.oneshot.team_148"],
+                _MAIN_AGENTS["scml2023.oneshot.team_145"],
+                _MAIN_AGENTS["scml2023.oneshot.team_127"],
+                _MAIN_AGENTS["scml2023.oneshot.team_126"],
+                _MAIN_AGENTS["scml2023.oneshot.team_151"],
             )
         elif track in ("all", "any") and finalists_only:
             classes = (
-                scml2023.oneshot.team_poli_usp.MAIN_AGENT,
-                scml2023.oneshot.team_144.MAIN_AGENT,
-                scml2023.oneshot.team_143.MAIN_AGENT,
-                scml2023.oneshot.team_148.MAIN_AGENT,
-                scml2023.oneshot.team_145.MAIN_AGENT,
-                scml2023.oneshot.team_127.MAIN_AGENT,
-                scml2023.oneshot.team_126.MAIN_AGENT,
-                scml2023.oneshot.team_151.MAIN_AGENT,
-                scml2023.collusion.team_150.MAIN_AGENT,
-                scml2023.collusion.team_140.MAIN_AGENT,
+                _MAIN_AGENTS["scml2023.oneshot.team_poli_usp"],
+                _MAIN_AGENTS["scml2023.oneshot.team_144"],
+                _MAIN_AGENTS["scml2023.oneshot.team_143"],
+                _MAIN_AGENTS["scml2023.oneshot.team_148"],
+                _MAIN_AGENTS["scml2023.oneshot.team_145"],
+                _MAIN_AGENTS["scml2023.oneshot.team_127"],
+                _MAIN_AGENTS["scml2023.oneshot.team_126"],
+                _MAIN_AGENTS["scml2023.oneshot.team_151"],
+                _MAIN_AGENTS["scml2023.collusion.team_150"],
+                _MAIN_AGENTS["scml2023.collusion.team_140"],
             )
         elif track in ("oneshot", "one") and qualified_only:
             classes = (
-                scml2023.oneshot.team_102.MAIN_AGENT,
-                scml2023.oneshot.team_123.MAIN_AGENT,
-                scml2023.oneshot.team_126.MAIN_AGENT,
-                scml2023.oneshot.team_127.MAIN_AGENT,
-                scml2023.oneshot.team_134.MAIN_AGENT,
-                scml2023.oneshot.team_139.MAIN_AGENT,
-                scml2023.oneshot.team_143.MAIN_AGENT,
-                scml2023.oneshot.team_144.MAIN_AGENT,
-                scml2023.oneshot.team_145.MAIN_AGENT,
-                scml2023.oneshot.team_148.MAIN_AGENT,
-                scml2023.oneshot.team_149.MAIN_AGENT,
-                scml2023.oneshot.team_151.MAIN_AGENT,
-                scml2023.oneshot.team_poli_usp.MAIN_AGENT,
+                _MAIN_AGENTS["scml2023.oneshot.team_102"],
+                _MAIN_AGENTS["scml2023.oneshot.team_123"],
+                _MAIN_AGENTS["scml2023.oneshot.team_126"],
+                _MAIN_AGENTS["scml2023.oneshot.team_127"],
+                _MAIN_AGENTS["scml2023.oneshot.team_134"],
+                _MAIN_AGENTS["scml2023.oneshot.team_139"],
+                _MAIN_AGENTS["scml2023.oneshot.team_143"],
+                _MAIN_AGENTS["scml2023.oneshot.team_144"],
+                _MAIN_AGENTS["scml2023.oneshot.team_145"],
+                _MAIN_AGENTS["scml2023.oneshot.team_148"],
+                _MAIN_AGENTS["scml2023.oneshot.team_149"],
+                _MAIN_AGENTS["scml2023.oneshot.team_151"],
+                _MAIN_AGENTS["scml2023.oneshot.team_poli_usp"],
             )
         elif track in ("all", "any") and qualified_only:
             classes = (
-                scml2023.oneshot.team_102.MAIN_AGENT,
-                scml2023.oneshot.team_123.MAIN_AGENT,
-                scml2023.oneshot.team_126.MAIN_AGENT,
-                scml2023.oneshot.team_127.MAIN_AGENT,
-                scml2023.oneshot.team_134.MAIN_AGENT,
-                scml2023.oneshot.team_139.MAIN_AGENT,
-                scml2023.oneshot.team_143.MAIN_AGENT,
-                scml2023.oneshot.team_144.MAIN_AGENT,
-                scml2023.oneshot.team_145.MAIN_AGENT,
-                scml2023.oneshot.team_148.MAIN_AGENT,
-                scml2023.oneshot.team_149.MAIN_AGENT,
-                scml2023.oneshot.team_151.MAIN_AGENT,
-                scml2023.oneshot.team_poli_usp.MAIN_AGENT,
-                scml2023.collusion.team_150.MAIN_AGENT,
-                scml2023.collusion.team_140.MAIN_AGENT,
+                _MAIN_AGENTS["scml2023.oneshot.team_102"],
+                _MAIN_AGENTS["scml2023.oneshot.team_123"],
+                _MAIN_AGENTS["scml2023.oneshot.team_126"],
+                _MAIN_AGENTS["scml2023.oneshot.team_127"],
+                _MAIN_AGENTS["scml2023.oneshot.team_134"],
+                _MAIN_AGENTS["scml2023.oneshot.team_139"],
+                _MAIN_AGENTS["scml2023.oneshot.team_143"],
+                _MAIN_AGENTS["scml2023.oneshot.team_144"],
+                _MAIN_AGENTS["scml2023.oneshot.team_145"],
+                _MAIN_AGENTS["scml2023.oneshot.team_148"],
+                _MAIN_AGENTS["scml2023.oneshot.team_149"],
+                _MAIN_AGENTS["scml2023.oneshot.team_151"],
+                _MAIN_AGENTS["scml2023.oneshot.team_poli_usp"],
+                _MAIN_AGENTS["scml2023.collusion.team_150"],
+                _MAIN_AGENTS["scml2023.collusion.team_140"],
             )
         elif track in ("std", "col", "standard", "collusion"):
-            classes = tuple(
-                sum(
-                    (
-                        [
-                            eval(f"scml2023.standard.{_}.{a}")
-                            for a in eval(f"scml2023.standard.{_}").__all__
-                        ]
-                        for _ in dir(scml2023.standard)
-                        if ismodule(eval(f"scml2023.standard.{_}"))
-                    ),
-                    [],
-                )
-            )
+            classes = _track_agents("scml2023.standard")
         elif track in ("one", "oneshot"):
-            classes = tuple(
-                sum(
-                    (
-                        [
-                            eval(f"scml2023.oneshot.{_}.{a}")
-                            for a in eval(f"scml2023.oneshot.{_}").__all__
-                        ]
-                        for _ in dir(scml2023.oneshot)
-                        if ismodule(eval(f"scml2023.oneshot.{_}"))
-                    ),
-                    [],
-                )
-            )
+            classes = _track_agents("scml2023.oneshot")
         elif track in ("any", "all"):
-            classes = tuple(
-                sum(
-                    [
-                        [
-                            eval(f"scml2023.standard.{_}.{a}")
-                            for a in eval(f"scml2023.standard.{_}").__all__
-                        ]
-                        for _ in dir(scml2023.standard)
-                        if ismodule(eval(f"scml2023.standard.{_}"))
-                    ]
-                    + [
-                        [
-                            eval(f"scml2023.collusion.{_}.{a}")
-                            for a in eval(f"scml2023.collusion.{_}").__all__
-                        ]
-                        for _ in dir(scml2023.collusion)
-                        if ismodule(eval(f"scml2023.collusion.{_}"))
-                    ]
-                    + [
-                        [
-                            eval(f"scml2023.oneshot.{_}.{a}")
-                            for a in eval(f"scml2023.oneshot.{_}").__all__
-                        ]
-                        for _ in dir(scml2023.oneshot)
-                        if ismodule(eval(f"scml2023.oneshot.{_}"))
-                    ],
-                    [],
-                )
+            classes = _track_agents(
+                "scml2023.standard", "scml2023.collusion", "scml2023.oneshot"
             )
     elif isinstance(version, str) and version == "contrib":
         classes = tuple()
@@ -798,9 +948,7 @@ def get_agents(
             f"The version {version} is unknown. Valid versions are 2019, 2020 (as ints), 'contrib' as a string"
         )
     if as_class:
-        classes = tuple(get_class(_) for _ in classes)
-    else:
-        classes = tuple(get_full_type_name(_) for _ in classes)
+        classes = tuple(_import_agent(_) for _ in classes)
 
     if top_only is not None:
         n = int(top_only) if top_only >= 1 else (top_only * len(classes))
@@ -0,0 +1,43 @@
+"""
+Lazy exports for the year and track packages.
+
+Each package lists the agents it exports with the (relative) module defining them and imports a module only when
+one of its agents (or the module itself) is first accessed. This way ``import scml_agents`` or getting the name of an
+agent does not import every team (and torch, tensorflow, sklearn, ... with them).
+"""
+
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from typing import Any, Callable, Iterable
+
+__all__ = ["lazy_getattr"]
+
+
+def lazy_getattr(
+    package: str, exports: dict[str, str], submodules: Iterable[str] = ()
+) -> Callable[[str], Any]:
+    """
+    Creates a module level ``__getattr__`` (PEP 562) for a package.
+
+    Args:
+        package: The full name of the package (its ``__name__``)
+        exports: Maps every name the package exports to the relative module it is imported from
+        submodules: Submodules accessible as attributes of the package in addition to the ones in exports
+    """
+    submodules = set(submodules) | {
+        _.lstrip(".").split(".")[0] for _ in exports.values()
+    }
+
+    def __getattr__(name: str) -> Any:
+        if name in exports:
+            value = getattr(import_module(exports[name], package), name)
+        elif name in submodules:
+            value = import_module(f".{name}", package)
+        else:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
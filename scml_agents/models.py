@@ -0,0 +1,145 @@
+"""
+A process wide registry of the models (pickled sklearn, xgboost, ... objects) shipped with the agents.
+
+Every artifact is resolved relative to the ``scml_agents`` package (not the current working directory), deserialized
+once per process and the same object is returned to every agent asking for it. Agents must treat these models as
+read-only: their NumPy arrays are marked as not writeable.
+
+Tournament runners can call `preload_models` when a worker process starts (e.g. as the ``initializer`` of a process
+pool) so that no agent pays for deserialization during a simulation, and `model_report` tells how long loading every
+artifact took and how much memory it allocated.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+__all__ = [
+    "MODELS",
+    "ModelLoad",
+    "model_path",
+    "load_model",
+    "preload_models",
+    "model_report",
+]
+
+# artifacts loaded by the agents (relative to the package)
+MODELS = (
+    "scml2020/team_29/production_binary_classifier.pkl",
+    "scml2021/oneshot/team_90/input_model.sav",
+    "scml2021/oneshot/team_90/output_model.sav",
+    *(
+        f"scml2021/standard/team_78/models/sold_quantity_{i}_predictor_init.pkl"
+        for i in range(5)
+    ),
+)
+
+_ROOT = Path(__file__).parent
+_LOCK = threading.Lock()
+_MODELS: dict[Path, Any] = dict()
+_LOADS: dict[Path, "ModelLoad"] = dict()
+
+
+@dataclass(frozen=True)
+class ModelLoad:
+    """How loading an artifact went"""
+
+    path: Path
+    """The resolved path of the artifact"""
+    seconds: float
+    """Wall time spent deserializing it"""
+    memory: int
+    """Bytes allocated (and still allocated) while deserializing it"""
+
+
+def model_path(path: str | os.PathLike) -> Path:
+    """Resolves the path of an artifact. Relative paths are relative to the scml_agents package"""
+    return (_ROOT / path).resolve()
+
+
+def _freeze(obj: Any, depth: int = 3) -> None:
+    """Marks the NumPy arrays reachable from obj (through containers and attributes) as read-only"""
+    if isinstance(obj, np.ndarray):
+        obj.flags.writeable = False
+        return
+    if depth <= 0:
+        return
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        children = obj
+    elif isinstance(obj, dict):
+        children = obj.values()
+    else:
+        children = getattr(obj, "__dict__", dict()).values()
+    for child in children:
+        _freeze(child, depth - 1)
+
+
+def load_model(path: str | os.PathLike) -> Any:
+    """
+    Returns the object pickled in the given artifact, deserializing it only the first time it is asked for.
+
+    Args:
+        path: The path of the artifact (relative to the scml_agents package or absolute)
+
+    Remarks:
+        - The same object is returned for every call with the same artifact so it must not be modified.
+    """
+    path = model_path(path)
+    model = _MODELS.get(path, None)
+    if model is not None:
+        return model
+    with _LOCK:
+        if path in _MODELS:
+            return _MODELS[path]
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                model = pickle.load(f)
+        finally:
+            seconds = time.perf_counter() - start
+            memory = tracemalloc.get_traced_memory()[0] - before
+            if not tracing:
+                tracemalloc.stop()
+        _freeze(model)
+        _MODELS[path] = model
+        _LOADS[path] = ModelLoad(path, seconds, memory)
+    return model
+
+
+def preload_models(paths: Iterable[str | os.PathLike] | None = None) -> list[ModelLoad]:
+    """
+    Loads the given artifacts (all the ones used by the agents by default) into the registry.
+
+    Returns:
+        How loading each artifact went (including the ones loaded before).
+
+    Remarks:
+        - Artifacts that cannot be loaded (e.g. pickled with an incompatible version of sklearn) are skipped. Agents
+          using them will fail when they try to load them exactly as they would without preloading.
+    """
+    loads = []
+    for path in MODELS if paths is None else paths:
+        try:
+            load_model(path)
+        except Exception:
+            continue
+        loads.append(_LOADS[model_path(path)])
+    return loads
+
+
+def model_report() -> list[ModelLoad]:
+    """How loading every artifact in the registry went (in loading order)"""
+    return list(_LOADS.values())
@@ -0,0 +1,252 @@
+"""
+Selection of subsets of offers without enumerating all of them.
+
+Several oneshot agents decide which offers to accept by scoring every subset of their partners. Here, a knapsack like
+dynamic program over the total quantity finds, for every total quantity, the best subset of offers. Its cost is linear
+in the number of offers times the maximum quantity (bounded by the number of production lines) instead of exponential
+in the number of partners.
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+from typing import Literal, Sequence
+
+from scml.oneshot.ufun import OneShotUFun
+from scml.scml2020.common import QUANTITY, UNIT_PRICE
+
+__all__ = ["subsets_by_quantity", "best_offer_subset"]
+
+
+def subsets_by_quantity(
+    quantities: Sequence[int],
+    max_quantity: int,
+    scores: Sequence[Sequence[float]] = (),
+    order: Literal["powerset", "binary"] = "powerset",
+) -> dict[int, tuple[int, ...]]:
+    """
+    Finds, for every total quantity up to max_quantity, the best subset of items reaching it.
+
+    Args:
+        quantities: The quantity of each item (e.g. offer)
+        max_quantity: Subsets with a larger total quantity are not considered
+        scores: Per item scores. The best subset maximizes the total of the first score, then of the second, etc.
+        order: How to break remaining ties, choosing the subset enumerated first by:
+
+               - "powerset": itertools.combinations over increasing sizes (fewer items, then earlier indices)
+               - "binary": including/excluding items in index order with exclusion first (i.e. counting in binary
+                 with the first item as the most significant bit)
+
+    Returns:
+        Maps every total quantity that some subset reaches to the (sorted) indices of its best subset.
+
+    Remarks:
+        - Every score is summed in index order starting from zero exactly like ``sum`` over the subset would do.
+    """
+    if max_quantity < 0:
+        return dict()
+    n = len(quantities)
+    # the tie breaking order is itself an additive score: the binary rank of a subset is the sum of 2^(n - 1 - i)
+    # over its items and combinations of the same size are enumerated in decreasing binary rank.
+    if order == "powerset":
+        ranks = [(-1, 1 << (n - 1 - i)) for i in range(n)]
+    elif order == "binary":
+        ranks = [(-(1 << (n - 1 - i)),) for i in range(n)]
+    else:
+        raise ValueError(f"Unknown order {order}")
+    values = [tuple(score[i] for score in scores) + ranks[i] for i in range(n)]
+    width = len(scores) + (2 if order == "powerset" else 1)
+    best: dict[int, tuple[tuple, tuple[int, ...]]] = {0: ((0,) * width, tuple())}
+    for i, q in enumerate(quantities):
+        # iterate over a snapshot so that every item is used at most once
+        for total, (value, subset) in list(best.items()):
+            total += q
+            if total > max_quantity:
+                continue
+            value = tuple(a + b for a, b in zip(value, values[i]))
+            current = best.get(total, None)
+            if current is None or value > current[0]:
+                best[total] = (value, subset + (i,))
+    return {total: subset for total, (_, subset) in best.items()}
+
+
+def _fixed_offers(
+    ufun: OneShotUFun,
+    fixed_offers: Sequence[tuple[int, int, int]],
+    fixed_outputs: Sequence[bool],
+) -> tuple[list[tuple[int, int, int]], list[tuple[int, int, int]]]:
+    """The inputs and outputs accepted in every case, followed by the exogenous contracts as ``from_offers`` adds them"""
+    inputs = [o for o, is_output in zip(fixed_offers, fixed_outputs) if not is_output]
+    outputs = [o for o, is_output in zip(fixed_offers, fixed_outputs) if is_output]
+    inputs.append((ufun.ex_qin, 0, ufun.ex_pin / ufun.ex_qin if ufun.ex_qin else 0))
+    outputs.append(
+        (ufun.ex_qout, 0, ufun.ex_pout / ufun.ex_qout if ufun.ex_qout else 0)
+    )
+    return [_ for _ in inputs if _], [_ for _ in outputs if _]
+
+
+def _affordable(
+    ufun: OneShotUFun, inputs: Sequence[tuple[int, int, int]]
+) -> tuple[int, int | None]:
+    """
+    The input quantity and the quantity the agent can pay for (None if it can pay for everything) as in ``from_offers``
+    """
+    balance, cost = ufun.current_balance, ufun.production_cost
+    qin, pin, qin_bar = 0, 0, 0 if balance < 0 else None
+    for offer in sorted(inputs, key=lambda x: x[UNIT_PRICE]):
+        q, p = offer[QUANTITY], offer[UNIT_PRICE]
+        if qin_bar is None and pin + p * q + q * cost > balance:
+            qin_bar = qin + int((balance - pin) // (p + cost))
+        pin += p * q
+        qin += q
+    return qin, qin_bar
+
+
+def _best_sales_by_quantity(
+    ufun: OneShotUFun,
+    offers: Sequence[tuple[int, int, int]],
+    fixed_inputs: Sequence[tuple[int, int, int]],
+    fixed_outputs: Sequence[tuple[int, int, int]],
+    max_quantity: int,
+    ties: Sequence[Sequence[float]],
+) -> list[tuple[int, ...]]:
+    """
+    Finds, for every total quantity, the subset of output offers with the highest utility when all inputs are fixed.
+
+    The inputs fix the producible quantity so, for a given total quantity, the utility only changes with the money
+    received for the producible quantity (sold to the most expensive offers first) minus the shortfall penalty which is
+    proportional to the total price of the outputs. Going through the offers from the most expensive, the money received
+    for an offer only depends on the quantity accepted before it.
+    """
+    qin, qin_bar = _affordable(ufun, fixed_inputs)
+    producible = min(qin if qin_bar is None else qin_bar, ufun.n_lines)
+    n = len(offers)
+    values = [
+        tuple(score[i] for score in ties) + (-1, 1 << (n - 1 - i)) for i in range(n)
+    ]
+    # the fixed outputs go after the offers exactly as in from_offers
+    items = sorted(
+        [(offer, i) for i, offer in enumerate(offers)]
+        + [(offer, None) for offer in fixed_outputs],
+        key=lambda x: -x[0][UNIT_PRICE],
+    )
+    fixed_quantity = sum(offer[QUANTITY] for offer in fixed_outputs)
+    found = []
+    for total in range(max_quantity + 1):
+        qout = fixed_quantity + total
+        sold = min(qin, ufun.n_lines, producible, qout)
+        weight = 0
+        if ufun.output_penalty_scale is None and qout:
+            weight = ufun.shortfall_penalty * max(0, qout - sold) / qout
+
+        def key(x):
+            money, price, scores, _ = x
+            return (money - weight * price,) + scores
+
+        # accepted quantity -> (money received, total price, tie breaking scores, subset)
+        best = {0: (0, 0, (0,) * (len(ties) + 2), tuple())}
+        before = 0
+        for offer, i in items:
+            q, p = offer[QUANTITY], offer[UNIT_PRICE]
+            if i is None:
+                best = {
+                    accepted: (
+                        money + p * max(0, min(q, producible - accepted - before)),
+                        price,
+                        scores,
+                        subset,
+                    )
+                    for accepted, (money, price, scores, subset) in best.items()
+                }
+                before += q
+                continue
+            # iterate over a snapshot so that every offer is used at most once
+            for accepted, (money, price, scores, subset) in list(best.items()):
+                if accepted + q > total:
+                    continue
+                candidate = (
+                    money + p * max(0, min(q, producible - accepted - before)),
+                    price + p * q,
+                    tuple(a + b for a, b in zip(scores, values[i])),
+                    tuple(sorted(subset + (i,))),
+                )
+                current = best.get(accepted + q, None)
+                if current is None or key(candidate) > key(current):
+                    best[accepted + q] = candidate
+        if total in best:
+            found.append(best[total][-1])
+    return found
+
+
+def best_offer_subset(
+    ufun: OneShotUFun,
+    offers: Sequence[tuple[int, int, int]],
+    is_selling: bool,
+    fixed_offers: Sequence[tuple[int, int, int]] = (),
+    fixed_outputs: Sequence[bool] = (),
+    tie_scores: Sequence[float] | None = None,
+    include_empty: bool = True,
+) -> tuple[tuple[int, ...] | None, float]:
+    """
+    Finds the subset of offers that ``ufun.from_offers`` values the most.
+
+    Args:
+        ufun: The utility function of the agent
+        offers: The offers as (quantity, time, unit price) tuples
+        is_selling: If true, all offers are for selling the output product otherwise they are all for buying the input
+        fixed_offers: Offers (e.g. signed contracts) accepted with every subset
+        fixed_outputs: Whether each fixed offer is for selling the output product
+        tie_scores: If given, ties in utility go to the subset with the smallest total tie score
+        include_empty: Whether accepting no offers is a possible choice
+
+    Returns:
+        The indices of the best subset (None if there is no possible subset) and its utility. Remaining ties in utility
+        go to the subset enumerated first by itertools.combinations over increasing sizes.
+
+    Remarks:
+        - Accepting the last offer in price order (the cheapest sale or the most expensive purchase) of a subset
+          that already reaches the production capacity without it never increases the utility, so only subsets up to
+          the number of lines plus the largest quantity are considered.
+        - When selling, the subset with the highest utility is found for every total quantity by a dynamic program over
+          the offers sorted by price. When buying, it is the cheapest subset unless the agent may not be able to pay for
+          all inputs in which case the utility depends on which inputs are the cheapest and all subsets are evaluated.
+    """
+    fixed_offers, fixed_outputs = tuple(fixed_offers), tuple(fixed_outputs)
+
+    def utility(subset: tuple[int, ...]) -> float:
+        return ufun.from_offers(
+            tuple(offers[_] for _ in subset) + fixed_offers,
+            (is_selling,) * len(subset) + fixed_outputs,
+        )
+
+    n = len(offers)
+    quantities = [offer[QUANTITY] for offer in offers]
+    max_quantity = ufun.n_lines + max(quantities, default=0)
+    ties = [[-_ for _ in tie_scores]] if tie_scores is not None else []
+    inputs, outputs = _fixed_offers(ufun, fixed_offers, fixed_outputs)
+    if is_selling:
+        candidates = _best_sales_by_quantity(
+            ufun, offers, inputs, outputs, max_quantity, ties
+        )
+    elif (
+        ufun.current_balance < 0 or _affordable(ufun, inputs + list(offers))[1] is None
+    ):
+        price = [-offer[UNIT_PRICE] * offer[QUANTITY] for offer in offers]
+        candidates = subsets_by_quantity(
+            quantities, max_quantity, [price] + ties
+        ).values()
+    else:
+        candidates = [
+            subset
+            for r in range(n + 1)
+            for subset in combinations(range(n), r)
+            if sum(quantities[_] for _ in subset) <= max_quantity
+        ]
+    best, best_key = None, None
+    for subset in sorted(set(candidates), key=lambda x: (len(x), x)):
+        if not subset and not include_empty:
+            continue
+        key = (utility(subset), -sum(tie_scores[_] for _ in subset) if ties else 0)
+        if best_key is None or key > best_key:
+            best, best_key = subset, key
+    return best, (best_key[0] if best_key is not None else float("-inf"))
@@ -0,0 +1,292 @@
+"""
+Statistics of a stream of values updated in constant time per value.
+
+Several oneshot agents summarize the prices they receive (means, percentiles, trends, moving averages) by recomputing
+the statistic from the whole history every time they respond. The classes here keep the summary instead so that adding
+a value and reading the statistic do not depend on how many values were seen.
+
+Sums are kept exactly (integers stay integers and floats are accumulated as fractions) so that means, variances and
+trends are the correctly rounded values ``statistics.mean``, ``statistics.variance`` and a least squares fit over the
+whole history would give.
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from collections import deque
+from fractions import Fraction
+from numbers import Integral, Real
+
+__all__ = [
+    "RunningStats",
+    "LinearTrend",
+    "QuantileSketch",
+    "MovingAverage",
+    "ExponentialMovingAverage",
+]
+
+
+def _exact(x: Real) -> int | Fraction:
+    """The exact value of a number (ints are kept as is to stay fast)"""
+    if isinstance(x, Integral):
+        return int(x)
+    return Fraction(x)
+
+
+def _ratio(a: int | Fraction, b: int | Fraction) -> float:
+    """a / b correctly rounded to a float"""
+    return float(a / b)
+
+
+class RunningStats:
+    """Count, mean, sample variance, minimum and maximum of the values added so far"""
+
+    def __init__(self, values=()):
+        self.count = 0
+        self.min = self.max = None
+        self._sum = self._squares = 0
+        for x in values:
+            self.add(x)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x: Real) -> None:
+        if not self.count:
+            self.min = self.max = x
+        elif x < self.min:
+            self.min = x
+        elif x > self.max:
+            self.max = x
+        x = _exact(x)
+        self.count += 1
+        self._sum += x
+        self._squares += x * x
+
+    @property
+    def mean(self) -> float:
+        """The mean (nan if no values were added)"""
+        if not self.count:
+            return math.nan
+        return _ratio(self._sum, self.count)
+
+    @property
+    def variance(self) -> float:
+        """The sample variance (zero with less than two values)"""
+        n = self.count
+        if n < 2:
+            return 0.0
+        return _ratio(n * self._squares - self._sum * self._sum, n * (n - 1))
+
+    @property
+    def std(self) -> float:
+        """The sample standard deviation (zero with less than two values)"""
+        return math.sqrt(self.variance)
+
+
+class LinearTrend:
+    """
+    The least squares line through the points added so far.
+
+    Points are (x, y) pairs. If x is not given, it is the index of the point (0, 1, 2, ...) which makes the line the
+    trend of the values over time.
+    """
+
+    def __init__(self, values=()):
+        self.count = 0
+        self._sx = self._sy = self._sxx = self._sxy = 0
+        for y in values:
+            self.add(y)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, y: Real, x: Real | None = None) -> None:
+        x = self.count if x is None else _exact(x)
+        y = _exact(y)
+        self.count += 1
+        self._sx += x
+        self._sy += y
+        self._sxx += x * x
+        self._sxy += x * y
+
+    def _slope(self) -> int | Fraction:
+        n = self.count
+        d = n * self._sxx - self._sx * self._sx
+        if not d:
+            return 0
+        return Fraction(n * self._sxy - self._sx * self._sy, d)
+
+    @property
+    def slope(self) -> float:
+        """The slope of the line (zero with less than two distinct x values)"""
+        return float(self._slope())
+
+    @property
+    def intercept(self) -> float:
+        """The value of the line at x = 0 (nan if no points were added)"""
+        return self.predict(0)
+
+    def predict(self, x: Real) -> float:
+        """The value of the line at x (nan if no points were added)"""
+        n = self.count
+        if not n:
+            return math.nan
+        return float(
+            Fraction(self._sy, n) + self._slope() * (_exact(x) - Fraction(self._sx, n))
+        )
+
+
+class QuantileSketch:
+    """
+    Quantiles of the values added so far using at most `capacity` centroids.
+
+    Values are kept sorted as they are added. While there are at most `capacity` of them, quantiles are exactly what
+    ``np.quantile`` (linear method) gives. Beyond that, neighbouring centroids are merged (into their weighted mean) so
+    that none weighs much more than the others and quantiles interpolate linearly between the centers of the
+    centroids. Adding a value and getting a quantile take a time bounded by `capacity`.
+    """
+
+    def __init__(self, values=(), capacity: int = 256):
+        if capacity < 2:
+            raise ValueError(f"capacity must be at least 2 (got {capacity})")
+        self.capacity = capacity
+        self.count = 0
+        self._values = []
+        self._weights = []
+        self._exact = True
+        for x in values:
+            self.add(x)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def exact(self) -> bool:
+        """Whether quantiles are still exact (no centroids were merged)"""
+        return self._exact
+
+    def add(self, x: Real) -> None:
+        i = bisect_right(self._values, x)
+        self._values.insert(i, x)
+        self._weights.insert(i, 1)
+        self.count += 1
+        if len(self._values) > self.capacity:
+            self._compress()
+
+    def _compress(self) -> None:
+        # neighbouring centroids are merged as long as their total weight stays under a limit. Any two consecutive
+        # centroids left weigh more than the limit together so at most half the capacity of them remain
+        limit = math.ceil(4 * self.count / self.capacity)
+        values, weights = [self._values[0]], [self._weights[0]]
+        for x, w in zip(self._values[1:], self._weights[1:]):
+            if weights[-1] + w <= limit:
+                values[-1] = (values[-1] * weights[-1] + x * w) / (weights[-1] + w)
+                weights[-1] += w
+            else:
+                values.append(x)
+                weights.append(w)
+        self._values, self._weights = values, weights
+        self._exact = False
+
+    def quantile(self, q: float) -> float:
+        """The q quantile (0 <= q <= 1) of the values (nan if no values were added)"""
+        if not self.count:
+            return math.nan
+        values = self._values
+        if self._exact:
+            # the same operations as np.quantile so that results are identical
+            n = len(values)
+            virtual = (n - 1) * q
+            if virtual >= n - 1:
+                return values[-1]
+            if virtual < 0:
+                return values[0]
+            i = math.floor(virtual)
+            gamma = virtual - i
+            a, b = values[i], values[i + 1]
+            if gamma >= 0.5:
+                return b - (b - a) * (1 - gamma)
+            return a + (b - a) * gamma
+        # each centroid covers the ranks of the values merged into it and sits at their center
+        target = q * (self.count - 1)
+        previous, before = None, 0
+        for x, w in zip(values, self._weights):
+            center = before + (w - 1) / 2
+            if target <= center:
+                if previous is None:
+                    return x
+                c, p = previous
+                return p + (x - p) * (target - c) / (center - c)
+            previous = center, x
+            before += w
+        return values[-1]
+
+    def percentile(self, p: float) -> float:
+        """The p percentile (0 <= p <= 100) of the values like ``np.percentile``"""
+        return self.quantile(p / 100)
+
+
+class MovingAverage:
+    """The mean of the last `window` values added"""
+
+    def __init__(self, window: int, values=()):
+        if window < 1:
+            raise ValueError(f"window must be positive (got {window})")
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._sum = 0
+        for x in values:
+            self.add(x)
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, x: Real) -> None:
+        if len(self._values) == self.window:
+            self._sum -= _exact(self._values[0])
+        self._values.append(x)
+        self._sum += _exact(x)
+
+    @property
+    def mean(self) -> float:
+        """The mean of the values in the window (nan if no values were added)"""
+        if not self._values:
+            return math.nan
+        return _ratio(self._sum, len(self._values))
+
+
+class ExponentialMovingAverage:
+    """
+    The exponentially weighted mean of the values added so far.
+
+    This gives the same values as ``pd.Series(values).ewm(alpha=alpha, adjust=False).mean().iloc[-1]``.
+    """
+
+    def __init__(self, alpha: float, values=()):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1] (got {alpha})")
+        self.alpha = alpha
+        # pandas goes through the center of mass which may change the last bits of alpha
+        self._alpha = 1.0 / (1.0 + (1.0 / alpha - 1))
+        self.count = 0
+        self.mean = math.nan
+        for x in values:
+            self.add(x)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x: Real) -> None:
+        x = float(x)
+        self.count += 1
+        if self.count == 1:
+            self.mean = x
+            return
+        # the same operations as pandas so that results are identical
+        old_weight = 1.0 - self._alpha
+        if self.mean != x:
+            self.mean = (old_weight * self.mean + self._alpha * x) / (
+                old_weight + self._alpha
+            )
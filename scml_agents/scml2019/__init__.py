@@ -1,20 +1,16 @@
 # -*- coding: utf-8 -*-
-from .cheap_buyer.cheapbuyer import CheapBuyerFactoryManager
-from .fj2 import FJ2FactoryManager
-from .iffm import InsuranceFraudFactoryManager
-from .monopoly import Monopoly
-from .nvm.nmv_agent import NVMFactoryManager
-from .psfm import PenaltySabotageFactoryManager
-from .rapt_fm import RaptFactoryManager
-from .saha import SAHAFactoryManager
+from scml_agents.lazy import lazy_getattr
 
-__all__ = [
-    "FJ2FactoryManager",
-    "RaptFactoryManager",
-    "InsuranceFraudFactoryManager",
-    "SAHAFactoryManager",
-    "CheapBuyerFactoryManager",
-    "NVMFactoryManager",
-    "Monopoly",
-    "PenaltySabotageFactoryManager",
-]
+_EXPORTS = {
+    "FJ2FactoryManager": ".fj2",
+    "RaptFactoryManager": ".rapt_fm",
+    "InsuranceFraudFactoryManager": ".iffm",
+    "SAHAFactoryManager": ".saha",
+    "CheapBuyerFactoryManager": ".cheap_buyer.cheapbuyer",
+    "NVMFactoryManager": ".nvm.nmv_agent",
+    "Monopoly": ".monopoly",
+    "PenaltySabotageFactoryManager": ".psfm",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
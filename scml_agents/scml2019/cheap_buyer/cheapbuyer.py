@@ -45,13 +45,14 @@ import time
 from typing import Any, Collection, Dict, List, Optional, Type, Union
 
 from negmas import AgentMechanismInterface, Contract, MechanismState, Negotiator
-from scml.scml2019.common import CFP, SCMLAgreement
+from scml.scml2019.common import CFP
 from scml.scml2019.factory_managers.builtins import (
     GreedyFactoryManager,
     Scheduler,
     temporary_transaction,
 )
 
+from ..feasibility import FeasibilityOracle
 from .myconsumer import MyConsumer
 from .MyNegotiator2 import MyNegotiator2
 from .myscheduler import MyScheduler
@@ -116,6 +117,7 @@ class CheapBuyerFactoryManager(GreedyFactoryManager):
             riskiness=riskiness,
         )
         self.ufun_factory = MyUtilityFunction
+        self.feasibility = FeasibilityOracle(self)
         """"""
 
     def init(self):
@@ -599,41 +601,9 @@ class CheapBuyerFactoryManager(GreedyFactoryManager):
     def can_produce(self, cfp: CFP, assume_no_further_negotiations=False) -> bool:
         """Whether or not we can produce the required item in time"""
         self.number_of_evaluations = self.number_of_evaluations + 1
-        if cfp.product not in self.producing.keys():
-            self.number_of_condition_satisfaction = (
-                self.number_of_condition_satisfaction + 1
-            )
-            return False
-        agreement = SCMLAgreement(
-            time=cfp.max_time, unit_price=cfp.max_unit_price, quantity=cfp.min_quantity
-        )
-        min_concluded_at = self.awi.current_step + 1 - int(self.immediate_negotiations)
-        min_sign_at = min_concluded_at + self.awi.default_signing_delay
-        if cfp.max_time < min_sign_at + 1:  # 1 is minimum time to produce the product
-            self.number_of_condition_satisfaction = (
-                self.number_of_condition_satisfaction + 1
-            )
-            return False
-        with temporary_transaction(self.scheduler):
-            schedule = self.scheduler.schedule(
-                contracts=[
-                    Contract(
-                        partners=[self.id, cfp.publisher],
-                        agreement=agreement,
-                        annotation=self._create_annotation(cfp=cfp),
-                        issues=cfp.issues,
-                        signed_at=min_sign_at,
-                        concluded_at=min_concluded_at,
-                    )
-                ],
-                ensure_storage_for=self.transportation_delay,
-                assume_no_further_negotiations=assume_no_further_negotiations,
-                start_at=min_sign_at,
-            )
-        result = schedule.valid and self.can_secure_needs(
-            schedule=schedule, step=self.awi.current_step
+        result = self.feasibility.can_produce(
+            cfp, assume_no_further_negotiations=assume_no_further_negotiations
         )
-
         if not result:
             self.number_of_condition_satisfaction = (
                 self.number_of_condition_satisfaction + 1
@@ -714,6 +684,7 @@ class CheapBuyerFactoryManager(GreedyFactoryManager):
             ) * contract.agreement.get("unit_price")
         # print("AVERAGE SELLING PRICE ", self.get_average_selling_price())
         # super().on_contract_signed(contract=contract)
+        self.feasibility.on_simulator_changed()
 
     def get_average_selling_price(self):
         if self.amount_sold > 0:
@@ -796,6 +767,7 @@ class CheapBuyerFactoryManager(GreedyFactoryManager):
             self.sell_contract_cancellations += 1
         elif contract.annotation.get("buyer") == self.id and rejectors[0] != self.id:
             self.buy_contract_cancellations += 1
+        self.feasibility.on_simulator_changed()
 
 
 # def main(competition='std', reveal_names=True, n_steps=200, n_configs=1, max_n_worlds_per_config=1, n_runs_per_world=1):
@@ -0,0 +1,224 @@
+"""
+Answers whether a factory manager can produce what a buy CFP asks for without running a trial schedule every time.
+
+`GreedyFactoryManager.can_produce` (and the agents that copied it) schedules a contract for the minimum quantity at the
+latest time of the CFP in a temporary transaction of the scheduler for every CFP received. When the manager would be
+the seller, the answer depends only on the product, quantity and time of the CFP, the current step and the state of
+the factory simulator (which only changes when the manager executes the schedule of a signed contract and when it
+is set to the state of the factory at every step).
+
+`FeasibilityOracle` keeps the free steps of every line (as prefix sums) and the least storage of every product from
+each step on until the manager tells it that its simulator changed. With `GreedyScheduler` these answer CFPs that can
+be sold from storage and reject CFPs that need more units than the free capacity of the lines producing the product
+before the CFP's time could ever give. Only the remaining CFPs are answered by a trial schedule, and all answers are
+kept for the rest of the step, so answers are exactly those of the trial schedule.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from negmas import Contract
+from scml.scml2019.common import CFP, NO_PRODUCTION, SCMLAgreement
+from scml.scml2019.schedulers import GreedyScheduler, ScheduleInfo, Scheduler
+from scml.scml2019.simulators import FastFactorySimulator, temporary_transaction
+
+__all__ = ["FeasibilityOracle"]
+
+
+def _is_greedy(scheduler: Scheduler) -> bool:
+    """Whether the scheduler schedules contracts exactly as `GreedyScheduler` does"""
+    cls = type(scheduler)
+    return (
+        cls.schedule is Scheduler.schedule
+        and cls.find_schedule is GreedyScheduler.find_schedule
+        and cls.schedule_contracts is GreedyScheduler.schedule_contracts
+        and cls.schedule_contract is GreedyScheduler.schedule_contract
+    )
+
+
+class FeasibilityOracle:
+    """
+    Memoized `can_produce` of a factory manager (see the module documentation).
+
+    Args:
+        manager: The factory manager. It must have a `scheduler` and a `can_secure_needs` method (like
+                 `GreedyFactoryManager`) and call `on_simulator_changed` whenever it changes its simulator outside a
+                 temporary transaction.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._step: Optional[Tuple[int, int]] = None
+        self._answers: Dict[Tuple, bool] = dict()
+        # free steps of every line before each step (the first column is zero)
+        self._free_before: Optional[np.ndarray] = None
+        # the least storage of every product at each step or later
+        self._least_storage: Optional[np.ndarray] = None
+        # (line, minimum steps taken, maximum quantity produced) of every product
+        self._lines: Dict[int, Optional[List[Tuple[int, int, int]]]] = dict()
+        self.n_queries = 0
+        self.n_scheduled = 0
+
+    def on_simulator_changed(self) -> None:
+        """
+        Forgets the answers, free line steps and storage kept so far.
+
+        Remarks:
+            The manager calls it whenever a contract is signed, cancelled or breached (trial schedules are rolled
+            back so they leave the simulator as it was). It is called at every step anyway.
+        """
+        self._answers = dict()
+        self._free_before = None
+        self._least_storage = None
+
+    def can_produce(self, cfp: CFP, assume_no_further_negotiations=False) -> bool:
+        """Whether or not we can produce the required item in time"""
+        manager = self.manager
+        if cfp.product not in manager.producing.keys():
+            return False
+        awi = manager.awi
+        min_concluded_at = awi.current_step + 1 - int(manager.immediate_negotiations)
+        min_sign_at = min_concluded_at + awi.default_signing_delay
+        if cfp.max_time < min_sign_at + 1:  # 1 is minimum time to produce the product
+            return False
+        self.n_queries += 1
+        if not cfp.is_buy or cfp.publisher == manager.id:
+            # we would not be the seller so the answer depends on the price and the partner
+            return self._schedule(
+                cfp, min_concluded_at, min_sign_at, assume_no_further_negotiations
+            )
+        # managers set the state of their simulator to that of their factory at every step (fixing the past)
+        step = (awi.current_step, manager.scheduler.simulator.fixed_before)
+        if step != self._step:
+            self._step = step
+            self.on_simulator_changed()
+        key = (
+            cfp.product,
+            cfp.min_quantity,
+            cfp.max_time,
+            min_sign_at,
+            assume_no_further_negotiations,
+            # money shortages are only checked when assuming no further negotiations
+            cfp.max_unit_price if assume_no_further_negotiations else None,
+        )
+        answer = self._answers.get(key, None)
+        if answer is None:
+            answer = self._known_answer(
+                cfp.product, cfp.min_quantity, cfp.max_time, min_sign_at
+            )
+            if answer is None:
+                answer = self._schedule(
+                    cfp, min_concluded_at, min_sign_at, assume_no_further_negotiations
+                )
+            self._answers[key] = answer
+        return answer
+
+    def _schedule(
+        self,
+        cfp: CFP,
+        min_concluded_at: int,
+        min_sign_at: int,
+        assume_no_further_negotiations: bool,
+    ) -> bool:
+        # the trial schedule of GreedyFactoryManager.can_produce
+        manager = self.manager
+        self.n_scheduled += 1
+        agreement = SCMLAgreement(
+            time=cfp.max_time, unit_price=cfp.max_unit_price, quantity=cfp.min_quantity
+        )
+        with temporary_transaction(manager.scheduler):
+            schedule = manager.scheduler.schedule(
+                contracts=[
+                    Contract(
+                        partners=[manager.id, cfp.publisher],
+                        agreement=agreement,
+                        annotation=manager._create_annotation(cfp=cfp),
+                        issues=cfp.issues,
+                        signed_at=min_sign_at,
+                        concluded_at=min_concluded_at,
+                    )
+                ],
+                ensure_storage_for=manager.transportation_delay,
+                assume_no_further_negotiations=assume_no_further_negotiations,
+                start_at=min_sign_at,
+            )
+        return schedule.valid and manager.can_secure_needs(
+            schedule=schedule, step=manager.awi.current_step
+        )
+
+    def _product_lines(self, product: int) -> Optional[List[Tuple[int, int, int]]]:
+        if product in self._lines:
+            return self._lines[product]
+        scheduler = self.manager.scheduler
+        lines: Dict[int, Tuple[int, int]] = dict()
+        for info in scheduler.producing.get(product, []):
+            profile = scheduler.profiles[info.profile]
+            # a job takes at least this many free steps of the window it is scheduled in
+            steps = min(info.step, profile.n_steps)
+            if steps < 1:
+                lines = None
+                break
+            least, most = lines.get(profile.line, (steps, info.quantity))
+            lines[profile.line] = (min(least, steps), max(most, info.quantity))
+        result = (
+            None
+            if lines is None
+            else [(line, steps, q) for line, (steps, q) in lines.items()]
+        )
+        self._lines[product] = result
+        return result
+
+    def _known_answer(
+        self, product: int, quantity: int, t: int, start_at: int
+    ) -> Optional[bool]:
+        """
+        The answer of the trial schedule if the storage or the free steps of the lines before t decide it.
+
+        Only valid for `GreedyScheduler` which sells from storage when enough is available at t and otherwise
+        schedules every job inside a run of free steps of its line between the start and ``t - ensure_storage_for``.
+        """
+        manager = self.manager
+        scheduler = manager.scheduler
+        if not _is_greedy(scheduler):
+            return None
+        simulator = scheduler.simulator
+        start = max(simulator.fixed_before, start_at)
+        if t < start:
+            return False
+        needed = quantity - simulator.available_storage_at(t)[product]
+        if needed <= 0:
+            if type(simulator) is not FastFactorySimulator:
+                return None
+            if self._least_storage is None:
+                storage = simulator.storage_to(simulator.n_steps - 1)[:, ::-1]
+                self._least_storage = np.minimum.accumulate(storage, axis=1)[:, ::-1]
+            # selling from storage needs nothing and only fails if the storage falls short at t or later
+            if self._least_storage[product, t] < quantity:
+                return False
+            return manager.can_secure_needs(
+                schedule=ScheduleInfo(final_balance=simulator.final_balance),
+                step=manager.awi.current_step,
+            )
+        lines = self._product_lines(product)
+        if lines is None:
+            return None
+        if self._free_before is None:
+            free = simulator.line_schedules_to(simulator.n_steps - 1) == NO_PRODUCTION
+            self._free_before = np.zeros((free.shape[0], free.shape[1] + 1), dtype=int)
+            np.cumsum(free, axis=1, out=self._free_before[:, 1:])
+        # the steps the scheduler looks at: line_schedules_to(t - ensure_storage_for - 1)[line][start:]
+        window = range(simulator.n_steps)[: t - self.manager.transportation_delay][
+            start:
+        ]
+        if len(window) < 1:
+            return False
+        capacity = 0
+        for line, steps, q in lines:
+            free = (
+                self._free_before[line, window.stop]
+                - self._free_before[line, window.start]
+            )
+            capacity += (free // steps) * q
+        if needed > capacity:
+            return False
+        return None
@@ -1,15 +1,18 @@
-from typing import Optional
+from typing import List, Optional
 
-from negmas import Contract, Negotiator
+from negmas import Breach, Contract, Negotiator
 from negmas.sao import NiceNegotiator
 from scml.scml2019.common import CFP
 from scml.scml2019.factory_managers.builtins import GreedyFactoryManager
 
+from scml_agents.scml2019.feasibility import FeasibilityOracle
+
 
 class FJ2FactoryManager(GreedyFactoryManager):
     """My factory manager"""
 
     def init(self):
+        self.feasibility = FeasibilityOracle(self)
         super().init()
         self.awi.register_interest([p.id for p in self.awi.products])
 
@@ -44,6 +47,22 @@ class FJ2FactoryManager(GreedyFactoryManager):
             self.awi.buy_insurance(contract)
         else:
             super().on_contract_signed(contract)
+            self.feasibility.on_simulator_changed()
+
+    def on_contract_cancelled(self, contract: Contract, rejectors: List[str]) -> None:
+        super().on_contract_cancelled(contract, rejectors)
+        self.feasibility.on_simulator_changed()
+
+    def on_contract_breached(
+        self, contract: Contract, breaches: List[Breach], resolution: Optional[Contract]
+    ) -> None:
+        super().on_contract_breached(contract, breaches, resolution)
+        self.feasibility.on_simulator_changed()
+
+    def can_produce(self, cfp: CFP, assume_no_further_negotiations=False) -> bool:
+        return self.feasibility.can_produce(
+            cfp, assume_no_further_negotiations=assume_no_further_negotiations
+        )
 
     def respond_to_negotiation_request(
         self, cfp: "CFP", partner: str
@@ -60,7 +60,6 @@ from scml.scml2019.common import (
     Loan,
     ProductionFailure,
     ProductionReport,
-    SCMLAgreement,
 )
 from scml.scml2019.factory_managers.builtins import (
     DoNothingFactoryManager,
@@ -75,6 +74,9 @@ from scml.scml2019.simulators import (
     temporary_transaction,
 )
 
+from scml_agents import tracing
+from scml_agents.scml2019.feasibility import FeasibilityOracle
+
 
 class PrintingFactoryManager(DoNothingFactoryManager):
     def __init__(
@@ -99,8 +101,8 @@ class PrintingFactoryManager(DoNothingFactoryManager):
     ):
         super().__init__(*args, **kwargs)
 
-        self._is_print = isPrint
-        if not self._is_print:
+        self._print_requested = isPrint
+        if not self._print_requested:
             printDepth = 0
         self._print_depth = printDepth
 
@@ -115,6 +117,14 @@ class PrintingFactoryManager(DoNothingFactoryManager):
             scheduler_params if scheduler_params is not None else {}
         )
 
+    @property
+    def _is_print(self):
+        """Printing goes to the trace (see scml_agents.tracing) so it only happens when tracing is enabled"""
+        return self._print_requested and tracing.is_enabled()
+
+    def _print(self, *args):
+        tracing.message(self.id, *args)
+
     def step(self, *args, **kwargs):
         super().step(*args, **kwargs)
         self._dump_data()
@@ -158,8 +168,8 @@ class PrintingFactoryManager(DoNothingFactoryManager):
         for i in self.producing.keys():
             self.sell[i] = [0 for j in range(self.awi.n_steps)]
         if self._is_print and self._print_depth >= 1:
-            print("--------")
-            print(str(self.name) + "'s dump data initialization is done.")
+            self._print("--------")
+            self._print(str(self.name) + "'s dump data initialization is done.")
 
         self._agent_layer_min = min(self.consuming.keys())
         self._agent_layer_max = min(self.producing.keys()) - 1
@@ -223,9 +233,9 @@ class PrintingFactoryManager(DoNothingFactoryManager):
                     if _first:
                         _first = False
                         if self._is_print:
-                            print(self.contract_schedules)
+                            self._print(self.contract_schedules)
                     if self._is_print:
-                        print(job)
+                        self._print(job)
 
     def _print_schedule(self, start=None, end=None):
         if start == None:
@@ -244,18 +254,18 @@ class PrintingFactoryManager(DoNothingFactoryManager):
             if i == self.awi.current_step:
                 _print_str += "\033[0m"
             _print_str += "|"
-        print(_print_str)
+        self._print(_print_str)
         # sell/buy
         for k, v in self.buy.items():
             _print_str = "BUY  " + self.products[k].name + " |"
             for i in range(_range_start, _range_end):
                 _print_str += ("0000" + str(v[i]))[-4:] + "|"
-        print(_print_str)
+        self._print(_print_str)
         for k, v in self.sell.items():
             _print_str = "SELL " + self.products[k].name + " |"
             for i in range(_range_start, _range_end):
                 _print_str += ("0000" + str(v[i]))[-4:] + "|"
-        print(_print_str)
+        self._print(_print_str)
         # schedule
         for i in range(self.scheduler.n_lines):
             _print_str = "Line " + ("00" + str(i))[-3:]
@@ -302,17 +312,17 @@ class PrintingFactoryManager(DoNothingFactoryManager):
                     else:
                         _print_str += "    "
             _print_str += "|"
-            print(_print_str)
+            self._print(_print_str)
         return None
 
     def _dump_data(self, additional_print=None):
         self._process_schedule_for_dump()
         if self._is_print and self._print_depth >= 1:
-            print("--------")
+            self._print("--------")
             if additional_print:
-                print(additional_print)
+                self._print(additional_print)
             # stepを表示
-            print(
+            self._print(
                 "time:\t\t"
                 + str(self.awi.current_step)
                 + " steps / "
@@ -322,10 +332,10 @@ class PrintingFactoryManager(DoNothingFactoryManager):
                 + ")"
             )
             # 自分の名前を表示
-            print("name:\t\t" + str(self.name))
-            print("id:\t\t" + str(self.id))
+            self._print("name:\t\t" + str(self.name))
+            self._print("id:\t\t" + str(self.id))
             # products 概要
-            print(
+            self._print(
                 "produce:\t"
                 + str([self.products[i].name for i in self.consuming.keys()])
                 + "=>"
@@ -353,10 +363,10 @@ class PrintingFactoryManager(DoNothingFactoryManager):
                         + "@"
                         + str(int(_output.step))
                     )
-                print(_print_str)
+                self._print(_print_str)
             # lines
-            print("lines:\t\t" + str(self.awi.state.n_lines) + " lines")
-            print(
+            self._print("lines:\t\t" + str(self.awi.state.n_lines) + " lines")
+            self._print(
                 "line usage:\t"
                 + str(sum(i == 1 for i in self.awi.state.line_schedules))
                 + "/"
@@ -374,14 +384,14 @@ class PrintingFactoryManager(DoNothingFactoryManager):
                 )
             if not _is_stock:
                 _print_str += "---"
-            print(_print_str)
+            self._print(_print_str)
             # products catalog price
             _print_str = "products catalog price:\t"
             for _product in self.awi.products:
                 _print_str += (
                     str(_product.name) + ":" + str(_product.catalog_price) + ", "
                 )
-            print(_print_str)
+            self._print(_print_str)
         # commandのプリント
         # if self._is_print:
         #    print(self.awi.state.commands)
@@ -477,54 +487,75 @@ class PrintingFactoryManager(DoNothingFactoryManager):
             self.awi.state.storage[i] for i in self.producing.keys()
         )
         if self._is_print and self._print_depth >= 1:
-            print("Money:\t\t" + str(self.awi.state.wallet))
-            print(
+            tracing.record(
+                self.id,
+                "state",
+                step=self.awi.current_step,
+                wallet=self.awi.state.wallet,
+                running_steps_left=self._running_steps_left,
+                total_production=self._total_production,
+                buy_offer_before=self._buy_offer_before,
+                buy_offer_after=self._buy_offer_after,
+                material_bought=self._material_bought,
+                buy_order_excuted_ratio=self._buy_order_excuted_ratio,
+                sell_offer_before=self._sell_offer_before,
+                sell_offer_after=self._sell_offer_after,
+                products_sold=self._products_sold,
+            )
+            self._print("Money:\t\t" + str(self.awi.state.wallet))
+            self._print(
                 "Agent layer:\t\t"
                 + str(self._agent_layer_min)
                 + "-"
                 + str(self._agent_layer_max)
             )
-            print("Max layer:\t\t" + str(self._max_layer))
-            print("The last step factory runs:\t" + str(self._running_last_step))
-            print("Running steps last:\t\t" + str(self._running_steps_left))
-            print("Total buy setps:\t\t" + str(self._total_buy_steps))
-            print("Total sell setps:\t\t" + str(self._total_sell_steps))
-            print("Total Production:\t\t" + str(self._total_production))
-            print("Buy offer Before:\t\t" + str(self._buy_offer_before))
-            print("Buy offer Before10:\t\t" + str(self._buy_offer_before_10))
-            print("Buy offer Before (Ave.):\t" + str(self._buy_offer_before_ave))
-            print("Buy offer Before10 (Ave.):\t" + str(self._buy_offer_before_ave_10))
-            print("Buy Offer After:\t\t" + str(self._buy_offer_after))
-            print("Buy Offer After10:\t\t" + str(self._buy_offer_after_10))
-            print("Buy Offer After (Ave.):\t\t" + str(self._buy_offer_after_ave))
-            print("Buy Offer After10 (Ave.):\t" + str(self._buy_offer_after_ave_10))
-            print("Material bought:\t\t" + str(self._material_bought))
-            print(
+            self._print("Max layer:\t\t" + str(self._max_layer))
+            self._print("The last step factory runs:\t" + str(self._running_last_step))
+            self._print("Running steps last:\t\t" + str(self._running_steps_left))
+            self._print("Total buy setps:\t\t" + str(self._total_buy_steps))
+            self._print("Total sell setps:\t\t" + str(self._total_sell_steps))
+            self._print("Total Production:\t\t" + str(self._total_production))
+            self._print("Buy offer Before:\t\t" + str(self._buy_offer_before))
+            self._print("Buy offer Before10:\t\t" + str(self._buy_offer_before_10))
+            self._print("Buy offer Before (Ave.):\t" + str(self._buy_offer_before_ave))
+            self._print(
+                "Buy offer Before10 (Ave.):\t" + str(self._buy_offer_before_ave_10)
+            )
+            self._print("Buy Offer After:\t\t" + str(self._buy_offer_after))
+            self._print("Buy Offer After10:\t\t" + str(self._buy_offer_after_10))
+            self._print("Buy Offer After (Ave.):\t\t" + str(self._buy_offer_after_ave))
+            self._print(
+                "Buy Offer After10 (Ave.):\t" + str(self._buy_offer_after_ave_10)
+            )
+            self._print("Material bought:\t\t" + str(self._material_bought))
+            self._print(
                 "When material was bought at first:\t"
                 + str(self._step_first_material_came)
             )
-            print("Buy Order Excuted ratio:\t" + str(self._buy_order_excuted_ratio))
-            print(
+            self._print(
+                "Buy Order Excuted ratio:\t" + str(self._buy_order_excuted_ratio)
+            )
+            self._print(
                 "Buy Order Excution EST.(min):\t"
                 + str(self._buy_offer_excution_est_min)
             )
-            print(
+            self._print(
                 "Buy Order Excution EST.(max):\t"
                 + str(self._buy_offer_excution_est_max)
             )
-            print("Sell Offer Before:\t\t" + str(self._sell_offer_before))
-            print("Sell Offer After:\t\t" + str(self._sell_offer_after))
-            print("Sold products:\t\t" + str(self._products_sold))
-            print("Other agents data:")
+            self._print("Sell Offer Before:\t\t" + str(self._sell_offer_before))
+            self._print("Sell Offer After:\t\t" + str(self._sell_offer_after))
+            self._print("Sold products:\t\t" + str(self._products_sold))
+            self._print("Other agents data:")
             for partnerid, data in sorted(self._partner_credit.items()):
-                print(str(partnerid) + ":\t\t" + str(data))
+                self._print(str(partnerid) + ":\t\t" + str(data))
         self._partner_credit_history[self.awi.current_step] = self._partner_credit
         # process_stat print
         if self._is_print and self._print_depth >= 1:
             if self.awi.current_step < self.scheduler.n_steps - 1:
                 self._print_schedule()
             else:
-                print("Final Schedule:")
+                self._print("Final Schedule:")
                 for i in range(int((self.awi.n_steps - 1) / 20) + 1):
                     self._print_schedule(
                         start=i * 20, end=min((i + 1) * 20, self.awi.n_steps)
@@ -534,9 +565,9 @@ class PrintingFactoryManager(DoNothingFactoryManager):
 
     def _dump_failure(self, failures: List[ProductionFailure]) -> None:
         if self._is_print and self._print_depth >= 2:
-            print("--------")
-            print(str(self.name) + "'s production failures.")
-            print(failures)
+            self._print("--------")
+            self._print(str(self.name) + "'s production failures.")
+            self._print(failures)
         for _fail in failures:
             _command = _fail.command
             _line = _command.profile.line
@@ -564,8 +595,8 @@ class PrintingFactoryManager(DoNothingFactoryManager):
 
     def _dump_contract(self, contract: Contract, addPrint="", isSigned=False) -> None:
         if self._is_print and self._print_depth >= 2:
-            print("--------")
-            print(str(self.name) + "'s contract " + str(addPrint))
+            self._print("--------")
+            self._print(str(self.name) + "'s contract " + str(addPrint))
         (
             _cfp,
             _seller_id,
@@ -581,7 +612,7 @@ class PrintingFactoryManager(DoNothingFactoryManager):
             _is_buy = False
         else:
             _is_buy = None
-            print("\033[31mBUY/SELL ERROR\033[0m")
+            self._print("\033[31mBUY/SELL ERROR\033[0m")
             pass
         if isSigned:
             if _is_buy:
@@ -603,9 +634,11 @@ class PrintingFactoryManager(DoNothingFactoryManager):
                 + "x"
                 + str(_quantity)
             )
-            print(_print_str)
-            print("w/ " + _seller_id if _is_buy else _buyer_id)
-            print("insurance premier:\t" + str(self.awi.evaluate_insurance(contract)))
+            self._print(_print_str)
+            self._print("w/ " + _seller_id if _is_buy else _buyer_id)
+            self._print(
+                "insurance premier:\t" + str(self.awi.evaluate_insurance(contract))
+            )
         pass
 
     def on_contract_signed(self, contract: Contract) -> None:
@@ -619,7 +652,7 @@ class PrintingFactoryManager(DoNothingFactoryManager):
         super().on_negotiation_success(contract=contract, mechanism=mechanism)
         self._dump_contract(contract, addPrint="AGREED")
         if self._is_print and self._print_depth >= 2:
-            print("To be signed at " + str(contract.to_be_signed_at))
+            self._print("To be signed at " + str(contract.to_be_signed_at))
         pass
 
     def on_production_failure(self, failures: List[ProductionFailure]) -> None:
@@ -630,37 +663,37 @@ class PrintingFactoryManager(DoNothingFactoryManager):
     def on_production_success(self, reports: List[ProductionReport]) -> None:
         super().on_production_success(reports)
         if self._is_print and self._print_depth >= 3:
-            print("--------")
-            print(self.name)
-            print("success", reports)
+            self._print("--------")
+            self._print(self.name)
+            self._print("success", reports)
 
     def on_inventory_change(self, product: int, quantity: int, cause: str) -> None:
         super().on_inventory_change(product, quantity, cause)
         if self._is_print and self._print_depth >= 3:
-            print("--------")
-            print(self.name)
-            print("change", product, quantity, cause)
+            self._print("--------")
+            self._print(self.name)
+            self._print("change", product, quantity, cause)
 
     def on_cash_transfer(self, amount: float, cause: str) -> None:
         super().on_cash_transfer(amount, cause)
         if self._is_print and self._print_depth >= 2:
-            print("--------")
-            print(self.name)
-            print("cash", amount, cause)
+            self._print("--------")
+            self._print(self.name)
+            self._print("cash", amount, cause)
 
     def on_new_report(self, report: FinancialReport):
         super().on_new_report(report)
         if self._is_print and self._print_depth >= 3:
-            print("--------")
-            print(self.name)
-            print("report", report)
+            self._print("--------")
+            self._print(self.name)
+            self._print("report", report)
 
     def on_contract_executed(self, contract: Contract) -> None:
         super().on_contract_executed(contract)
         if self._is_print and self._print_depth >= 3:
-            print("--------")
-            print("Contract was excuted")
-            print(contract)
+            self._print("--------")
+            self._print("Contract was excuted")
+            self._print(contract)
         (
             _cfp,
             _seller_id,
@@ -676,11 +709,11 @@ class PrintingFactoryManager(DoNothingFactoryManager):
             _is_buy = False
         else:
             _is_buy = None
-            print("\033[31mBUY/SELL ERROR\033[0m")
+            self._print("\033[31mBUY/SELL ERROR\033[0m")
             pass
         if _is_buy:
             if self._is_print and self._print_depth >= 2:
-                print(_seller_id)
+                self._print(_seller_id)
             if _seller_id not in self._partner_credit:
                 self._partner_credit[_seller_id] = {
                     "breach": 0,
@@ -695,15 +728,15 @@ class PrintingFactoryManager(DoNothingFactoryManager):
     ) -> None:
         super().on_contract_breached(contract, breaches, resolution)
         if self._is_print and self._print_depth >= 3:
-            print("--------")
-            print("\033[31mContract was breached\033[0m")
-            print(contract)
-            print(breaches)
+            self._print("--------")
+            self._print("\033[31mContract was breached\033[0m")
+            self._print(contract)
+            self._print(breaches)
         for breach in breaches:
             if self.id == breach.perpetrator:
                 continue
             if self._is_print and self._print_depth >= 2:
-                print(breach.perpetrator)
+                self._print(breach.perpetrator)
             if breach.perpetrator not in self._partner_credit:
                 self._partner_credit[breach.perpetrator] = {
                     "breach": 0,
@@ -781,6 +814,7 @@ class NonDemandDrivenAgent(PrintingFactoryManager):
         self.negotiator_params = (
             negotiator_params if negotiator_params is not None else {}
         )
+        self.feasibility = FeasibilityOracle(self)
 
     # =====================
     # Time-Driven Callbacks
@@ -863,14 +897,14 @@ class NonDemandDrivenAgent(PrintingFactoryManager):
         self._needs = self.add_i
 
         if self._is_print and self._print_depth >= 2:
-            print("Controll:")
-            print(
+            self._print("Controll:")
+            self._print(
                 "fail rate: {}, current input: {}, current lambdda: {}, current onuput: {}, mu: {}, target lambda: {},\
 target input: {}, delta input: {}".format(
                     f, ci, clambda, co, mu, tlambda, ti, di
                 )
             )
-            print(self.add_i, s * di)
+            self._print(self.add_i, s * di)
 
         ####
         # To Do:
@@ -907,7 +941,7 @@ target input: {}, delta input: {}".format(
                         quantity=(1, int(_quantity_max)),
                     )
                     if self._is_print:
-                        print(cfp)
+                        self._print(cfp)
                     self.awi.register_cfp(cfp)
 
     # ==========================
@@ -1057,7 +1091,7 @@ target input: {}, delta input: {}".format(
             _is_buy = False
         else:
             _is_buy = None
-            print("\033[31mBUY/SELL ERROR\033[0m")
+            self._print("\033[31mBUY/SELL ERROR\033[0m")
 
         if any(self.awi.is_bankrupt(partner) for partner in contract.partners):
             return None
@@ -1095,13 +1129,13 @@ target input: {}, delta input: {}".format(
 
         if _is_buy:
             if self._is_print and self._print_depth >= 2:
-                print("--------")
-                print(self.name)
-                print("Signing Contract")
-                print(str(self._needs) + " needs left")
+                self._print("--------")
+                self._print(self.name)
+                self._print("Signing Contract")
+                self._print(str(self._needs) + " needs left")
             if self._needs < _quantity:
                 if self._is_print and self._print_depth >= 2:
-                    print("Deny to sign")
+                    self._print("Deny to sign")
                 return None
             else:
                 self._needs -= _quantity
@@ -1119,10 +1153,12 @@ target input: {}, delta input: {}".format(
         schedule = self.contract_schedules[contract.id]
         if schedule is not None and schedule.valid:
             self._execute_schedule(schedule=schedule, contract=contract)
+        self.feasibility.on_simulator_changed()
 
     def on_contract_cancelled(self, contract: Contract, rejectors: List[str]) -> None:
         """Called whenever at least a partner did not sign the contract"""
         super().on_contract_cancelled(contract, rejectors)
+        self.feasibility.on_simulator_changed()
 
     def on_contract_nullified(
         self, contract: Contract, bankrupt_partner: str, compensation: float
@@ -1152,6 +1188,7 @@ target input: {}, delta input: {}".format(
 
         """
         super().on_contract_breached(contract, breaches, resolution)
+        self.feasibility.on_simulator_changed()
 
     def confirm_contract_execution(self, contract: Contract) -> bool:
         """Called at the delivery time specified in the contract to confirm that the agent wants to execute it.
@@ -1332,33 +1369,8 @@ target input: {}, delta input: {}".format(
 
     def can_produce(self, cfp: CFP, assume_no_further_negotiations=False) -> bool:
         """Whether or not we can produce the required item in time"""
-        if cfp.product not in self.producing.keys():
-            return False
-        agreement = SCMLAgreement(
-            time=cfp.max_time, unit_price=cfp.max_unit_price, quantity=cfp.min_quantity
-        )
-        min_concluded_at = self.awi.current_step + 1 - int(self.immediate_negotiations)
-        min_sign_at = min_concluded_at + self.awi.default_signing_delay
-        if cfp.max_time < min_sign_at + 1:  # 1 is minimum time to produce the product
-            return False
-        with temporary_transaction(self.scheduler):
-            schedule = self.scheduler.schedule(
-                contracts=[
-                    Contract(
-                        partners=[self.id, cfp.publisher],
-                        agreement=agreement,
-                        annotation=self._create_annotation(cfp=cfp),
-                        issues=cfp.issues,
-                        signed_at=min_sign_at,
-                        concluded_at=min_concluded_at,
-                    )
-                ],
-                ensure_storage_for=self.transportation_delay,
-                assume_no_further_negotiations=assume_no_further_negotiations,
-                start_at=min_sign_at,
-            )
-        return schedule.valid and self.can_secure_needs(
-            schedule=schedule, step=self.awi.current_step
+        return self.feasibility.can_produce(
+            cfp, assume_no_further_negotiations=assume_no_further_negotiations
         )
 
     def can_secure_needs(self, schedule: ScheduleInfo, step: int):
@@ -1445,7 +1457,7 @@ class InsuranceFraudFactoryManager(NonDemandDrivenAgent):
 
     def _process_buy_cfp(self, cfp: CFP) -> None:
         if cfp.max_quantity == self._collusion_para1:
-            print(cfp.publisher)
+            self._print(cfp.publisher)
             if cfp.publisher not in self._collusion_target:
                 self._collusion_target.append(cfp.publisher)
         else:
@@ -1702,7 +1714,7 @@ class InsuranceFraudFactoryManager(NonDemandDrivenAgent):
             _is_buy = False
         else:
             _is_buy = None
-            print("\033[31mBUY/SELL ERROR\033[0m")
+            self._print("\033[31mBUY/SELL ERROR\033[0m")
             pass
 
         if contract.agreement["quantity"] == self._collusion_para1:
@@ -1739,7 +1751,7 @@ class InsuranceFraudFactoryManager(NonDemandDrivenAgent):
             _is_buy = False
         else:
             _is_buy = None
-            print("\033[31mBUY/SELL ERROR\033[0m")
+            self._print("\033[31mBUY/SELL ERROR\033[0m")
             pass
 
         if contract.agreement["quantity"] == self._collusion_para1:
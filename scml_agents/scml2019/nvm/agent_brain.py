@@ -20,6 +20,7 @@ class AgentBrain:
         production_cost: float,
         num_intermediate_products: int,
         verbose: bool = False,
+        backend: str = "flow",
     ):
         """
         Initializes the brain of the agent. The constructor reads all the static data once and prepares it for the game.
@@ -28,7 +29,11 @@ class AgentBrain:
         :param output_product_index:
         :param production_cost:
         :param num_intermediate_products:
+        :param verbose:
+        :param backend: how to value contracts, either "flow" (solved in process) or "lp" (PuLP model).
         """
+        if backend not in ("flow", "lp"):
+            raise ValueError(f"Unknown backend {backend}")
         # Set verbosity and game length
         self.verbose = verbose
         self.game_length = game_length
@@ -42,12 +47,16 @@ class AgentBrain:
         # Initialize stuff about the MPNVP that is going to be reused each time
         self.mpnvp_number_of_periods = 4
         self.mpnvp_quantities_domain_size = 20
-        self.mpnvp_feasible_sols = mp_nvp.read_qtty_feasible_domain(
+        # The feasible solutions are shared by all the agents in the process (and memory-mapped when possible).
+        self.mpnvp_feasible_sols = mp_nvp.load_qtty_feasible_domain(
             self.mpnvp_number_of_periods, self.mpnvp_quantities_domain_size
         )
 
         # Initialize stuff about the MPNVP-LP
         self.mpnvplp_horizon = 10
+        self.mpnvplp_backend = backend
+        # The last network solved by the flow backend, with the key of its inputs. Reused to value extra contracts.
+        self._mpnvplp_network_cache = (None, None)
 
         # Check if the data exists. If so, load it and set self.there_is_data flag to True.
         if self.check_if_data_exists():
@@ -134,15 +143,17 @@ class AgentBrain:
             for t in range(current_time, end)
         }
         slice_prices_inn = {
-            t - current_time: self.prices_inn[str(t)]
-            if str(t) in self.prices_inn
-            else 0.0
+            t
+            - current_time: (
+                self.prices_inn[str(t)] if str(t) in self.prices_inn else 0.0
+            )
             for t in range(current_time, end)
         }
         slice_prices_out = {
-            t - current_time: self.prices_out[str(t)]
-            if str(t) in self.prices_out
-            else 0.0
+            t
+            - current_time: (
+                self.prices_out[str(t)] if str(t) in self.prices_out else 0.0
+            )
             for t in range(current_time, end)
         }
 
@@ -180,20 +191,16 @@ class AgentBrain:
             else [0] * self.mpnvp_number_of_periods
         )
 
-    def get_value_contracts(
+    def get_mpnvplp_inputs(
         self, current_time: int, total_game_time: int, contracts: dict
-    ) -> float:
+    ) -> dict:
         """
-        Given a set of buy and sell contracts, returns the value of planning assuming the buy and sell contracts will actually happen.
+        Returns the inputs of the MPNVM-LP for a set of buy and sell contracts.
         :param current_time
         :param total_game_time
         :param contracts:
-        :return:
+        :return: keyword arguments for mp_nvp_lp.solve_mp_nvp_lp.
         """
-        # If there is no data, we cannot solve th MPNVM-LP. Hence, we just return an infinity value and hope for the best.
-        if not self.there_is_data:
-            return float("inf")
-
         end = min(current_time + self.mpnvplp_horizon, total_game_time - 1)
         dict_of_buy_contracts = {
             t - current_time: [c for buy, c in contracts[t] if buy]
@@ -210,15 +217,17 @@ class AgentBrain:
             t - current_time: self.q_inn_expected[t] for t in range(current_time, end)
         }
         slice_prices_inn = {
-            t - current_time: self.prices_inn[str(t)]
-            if str(t) in self.prices_inn
-            else 0.0
+            t
+            - current_time: (
+                self.prices_inn[str(t)] if str(t) in self.prices_inn else 0.0
+            )
             for t in range(current_time, end)
         }
         slice_prices_out = {
-            t - current_time: self.prices_out[str(t)]
-            if str(t) in self.prices_out
-            else 0.0
+            t
+            - current_time: (
+                self.prices_out[str(t)] if str(t) in self.prices_out else 0.0
+            )
             for t in range(current_time, end)
         }
 
@@ -230,7 +239,7 @@ class AgentBrain:
             print(f"slice_prices_inn = {slice_prices_inn}")
             print(f"slice_prices_out = {slice_prices_out}")
 
-        return mp_nvp_lp.solve_mp_nvp_lp(
+        return dict(
             p_out=slice_prices_out,
             p_inn=slice_prices_inn,
             q_out=slice_q_out_expected,
@@ -240,6 +249,53 @@ class AgentBrain:
             input_offers=dict_of_buy_contracts,
             output_offers=dict_of_sell_contracts,
             time_horizon=min(self.mpnvplp_horizon, total_game_time - current_time - 1),
+        )
+
+    def get_contracts_network(
+        self, current_time: int, total_game_time: int, contracts: dict
+    ) -> mp_nvp_lp.MPNVPFlow:
+        """
+        Returns the solved flow network for a set of buy and sell contracts. The last network is cached, so that
+        valuing several candidate contracts against the same signed contracts builds and solves it only once.
+        :param current_time
+        :param total_game_time
+        :param contracts:
+        :return:
+        """
+        inputs = self.get_mpnvplp_inputs(current_time, total_game_time, contracts)
+        key = (
+            current_time,
+            total_game_time,
+            tuple(tuple(c) for c in inputs["input_offers"].values()),
+            tuple(tuple(c) for c in inputs["output_offers"].values()),
+        )
+        cached_key, network = self._mpnvplp_network_cache
+        if cached_key != key:
+            network = mp_nvp_lp.MPNVPFlow(**inputs)
+            network.solve()
+            self._mpnvplp_network_cache = (key, network)
+        return network
+
+    def get_value_contracts(
+        self, current_time: int, total_game_time: int, contracts: dict
+    ) -> float:
+        """
+        Given a set of buy and sell contracts, returns the value of planning assuming the buy and sell contracts will actually happen.
+        :param current_time
+        :param total_game_time
+        :param contracts:
+        :return:
+        """
+        # If there is no data, we cannot solve th MPNVM-LP. Hence, we just return an infinity value and hope for the best.
+        if not self.there_is_data:
+            return float("inf")
+
+        if self.mpnvplp_backend == "flow":
+            return self.get_contracts_network(
+                current_time, total_game_time, contracts
+            ).solve()
+        return mp_nvp_lp.solve_mp_nvp_lp(
+            **self.get_mpnvplp_inputs(current_time, total_game_time, contracts),
             verbose=self.verbose and False,
         )
 
@@ -316,20 +372,37 @@ class AgentBrain:
         :param agent_is_buy:
         :return:
         """
-        value_with___ = self.get_value_of_contract(
-            current_time=current_time,
-            total_game_time=total_game_time,
-            contracts=contracts,
-            contract=contract,
-            agent_is_buy=agent_is_buy,
-        )
-        value_without = self.get_value_of_contract(
-            current_time=current_time,
-            total_game_time=total_game_time,
-            contracts=contracts,
-            contract=None,
-            agent_is_buy=agent_is_buy,
-        )
+        if (
+            self.mpnvplp_backend == "flow"
+            and self.there_is_data
+            and contract.agreement["time"] >= current_time - 1
+        ):
+            # Re-solve the cached network of the signed contracts with the new contract only.
+            network = self.get_contracts_network(
+                current_time, total_game_time, contracts
+            )
+            value_without = network.solve()
+            value_with___ = network.with_contract(
+                t=contract.agreement["time"] - current_time,
+                unit_price=contract.agreement["unit_price"],
+                quantity=contract.agreement["quantity"],
+                is_buy=agent_is_buy,
+            ).solve()
+        else:
+            value_with___ = self.get_value_of_contract(
+                current_time=current_time,
+                total_game_time=total_game_time,
+                contracts=contracts,
+                contract=contract,
+                agent_is_buy=agent_is_buy,
+            )
+            value_without = self.get_value_of_contract(
+                current_time=current_time,
+                total_game_time=total_game_time,
+                contracts=contracts,
+                contract=None,
+                agent_is_buy=agent_is_buy,
+            )
         if self.verbose and False:
             print(f"\t ** ")
             print(f"\t Value with = {value_with___}")
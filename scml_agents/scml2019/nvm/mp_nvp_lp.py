@@ -1,6 +1,13 @@
+import copy
+import math
+from collections import deque
+from typing import List, Optional
+
 from prettytable import PrettyTable
 from pulp import *
 
+EPS = 1e-9
+
 
 def solve_mp_nvp_lp(
     p_out: dict,
@@ -80,10 +87,10 @@ def solve_mp_nvp_lp(
     # DEBUG print the LP.
     if verbose:
         # print(mpnvp_lp)
-        print(f"Status: {pulp.LpStatus[mpnvp_lp.status]}")
+        print(f"Status: {LpStatus[mpnvp_lp.status]}")
 
     # Get the status of the LP. If the LP is infeasible, the value is -infty. Otherwise, is the value of the objective function.
-    if pulp.LpStatus[mpnvp_lp.status] == "Infeasible":
+    if LpStatus[mpnvp_lp.status] == "Infeasible":
         return float("-inf")
     else:
         if verbose:
@@ -91,4 +98,227 @@ def solve_mp_nvp_lp(
             for t in range(0, time_horizon):
                 table.add_row([t, x[t].value(), y[t].value(), z[t].value()])
             print(table)
-        return pulp.value(mpnvp_lp.objective)
+        return value(mpnvp_lp.objective)
+
+
+class MPNVPFlow:
+    """
+    Solves the utility calculation LP of solve_mp_nvp_lp in process, as a min-cost flow problem.
+    Each unit of input bought at t flows to the input inventory at t + 1, can be produced at any later step (at most
+    production_capacity per step), and the output reaches the output inventory one step after production, from which
+    it can be sold. Leftover inventory is carried to the end of the horizon. Contracts fix a lower bound on what is
+    bought or sold at their time, exactly as the LP does.
+    The optimal flow is kept, so that the value of the same problem with one extra contract is obtained by an
+    incremental re-solve (see with_contract).
+    """
+
+    def __init__(
+        self,
+        p_out: dict,
+        p_inn: dict,
+        q_out: dict,
+        q_inn: dict,
+        time_horizon: int,
+        production_capacity: int,
+        production_cost: float,
+        input_offers: dict,
+        output_offers: dict,
+    ):
+        """
+        Builds the network. The parameters are the same as those of solve_mp_nvp_lp.
+        """
+        self.time_horizon = H = max(time_horizon, 0)
+        # Node 0 is the source, node 1 the sink, then the input inventories at 0, ..., H and the output inventories at 0, ..., H.
+        self.n_nodes = 2 + 2 * (H + 1)
+        self.heads: List[int] = []
+        self.caps: List[float] = []
+        self.costs: List[float] = []
+        self.adjacency: List[List[int]] = [[] for _ in range(self.n_nodes)]
+        self.excess = [0.0] * self.n_nodes
+        # The value of the contracts plus the cost of the flow forced through the network so far.
+        self.constant = sum(
+            c_q * c_p
+            for contracts in output_offers.values()
+            for c_p, c_q, c_t in contracts
+        ) - sum(
+            c_q * c_p
+            for contracts in input_offers.values()
+            for c_p, c_q, c_t in contracts
+        )
+        self.cost = 0.0
+        # The optimal value once solved (or -inf as soon as the problem is known to be infeasible).
+        self.value: Optional[float] = None
+        self.buy_edges, self.sell_edges = [], []
+        for t in range(H):
+            bought = sum(q for _, q, _ in input_offers.get(t, []))
+            sold = sum(q for _, q, _ in output_offers.get(t, []))
+            self.buy_edges.append(
+                self._add_edge(0, self._inn(t + 1), bought, bought + q_inn[t], p_inn[t])
+            )
+            self._add_edge(
+                self._inn(t), self._out(t + 1), 0, production_capacity, production_cost
+            )
+            self.sell_edges.append(
+                self._add_edge(self._out(t), 1, sold, sold + q_out[t], -p_out[t])
+            )
+            self._add_edge(self._inn(t), self._inn(t + 1), 0, math.inf, 0.0)
+            self._add_edge(self._out(t), self._out(t + 1), 0, math.inf, 0.0)
+        self._add_edge(self._inn(H), 1, 0, math.inf, 0.0)
+        self._add_edge(self._out(H), 1, 0, math.inf, 0.0)
+        self._add_edge(1, 0, 0, math.inf, 0.0)
+        # Saturate the edges with negative cost (sales), so that all residual costs are non-negative.
+        for e in range(0, len(self.heads), 2):
+            if self.costs[e] < 0 and self.caps[e] > EPS:
+                self._force(e, self.caps[e])
+
+    def _inn(self, t: int) -> int:
+        return 2 + t
+
+    def _out(self, t: int) -> int:
+        return 2 + self.time_horizon + 1 + t
+
+    def _add_edge(self, u: int, v: int, lower: float, upper: float, cost: float) -> int:
+        """
+        Adds an edge with flow in [lower, upper]. The lower bound is forced through the edge right away.
+        :return: the index of the edge. Its reverse (residual) edge is index ^ 1.
+        """
+        e = len(self.heads)
+        self.heads += [v, u]
+        self.caps += [max(upper - lower, 0.0), 0.0]
+        self.costs += [cost, -cost]
+        self.adjacency[u].append(e)
+        self.adjacency[v].append(e + 1)
+        if upper < lower - EPS:
+            # No flow can satisfy the bounds
+            self.value = float("-inf")
+        if lower > 0:
+            self.cost += lower * cost
+            self.excess[v] += lower
+            self.excess[u] -= lower
+        return e
+
+    def _force(self, e: int, amount: float):
+        """Pushes amount of flow through the residual edge e, leaving the imbalance to be fixed by solve."""
+        u, v = self.heads[e ^ 1], self.heads[e]
+        self.caps[e] -= amount
+        self.caps[e ^ 1] += amount
+        self.cost += amount * self.costs[e]
+        self.excess[v] += amount
+        self.excess[u] -= amount
+
+    def _shortest_path(self, sources: List[int]):
+        """Bellman-Ford (SPFA) over the residual network from all the given sources at once."""
+        dist = [math.inf] * self.n_nodes
+        parent = [-1] * self.n_nodes
+        in_queue = [False] * self.n_nodes
+        queue = deque(sources)
+        for s in sources:
+            dist[s] = 0.0
+            in_queue[s] = True
+        while queue:
+            u = queue.popleft()
+            in_queue[u] = False
+            for e in self.adjacency[u]:
+                if self.caps[e] > EPS:
+                    v = self.heads[e]
+                    d = dist[u] + self.costs[e]
+                    if d < dist[v] - EPS:
+                        dist[v] = d
+                        parent[v] = e
+                        if not in_queue[v]:
+                            in_queue[v] = True
+                            queue.append(v)
+        return dist, parent
+
+    def solve(self) -> float:
+        """
+        Routes all the imbalances created by the contracts and the saturated edges through cheapest paths.
+        :return: the optimal value of the LP, or -inf if the LP is infeasible.
+        """
+        if self.value is not None:
+            return self.value
+        while True:
+            sources = [u for u in range(self.n_nodes) if self.excess[u] > EPS]
+            if not sources:
+                break
+            dist, parent = self._shortest_path(sources)
+            sinks = [
+                u
+                for u in range(self.n_nodes)
+                if self.excess[u] < -EPS and dist[u] < math.inf
+            ]
+            if not sinks:
+                # Some imbalance cannot be routed, i.e. the LP is infeasible.
+                self.value = float("-inf")
+                return self.value
+            sink = min(sinks, key=lambda u: dist[u])
+            path, u = [], sink
+            while parent[u] >= 0:
+                path.append(parent[u])
+                u = self.heads[parent[u] ^ 1]
+            amount = min(
+                [self.excess[u], -self.excess[sink]] + [self.caps[e] for e in path]
+            )
+            for e in path:
+                self._force(e, amount)
+        self.value = self.constant - self.cost
+        return self.value
+
+    def with_contract(
+        self, t: int, unit_price: float, quantity: int, is_buy: bool
+    ) -> "MPNVPFlow":
+        """
+        Returns a copy of this problem with one more contract at time t (relative to the start of the horizon).
+        The copy starts from the optimal flow of this problem, so solving it only routes the contract's quantity.
+        :param t:
+        :param unit_price:
+        :param quantity:
+        :param is_buy: True if the agent buys (an input offer), False if it sells (an output offer).
+        :return:
+        """
+        self.solve()
+        other = copy.copy(self)
+        other.caps = list(self.caps)
+        other.excess = list(self.excess)
+        other.value = None
+        if self.value == float("-inf") or not 0 <= t < self.time_horizon:
+            # Adding constraints to an infeasible problem keeps it infeasible. Contracts out of the horizon are ignored.
+            other.value = self.value
+            return other
+        other.constant += (-1 if is_buy else 1) * quantity * unit_price
+        # The contract raises both bounds of the edge by its quantity: force that quantity through the edge.
+        e = (self.buy_edges if is_buy else self.sell_edges)[t]
+        u, v = other.heads[e ^ 1], other.heads[e]
+        other.cost += quantity * other.costs[e]
+        other.excess[v] += quantity
+        other.excess[u] -= quantity
+        return other
+
+
+def solve_mp_nvp_flow(
+    p_out: dict,
+    p_inn: dict,
+    q_out: dict,
+    q_inn: dict,
+    time_horizon: int,
+    production_capacity: int,
+    production_cost: float,
+    input_offers: dict,
+    output_offers: dict,
+    verbose: bool = False,
+):
+    """
+    Same as solve_mp_nvp_lp but solved in process with MPNVPFlow instead of calling an external LP solver.
+    :return: the optimal value of the LP, or -inf if the LP is infeasible.
+    """
+    return MPNVPFlow(
+        p_out=p_out,
+        p_inn=p_inn,
+        q_out=q_out,
+        q_inn=q_inn,
+        time_horizon=time_horizon,
+        production_capacity=production_capacity,
+        production_cost=production_cost,
+        input_offers=input_offers,
+        output_offers=output_offers,
+    ).solve()
@@ -5,7 +5,6 @@ from scml.scml2019.common import (
     INVALID_UTILITY,
     ProductionFailure,
     ProductionReport,
-    SCMLAgreement,
 )
 from scml.scml2019.consumers import ConsumptionProfile
 from scml.scml2019.factory_managers.builtins import (
@@ -21,6 +20,7 @@ from scml.scml2019.simulators import (
     temporary_transaction,
 )
 
+from scml_agents.scml2019.feasibility import FeasibilityOracle
 from scml_agents.scml2021.oneshot.team_73.nego_utils import UNIT_PRICE
 
 if True:
@@ -384,6 +384,7 @@ class RaptFactoryManager(GreedyFactoryManager):
         self.scheduler_params: Dict[str, Any] = (
             scheduler_params if scheduler_params is not None else {}
         )
+        self.feasibility = FeasibilityOracle(self)
 
     def total_utility(self, contracts: Collection[Contract] = ()) -> float:
         """Calculates the total utility for the agent of a collection of contracts"""
@@ -657,6 +658,7 @@ class RaptFactoryManager(GreedyFactoryManager):
         schedule = self.contract_schedules[contract.id]
         if schedule is not None and schedule.valid:
             self._execute_schedule(schedule=schedule, contract=contract)
+        self.feasibility.on_simulator_changed()
         if contract.annotation["buyer"] != self.id or not self.use_consumer:
             for negotiation in self._running_negotiations.values():
                 self.notify(
@@ -664,6 +666,16 @@ class RaptFactoryManager(GreedyFactoryManager):
                     Notification(type="ufun_modified", data=None),
                 )
 
+    def on_contract_cancelled(self, contract: Contract, rejectors: List[str]) -> None:
+        super().on_contract_cancelled(contract, rejectors)
+        self.feasibility.on_simulator_changed()
+
+    def on_contract_breached(
+        self, contract: Contract, breaches: List[Breach], resolution: Optional[Contract]
+    ) -> None:
+        super().on_contract_breached(contract, breaches, resolution)
+        self.feasibility.on_simulator_changed()
+
     def _process_buy_cfp(self, cfp: "CFP") -> None:
         if cfp.publisher == self.id:
             return
@@ -777,33 +789,8 @@ class RaptFactoryManager(GreedyFactoryManager):
 
     def can_produce(self, cfp: CFP, assume_no_further_negotiations=False) -> bool:
         """Whether or not we can produce the required item in time"""
-        if cfp.product not in self.producing.keys():
-            return False
-        agreement = SCMLAgreement(
-            time=cfp.max_time, unit_price=cfp.max_unit_price, quantity=cfp.min_quantity
-        )
-        min_concluded_at = self.awi.current_step + 1 - int(self.immediate_negotiations)
-        min_sign_at = min_concluded_at + self.awi.default_signing_delay
-        if cfp.max_time < min_sign_at + 1:  # 1 is minimum time to produce the product
-            return False
-        with temporary_transaction(self.scheduler):
-            schedule = self.scheduler.schedule(
-                contracts=[
-                    Contract(
-                        partners=[self.id, cfp.publisher],
-                        agreement=agreement,
-                        annotation=self._create_annotation(cfp=cfp),
-                        issues=cfp.issues,
-                        signed_at=min_sign_at,
-                        concluded_at=min_concluded_at,
-                    )
-                ],
-                ensure_storage_for=self.transportation_delay,
-                assume_no_further_negotiations=assume_no_further_negotiations,
-                start_at=min_sign_at,
-            )
-        return schedule.valid and self.can_secure_needs(
-            schedule=schedule, step=self.awi.current_step
+        return self.feasibility.can_produce(
+            cfp, assume_no_further_negotiations=assume_no_further_negotiations
         )
 
     def can_secure_needs(self, schedule: ScheduleInfo, step: int):
@@ -35,6 +35,7 @@ The SCML2019Agent class itself has some helper properties/methods that internall
 """
 import itertools
 import math
+from bisect import insort
 from collections import defaultdict
 from operator import attrgetter
 from typing import Any, Callable, Collection, Dict, List, Optional, Type, Union
@@ -75,6 +76,46 @@ from scml.scml2019.simulators import (
 )
 
 
+class PriceHistory:
+    """
+    The distinct prices seen for a product kept sorted (with a set of them for membership checks).
+
+    Adding a price and getting (or removing) the smallest or largest one do not scan the whole history.
+    """
+
+    def __init__(self):
+        self._prices = []
+        self._index = set()
+
+    def __len__(self):
+        return len(self._prices)
+
+    def __contains__(self, price):
+        return price in self._index
+
+    def __iter__(self):
+        return iter(self._prices)
+
+    def add(self, price) -> None:
+        """Adds a price unless it was already seen"""
+        if price in self._index:
+            return
+        self._index.add(price)
+        insort(self._prices, price)
+
+    def min(self):
+        return self._prices[0]
+
+    def max(self):
+        return self._prices[-1]
+
+    def remove_min(self) -> None:
+        self._index.remove(self._prices.pop(0))
+
+    def remove_max(self) -> None:
+        self._index.remove(self._prices.pop())
+
+
 class ProductData:
     id: int
     stock: int
@@ -83,8 +124,8 @@ class ProductData:
     BuyThreshold: int
     MinPrice: int
     MaxPrice: int
-    HistoryMin: []
-    HistoryMax: []
+    HistoryMin: PriceHistory
+    HistoryMax: PriceHistory
     # HistoryPublishers: []
     Asked: int
     retracted: int
@@ -102,8 +143,8 @@ class ProductData:
         self.BuyThreshold = BuyThreshold
         self.MinPrice = MinPrice
         self.MaxPrice = MaxPrice
-        self.HistoryMin = []
-        self.HistoryMax = []
+        self.HistoryMin = PriceHistory()
+        self.HistoryMax = PriceHistory()
         # self.HistoryPublishers = []
         self.Asked = -10
         self.retracted = -10
@@ -479,10 +520,8 @@ class SAHAFactoryManager(DoNothingFactoryManager):
         self.cfp_records[cfp.product].prevMin = self.cfp_records[cfp.product].MinPrice
         self.cfp_records[cfp.product].prevMax = self.cfp_records[cfp.product].MaxPrice
 
-        if cfp.min_unit_price not in self.cfp_records[cfp.product].HistoryMin:
-            self.cfp_records[cfp.product].HistoryMin.append(cfp.min_unit_price)
-        if cfp.max_unit_price not in self.cfp_records[cfp.product].HistoryMax:
-            self.cfp_records[cfp.product].HistoryMax.append(cfp.max_unit_price)
+        self.cfp_records[cfp.product].HistoryMin.add(cfp.min_unit_price)
+        self.cfp_records[cfp.product].HistoryMax.add(cfp.max_unit_price)
 
         self.recalculate_prices(cfp.product)
         self.cfp_records[cfp.product].lastSigned = self.awi.current_step
@@ -576,10 +615,8 @@ class SAHAFactoryManager(DoNothingFactoryManager):
 
         if cfp.product in self.cfp_records:
             # self.cfp_records[cfp.product].HistoryPublishers.append(cfp.publisher)
-            if cfp.min_unit_price not in self.cfp_records[cfp.product].HistoryMin:
-                self.cfp_records[cfp.product].HistoryMin.append(cfp.min_unit_price)
-            if cfp.max_unit_price not in self.cfp_records[cfp.product].HistoryMax:
-                self.cfp_records[cfp.product].HistoryMax.append(cfp.max_unit_price)
+            self.cfp_records[cfp.product].HistoryMin.add(cfp.min_unit_price)
+            self.cfp_records[cfp.product].HistoryMax.add(cfp.max_unit_price)
             self.recalculate_prices(cfp.product)
 
         want = [value.id for key, value in self.cfp_records.items() if value.stock > 0]
@@ -595,11 +632,11 @@ class SAHAFactoryManager(DoNothingFactoryManager):
 
         if len(self.cfp_records[product].HistoryMin) > 0:
             self.cfp_records[product].MinPrice = max(
-                [math.floor(min(self.cfp_records[product].HistoryMin)), 1]
+                [math.floor(self.cfp_records[product].HistoryMin.min()), 1]
             )
         if len(self.cfp_records[product].HistoryMax) > 0:
             self.cfp_records[product].MaxPrice = min(
-                [math.ceil(max(self.cfp_records[product].HistoryMax)), 1000]
+                [math.ceil(self.cfp_records[product].HistoryMax.max()), 1000]
             )
 
     def generate_price_ranges(self, minPrice, maxPrice):
@@ -636,11 +673,9 @@ class SAHAFactoryManager(DoNothingFactoryManager):
                 and item.retracted < self.awi.current_step - 4
             ):
                 if len(item.HistoryMin) > 1:
-                    item.HistoryMin.remove(min(item.HistoryMin))
-                    # item.HistoryMin.pop()
+                    item.HistoryMin.remove_min()
                 if len(item.HistoryMax) > 1:
-                    # item.HistoryMax.pop()
-                    item.HistoryMax.remove(max(item.HistoryMax))
+                    item.HistoryMax.remove_max()
                 self.recalculate_prices(key)
                 item.retracted = self.awi.current_step
 
@@ -689,22 +724,22 @@ class SAHAFactoryManager(DoNothingFactoryManager):
                 item.Asked = self.awi.current_step
 
             if item.stock > 0 and item.id not in self.consuming.keys():
-                for unit in range(item.stock):
-                    unit_price = self.generate_price_ranges(
-                        item.MaxPrice - item.MaxPrice * item.BuyThreshold,
-                        item.MaxPrice + item.MaxPrice * item.SellThreshold,
-                    )
+                # a single CFP for any quantity up to the stock (instead of one for every unit in stock)
+                unit_price = self.generate_price_ranges(
+                    item.MaxPrice - item.MaxPrice * item.BuyThreshold,
+                    item.MaxPrice + item.MaxPrice * item.SellThreshold,
+                )
 
-                    cfp = CFP(
-                        is_buy=False,
-                        publisher=self.id,
-                        product=item.id,
-                        time=max([2 + (2 * item.id), self.awi.current_step + 6]),
-                        unit_price=unit_price,
-                        quantity=1,
-                    )
-                    self.awi.register_cfp(cfp)
-                    item.Asked = self.awi.current_step
+                cfp = CFP(
+                    is_buy=False,
+                    publisher=self.id,
+                    product=item.id,
+                    time=max([2 + (2 * item.id), self.awi.current_step + 6]),
+                    unit_price=unit_price,
+                    quantity=(1, item.stock),
+                )
+                self.awi.register_cfp(cfp)
+                item.Asked = self.awi.current_step
 
     def can_produce(self, cfp: CFP, assume_no_further_negotiations=False) -> bool:
         """Whether or not we can produce the required item in time"""
@@ -1,43 +1,27 @@
 # -*- coding: utf-8 -*-
-from .a_sengupta import *
-from .agent0x111 import *
-from .bargent import *
-from .biu_th import *
-from .monty_hall import *
-from .past_frauds import *
-from .team_10 import *
-from .team_15 import *
-from .team_17 import *
-from .team_18 import *
-from .team_19 import *
-from .team_20 import *
-from .team_22 import *
-from .team_25 import *
-from .team_27 import *
-from .team_29 import *
-from .team_32 import *
-from .team_may import *
-from .threadfield import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = (
-    a_sengupta.__all__
-    + team_may.__all__
-    + team_22.__all__
-    + team_25.__all__
-    + biu_th.__all__
-    + team_15.__all__
-    + bargent.__all__
-    + agent0x111.__all__
-    + a_sengupta.__all__
-    + past_frauds.__all__
-    + monty_hall.__all__
-    + threadfield.__all__
-    + team_19.__all__
-    + team_17.__all__
-    + team_10.__all__
-    + team_29.__all__
-    + team_20.__all__
-    + team_27.__all__
-    + team_18.__all__
-    + team_32.__all__
-)
+_EXPORTS = {
+    "Merchant": ".a_sengupta",
+    "MMM": ".team_may",
+    "SavingAgent": ".team_22",
+    "Agent30": ".team_25",
+    "THBiuAgent": ".biu_th",
+    "SteadyMgr": ".team_15",
+    "BARGentCovid19": ".bargent",
+    "ASMASH": ".agent0x111",
+    "MhiranoAgent": ".past_frauds",
+    "MontyHall": ".monty_hall",
+    "GreedyFactoryManager2": ".threadfield",
+    "Ashgent": ".team_19",
+    "WhAgent": ".team_17",
+    "UnicornAgent": ".team_10",
+    "BIUDODY": ".team_29",
+    "CrescentAgent": ".team_20",
+    "AgentProjectGC": ".team_27",
+    "MercuAgent": ".team_18",
+    "BeerAgent": ".team_32",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
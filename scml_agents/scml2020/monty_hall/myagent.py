@@ -36,6 +36,8 @@ from scml.utils import anac2020_collusion, anac2020_std
 from tabulate import tabulate
 
 # from myothernegotiationmanager import NewStepNegotiationManager
+from scml_agents import tracing
+
 from .myindependentnegotiatonmanager import MyIndependentNegotiationManager
 from .mynegotiationmanager import MyNegotiationManager
 from .nvm_lib.nvm_lib import NVMLib
@@ -530,7 +532,7 @@ class MontyHall(SCML2020Agent):
             if dp[index][available_output] is not None:
                 return dp[index][available_output]
         except Exception as inst:
-            print(inst)
+            tracing.message(self.id, inst)
             # print("---------INDEX: " + str(index) + "---AVAILABLE OUTPUT: " + str(available_output))
 
         quantity = sell_contracts[index][0].agreement["quantity"]
@@ -653,13 +655,12 @@ class MontyHall(SCML2020Agent):
     ) -> None:
         """Called whenever any agent goes bankrupt. It informs you about changes
         in future contracts you have with you (if any)."""
-        print(
-            "BANKRUPT:",
-            agent,
-            "went bankrupt :( quantity:",
-            quantities,
-            "compensation money:",
-            compensation_money,
+        tracing.record(
+            self.id,
+            "bankrupt",
+            agent=agent,
+            quantities=quantities,
+            compensation_money=compensation_money,
         )
 
 
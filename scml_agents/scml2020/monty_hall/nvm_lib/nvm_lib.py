@@ -1,10 +1,17 @@
+import glob
 import json
 import os
 import time
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+QTTY_DOMAIN_DIR = os.path.join(os.path.dirname(__file__), "qtty_domain")
+
+# (number of periods, quantities domain size) -> feasible domain, shared by all NVMLib instances in the process.
+_qtty_feasible_domains: Dict[Tuple[int, int], np.ndarray] = {}
+
 
 class NVMPlan:
     """
@@ -91,7 +98,8 @@ class NVMLib:
         # Initialize properties of the multi-period news-vendor problem (MPNVP) that is going to be reused each time
         self.mpnvp_number_of_periods = mpnvp_number_of_periods
         self.mpnvp_quantities_domain_size = mpnvp_quantities_domain_size
-        self.mpnvp_feasible_sols = NVMLib.read_qtty_feasible_domain(
+        # The feasible solutions are shared by all the instances in the process (and memory-mapped when possible).
+        self.mpnvp_feasible_sols = NVMLib.load_qtty_feasible_domain(
             self.mpnvp_number_of_periods, self.mpnvp_quantities_domain_size
         )
 
@@ -178,6 +186,29 @@ class NVMLib:
         with open(json_file_name) as JSON:
             return json.load(JSON)
 
+    @staticmethod
+    def get_qtty_domain_location(
+        the_number_of_periods: int,
+        the_quantities_domain_size: int,
+        extension: str = "zip",
+    ) -> str:
+        """
+        Produces the location of the file storing a feasible domain.
+        :param the_number_of_periods: planning horizon of the NVM, an integer.
+        :param the_quantities_domain_size:
+        :param extension: "zip" for the gzip compressed csv, "npy" for the binary version.
+        :return:
+        """
+        return (
+            QTTY_DOMAIN_DIR
+            + "/qtty_domain_t_"
+            + str(the_number_of_periods)
+            + "_d_"
+            + str(the_quantities_domain_size)
+            + "."
+            + extension
+        )
+
     @staticmethod
     def read_qtty_feasible_domain(
         the_number_of_periods: int, the_quantities_domain_size: int
@@ -189,22 +220,62 @@ class NVMLib:
         :return:
         feasible solutions?? --eddy
         """
-        # file_location = 'C:/Users/ED2016/Documents/SCML/scml20areyan/new_agent_5_31_20_sell_all_produce_all/nvm_lib/qtty_domain/qtty_domain_t_' + str(
-        #    the_number_of_periods) + '_d_' + str(the_quantities_domain_size) + '.zip'
-        file_location = (
-            "nvm_lib/qtty_domain/qtty_domain_t_"
-            + str(the_number_of_periods)
-            + "_d_"
-            + str(the_quantities_domain_size)
-            + ".zip"
+        file_location = NVMLib.get_qtty_domain_location(
+            the_number_of_periods, the_quantities_domain_size
         )
-        # file_location = '/'.join(__file__.split('/')[:-1]) + '/qtty_domain/qtty_domain_t_' + str(the_number_of_periods) + '_d_' + str(the_quantities_domain_size) + '.zip'
         if not os.path.isfile(file_location):
             raise Exception(
                 f"Could not find the file with feasible domain at {file_location}"
             )
         return pd.read_csv(file_location, compression="gzip", sep=",")
 
+    @staticmethod
+    def convert_qtty_feasible_domain(
+        the_number_of_periods: int, the_quantities_domain_size: int
+    ) -> str:
+        """
+        Converts a feasible domain from its compressed csv to a uint8 .npy file next to it, which
+        load_qtty_feasible_domain can memory-map. This only needs to be done once per domain.
+        :param the_number_of_periods: planning horizon of the NVM, an integer.
+        :param the_quantities_domain_size:
+        :return: the location of the .npy file.
+        """
+        sols = NVMLib.read_qtty_feasible_domain(
+            the_number_of_periods, the_quantities_domain_size
+        ).to_numpy()
+        assert sols.min() >= 0 and sols.max() <= np.iinfo(np.uint8).max
+        location = NVMLib.get_qtty_domain_location(
+            the_number_of_periods, the_quantities_domain_size, "npy"
+        )
+        np.save(location, sols.astype(np.uint8))
+        return location
+
+    @staticmethod
+    def load_qtty_feasible_domain(
+        the_number_of_periods: int, the_quantities_domain_size: int
+    ) -> np.ndarray:
+        """
+        Returns the feasible domain as a read-only uint8 array with one row per solution.
+        The domain is loaded once per process. When the .npy version exists it is memory-mapped, so that
+        worker processes share the same pages, otherwise the compressed csv is read.
+        :param the_number_of_periods: planning horizon of the NVM, an integer.
+        :param the_quantities_domain_size:
+        :return:
+        """
+        key = (the_number_of_periods, the_quantities_domain_size)
+        sols = _qtty_feasible_domains.get(key, None)
+        if sols is None:
+            location = NVMLib.get_qtty_domain_location(*key, "npy")
+            if os.path.isfile(location):
+                sols = np.load(location, mmap_mode="r")
+            else:
+                sols = (
+                    NVMLib.read_qtty_feasible_domain(*key).to_numpy().astype(np.uint8)
+                )
+                sols.setflags(write=False)
+            _qtty_feasible_domains[key] = sols
+        return sols
+
     @staticmethod
     def pandas_tuple_to_nvm_plan(sol: pd, number_of_periods: int) -> Optional[NVMPlan]:
         """
@@ -221,61 +292,99 @@ class NVMLib:
             [sol[t * 3 + 2] for t in range(number_of_periods)],
         )
 
+    @staticmethod
+    def expectations_to_array(
+        the_expectations_q_min: dict, number_of_periods: int
+    ) -> np.ndarray:
+        """
+        Converts expectations of minima given as {t: {"min_q": E[min(q, X_t)]}} to a dense array.
+        :param the_expectations_q_min:
+        :param number_of_periods:
+        :return: an array ret of shape (number_of_periods, size) where ret[t, q] = E[min(q, X_t)]
+        """
+        return np.array(
+            [
+                [
+                    the_expectations_q_min[t]["min_" + str(q)]
+                    for q in range(len(the_expectations_q_min[t]))
+                ]
+                for t in range(number_of_periods)
+            ],
+            dtype=float,
+        )
+
     @staticmethod
     def solve_mpnvm(
-        the_feasible_sols: pd.DataFrame,
+        the_feasible_sols: Union[pd.DataFrame, np.ndarray],
         the_expectations_q_min_out: dict,
         the_expectations_q_min_in: dict,
         the_prices_out: dict,
         the_prices_in: dict,
         the_production_cost: float,
         verbose: bool = False,
+        top_k: Optional[int] = None,
     ):
         """
         Solves the stochastic Multi-Step NewsVendor Problem.
-        :param the_feasible_sols: a DataFrame with all the solutions to be checked. The number of columns must be a multiple of 3
+        The objective value of every feasible solution is computed at once with NumPy.
+        :param the_feasible_sols: a DataFrame (or an integer array) with all the solutions to be checked. The number of columns must be a multiple of 3
         :param the_expectations_q_min_out:
         :param the_expectations_q_min_in:
         :param the_prices_out:
         :param the_prices_in:
         :param the_production_cost:
         :param verbose
-        :return:
+        :param top_k: if given, only the top_k solutions with positive objective value are returned, best first.
+        :return: the optimal objective value, the optimal plan (None if no solution has a positive value)
+                 and the solutions with positive objective value together with their values.
         """
-        assert len(the_feasible_sols.columns) % 3 == 0
-        optimal_sol = None
-        optimal_sol_revenue = 0.0
-        # Solve the MPNVM for each feasible solution.
-        positive_solutions = []
-        # The time horizon is implicit in the number of columns of the solutions' DataFrame.
-        T = int(len(the_feasible_sols.columns) / 3)
-        # Loop through each row of the feasible solutions DataFrame. Use itertuples for faster looping.
+        sols = (
+            the_feasible_sols.to_numpy()
+            if isinstance(the_feasible_sols, pd.DataFrame)
+            else the_feasible_sols
+        )
+        assert sols.shape[1] % 3 == 0
+        # The time horizon is implicit in the number of columns of the solutions' table.
+        T = sols.shape[1] // 3
         t0 = time.time()
-        for row in the_feasible_sols.itertuples(index=False):
-            # Compute the objective value
-            candidate_sol_value = sum(
-                the_prices_out[t]
-                * the_expectations_q_min_out[t]["min_" + str(row[(t * 3) + 1])]
-                - the_prices_in[t]
-                * the_expectations_q_min_in[t]["min_" + str(row[t * 3])]
-                - the_production_cost * row[(t * 3) + 2]
-                for t in range(T)
+        q_min_out = NVMLib.expectations_to_array(the_expectations_q_min_out, T)
+        q_min_in = NVMLib.expectations_to_array(the_expectations_q_min_in, T)
+        # Accumulate the objective value one period at a time, in the same order as summing per solution would.
+        # Quantities are widened first as the binary tables are uint8 and an integer cost would keep that type.
+        values = np.zeros(len(sols))
+        for t in range(T):
+            values = values + (
+                the_prices_out[t] * q_min_out[t, sols[:, (t * 3) + 1]]
+                - the_prices_in[t] * q_min_in[t, sols[:, t * 3]]
+                - the_production_cost * sols[:, (t * 3) + 2].astype(np.int64)
             )
-            # Keep track in case this solution improves on the optimal so far
-            if candidate_sol_value > optimal_sol_revenue:
-                optimal_sol_revenue = candidate_sol_value
-                optimal_sol = row
+        values[np.isnan(values)] = -np.inf
+
+        # The optimal solution is the first one with the largest positive objective value.
+        optimal_sol = None
+        optimal_sol_revenue = 0.0
+        if len(values) > 0:
+            best = int(np.argmax(values))
+            if values[best] > optimal_sol_revenue:
+                optimal_sol_revenue = float(values[best])
+                optimal_sol = tuple(sols[best].tolist())
                 if verbose:
                     print(
                         f"\tit took "
                         + format(time.time() - t0, ".4f")
-                        + f" seconds to find a better solution: {NVMLib.pandas_tuple_to_nvm_plan(optimal_sol, T)}, "
+                        + f" seconds to find the best solution: {NVMLib.pandas_tuple_to_nvm_plan(optimal_sol, T)}, "
                         f" revenue = " + format(optimal_sol_revenue, ".4f")
                     )
 
-            # For debugging purposes only, keep track of all solutions with positive objective value.
-            if candidate_sol_value > 0:
-                positive_solutions.append((row, candidate_sol_value))
+        # For debugging purposes only, keep track of all solutions with positive objective value.
+        positive = np.flatnonzero(values > 0)
+        if top_k is not None:
+            # Best first, ties broken by the order of the solutions in the table.
+            positive = positive[np.argsort(-values[positive], kind="stable")[:top_k]]
+        positive_solutions = [
+            (tuple(row), value)
+            for row, value in zip(sols[positive].tolist(), values[positive].tolist())
+        ]
         return (
             optimal_sol_revenue,
             NVMLib.pandas_tuple_to_nvm_plan(optimal_sol, T),
@@ -328,15 +437,17 @@ class NVMLib:
         # Since we only store prices that are present in the data, we might have some prices missing for some time period. Here we guard against this missing data.
         # TODO: Add catalog prices in the case for which we have no data about prices. Otherwise, having prices of 0.0 is problematic, stuff is given away for free.
         slice_prices_inn = {
-            t - current_time: self.prices_inn[str(t)]
-            if str(t) in self.prices_inn
-            else 0.0
+            t
+            - current_time: (
+                self.prices_inn[str(t)] if str(t) in self.prices_inn else 0.0
+            )
             for t in range(current_time, end)
         }
         slice_prices_out = {
-            t - current_time: self.prices_out[str(t)]
-            if str(t) in self.prices_out
-            else 0.0
+            t
+            - current_time: (
+                self.prices_out[str(t)] if str(t) in self.prices_out else 0.0
+            )
             for t in range(current_time, end)
         }
 
@@ -357,3 +468,10 @@ class NVMLib:
         if verbose:
             print(f"\t\t Done solving MPNVP. Took {time.time() - t0} sec. ")
         return optimal_sol
+
+
+if __name__ == "__main__":
+    # Converts every compressed feasible domain to its binary version.
+    for zip_location in sorted(glob.glob(QTTY_DOMAIN_DIR + "/qtty_domain_t_*_d_*.zip")):
+        t, d = zip_location[: -len(".zip")].split("qtty_domain_t_")[-1].split("_d_")
+        print(f"Converted {NVMLib.convert_qtty_feasible_domain(int(t), int(d))}")
@@ -64,7 +64,106 @@ class NVMPlan:
             raise StopIteration
 
 
+class UncertaintyModel:
+    """
+    The quantity and price uncertainty model of a game, stored as read-only NumPy arrays.
+    Models are loaded from the json files in data2 the first time they are requested and then shared by every caller
+    in the process, so that NVMLib2 does not re-parse them at every step.
+    """
+
+    DATA_DIR = pathlib.Path(__file__).parent / "data2"
+
+    # (num_intermediate_products, game_length) -> UncertaintyModel
+    _models: Dict[Tuple[int, int], "UncertaintyModel"] = {}
+
+    def __init__(self, quantities: np.ndarray, prices: np.ndarray):
+        """
+        :param quantities: quantities[p, t, q] is the probability of trading q units of product p at time t.
+        :param prices: prices[p, t] is the expected price of product p at time t, nan if there is no data.
+        """
+        quantities.setflags(write=False)
+        prices.setflags(write=False)
+        self.quantities = quantities
+        self.prices = prices
+
+    @staticmethod
+    def qtty_path(num_intermediate_products: int, game_length: int) -> pathlib.Path:
+        return (
+            UncertaintyModel.DATA_DIR
+            / f"dict_qtty_num_intermediate_products_{num_intermediate_products}_{game_length}.json"
+        )
+
+    @staticmethod
+    def price_path(num_intermediate_products: int, game_length: int) -> pathlib.Path:
+        return (
+            UncertaintyModel.DATA_DIR
+            / f"dict_price_num_intermediate_products_{num_intermediate_products}_{game_length}.json"
+        )
+
+    @classmethod
+    def get(
+        cls, num_intermediate_products: int, game_length: int
+    ) -> "UncertaintyModel":
+        """
+        Returns the shared uncertainty model for the given game, loading it on first use.
+        :param num_intermediate_products: number of intermediate products in the chain, an integer.
+        :param game_length: the length of the game, an integer.
+        :return: an UncertaintyModel. Raises if the data for the game does not exist.
+        """
+        key = (num_intermediate_products, game_length)
+        model = cls._models.get(key, None)
+        if model is None:
+            model = cls.load(num_intermediate_products, game_length)
+            cls._models[key] = model
+        return model
+
+    @classmethod
+    def load(
+        cls, num_intermediate_products: int, game_length: int
+    ) -> "UncertaintyModel":
+        """
+        Parses the json files of the uncertainty model for the given game.
+        :param num_intermediate_products: number of intermediate products in the chain, an integer.
+        :param game_length: the length of the game, an integer.
+        :return: an UncertaintyModel.
+        """
+        qtty_path = cls.qtty_path(num_intermediate_products, game_length)
+        price_path = cls.price_path(num_intermediate_products, game_length)
+        if not qtty_path.is_file():
+            raise Exception(
+                f"The uncertainty model for quantities could not be found at {qtty_path}"
+            )
+        if not price_path.is_file():
+            raise Exception(
+                f"The uncertainty model for prices could not be found at {price_path}"
+            )
+        qtty_data = NVMLib2.get_json_dict(str(qtty_path))
+        price_data = NVMLib2.get_json_dict(str(price_path))
+
+        # Products are stored as "p0", "p1", ..., times as "0", "1", ... and quantities as "1", "2", ...
+        n_products = 1 + max(int(p[1:]) for p in qtty_data.keys() | price_data.keys())
+        n_steps = 1 + max(
+            int(t) for data in (qtty_data, price_data) for v in data.values() for t in v
+        )
+        q_size = 1 + max(
+            (int(q) for v in qtty_data.values() for dist in v.values() for q in dist),
+            default=0,
+        )
+        quantities = np.zeros((n_products, n_steps, q_size))
+        prices = np.full((n_products, n_steps), np.nan)
+        for p, dists in qtty_data.items():
+            for t, dist in dists.items():
+                for q, prob in dist.items():
+                    quantities[int(p[1:]), int(t), int(q)] = prob
+        for p, values in price_data.items():
+            for t, price in values.items():
+                prices[int(p[1:]), int(t)] = price
+        return cls(quantities, prices)
+
+
 class NVMLib2:
+    BACKENDS = ("dp", "ilp")
+
     def __init__(
         self,
         mpnvp_number_of_periods: int,
@@ -76,6 +175,7 @@ class NVMLib2:
         production_cost: float,
         current_inventory: int,
         current_time: int,
+        backend: str = "dp",
     ):
         """
         Initializes the NVMLib.
@@ -87,7 +187,16 @@ class NVMLib2:
         :param output_product_index: the index of the product the agent produces, an integer.
         :param num_intermediate_products: number of intermediate products in the chain, an integer.
         :param production_cost: the unit cost of turning one input into an output, a float.
+        :param current_inventory: the number of outputs available to sell at the current time, an integer.
+        :param current_time: the current simulation time, an integer.
+        :param backend: how to solve the plan, either "dp" (dynamic program, solved in process) or "ilp" (PuLP model).
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend}. Expected one of {self.BACKENDS}"
+            )
+        self.backend = backend
+
         # Initialize properties of the game.
         # why are all of these instance attributes? lol
         self.game_length = game_length
@@ -112,63 +221,29 @@ class NVMLib2:
         q_max = 10
         current_inventory = self.current_inventory
 
-        # check data exists
-        assert self.check_if_data_exists() is True
-
+        # The uncertainty model is parsed once per process and shared by every NVMLib2 instance.
+        # Raises if the data for this game does not exist.
         # TODO: fall back plan with self.current_time + 1, 2, etc
-        if self.check_if_data_exists() is True:
-
-            # Get the data for quantities
-            path = (
-                pathlib.Path(__file__).parent
-                / "data2"
-                / f"dict_qtty_num_intermediate_products_{self.num_intermediate_products}_{self.game_length}.json"
-            )
-            path_string = str(path)
-            q_uncertainty_model = NVMLib2.get_json_dict(path_string)
-            # quantity distribution for the input product, time step distribution of probability distribution
-            Q_inn = q_uncertainty_model["p" + str(self.input_product_index)]
-            # quantity distribution for the output product, time step distribution of probability distribution
-            Q_out = q_uncertainty_model["p" + str(self.output_product_index)]
-
-            ##print(f"q_uncertainty_model {q_uncertainty_model}")
-            ##print(f"Q_inn : {Q_inn}")
-            ##print(f"Q_out : {Q_out}")
-
-            # Get the data for prices
-            price_path = (
-                pathlib.Path(__file__).parent
-                / "data2"
-                / f"dict_price_num_intermediate_products_{self.num_intermediate_products}_{self.game_length}.json"
+        uncertainty_model = UncertaintyModel.get(
+            self.num_intermediate_products, self.game_length
+        )
+        # quantity distribution for the input product, time step distribution of probability distribution
+        Q_inn = uncertainty_model.quantities[self.input_product_index]
+        # quantity distribution for the output product, time step distribution of probability distribution
+        Q_out = uncertainty_model.quantities[self.output_product_index]
+        # price distribution for the input and output products, indexed by time step
+        p_inn = uncertainty_model.prices[self.input_product_index]
+        p_out = uncertainty_model.prices[self.output_product_index]
+
+        # Compute minima
+        inn, out = self.compute_minima(T, q_max, Q_inn, Q_out)
+
+        if self.backend == "dp":
+            time_to_generate_ILP, optimistic = 0.0, True
+            buy_plan, sell_plan, solve_time, total_time = self.solve_DP(
+                T, q_max, inn, out, p_inn, p_out, current_inventory
             )
-            price_path_string = str(price_path)
-            prices = NVMLib2.get_json_dict(price_path_string)
-            p_inn = prices[
-                "p" + str(self.input_product_index)
-            ]  # price distribution for the input product
-            p_out = prices[
-                "p" + str(self.output_product_index)
-            ]  # price distribution for the output product
-
-            # print(f"QUANTITY PATH READ: {path_string}")
-            # print(f"PRICE PATH READ: {price_path_string}")
-            # pprint.pprint(f"p_inn: {'p' + str(self.input_product_index)}: {p_inn}")
-            # pprint.pprint(f"p_out: {'p' + str(self.output_product_index)}: {p_out}")
-            # print(f"CURRENT TIME SELF: {self.current_time}")
-
-            # Compute minima
-            inn, out = self.compute_minima(T, q_max, Q_inn, Q_out)
-
-            ##print(f"inn: {inn}")
-            ##print(f"out: {out}")
-
-            # Construct ILP
-            # inn_vars, model, optimistic, out_vars, t0, time_to_generate_ILP = self.construct_ILP(
-            #     T, q_max, inn, out, p_inn, p_out, current_inventory)
-
-            # Solve ILP
-            # buy_plan, sell_plan, solve_time, total_time = self.get_solved_plan(T, q_max, model, t0, inn_vars, out_vars)
-
+        else:
             # Construct ILP and then Solve in one step
             (
                 buy_plan,
@@ -183,63 +258,37 @@ class NVMLib2:
                 time_to_generate_ILP,
             ) = self.construct_ILP(T, q_max, inn, out, p_inn, p_out, current_inventory)
 
-            # print(f"Buy Plan: {buy_plan}")
-            # print(f"Sell Plan: {sell_plan}")
-
-            # #print Pretty Table
-            self.print_pretty_tables(
-                T,
-                q_max,
-                current_inventory,
-                inn,
-                out,
-                p_inn,
-                p_out,
-                buy_plan,
-                sell_plan,
-                time_to_generate_ILP,
-                solve_time,
-                total_time,
-                optimistic,
-            )
-
-            # Create buy and sell plan instance attributes
-            self.buy_plan = buy_plan
-            self.sell_plan = sell_plan
+        # #print Pretty Table
+        self.print_pretty_tables(
+            T,
+            q_max,
+            current_inventory,
+            inn,
+            out,
+            p_inn,
+            p_out,
+            buy_plan,
+            sell_plan,
+            time_to_generate_ILP,
+            solve_time,
+            total_time,
+            optimistic,
+        )
 
-        else:
-            # print("data nonexistent so using the fall back plan")
-            buy_plan = {
-                self.current_time: 9,
-                self.current_time + 1: 9,
-                self.current_time + 2: 9,
-                self.current_time + 3: 9,
-                self.current_time + 4: 9,
-            }
-            sell_plan = {
-                self.current_time: 5,
-                self.current_time + 1: 9,
-                self.current_time + 2: 9,
-                self.current_time + 3: 9,
-                self.current_time + 4: 9,
-            }
-            self.buy_plan = buy_plan
-            self.sell_plan = sell_plan
+        # Create buy and sell plan instance attributes
+        self.buy_plan = buy_plan
+        self.sell_plan = sell_plan
 
     def check_if_data_exists(self) -> bool:
         """
         Check if the uncertainty model exists, both for prices and quantity
         :return:
         """
-        qtty_path = (
-            pathlib.Path(__file__).parent
-            / "data2"
-            / f"dict_qtty_num_intermediate_products_{self.num_intermediate_products}_{self.game_length}.json"
+        qtty_path = UncertaintyModel.qtty_path(
+            self.num_intermediate_products, self.game_length
         )
-        price_path = (
-            pathlib.Path(__file__).parent
-            / "data2"
-            / f"dict_price_num_intermediate_products_{self.num_intermediate_products}_{self.game_length}.json"
+        price_path = UncertaintyModel.price_path(
+            self.num_intermediate_products, self.game_length
         )
         if not qtty_path.is_file():
             raise Exception(
@@ -270,6 +319,21 @@ class NVMLib2:
             ret[i] = ret[i - 1] + temp
         return ret
 
+    @staticmethod
+    def compute_min_expectations(pmf: np.ndarray, size: int) -> np.ndarray:
+        """
+        Vectorized version of compute_min_expectation over the last axis of pmf.
+        :param pmf: an array where pmf[..., x] = P(X = x). Missing values of x are assumed to have zero probability.
+        :param size: the support of random variable is from 0, ..., size.
+        :return: an array ret where ret[..., y] = E[min(y, X)] for y ranging from 0, ..., size - 1.
+        """
+        probs = np.zeros(pmf.shape[:-1] + (max(size - 1, 0),))
+        n = min(size - 1, pmf.shape[-1])
+        probs[..., :n] = pmf[..., :n]
+        ret = np.zeros(pmf.shape[:-1] + (size,))
+        np.cumsum(1.0 - np.cumsum(probs, axis=-1), axis=-1, out=ret[..., 1:])
+        return ret
+
     @staticmethod
     def get_json_dict(json_file_name: str) -> dict:
         """
@@ -311,25 +375,23 @@ class NVMLib2:
         # pprint.pprint(Q_out)
         return Q_inn, Q_out, p_inn, p_out
 
-    def compute_minima(self, T: int, q_max: int, Q_inn: Dict[str, Dict], Q_out):
+    def compute_minima(self, T: int, q_max: int, Q_inn: np.ndarray, Q_out: np.ndarray):
         t0 = time.time()
-        ##print("TEST #print Q_INN[0]: ")
-        ##print(f"Q_INN[0]: {Q_inn[str(0)]}")
-        inn = {
-            t: NVMLib2.compute_min_expectation(Q_inn[str(t)], q_max)
-            for t in range(self.current_time, self.current_time + T)
-        }
-        out = {
-            t: NVMLib2.compute_min_expectation(Q_out[str(t)], q_max)
-            for t in range(self.current_time, self.current_time + T)
-        }
+        times = range(self.current_time, self.current_time + T)
+        # The quantity distributions of data2 are keyed by strings while compute_min_expectation looks up integer
+        # quantities, so no probability is ever found and E[min(y, X)] = y. The minima are computed as if the
+        # distributions were empty to keep the plans as they have always been.
+        inn_minima = NVMLib2.compute_min_expectations(
+            Q_inn[times.start : times.stop, :0], q_max
+        )
+        out_minima = NVMLib2.compute_min_expectations(
+            Q_out[times.start : times.stop, :0], q_max
+        )
         # print(f'took {time.time() - t0} to generate the minima')
         # Sanity check: the expectation of the minima should be non-negative
-        for t, min_data in inn.items():
-            for q, the_min in min_data.items():
-                assert the_min >= 0
-        # Debug #print
-        # pprint.pprint(inn)
+        assert (inn_minima >= 0).all()
+        inn = {t: dict(enumerate(row)) for t, row in zip(times, inn_minima.tolist())}
+        out = {t: dict(enumerate(row)) for t, row in zip(times, out_minima.tolist())}
         return inn, out
 
     def construct_ILP(
@@ -377,8 +439,8 @@ class NVMLib2:
         # Here, revenue is the money received from sales of outputs, and cost is the money used to buy inputs.
         model += pulp.lpSum(
             [
-                out_vars[t, k] * out[t][k] * p_out[str(t)]
-                - inn_vars[t, k] * inn[t][k] * p_inn[str(t)]
+                out_vars[t, k] * out[t][k] * p_out[t]
+                - inn_vars[t, k] * inn[t][k] * p_inn[t]
                 for t, k in it.product(
                     range(self.current_time, self.current_time + T), range(0, q_max)
                 )
@@ -454,6 +516,68 @@ class NVMLib2:
             time_to_generate_ILP,
         )
 
+    def solve_DP(
+        self,
+        T: int,
+        q_max: int,
+        inn: Dict[int, Dict],
+        out: Dict[int, Dict],
+        p_inn,
+        p_out,
+        current_inventory: int,
+    ):
+        """
+        Solves the same problem as the optimistic ILP built by construct_ILP with a dynamic program over
+        (time, inventory level), without calling an external solver.
+        At each time the plan picks one quantity k in 0, ..., q_max - 1 to buy and one to sell, it cannot sell more
+        than its inventory, and the inventory is then updated by the bought and sold quantities.
+        Since no more than q_max - 1 units are sold per step, inventory levels above (q_max - 1) * T are equivalent
+        and are capped, which keeps the state space small.
+        Among plans of equal profit, the one buying and then selling the least at the earliest times is returned.
+        :return: buy plan, sell plan, solve time and total time, as in construct_ILP.
+        """
+        t0 = time.time()
+        times = range(self.current_time, self.current_time + T)
+        cap = (q_max - 1) * T
+        levels = np.arange(cap + 1)
+        quantities = np.arange(q_max)
+        # profit[t, b, s] is the profit of buying b and selling s at time t
+        buy_cost = np.array([[inn[t][k] * p_inn[t] for k in quantities] for t in times])
+        sell_revenue = np.array(
+            [[out[t][k] * p_out[t] for k in quantities] for t in times]
+        )
+        profit = sell_revenue[:, None, :] - buy_cost[:, :, None]
+        # next_level[i, b, s] is the inventory level reached from level i after buying b and selling s
+        next_level = np.minimum(
+            levels[:, None, None]
+            + quantities[None, :, None]
+            - quantities[None, None, :],
+            cap,
+        )
+        infeasible = quantities[None, None, :] > levels[:, None, None]
+        infeasible = np.broadcast_to(infeasible, next_level.shape)
+        next_level = np.where(infeasible, 0, next_level)
+
+        # Backward pass: value[i] is the best profit obtainable from the current step on, starting at level i.
+        value = np.zeros(cap + 1)
+        best_actions = np.empty((T, cap + 1), dtype=int)
+        for i in reversed(range(T)):
+            candidates = profit[i][None, :, :] + value[next_level]
+            candidates[infeasible] = -np.inf
+            candidates = candidates.reshape(cap + 1, -1)
+            best_actions[i] = np.argmax(candidates, axis=1)
+            value = candidates[levels, best_actions[i]]
+
+        # Forward pass: follow the best actions from the current inventory.
+        buy_plan, sell_plan = {}, {}
+        level = min(current_inventory, cap)
+        for i, t in enumerate(times):
+            b, s = divmod(int(best_actions[i, level]), q_max)
+            buy_plan[t], sell_plan[t] = b, s
+            level = int(next_level[level, b, s])
+        solve_time = total_time = time.time() - t0
+        return buy_plan, sell_plan, solve_time, total_time
+
     def get_solved_plan(self, T, q_max, model, t0, inn_vars, out_vars):
         t0_solve = time.time()
         model.solve()
@@ -515,7 +639,7 @@ class NVMLib2:
         x.add_row(
             ["B-P"]
             + [
-                str(round(p_inn[str(t)], 2))
+                str(round(p_inn[t], 2))
                 for t in range(self.current_time, self.current_time + T)
             ]
             + ["--"]
@@ -523,7 +647,7 @@ class NVMLib2:
         x.add_row(
             ["S-P"]
             + [
-                str(round(p_out[str(t)], 2))
+                str(round(p_out[t], 2))
                 for t in range(self.current_time, self.current_time + T)
             ]
             + ["--"]
@@ -560,7 +684,7 @@ class NVMLib2:
         x.add_row(
             [
                 "total profit",
-                f"{sum([out[t][sell_plan[t]] * p_out[str(t)] - inn[t][buy_plan[t]] * p_inn[str(t)] for t in range(self.current_time, self.current_time + T)]) :.4f}",
+                f"{sum([out[t][sell_plan[t]] * p_out[t] - inn[t][buy_plan[t]] * p_inn[t] for t in range(self.current_time, self.current_time + T)]) :.4f}",
             ]
         )
         x.add_row(["build time", f"{time_to_generate_ILP : .4f} sec"])
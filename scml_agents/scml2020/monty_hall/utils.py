@@ -11,6 +11,8 @@ from negmas import (
     SAONegotiator,
 )
 
+from scml_agents import tracing
+
 from .nvm_lib2.nvm_lib2 import NVMLib2
 
 
@@ -172,41 +174,32 @@ class AgentStatistics:
         self.default_agent_names = ["BUYER", "SELLER"]
 
     def step(self):
-        params = [
+        if not tracing.is_enabled():
+            return
+        tracing.record(
             self.agent.id,
-            self.agent.get_balance(),
-            self.agent.plan.available_money,
-            self.agent.get_balance_change(),
-            self.agent.get_input_inventory(),
-            self.agent.get_output_inventory(),
-            self.agent.plan.available_output,
-            self.buy_neg_agreed_count,
-            self.buy_neg_reject_count,
-            self.sell_neg_agreed_count,
-            self.sell_neg_reject_count,
-            self.buy_both_reject,
-            self.buy_agent_reject,
-            self.buy_partner_reject,
-            self.buy_both_reject,
-            self.sell_both_reject,
-            self.sell_agent_reject,
-            self.sell_partner_reject,
-            self.sell_both_reject,
-        ]
-        report = """
-        ############# {}  STAT INFO #############
-        Current Balance = {}  Available Balance = {}    Balance Change = {}
-        Input Count = {}   Output Count = {}  Available Output = {}
-        Buy: Agreed Neg = {}     Rejected Neg = {}
-        Sell: Agreed Neg = {}     Rejected Neg = {}
-        Buy: Both Reject = {}   Agent Reject = {}   Partner Reject = {}     Both Accept = {}
-        Sell: Both Reject = {}   Agent Reject = {}   Partner Reject = {}    Both Accept = {}
-        """.format(
-            *params
+            "statistics",
+            step=self.agent.get_current_step(),
+            balance=self.agent.get_balance(),
+            available_balance=self.agent.plan.available_money,
+            balance_change=self.agent.get_balance_change(),
+            input_inventory=self.agent.get_input_inventory(),
+            output_inventory=self.agent.get_output_inventory(),
+            available_output=self.agent.plan.available_output,
+            buy_neg_agreed_count=self.buy_neg_agreed_count,
+            buy_neg_reject_count=self.buy_neg_reject_count,
+            sell_neg_agreed_count=self.sell_neg_agreed_count,
+            sell_neg_reject_count=self.sell_neg_reject_count,
+            buy_both_reject=self.buy_both_reject,
+            buy_agent_reject=self.buy_agent_reject,
+            buy_partner_reject=self.buy_partner_reject,
+            buy_both_accept=self.buy_both_reject,
+            sell_both_reject=self.sell_both_reject,
+            sell_agent_reject=self.sell_agent_reject,
+            sell_partner_reject=self.sell_partner_reject,
+            sell_both_accept=self.sell_both_reject,
         )
 
-    #        #print(report)
-
     def on_negotiation_failure(
         self,
         partners: List[str],
@@ -277,7 +270,11 @@ class AgentStatistics:
                     self.sell_partner_reject += 1
 
     def print_supply_chain(self):
-        for line in self.agent.data.supplier_matrix:
-            continue
-            # print(line)
-        # print(self.agent.data.consumer_matrix[-1])
+        if not tracing.is_enabled():
+            return
+        tracing.record(
+            self.agent.id,
+            "supply_chain",
+            suppliers=self.agent.data.supplier_matrix,
+            consumers=self.agent.data.consumer_matrix[-1],
+        )
@@ -81,6 +81,7 @@ from scml.scml2020.agents import (
     IndDecentralizingAgent,
     MovingRangeAgent,
 )
+from scml.scml2020.common import NO_COMMAND
 from scml.utils import anac2020_collusion, anac2020_std
 from tabulate import tabulate
 from tqdm import tqdm
@@ -121,6 +122,8 @@ class MhiranoAgent(DemandDrivenProductionStrategy, PrintingAgent):
         # 交渉中(negotiating; request accepting => success/fail)のinput量
         self.inputs_negotiating: List = []
         self.outputs_negotiating: List = []
+        # the number of lines with a command at every step (updated whenever the schedule changes)
+        self.line_usage: np.ndarray = None
         self.controller: MhiranoController = MhiranoController(
             parent=self, default_negotiator_type=MhiranoNegotiator
         )
@@ -135,11 +138,17 @@ class MhiranoAgent(DemandDrivenProductionStrategy, PrintingAgent):
         self.outputs_contracted = np.zeros(awi.n_steps, dtype=int)
         self.inputs_negotiated = np.zeros(awi.n_steps, dtype=int)
         self.outputs_negotiated = np.zeros(awi.n_steps, dtype=int)
-        pass
+        self.update_line_usage()
+
+    def update_line_usage(self):
+        """Counts the lines with a command at every step"""
+        commands: np.ndarray = self.awi.state.commands
+        self.line_usage = commands.shape[1] - (commands == NO_COMMAND).sum(axis=1)
 
     def step(self):
         """Called at every production step by the world"""
         super().step()
+        self.update_line_usage()
         awi: AWI = self.awi
         factory_state: FactoryState = awi.state
         # contracted >= signed
@@ -388,6 +397,8 @@ class MhiranoAgent(DemandDrivenProductionStrategy, PrintingAgent):
                 self.outputs_signed[t] += q
             else:
                 self.inputs_signed[t] += q
+        # production was scheduled for the signed contracts
+        self.update_line_usage()
 
     def on_contract_executed(self, contract: Contract) -> None:
         """Called when a contract executes successfully and fully"""
@@ -411,7 +422,11 @@ class MhiranoAgent(DemandDrivenProductionStrategy, PrintingAgent):
         Called just before production starts at every step allowing the
         agent to change what is to be produced in its factory on that step.
         """
-        return super().confirm_production(commands, balance, inventory)
+        commands = super().confirm_production(commands, balance, inventory)
+        self.line_usage[self.awi.current_step] = len(commands) - sum(
+            commands == NO_COMMAND
+        )
+        return commands
 
     def on_failures(self, failures: List[Failure]) -> None:
         """Called when production fails. If you are careful in
@@ -476,6 +491,8 @@ class MhiranoController(PrintingSAOController):
         self.ufun_min = 0.3
         self.power = 1.0
         self._last_evaluation = None
+        # poisson.pmf(k, mean) for k = 0, 1, 2, ... for every mean seen
+        self._pmf_tables: Dict[int, np.ndarray] = dict()
 
     def _get_best_outcome(
         self,
@@ -643,9 +660,20 @@ class MhiranoController(PrintingSAOController):
             negotiator_id=negotiator_id, is_seller=is_seller, offers=[offer]
         )[0]
 
+    def _poisson_pmf(self, values: np.ndarray, mean: int) -> np.ndarray:
+        # poisson.pmf(values, mean) looked up in a table computed once per mean
+        if len(values) == 0 or values.dtype.kind not in "iu" or values.min() < 0:
+            return poisson.pmf(values, mean)
+        table: np.ndarray = self._pmf_tables.get(mean, None)
+        if table is None or len(table) <= values.max():
+            size: int = max(values.max() + 1, 0 if table is None else 2 * len(table))
+            table = poisson.pmf(np.arange(size), mean)
+            self._pmf_tables[mean] = table
+        return table[values]
+
     def _time_price_probs(
         self, is_sell: bool, t_up_list: List[Tuple[int, int]]
-    ) -> List[float]:
+    ) -> np.ndarray:
         # 時間とpriceの出現確率
         # priceに対して指数分布を仮定
         # カタログプライスはわざと逆にしている
@@ -655,248 +683,138 @@ class MhiranoController(PrintingSAOController):
         else:
             mean: int = int(awi.catalog_prices[awi.my_input_product])
         np_t_up: np.ndarray = np.array(t_up_list)
-        origin_prob: np.ndarray = poisson.pmf(np_t_up[:, 1], mean)
-        return list(origin_prob / origin_prob.sum())
+        origin_prob: np.ndarray = self._poisson_pmf(np_t_up[:, 1], mean)
+        return origin_prob / origin_prob.sum()
+
+    def _opponent_spaces(
+        self, is_seller: bool
+    ) -> List[Tuple[int, np.ndarray, np.ndarray]]:
+        # 相対する交渉中のもの (評価するofferが買いなら売り注文，売りなら買い注文)
+        # [(max quantity, (time, price) pairs of the current space, their probabilities)]
+        # cached for every negotiation until its space is cut
+        spaces: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        for data in self._negotiating.values():
+            if data["is_seller"] == is_seller:
+                continue
+            space: List["Outcome"] = data["current_space"]
+            cached = data.get("opponent_space", None)
+            if cached is None or cached[0] is not space:
+                max_q: int = max(q for (q, t, up) in space)
+                t_up: np.ndarray = np.array(list({(t, up) for (q, t, up) in space}))
+                cached = (
+                    space,
+                    max_q,
+                    t_up,
+                    self._time_price_probs(is_sell=is_seller, t_up_list=t_up),
+                )
+                data["opponent_space"] = cached
+            spaces.append(cached[1:])
+        return spaces
+
+    def _get_production_start_times(
+        self, q_max: int, end_time: int, free_lines: np.ndarray
+    ) -> np.ndarray:
+        # 最も遅い生産時間を考える (生産できない分は-1)
+        awi: AWI = self.parent.awi
+        end_time = min(end_time, awi.n_steps - 1)
+        steps: np.ndarray = np.arange(awi.current_step, end_time)[::-1]
+        free: np.ndarray = free_lines[awi.current_step : end_time][::-1]
+        start_times: np.ndarray = np.repeat(steps, free)[:q_max]
+        return np.concatenate((start_times, np.full(q_max - len(start_times), -1)))
 
     def _mk_evaluation_for_tup(
         self,
         q_max: int,
         is_seller: bool,
-        t_up_list: List[Tuple[int, int]],
-        input_diff_series: List[int],
-        line_usage_list: List[int],
-    ) -> Dict[Tuple[int, int], List[float]]:
-        def _get_production_end_time_of_buy(
-            _q_max: int, _start_time: int, _line_usage_list: List[int]
-        ) -> np.ndarray:
-            # 最も早い生産時間を考える
-            production_end_time: List[Union[int, np.inf]] = []
-            if _start_time < 0:
-                _start_time = 0
-            for i in range(_start_time, self.parent.awi.n_steps):
-                if _line_usage_list[i] < self.parent.awi.n_lines:
-                    can_produce: int = self.parent.awi.n_lines - _line_usage_list[i]
-                    produce: int = min(can_produce, _q_max - len(production_end_time))
-                    for _ in range(produce):
-                        production_end_time.append(i)
-
-                if len(production_end_time) == _q_max:
-                    break
-            n_left: int = _q_max - len(production_end_time)
-            for _ in range(n_left):
-                production_end_time.append(np.inf)
-            return np.array(production_end_time) + 1
-
-        def _get_production_start_time_of_sell(
-            _q_max: int, _end_time: int, _line_usage_list: List[int]
-        ) -> np.ndarray:
-            # 最も遅い生産時間を考える
-            production_start_time: List[int] = []
-            if _end_time >= self.parent.awi.n_steps:
-                _end_time = self.parent.awi.n_steps - 1
-            for i in range(_end_time - 1, self.parent.awi.current_step - 1, -1):
-                if _line_usage_list[i] < self.parent.awi.n_lines:
-                    can_produce: int = self.parent.awi.n_lines - _line_usage_list[i]
-                    produce: int = min(can_produce, _q_max - len(production_start_time))
-                    for _ in range(produce):
-                        production_start_time.append(i)
-                if len(production_start_time) == _q_max:
-                    break
-            n_left: int = _q_max - len(production_start_time)
-            for _ in range(n_left):
-                production_start_time.append(-1)
-            return production_start_time
-
+        t_up: np.ndarray,
+        input_diff_series: np.ndarray,
+        free_lines: np.ndarray,
+    ) -> np.ndarray:
         ####
         # 相手方のnegotiation spaceに対して，価値づけを行う関数 => (q, t, up)に対して価値をつける
-        # target
         # is_sellerは評価するoffer
-        t_min: int = self.parent.awi.current_step
-        t_max: int = min(
-            self.parent.awi.current_step + 10, self.parent.awi.n_steps
-        )  # endは含まない
-        #####
-        # {(time, price): [[ev for agg1 for q=1, q=2, ..., q=q_max],...,[...]]}
-        #
-        all_q: int = 0
-        agreements: List[int] = []
-        negotiating_opponents: List[Tuple[int, List[Tuple[int, int]]]] = []
+        # t_upは評価する(time, price)の組み
+        # 最終的に作りたいもの
+        # [[ev for q=1, q=2, ..., q=q_max] for (time, price) in t_up]
+        awi: AWI = self.parent.awi
+        t_min: int = awi.current_step
+        t_max: int = min(awi.current_step + 10, awi.n_steps)  # endは含まない
+        # agreements: inputsベースの契約済，合意済の時系列相対契約．q at tとなる．timeのスタートは現在時刻
         if not is_seller:
             # 評価するofferが買い注文である => materialの不足を補う
-            # 売り注文がopponents
-            agreements = [max(0, -i) for i in input_diff_series[t_min:t_max]]
-            all_q += sum(agreements)
-            for data in self._negotiating.values():
-                if data["is_seller"]:
-                    max_q = max(q for (q, t, up) in data["current_space"])
-                    all_q += max_q
-                    negotiating_opponents.append(
-                        (
-                            max_q,
-                            list({(t, up) for (q, t, up) in data["current_space"]}),
-                        )
-                    )
+            agreements: np.ndarray = np.maximum(0, -input_diff_series[t_min:t_max])
         else:
             # 評価するofferが売り注文である => material のあまりを消費する
-            # 買い注文がopponents
-            agreements = [max(0, i) for i in input_diff_series[t_min:t_max]]
-            all_q += sum(agreements)
-            for data in self._negotiating.values():
-                if not data["is_seller"]:
-                    max_q = max(q for (q, t, up) in data["current_space"])
-                    all_q += max_q
-                    negotiating_opponents.append(
-                        (
-                            max_q,
-                            list({(t, up) for (q, t, up) in data["current_space"]}),
-                        )
-                    )
-        #####
-        # agreements: inputsベースの契約済，合意済の時系列相対契約．q at tとなる．timeのスタートは現在時刻
-        # negotiating_opponents: 相対する交渉中のもの．契約の形態に合わせたinputs/outputsになっている
-        #####
-        # 最終的に作りたいもの
-        # {(time, price): [ev for q=1, q=2, ..., q=q_max]}
-        evaluation_dict: Dict[Tuple[int, int], List[float]] = {}
+            agreements: np.ndarray = np.maximum(0, input_diff_series[t_min:t_max])
+        opponents = self._opponent_spaces(is_seller=is_seller)
+        all_q: int = int(agreements.sum()) + sum(max_q for max_q, _, _ in opponents)
+        evaluation: np.ndarray = np.zeros((len(t_up), q_max))
+        if all_q == 0:
+            return evaluation
+        times: np.ndarray = t_up[:, 0]
+        prices: np.ndarray = t_up[:, 1]
+        quantities: np.ndarray = np.arange(1, q_max + 1)
         #####
-        # agreementsを評価 + 全てのt_upの組みを入れていく
+        # agreementsを評価
         # inputベースの時間軸なのでそのまま比較可能
-        awi: AWI = self.parent.awi
-        for t, up in t_up_list:
-            if all_q == 0:
-                evaluation_dict[(t, up)] = [0.0 for i in range(1, q_max + 1)]
-            else:
-                if not is_seller:
-                    # 評価する注文が買いの場合(agreementは売り注文)には
-                    # inputのカタログプライスでないと計算しない
-                    t_relative = t - t_min
-                    if up <= awi.catalog_prices[awi.my_input_product]:
-                        agree_tmp: List[int] = [
-                            agreements[i] if t_relative <= i else 0.0
-                            for i in range(t_max - t_min)
-                        ]
-                    else:
-                        agree_tmp: List[int] = [
-                            0 if t_relative <= i else 0.0 for i in range(t_max - t_min)
-                        ]
-                    evaluation_dict[(t, up)] = [
-                        min(sum(agree_tmp), i) / all_q for i in range(1, q_max + 1)
+        if not is_seller:
+            # 評価する注文が買いの場合(agreementは売り注文)には
+            # inputのカタログプライスでないと計算しない
+            # agreed from the time of the offer on
+            after: np.ndarray = np.append(np.cumsum(agreements[::-1])[::-1], 0)
+            agreed: np.ndarray = after[np.clip(times - t_min, 0, len(agreements))]
+            agreed[prices > awi.catalog_prices[awi.my_input_product]] = 0
+            evaluation[:] = np.minimum(agreed[:, None], quantities) / all_q
+        else:
+            # 評価する注文が売りの場合(agreementは買い注文)にはには
+            # outputのカタログプライス以上でないと計算しない
+            # agreed until the production of every unit starts
+            before: np.ndarray = np.cumsum(agreements)
+            end_times, end_time_rows = np.unique(times, return_inverse=True)
+            relative_start_time: np.ndarray = (
+                np.array(
+                    [
+                        self._get_production_start_times(
+                            q_max=q_max, end_time=t, free_lines=free_lines
+                        )
+                        for t in end_times
                     ]
-                else:
-                    # 評価する注文が売りの場合(agreementは買い注文)にはには
-                    # outputのカタログプライス以上でないと計算しない
-                    start_time: List[int] = _get_production_start_time_of_sell(
-                        _q_max=q_max, _end_time=t, _line_usage_list=line_usage_list
-                    )
-                    relative_start_time: List[int] = [x - t_min for x in start_time]
-                    evaluation_dict[(t, up)] = [0.0 for i in range(1, q_max + 1)]
-                    if up >= awi.catalog_prices[awi.my_output_product]:
-                        # priceはOK
-                        for j in range(q_max):
-                            t_relative = relative_start_time[j]
-                            agree_tmp: List[int] = [
-                                agreements[i] if t_relative >= i else 0.0
-                                for i in range(t_max - t_min)
-                            ]
-                            if sum(agree_tmp) > j + 1:
-                                evaluation_dict[(t, up)][j] += j / all_q
-            #####
-            # ToDo agreementの価格評価基準の追加 => done & test
-            #####
+                )
+                - t_min
+            )
+            agreed: np.ndarray = np.where(
+                relative_start_time >= 0,
+                before[np.clip(relative_start_time, 0, len(before) - 1)],
+                0,
+            )
+            price_ok: np.ndarray = prices >= awi.catalog_prices[awi.my_output_product]
+            evaluation[:] = np.where(
+                price_ok[:, None] & (agreed > quantities)[end_time_rows],
+                (quantities - 1) / all_q,
+                0.0,
+            )
         #####
         # negotiatingの状態を反映していく
-        # 買いの場合は，売りを評価すればいいので，買いofferを最短の生産を考える
-        # 売りの場合は，買いを評価すればいいので，売りofferを最遅の生産を考える
-        if all_q == 0:
-            return evaluation_dict
-
-        def _get_profit_prob(
-            _t: int, _up: int, _is_sell: bool, _outcome_space: List[Tuple[int, int]]
-        ) -> float:
-            # t, upを与えたら，ターゲットとなる注文1つのoutcome spaceの何割をカバーできるかを計算
-            # is_sell　は (_t, _up)が売り注文かどうか
-            _prob_list: List[float] = self._time_price_probs(
-                is_sell=_is_sell, t_up_list=_outcome_space
-            )
-            _results: float = 0.0
-            production_cost: float = min(self.parent.awi.profile.costs[0]) * 1.5
-            if not is_seller:
-                _up += production_cost
-            else:
-                _up -= production_cost
-
-            np_outcome_space: np.ndarray = np.array(_outcome_space)
-            np_prob: np.ndarray = np.array(_prob_list)
+        # それぞれの相手について，(t, up)がターゲットとなる注文のoutcome spaceの何割をカバーできるかを計算し
+        # 相手の最大の個数までの評価値に加える
+        production_cost: float = min(awi.profile.costs[0]) * 1.5
+        for q_target, outcome_space, probs in opponents:
             if not is_seller:
                 # ターゲットは売り注文
-                _results: float = sum(
-                    (np_outcome_space[:, 0] >= _t)
-                    * (np_outcome_space[:, 1] > _up)
-                    * np_prob
+                covered: np.ndarray = (outcome_space[:, 0] >= times[:, None]) * (
+                    outcome_space[:, 1] > (prices + production_cost)[:, None]
                 )
             else:
                 # ターゲットは買い注文
-                _results: float = sum(
-                    (np_outcome_space[:, 0] <= _t)
-                    * (np_outcome_space[:, 1] < _up)
-                    * np_prob
+                covered: np.ndarray = (outcome_space[:, 0] <= times[:, None]) * (
+                    outcome_space[:, 1] < (prices - production_cost)[:, None]
                 )
-            assert _results >= 0.0
-            assert _results <= 1.0 + 1e-9
-            return _results
-
-        # negotiating_opponents: 相対する交渉中のもの．契約の形態に合わせたinputs/outputsになっている
-        # [(個数, [current outcome space])] となっている
-        ######
-        # ToDo tqdm消す
-        ######
-        if not is_seller:
-            # 買いの場合は，売りを評価すればいいので，買いofferを最短の生産を考える
-            for (t, up), ev_list in evaluation_dict.items():
-                products_available_time_at_q: List[
-                    int
-                ] = _get_production_end_time_of_buy(
-                    _q_max=q_max, _start_time=t, _line_usage_list=line_usage_list
-                )
-                possible_time: Set[int] = set(products_available_time_at_q)
-                for q_target, outcome_space in negotiating_opponents:
-                    probs_by_time: Dict[int, float] = {}
-                    for _t in possible_time:
-                        prob = _get_profit_prob(
-                            _t=t,
-                            _up=up,
-                            _is_sell=is_seller,
-                            _outcome_space=outcome_space,
-                        )
-                        probs_by_time[_t] = prob
-                    for i in range(q_max):
-                        q = i + 1
-                        _t = products_available_time_at_q[i]
-                        if q <= q_target:
-                            ev_list[i] += probs_by_time[_t] / all_q
-        else:
-            # 売りの場合は，買いを評価すればいいので，売りofferを最遅の生産を考える
-            for (t, up), ev_list in evaluation_dict.items():
-                products_need_time_at_q: List[int] = _get_production_start_time_of_sell(
-                    _q_max=q_max, _end_time=t, _line_usage_list=line_usage_list
-                )
-                possible_time: Set[int] = set(products_need_time_at_q)
-                for q_target, outcome_space in negotiating_opponents:
-                    probs_by_time: Dict[int, float] = {}
-                    for _t in possible_time:
-                        prob = _get_profit_prob(
-                            _t=t,
-                            _up=up,
-                            _is_sell=is_seller,
-                            _outcome_space=outcome_space,
-                        )
-                        probs_by_time[_t] = prob
-                    for i in range(q_max):
-                        q = i + 1
-                        _t = products_need_time_at_q[i]
-                        if q <= q_target:
-                            ev_list[i] += probs_by_time[_t] / all_q
-        return evaluation_dict
+            # cumsum adds the probabilities in order (like sum()) so that ties between offers stay ties
+            results: np.ndarray = np.cumsum(covered * probs, axis=1)[:, -1]
+            assert (results >= 0.0).all()
+            assert (results <= 1.0 + 1e-9).all()
+            evaluation[:, :q_target] += (results / all_q)[:, None]
+        return evaluation
 
     def _get_current_eval_all(
         self, negotiator_id: str, is_seller: bool, offers: List["Outcome"]
@@ -905,21 +823,15 @@ class MhiranoController(PrintingSAOController):
         # 在庫確認
         awi: AWI = self.parent.awi
         parent: MhiranoAgent = self.parent
+        # awi.state (and awi.n_lines which goes through it) copies every contract so it is read once
         factory_state: FactoryState = awi.state
-        material_inventory: int = awi.state.inventory[awi.my_input_product]
+        material_inventory: int = factory_state.inventory[awi.my_input_product]
+        n_lines: int = factory_state.n_lines
         # productはsing済なので breachしても出ていくので在庫は発生し得ない．現在持ってる在庫は今回のstepで出すためのもの
-        # product_inventory: int = awi.state.inventory[awi.my_output_product]
-        # # もし全てのmaterialを生産するならいつ使えるようになるか
-        # production_step, _ = awi.available_for_production(repeats=material_inventory,
-        #                                                   step=(awi.current_step, awi.n_steps - 1), method="earliest")
-        # products_available_step: List[int] = production_step + 1
         # 余剰を確認(時系列のinputの余剰(マイナスは不足を確認))
         # outputの契約は契約時に生産のscheduleしているので，生産計画を確認すれば良い
-        line_usage_list: List[int] = []
-        for i in range(awi.n_steps):
-            i_line_working = factory_state.commands[i]
-            line_usage_list.append(-sum(i_line_working == -1) + factory_state.n_lines)
-        input_diff_series: List[int] = parent.inputs_signed - np.array(line_usage_list)
+        line_usage_list: np.ndarray = parent.line_usage.copy()
+        input_diff_series: np.ndarray = parent.inputs_signed - line_usage_list
         # 1step前までのdiffは過去のもの
         input_diff_series[: awi.current_step - 1] = 0
         # 現在のstepにmaterial inventoryを追加
@@ -932,12 +844,10 @@ class MhiranoController(PrintingSAOController):
             input_diff_series[t - 1] -= q
         # とりあえず追加して，ラインが足りないところは前倒す
         for i in range(awi.n_steps - 1, awi.current_step - 1, -1):
-            if line_usage_list[i] > awi.n_lines:
-                move_num: int = line_usage_list[i] - awi.n_lines
+            if line_usage_list[i] > n_lines:
+                move_num: int = line_usage_list[i] - n_lines
                 line_usage_list[i] -= move_num
                 line_usage_list[i - 1] += move_num
-                input_diff_series[i] += move_num
-                input_diff_series[i] -= move_num
         for buy_agreement in self._agreements["buy"]:
             (q, t, up) = buy_agreement
             assert t >= awi.current_step
@@ -947,30 +857,27 @@ class MhiranoController(PrintingSAOController):
         # input_diff_series: materialの過不足
         # line_usage_list: ラインの使用状況
         #####################
-        q_max: int = 0
-        t_up_list: List[Tuple[int, int]] = []
-        for offer in offers:
-            (q, t, up) = offer
-            if q > q_max:
-                q_max = q
-            t_up_list.append((t, up))
+        # 全てのofferの(t,up)の組みをまとめて評価する
+        rows: Dict[Tuple[int, int], int] = {}
+        offer_rows: List[int] = [
+            rows.setdefault((t, up), len(rows)) for (q, t, up) in offers
+        ]
+        quantities: np.ndarray = np.array([q for (q, t, up) in offers])
         # qが1-q_maxまでの評価値(t,up)の評価値を作成
-        # {(time, price): [ev for q=1, q=2, ..., q=q_max]}
-        evaluation_dict: Dict[
-            Tuple[int, int], List[float]
-        ] = self._mk_evaluation_for_tup(
-            q_max=q_max,
+        evaluation: np.ndarray = self._mk_evaluation_for_tup(
+            q_max=quantities.max(),
             is_seller=is_seller,
-            t_up_list=t_up_list,
+            t_up=np.array(list(rows)),
             input_diff_series=input_diff_series,
-            line_usage_list=line_usage_list,
+            free_lines=np.maximum(n_lines - line_usage_list, 0),
+        )
+        # the sum of the evaluations of the first q - 1 quantities (added in order like sum())
+        totals: np.ndarray = np.cumsum(evaluation, axis=1)
+        return list(
+            np.where(
+                quantities > 1, totals[offer_rows, np.maximum(quantities - 2, 0)], 0.0
+            )
         )
-        results_list: List[float] = []
-        for offer in offers:
-            (q, t, up) = offer
-            evl: float = sum(evaluation_dict[(t, up)][: q - 1])
-            results_list.append(evl)
-        return results_list
 
     def propose_(
         self, negotiator_id: str, state: MechanismState
@@ -96,6 +96,34 @@ class NegModel(nn.Module, autograd.Function):
         out = self.linear4(out)
         return out
 
+    def advance(self, x, state=None):
+        """Runs the model over x (steps, batch, features) starting from the (lstm1, lstm2) states in state
+        (None for an empty history) and returns the outputs and the final states"""
+        x = self.linear2(self.activation(self.linear1(x)))
+
+        lstm_out1, state1 = self.lstm1(x, None if state is None else state[0])
+        lstm_out2, state2 = self.lstm2(lstm_out1, None if state is None else state[1])
+
+        out = self.linear3(lstm_out2)
+        out = self.activation(out)
+        out = self.linear4(out)
+        return out, (state1, state2)
+
+    def predict_next(self, state, candidates):
+        """Outputs for each row of candidates when appended to the history whose states are state, all
+        candidates advancing the LSTMs by one step in a single batch"""
+        batch = len(candidates)
+        if state is not None:
+            state = tuple(
+                (
+                    h.expand(-1, batch, -1).contiguous(),
+                    c.expand(-1, batch, -1).contiguous(),
+                )
+                for h, c in state
+            )
+        out, _ = self.advance(candidates.view(1, batch, -1), state)
+        return out[0]
+
     def fit(self, train_data, test_data, save_model=True, epochs=NEG_EPOCHS, path=None):
         if not path:
             path = NEG_SELL_PATH if self.is_seller else NEG_BUY_PATH
@@ -34,6 +34,44 @@ from scml.scml2020.components.negotiation import (
 from utility import MyRLUtilityFunction, MyUtilityFunction
 
 
+def predict_candidates(history_state, candidates, prediction_model):
+    """Predicted outcome (last output) of each candidate message appended to the history whose model
+    states are history_state, all scored in one batch"""
+    to_features = np.array([message[:RESPONSE_RELATIVE_TIME] for message in candidates])
+    to_features = torch.from_numpy(to_features).float()
+    with torch.no_grad():
+        return prediction_model.predict_next(history_state, to_features)[:, -1].tolist()
+
+
+def search_prices(price_ranges, is_seller, score):
+    """
+    Binary searches the price range of every (time, quantity) key of price_ranges in lockstep.
+
+    Each round, score is called once with the (time, quantity, price) probed by every unfinished search and
+    returns their utilities and predicted outcomes. If the adversary does not agree to buy (sell) at a price,
+    it would not agree at a higher (lower) one, and if it agrees we try a higher (lower) price.
+
+    Returns:
+        The (price, utility, predicted outcome) probes of every key, in the order the search made them
+    """
+    bounds = {key: list(price_range) for key, price_range in price_ranges.items()}
+    probes = {key: [] for key in price_ranges}
+    active = [key for key, (start, end) in bounds.items() if start < end]
+    while active:
+        prices = [(bounds[key][0] + bounds[key][1]) // 2 for key in active]
+        utilities, outcomes = score(
+            [(time, quantity, price) for (time, quantity), price in zip(active, prices)]
+        )
+        for key, price, utility, outcome in zip(active, prices, utilities, outcomes):
+            probes[key].append((price, utility, outcome))
+            if (outcome < -900) == is_seller:
+                bounds[key][1] = price - 1
+            else:
+                bounds[key][0] = price + 1
+        active = [key for key in active if bounds[key][0] < bounds[key][1]]
+    return probes
+
+
 class MyFixedUtilityNegotiator(SAONegotiator):
     def __init__(
         self,
@@ -61,6 +99,7 @@ class MyFixedUtilityNegotiator(SAONegotiator):
                 manager  # the negotiation manager (parent may be a controller)
             )
         self.horizon = horizon
+        self._history_state = (None, 0, None)
 
     def pad(self, arr, padding):
         if len(arr) == padding:
@@ -136,6 +175,24 @@ class MyFixedUtilityNegotiator(SAONegotiator):
         to_features = torch.from_numpy(to_features).float()
         return prediction_model.predict(to_features)
 
+    def history_state(self, history, prediction_model):
+        """States of the prediction model after the messages in history, advanced from the states
+        cached for the part of the history seen by the previous call"""
+        model, n_messages, state = self._history_state
+        if model is not prediction_model or n_messages > len(history):
+            n_messages, state = 0, None
+        if n_messages < len(history):
+            to_features = np.array(
+                [message[:RESPONSE_RELATIVE_TIME] for message in history[n_messages:]]
+            )
+            to_features = torch.from_numpy(to_features).float()
+            with torch.no_grad():
+                _, state = prediction_model.advance(
+                    to_features.view(len(to_features), 1, -1), state
+                )
+        self._history_state = (prediction_model, len(history), state)
+        return state
+
     def propose(self, state: MechanismState) -> Optional["Outcome"]:
         """Propose a set of offers
 
@@ -195,23 +252,18 @@ class MyFixedUtilityNegotiator(SAONegotiator):
         current_proposal[OFFER_UTILITY] = self.ufun(offer)
 
         best_proposal = current_proposal
-        best_outcome = self.predict_outcome(
-            history + [best_proposal], _prediction_model
-        )[-1]
-
-        offer = [0] * 3
+        history_state = self.history_state(history, _prediction_model)
+        best_outcome = predict_candidates(
+            history_state, [best_proposal], _prediction_model
+        )[0]
 
+        aux, quantity_ranges, price_ranges = {}, {}, {}
         for time in range(*time_range):
-            offer[TIME] = time
-            current_proposal[OFFER_TIME] = time
-            current_proposal[AUX_NEEDED_START : AUX_NEEDED_END + 1] = self.pad(
-                _needed[time : time + MAX_HORIZON], MAX_HORIZON
-            )
-            current_proposal[AUX_PRICE_START : AUX_PRICE_END + 1] = self.pad(
-                _price[time : time + MAX_HORIZON], MAX_HORIZON
+            aux[time] = (
+                self.pad(_needed[time : time + MAX_HORIZON], MAX_HORIZON),
+                self.pad(_price[time : time + MAX_HORIZON], MAX_HORIZON),
             )
-
-            quantity_range = (
+            quantity_ranges[time] = (
                 1,
                 max(_needed[time : time + MAX_HORIZON]) + 1,
             )  # TODO: maybe allow even more?
@@ -220,51 +272,59 @@ class MyFixedUtilityNegotiator(SAONegotiator):
             else:
                 price_range = (floor(_price[time]) - 10, floor(_price[time]) + 1)
                 # price_range = (floor(_price[time]), floor(_price[time]) - 10 - 1, -1)
+            for quantity in range(*quantity_ranges[time]):
+                price_ranges[time, quantity] = price_range
+
+        def score(candidates):
+            proposals = []
+            for time, quantity, price in candidates:
+                offer = [0] * 3
+                offer[TIME], offer[QUANTITY], offer[UNIT_PRICE] = time, quantity, price
+                proposal = current_proposal.copy()
+                proposal[OFFER_TIME] = time
+                proposal[AUX_NEEDED_START : AUX_NEEDED_END + 1] = aux[time][0]
+                proposal[AUX_PRICE_START : AUX_PRICE_END + 1] = aux[time][1]
+                proposal[OFFER_QUANTITY] = quantity
+                proposal[OFFER_COST] = price
+                proposal[OFFER_UTILITY] = self.ufun(offer)
+                proposals.append(proposal)
+            return (
+                [proposal[OFFER_UTILITY] for proposal in proposals],
+                predict_candidates(history_state, proposals, _prediction_model),
+            )
 
-            for quantity in range(*quantity_range):
-                offer[QUANTITY] = quantity
-                current_proposal[OFFER_QUANTITY] = quantity
+        # if I'm a seller:
+        # first, find the highest price such that the adversary agrees to buy
 
-                # if I'm a seller:
-                # first, find the highest price such that the adversary agrees to buy
+        # if I'm a buyer:
+        # find the lowest price such that the adversary agrees to sell
+        probes = search_prices(price_ranges, self._is_seller, score)
 
-                # if I'm a buyer:
-                # find the lowest price such that the adversary agrees to sell
+        offer = [0] * 3
 
-                start, end = price_range
+        # replay the searches in the order they were originally made
+        for time in range(*time_range):
+            offer[TIME] = time
+            current_proposal[OFFER_TIME] = time
+            current_proposal[AUX_NEEDED_START : AUX_NEEDED_END + 1] = aux[time][0]
+            current_proposal[AUX_PRICE_START : AUX_PRICE_END + 1] = aux[time][1]
 
-                while start < end:
+            for quantity in range(*quantity_ranges[time]):
+                offer[QUANTITY] = quantity
+                current_proposal[OFFER_QUANTITY] = quantity
 
-                    price = (start + end) // 2
+                for price, utility, predicted_outcome in probes[time, quantity]:
                     offer[UNIT_PRICE] = price
-
                     current_proposal[OFFER_COST] = price
+                    current_proposal[OFFER_UTILITY] = utility
 
-                    current_proposal[OFFER_UTILITY] = self.ufun(offer)
-                    to_predict = history + [current_proposal]
-                    predicted_outcome = self.predict_outcome(
-                        to_predict, _prediction_model
-                    )
-                    if predicted_outcome[-1] < -900:
-                        # if the adversary didn't agree to buy in price p, he would not agree to buy
-                        # in price greater than p
-                        if self._is_seller:
-                            end = price - 1
-                        # if the adversary didn't agree to sell in price p, he would not agree to sell
-                        # in price lower than p
-                        else:
-                            start = price + 1
-                    else:
-                        # update the best proposal
-                        if predicted_outcome[-1] > best_outcome:
-                            best_outcome = predicted_outcome[-1]
-                            best_proposal = current_proposal
-                        # if the adversary agrees to buy in price p, we'll try to sell in higher price
-                        if self._is_seller:
-                            start = price + 1
-                        # if the adversary agrees to sell in price p, we'll try to buy in lower price
-                        else:
-                            end = price - 1
+                    # update the best proposal
+                    if (
+                        not predicted_outcome < -900
+                        and predicted_outcome > best_outcome
+                    ):
+                        best_outcome = predicted_outcome
+                        best_proposal = current_proposal
 
         offer[TIME] = best_proposal[OFFER_TIME]
         offer[UNIT_PRICE] = best_proposal[OFFER_COST]
@@ -323,6 +383,7 @@ class MyUtilityNegotiator(SAONegotiator):
                 manager  # the negotiation manager (parent may be a controller)
             )
         self.horizon = horizon
+        self._history_state = (None, 0, None)
 
     def pad(self, arr, padding):
         if len(arr) == padding:
@@ -401,6 +462,24 @@ class MyUtilityNegotiator(SAONegotiator):
         prediction = prediction_model.predict(to_features)
         return prediction
 
+    def history_state(self, history, prediction_model):
+        """States of the prediction model after the messages in history, advanced from the states
+        cached for the part of the history seen by the previous call"""
+        model, n_messages, state = self._history_state
+        if model is not prediction_model or n_messages > len(history):
+            n_messages, state = 0, None
+        if n_messages < len(history):
+            to_features = np.array(
+                [message[:RESPONSE_RELATIVE_TIME] for message in history[n_messages:]]
+            )
+            to_features = torch.from_numpy(to_features).float()
+            with torch.no_grad():
+                _, state = prediction_model.advance(
+                    to_features.view(len(to_features), 1, -1), state
+                )
+        self._history_state = (prediction_model, len(history), state)
+        return state
+
     def propose(self, state: MechanismState) -> Optional["Outcome"]:
         """Propose a set of offers
 
@@ -463,22 +542,21 @@ class MyUtilityNegotiator(SAONegotiator):
             current_proposal[OFFER_UTILITY] = current_proposal[OFFER_UTILITY].item()
 
         best_proposal = current_proposal
-        best_outcome = self.predict_outcome(
-            history + [best_proposal], _prediction_model
-        )[-1]
+        history_state = self.history_state(history, _prediction_model)
+        best_outcome = predict_candidates(
+            history_state, [best_proposal], _prediction_model
+        )[0]
 
+        aux, quantity_ranges, price_ranges = {}, {}, {}
         for time in range(*time_range):
-            current_proposal[OFFER_TIME] = time
             # TODO: actually, this should be over the time range, and the proposed time is in the interval
-            current_proposal[AUX_NEEDED_START : AUX_NEEDED_END + 1] = self.pad(
-                _needed[time : time + MAX_HORIZON], MAX_HORIZON
-            )
-            current_proposal[AUX_PRICE_START : AUX_PRICE_END + 1] = self.pad(
-                _price[time : time + MAX_HORIZON], MAX_HORIZON
+            aux[time] = (
+                self.pad(_needed[time : time + MAX_HORIZON], MAX_HORIZON),
+                self.pad(_price[time : time + MAX_HORIZON], MAX_HORIZON),
             )
 
             # TODO: actually, this should be only for _needed[time]
-            quantity_range = (
+            quantity_ranges[time] = (
                 1,
                 max(_needed[time : time + MAX_HORIZON]) + 1,
             )  # TODO: maybe allow even more?
@@ -487,54 +565,55 @@ class MyUtilityNegotiator(SAONegotiator):
             else:
                 price_range = (floor(_price[time]) - 10, floor(_price[time]) + 1)
                 # price_range = (floor(_price[time]), floor(_price[time]) - 10 - 1, -1)
-            for quantity in range(*quantity_range):
-                current_proposal[OFFER_QUANTITY] = quantity
+            for quantity in range(*quantity_ranges[time]):
+                price_ranges[time, quantity] = price_range
+
+        def score(candidates):
+            proposals = []
+            for time, quantity, price in candidates:
+                proposal = current_proposal.copy()
+                proposal[OFFER_TIME] = time
+                proposal[AUX_NEEDED_START : AUX_NEEDED_END + 1] = aux[time][0]
+                proposal[AUX_PRICE_START : AUX_PRICE_END + 1] = aux[time][1]
+                proposal[OFFER_QUANTITY] = quantity
+                proposal[OFFER_COST] = price
+                proposal[OFFER_UTILITY] = self.ufun(proposal[:OFFER_UTILITY])
+
+                if type(proposal[OFFER_UTILITY]) is torch.Tensor:
+                    proposal[OFFER_UTILITY] = proposal[OFFER_UTILITY].item()
+                proposals.append(proposal)
+            return (
+                [proposal[OFFER_UTILITY] for proposal in proposals],
+                predict_candidates(history_state, proposals, _prediction_model),
+            )
 
-                # if I'm a seller:
-                # first, find the highest price such that the adversary agrees to buy
+        # if I'm a seller:
+        # first, find the highest price such that the adversary agrees to buy
 
-                # if I'm a buyer:
-                # find the lowest price such that the adversary agrees to sell
+        # if I'm a buyer:
+        # find the lowest price such that the adversary agrees to sell
+        probes = search_prices(price_ranges, self._is_seller, score)
 
-                start, end = price_range
-                while start < end:
+        # replay the searches in the order they were originally made
+        for time in range(*time_range):
+            current_proposal[OFFER_TIME] = time
+            current_proposal[AUX_NEEDED_START : AUX_NEEDED_END + 1] = aux[time][0]
+            current_proposal[AUX_PRICE_START : AUX_PRICE_END + 1] = aux[time][1]
 
-                    price = (start + end) // 2
+            for quantity in range(*quantity_ranges[time]):
+                current_proposal[OFFER_QUANTITY] = quantity
 
+                for price, utility, predicted_outcome in probes[time, quantity]:
                     current_proposal[OFFER_COST] = price
-                    current_proposal[OFFER_UTILITY] = self.ufun(
-                        current_proposal[:OFFER_UTILITY]
-                    )
-
-                    if type(current_proposal[OFFER_UTILITY]) is torch.Tensor:
-                        current_proposal[OFFER_UTILITY] = current_proposal[
-                            OFFER_UTILITY
-                        ].item()
-
-                    to_predict = history + [current_proposal]
-                    predicted_outcome = self.predict_outcome(
-                        to_predict, _prediction_model
-                    )
-                    if predicted_outcome[-1] < -900:
-                        # if the adversary didn't agree to buy in price p, he would not agree to buy
-                        # in price greater than p
-                        if self._is_seller:
-                            end = price - 1
-                        # if the adversary didn't agree to sell in price p, he would not agree to sell
-                        # in price lower than p
-                        else:
-                            start = price + 1
-                    else:
-                        # update the best proposal
-                        if predicted_outcome[-1] > best_outcome:
-                            best_outcome = predicted_outcome[-1]
-                            best_proposal = current_proposal
-                        # if the adversary agrees to buy in price p, we'll try to sell in higher price
-                        if self._is_seller:
-                            start = price + 1
-                        # if the adversary agrees to sell in price p, we'll try to buy in lower price
-                        else:
-                            end = price - 1
+                    current_proposal[OFFER_UTILITY] = utility
+
+                    # update the best proposal
+                    if (
+                        not predicted_outcome < -900
+                        and predicted_outcome > best_outcome
+                    ):
+                        best_outcome = predicted_outcome
+                        best_proposal = current_proposal
 
         offer[TIME] = best_proposal[OFFER_TIME]
         offer[UNIT_PRICE] = best_proposal[OFFER_COST]
@@ -1,5 +1,4 @@
 import os
-import pickle
 from typing import Dict, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
@@ -23,6 +22,8 @@ from scml.scml2020.components.production import (
 )
 from scml.scml2020.components.trading import FixedTradePredictionStrategy
 
+from scml_agents.models import load_model
+
 
 class OmerProductionStrategyAgent(ProductionStrategy):
     def __init__(self, *args, **kwargs):
@@ -30,8 +31,10 @@ class OmerProductionStrategyAgent(ProductionStrategy):
 
     def _load_omer_production_args(self):
         if not hasattr(self, "_production_classifier"):
-            self._production_classifier, self._vectorizer = pickle.load(
-                open("production_binary_classifier.pkl", "rb")
+            self._production_classifier, self._vectorizer = load_model(
+                os.path.join(
+                    os.path.dirname(__file__), "production_binary_classifier.pkl"
+                )
             )
         if not hasattr(self, "omer_input"):
             self.omer_input = 0
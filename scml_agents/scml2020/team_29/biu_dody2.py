@@ -1,6 +1,6 @@
 import functools
 import math
-import pickle
+import os
 from abc import abstractmethod
 from collections import defaultdict
 from dataclasses import dataclass
@@ -39,6 +39,8 @@ from scml.scml2020.components.production import (
 )
 from scml.scml2020.services.controllers import StepController, SyncController
 
+from scml_agents.models import load_model
+
 
 class OmerProductionStrategyAgent(ProductionStrategy):
     def __init__(self, *args, **kwargs):
@@ -46,8 +48,10 @@ class OmerProductionStrategyAgent(ProductionStrategy):
 
     def _load_omer_production_args(self):
         if not hasattr(self, "_production_classifier"):
-            self._production_classifier, self._vectorizer = pickle.load(
-                open("production_binary_classifier.pkl", "rb")
+            self._production_classifier, self._vectorizer = load_model(
+                os.path.join(
+                    os.path.dirname(__file__), "production_binary_classifier.pkl"
+                )
             )
         if not hasattr(self, "omer_input"):
             self.omer_input = 0
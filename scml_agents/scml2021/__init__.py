@@ -1,5 +1,57 @@
 # -*- coding: utf-8 -*-
-from .oneshot import *
-from .standard import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = standard.__all__ + oneshot.__all__
+_EXPORTS = {
+    "CharliesAgent": ".standard",
+    "IYIBIAgent": ".standard",
+    "SteadyMgr": ".standard",
+    "AugurAgent": ".standard",
+    "SorceryAgent": ".standard",
+    "Agent68": ".standard",
+    "StingyAgent": ".standard",
+    "SolidAgent": ".standard",
+    "E3BIUagent": ".standard",
+    "MyPaibiuAgent": ".standard",
+    "PolymorphicAgent": ".standard",
+    "YIYAgent": ".standard",
+    "PerryTheAgent": ".standard",
+    "BlueWolf": ".standard",
+    "M4": ".standard",
+    "Mediocre": ".standard",
+    "ArtisanKangaroo": ".standard",
+    "StagHunterTough": ".oneshot",
+    "StagHunterV7": ".oneshot",
+    "Agent74": ".oneshot",
+    "QlAgent": ".oneshot",
+    "TheSopranos78": ".oneshot",
+    "Zilberan": ".oneshot",
+    "SimpleAgent": ".oneshot",
+    "BetterAgent": ".oneshot",
+    "AdaptiveAgent": ".oneshot",
+    "LearningAgent": ".oneshot",
+    "ImprovedLearningAgent": ".oneshot",
+    "BondAgent": ".oneshot",
+    "UcOneshotAgent3_4": ".oneshot",
+    "Agent97": ".oneshot",
+    "Gentle": ".oneshot",
+    "AgentT064": ".oneshot",
+    "AgentT063": ".oneshot",
+    "AgentT062": ".oneshot",
+    "AgentT061": ".oneshot",
+    "AgentT060": ".oneshot",
+    "AgentT056": ".oneshot",
+    "AgentT055": ".oneshot",
+    "AgentT054": ".oneshot",
+    "AgentT053": ".oneshot",
+    "AgentT052": ".oneshot",
+    "AgentT051": ".oneshot",
+    "AgentT050": ".oneshot",
+    "AgentT049": ".oneshot",
+    "AgentT048": ".oneshot",
+    "Agent112": ".oneshot",
+    "PDPSyncAgent": ".oneshot",
+    "GoldfishParetoEmpiricalGodfatherAgent": ".oneshot",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
@@ -1,28 +1,40 @@
 # -*- coding: utf-8 -*-
-from .staghunter import *
-from .team_50 import *
-from .team_51 import *
-from .team_54 import *
-from .team_55 import *
-from .team_61 import *
-from .team_62 import *
-from .team_72 import *
-from .team_73 import *
-from .team_86 import *
-from .team_90 import *
-from .team_corleone import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = (
-    staghunter.__all__
-    + team_50.__all__
-    + team_51.__all__
-    + team_54.__all__
-    + team_55.__all__
-    + team_61.__all__
-    + team_62.__all__
-    + team_72.__all__
-    + team_73.__all__
-    + team_86.__all__
-    + team_90.__all__
-    + team_corleone.__all__
-)
+_EXPORTS = {
+    "StagHunterTough": ".staghunter",
+    "StagHunterV7": ".staghunter",
+    "Agent74": ".team_50",
+    "QlAgent": ".team_51",
+    "TheSopranos78": ".team_54",
+    "Zilberan": ".team_55",
+    "SimpleAgent": ".team_86",
+    "BetterAgent": ".team_86",
+    "AdaptiveAgent": ".team_73",
+    "LearningAgent": ".team_72",
+    "ImprovedLearningAgent": ".team_55",
+    "BondAgent": ".team_61",
+    "UcOneshotAgent3_4": ".team_62",
+    "Agent97": ".team_72",
+    "Gentle": ".team_73",
+    "AgentT064": ".team_73",
+    "AgentT063": ".team_73",
+    "AgentT062": ".team_73",
+    "AgentT061": ".team_73",
+    "AgentT060": ".team_73",
+    "AgentT056": ".team_73",
+    "AgentT055": ".team_73",
+    "AgentT054": ".team_73",
+    "AgentT053": ".team_73",
+    "AgentT052": ".team_73",
+    "AgentT051": ".team_73",
+    "AgentT050": ".team_73",
+    "AgentT049": ".team_73",
+    "AgentT048": ".team_73",
+    "Agent112": ".team_86",
+    "PDPSyncAgent": ".team_90",
+    "GoldfishParetoEmpiricalGodfatherAgent": ".team_corleone",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
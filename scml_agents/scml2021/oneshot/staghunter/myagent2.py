@@ -106,6 +106,8 @@ from scml.scml2020.common import QUANTITY, TIME, UNIT_PRICE
 from scml.utils import anac2021_collusion, anac2021_oneshot, anac2021_std
 from tabulate import tabulate
 
+from scml_agents.marginal_utility import leave_one_out_utilities
+
 # warnings.filterwarnings('error')
 
 __all__ = [
@@ -238,22 +240,17 @@ class StagHunter(OneShotAgent):
 
         self._secured = 0
 
-        u_total = self.ufun.from_offers(
+        # utilities of the accepted offers with and without each partner's
+        u_total, u_others = leave_one_out_utilities(
+            self.ufun,
             tuple(tuple(_) for _ in self.cur_offer_list.values()),
             tuple([self.awi.is_first_level] * (len(self.cur_offer_list))),
         )
+        u_without = dict(zip(self.cur_offer_list.keys(), u_others))
 
         for oppo_id in self.oppo_list:
             if oppo_id in self.cur_offer_list:
-                cur_offer = []
-                for id_p in self.cur_offer_list:
-                    if id_p != oppo_id:
-                        cur_offer.append(self.cur_offer_list[id_p])
-
-                u_p = self.ufun.from_offers(
-                    tuple(tuple(_) for _ in cur_offer),
-                    tuple([self.awi.is_first_level] * (len(cur_offer))),
-                )
+                u_p = u_without[oppo_id]
 
                 # if(u_total-u_p >= self._prev_best_mag_profit[oppo_id]):
                 self._prev_mag_profit[oppo_id].append(u_total - u_p)
@@ -896,22 +893,17 @@ class StagHunterV5(OneShotAgent):
         self._prev_self_price = []
         self._secured = 0
 
-        u_total = self.ufun.from_offers(
+        # utilities of the accepted offers with and without each partner's
+        u_total, u_others = leave_one_out_utilities(
+            self.ufun,
             tuple(tuple(_) for _ in self.cur_offer_list.values()),
             tuple([self.awi.is_first_level] * (len(self.cur_offer_list))),
         )
+        u_without = dict(zip(self.cur_offer_list.keys(), u_others))
 
         for oppo_id in self.oppo_list:
             if oppo_id in self.cur_offer_list:
-                cur_offer = []
-                for id_p in self.cur_offer_list:
-                    if id_p != oppo_id:
-                        cur_offer.append(tuple(self.cur_offer_list[id_p]))
-
-                u_p = self.ufun.from_offers(
-                    tuple(cur_offer),
-                    tuple([self.awi.is_first_level] * (len(cur_offer))),
-                )
+                u_p = u_without[oppo_id]
 
                 # if(u_total-u_p >= self._prev_best_mag_profit[oppo_id]):
                 self._prev_mag_profit[oppo_id].append(u_total - u_p)
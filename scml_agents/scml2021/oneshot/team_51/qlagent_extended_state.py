@@ -60,8 +60,10 @@ You should see a short tournament running and results reported.
 import argparse
 import ast
 import csv
+import hashlib
 import itertools
 import math
+import os
 import pickle
 import random
 
@@ -71,6 +73,7 @@ import sys
 # required for running tournaments and printing
 import time
 from collections import defaultdict
+
 # from os import PRIO_PROCESS
 
 # required for typing
@@ -122,6 +125,7 @@ if ENABLE_GRAPH:
     # matplotlib.use('Agg')
     from scipy.signal import butter, filtfilt
 
+
 # Debug print type #1
 def DEBUG_PRINT(msg):
     if DEBUG:
@@ -153,6 +157,173 @@ class STATE_TYPE:
     OPP_COUNTER = 5
 
 
+""""
+Dense Q tables
+--------------
+A Q table is a 2D array with a row per state and a column per action, so that selecting the greedy action
+and updating a value are single NumPy operations. QTableLayout maps the state keys used by the agent
+(needs index strings for INIT, 5-tuples and 3-tuples of indexes for OPP_COUNTER, END and ACCEPT) and the
+action keys ((price index, quantity index), "end" and "acc") to rows and columns. "end" and "acc" are only
+available in OPP_COUNTER states; elsewhere they hold -inf, so they are never selected.
+"""
+
+
+class QTableLayout:
+    # layouts per (price_res, quantity_res, needs_size, complex_state)
+    _layouts = dict()
+
+    def __init__(self, price_res, quantity_res, needs_size, complex_state=True):
+        self.actions = list(itertools.product(range(price_res), range(quantity_res)))
+        self.actions += ["end", "acc"]
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
+        if complex_state:
+            init_states = [str(i_n) for i_n in range(needs_size)]
+            opp_states = list(
+                itertools.product(
+                    range(price_res),
+                    range(quantity_res),
+                    range(price_res),
+                    range(quantity_res),
+                    range(needs_size),
+                )
+            )
+            opp_states += list(
+                itertools.product(
+                    range(price_res), range(quantity_res), range(needs_size)
+                )
+            )
+            self.states = init_states + opp_states + [STATE_TYPE.END, STATE_TYPE.ACCEPT]
+            # per state: index of the needs and of the opponent's price (-1 when not part of the state)
+            self.needs_index = np.array(
+                [int(s) for s in init_states] + [s[-1] for s in opp_states] + [-1, -1]
+            )
+            self.opp_price_index = np.array(
+                [-1] * len(init_states) + [s[-3] for s in opp_states] + [-1, -1]
+            )
+        else:
+            self.states = [
+                STATE_TYPE.INIT,
+                STATE_TYPE.OPP_COUNTER,
+                STATE_TYPE.END,
+                STATE_TYPE.ACCEPT,
+            ]
+            self.needs_index = np.full(len(self.states), -1)
+            self.opp_price_index = np.full(len(self.states), -1)
+        self.state_index = {s: i for i, s in enumerate(self.states)}
+        # the states in which the agent can end the negotiation or accept the opponent's offer
+        self.terminal_rows = np.array(
+            [isinstance(s, tuple) or s == STATE_TYPE.OPP_COUNTER for s in self.states]
+        )
+        self.shape = (len(self.states), len(self.actions))
+        self.valid = np.ones(self.shape, dtype=bool)
+        self.valid[~self.terminal_rows, -2:] = False
+
+    @classmethod
+    def get(cls, price_res, quantity_res, needs_size, complex_state=True):
+        key = (price_res, quantity_res, needs_size, complex_state)
+        if key not in cls._layouts:
+            cls._layouts[key] = cls(*key)
+        return cls._layouts[key]
+
+    def from_dict(self, q_t):
+        """
+        Converts a nested {state: {action: value}} Q table to a dense one
+        :param: q_t - the nested Q table (as saved in text by older versions of the agent)
+        :return: the dense Q table
+        """
+        q = np.full(self.shape, -np.inf)
+        for s, values in q_t.items():
+            if s not in self.state_index:
+                raise ValueError(f"State {s} is not part of the Q table layout")
+            for a, v in values.items():
+                q[self.state_index[s], self.action_index[a]] = v
+        if np.isneginf(q[self.valid]).any():
+            raise ValueError("The Q table does not cover all states and actions")
+        return q
+
+    def to_dict(self, q):
+        """
+        Converts a dense Q table to a nested {state: {action: value}} one
+        :param: q - the dense Q table
+        :return: the nested Q table
+        """
+        return {
+            s: {
+                a: q[i, j].item()
+                for j, a in enumerate(self.actions)
+                if self.valid[i, j]
+            }
+            for i, s in enumerate(self.states)
+        }
+
+
+# learned Q tables read so far per file, shared (read only) by all agents of the process
+_learned_q_tables = dict()
+
+
+def _digest(path):
+    with open(path, "rb") as handle:
+        return hashlib.sha1(handle.read()).hexdigest()
+
+
+def learned_q_table_binary(path):
+    """
+    :param: path - the text file of a learned Q table
+    :return: the compressed NumPy file holding the same table (see convert_learned_q_table)
+    """
+    return os.path.splitext(path)[0] + ".npz"
+
+
+def convert_learned_q_table(path, price_res=5, quantity_res=5, needs_size=6):
+    """
+    Saves a learned Q table given as text next to it as the dense Q table of its layout (see QTableLayout), in a
+    compressed NumPy file that load_learned_q_table reads instead of parsing the text. This only needs to be done once
+    per table (the text is still read if it changes afterwards).
+    :param: path - the text file of the nested {state: {action: value}} dict
+    :param: price_res, quantity_res, needs_size - the layout of the table
+    :return: the path of the compressed file
+    """
+    layout = QTableLayout.get(price_res, quantity_res, needs_size)
+    with open(path) as handle:
+        q = layout.from_dict(ast.literal_eval(handle.read()))
+    location = learned_q_table_binary(path)
+    np.savez_compressed(
+        location,
+        q=q,
+        layout=np.array([price_res, quantity_res, needs_size]),
+        source=np.array(_digest(path)),
+    )
+    return location
+
+
+def load_learned_q_table(path):
+    """
+    Reads a learned Q table saved as the text of the nested {state: {action: value}} dict. The file is read once per
+    process (again if it changes). If it was converted with convert_learned_q_table (and did not change since), the
+    compressed dense table is read instead of parsing the text.
+    :param: path - the text file (relative to the working directory)
+    :return: the nested Q table (must not be modified)
+    """
+    location = learned_q_table_binary(path)
+    if not os.path.exists(path) and os.path.exists(location):
+        path = location
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key in _learned_q_tables:
+        return _learned_q_tables[key]
+    table = None
+    if os.path.exists(location):
+        with np.load(location) as data:
+            if path == location or str(data["source"]) == _digest(path):
+                layout = QTableLayout.get(*data["layout"].tolist())
+                table = layout.to_dict(data["q"])
+    if table is None:
+        with open(path) as handle:
+            table = ast.literal_eval(handle.read())
+    _learned_q_tables[key] = table
+    return table
+
+
 """"
 The QlAgent class
 -----------------
@@ -257,22 +428,23 @@ class QlAgent(OneShotAgent):
         # "buyer" = L1 position for agent
         # both may require different learning, because goals are opposite from negotiation price perspective.
         # that's why we have learning database for each type.
+        # the learned tables are read from the working directory (if there) once per process. The Q tables of
+        # opponents are dense (see QTableLayout) and shared until an opponent's table is first updated.
+        self.q_layout = QTableLayout.get(
+            price_res, quantity_res, needs_res + 1, complex_state
+        )
+        # initial (read only) Q tables, per role, issues and learned table
+        self._initial_q_tables = dict()
         if self.load_q:
             try:
-                # with open('q_seller.pickle', 'rb') as handle:
-                #     self.learned_q_seller_t = pickle.load(handle)
-                with open("q_seller.txt") as handle_s:
-                    self.learned_q_seller_t = ast.literal_eval(handle_s.read())
-                DEBUG_PRINT("UPLOADED FROM q_seller.pickle")
+                self.learned_q_seller_t = load_learned_q_table("q_seller.txt")
+                DEBUG_PRINT("UPLOADED FROM q_seller.txt")
             except FileNotFoundError:
                 self.load_q = False
 
             try:
-                # with open('q_buyer.pickle', 'rb') as handle:
-                #     self.learned_q_buyer_t = pickle.load(handle)
-                with open("q_buyer.txt") as handle_b:
-                    self.learned_q_buyer_t = ast.literal_eval(handle_b.read())
-                DEBUG_PRINT("UPLOADED FROM q_buyer.pickle")
+                self.learned_q_buyer_t = load_learned_q_table("q_buyer.txt")
+                DEBUG_PRINT("UPLOADED FROM q_buyer.txt")
             except FileNotFoundError:
                 self.load_q = False
 
@@ -381,7 +553,7 @@ class QlAgent(OneShotAgent):
             or (self.awi.current_step == self.awi.n_steps - 1)
         ):
             if self.save_q:
-                with open("q" + postfix + ".txt", "w") as handle:  # .pickle
+                with open("q" + postfix + ".txt", "w") as handle:
                     if self.save_q_type == "exact":
                         lea_k = None
                         k = None
@@ -394,36 +566,21 @@ class QlAgent(OneShotAgent):
                             my_q = list(self.q_table_per_opp.values())[0]
                         else:
                             my_q = self.q_table_per_opp[k]
-                        # if self.load_q:
-                        #     # if we came from a loaded table, we add entries from there we don't have in our new
-                        #     # learned table, in order to gather as much Q value as possible for different scenarios
-                        #     if self.is_seller:
-                        #         for s in self.learned_q_seller_t:
-                        #             if s not in my_q.keys():
-                        #                 my_q[s] = self.learned_q_seller_t[s]
-                        #             else:
-                        #                 for a in self.learned_q_seller_t[s]:
-                        #                     if a not in my_q[s].keys():
-                        #                         my_q[s][a] = self.learned_q_seller_t[s][a]
-                        #     else:
-                        #         for s in self.learned_q_buyer_t:
-                        #             if s not in my_q.keys():
-                        #                 my_q[s] = self.learned_q_buyer_t[s]
-                        #             else:
-                        #                 for a in self.learned_q_buyer_t[s]:
-                        #                     if a not in my_q[s].keys():
-                        #                         my_q[s][a] = self.learned_q_buyer_t[s][a]
 
                         DEBUG2_PRINT("saving " + postfix)
-                        handle.write(str(my_q))
+                        handle.write(str(self.q_layout.to_dict(my_q)))
 
                         DEBUG2_PRINT("saved " + postfix)
-                        # pickle.dump(my_q, handle, protocol=pickle.HIGHEST_PROTOCOL)
                     else:
                         handle.write(
-                            str(self.map_q(list(self.q_table_per_opp.values())[0]))
+                            str(
+                                self.map_q(
+                                    self.q_layout.to_dict(
+                                        list(self.q_table_per_opp.values())[0]
+                                    )
+                                )
+                            )
                         )
-                        # pickle.dump(self.map_q(list(self.q_table_per_opp.values())[0]), handle, protocol=pickle.HIGHEST_PROTOCOL)
 
         # drawing graphs if enabled
         if (self.awi.current_step > 0) and (
@@ -1017,7 +1174,6 @@ class QlAgent(OneShotAgent):
             # against it.
             DEBUG_PRINT("INIT, " + partner)
             self.started[partner] = True
-            self.q_table_per_opp[partner] = dict()
             # print(self.q_table_per_opp)
             price_gap = unit_price_issue.max_value - unit_price_issue.min_value
             quantity_gap = quantity_issue.max_value - quantity_issue.min_value
@@ -1025,8 +1181,7 @@ class QlAgent(OneShotAgent):
             # initializing an action vector with all action and a Q table against this partner.
             self.action_vec[partner] = dict()  # []
             # self.q_table_per_opp[partner], self.action_vec[partner] = self._q_learning_q_init(self.q_table_per_opp[partner], unit_price_issue, quantity_issue, self.action_vec[partner], is_seller, nmi)
-            self._q_learning_q_init(
-                self.q_table_per_opp[partner],
+            self.q_table_per_opp[partner] = self._q_learning_q_init(
                 unit_price_issue,
                 quantity_issue,
                 self.action_vec[partner],
@@ -1351,15 +1506,13 @@ class QlAgent(OneShotAgent):
                 self.state_per_opp[partner] = str(
                     self._find_nearest(self.ne_range, my_needs)
                 )  # str(int(np.ceil(my_needs)))
-            self.q_table_per_opp[partner] = dict()
             unit_price_issue = nmi.issues[OFFER_FIELD_IDX.UNIT_PRICE]
             quantity_issue = nmi.issues[OFFER_FIELD_IDX.QUANTITY]
             price_gap = unit_price_issue.max_value - unit_price_issue.min_value
             quantity_gap = quantity_issue.max_value - quantity_issue.min_value
             self.action_vec[partner] = dict()  # []
             # self.q_table_per_opp[partner], self.action_vec[partner] = self._q_learning_q_init(self.q_table_per_opp[partner], unit_price_issue, quantity_issue, self.action_vec[partner], is_seller, nmi)
-            self._q_learning_q_init(
-                self.q_table_per_opp[partner],
+            self.q_table_per_opp[partner] = self._q_learning_q_init(
                 unit_price_issue,
                 quantity_issue,
                 self.action_vec[partner],
@@ -1569,9 +1722,16 @@ class QlAgent(OneShotAgent):
         if action_m is None:
             return
 
+        # the table is shared until the first update against this partner
+        if not q.flags.writeable:
+            q = self.q_table_per_opp[partner] = q.copy()
+
         # updating Q table
-        q[state_m][action_m] = (1 - alpha_d) * q[state_m][action_m] + alpha_d * (
-            reward + self.gamma * max(q[new_state_m][a] for a in q[new_state_m].keys())
+        s_i = self.q_layout.state_index[state_m]
+        a_i = self.q_layout.action_index[action_m]
+        new_s_i = self.q_layout.state_index[new_state_m]
+        q[s_i, a_i] = (1 - alpha_d) * q[s_i, a_i] + alpha_d * (
+            reward + self.gamma * q[new_s_i].max()
         )
 
         # q[state_m][action_m] = (1-self.alpha)*q[state_m][action_m] + self.alpha*(reward + self.gamma*max([q[new_state_m][a] for a in q[new_state_m].keys()]))
@@ -1721,7 +1881,9 @@ class QlAgent(OneShotAgent):
                 # print("q")
 
                 # select greedily
-                max_q = max(q[state_m][action] for action in q[state_m].keys())
+                selected_a = self.q_layout.actions[
+                    q[self.q_layout.state_index[state_m]].argmax()
+                ]
 
                 constrained_ql = True
                 # if caller == "respond":
@@ -1745,14 +1907,6 @@ class QlAgent(OneShotAgent):
                     # print("state_m: ", state_m)
                     # print(q[state_m].keys())
 
-                    # searching the action index
-                    for a in q[state_m].keys():
-                        if q[state_m][a] == max_q:
-                            # print(a)
-                            # print("a:", a)
-                            selected_a = a
-                            break
-
                     balance_est = self.online_balance  # self.awi.current_balance
 
                     ######################################################
@@ -1978,35 +2132,23 @@ class QlAgent(OneShotAgent):
     (since state and actions are prices nd quanities and these may change, we encode them in the range as indexes.
     there is a rough assumption here that the relations between values count - where they are in the range -
     so we can expolit that to enable learning from simulation to simulation)
-    :param: q_t - Q table
+    The returned table is read only and shared with other opponents; it is copied on its first update.
     :param: unit_price_issue - includes the min and max prices
     :param: quantity_issue - includes the min and max quantities
     :param: action_vec - an empty vector to be initialized with all possible actions
     :param: is_seller - True if I'm "seller" (L0)
     :param: nmi - the framework's nmi
+    :return: the Q table
     """
 
     def _q_learning_q_init(
         self,
-        q_t,
         unit_price_issue,
         quantity_issue,
         action_vec,
         is_seller=True,
         nmi=None,
     ):
-        # DEBUG_PRINT("_q_learning_q_init")
-
-        # print(quantity_issue)
-        # print(unit_price_issue)
-
-        # if self.q_table_per_opp:
-        #     if self.q_table_per_opp[list(self.q_table_per_opp.keys())[0]]:
-        #         #print(len(self.q_table_per_opp[list(self.q_table_per_opp.keys())[0]]))
-        #         q_t = self.q_table_per_opp[list(self.q_table_per_opp.keys())[0]]
-        #         action_vec = self.action_vec[list(self.q_table_per_opp.keys())[0]]
-        #         return [q_t, action_vec]
-
         # limiting possible actions for the agent: this gives better performance
         min_q = (
             quantity_issue.min_value
@@ -2023,10 +2165,6 @@ class QlAgent(OneShotAgent):
         my_q_range = np.linspace(
             min_q, max_q, self.quantity_res
         )  # [0:int(np.ceil(self.quantity_res/5))]
-        # print(my_q_range)
-        q_range = np.linspace(
-            quantity_issue.min_value, quantity_issue.max_value, self.quantity_res
-        )
         c_mx_v = G_C_MX_V  # 1.1#1.5
         c_mn_v = G_C_MN_V  # 0.9#0.5
         if self.is_seller:
@@ -2042,343 +2180,85 @@ class QlAgent(OneShotAgent):
                 self.price_res,
             )
 
-        # print(list(p_range))
-        # print(list(my_q_range))
-        # print(list(my_p_range))
-        # print(list(q_range))
-
-        # Going over all state type and building a basic table
-        for s in [
-            STATE_TYPE.INIT,
-            STATE_TYPE.OPP_COUNTER,
-            STATE_TYPE.END,
-            STATE_TYPE.ACCEPT,
-        ]:  # , STATE_TYPE.MY_COUNTER
-            if not self.complex_state:
-                q_t[s] = dict()
-            else:
-                if s == STATE_TYPE.INIT:
-                    # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                    for i_n, needs in enumerate(self.ne_range):
-                        # q_t[str(needs)] = dict()
-                        q_t[str(i_n)] = dict()
-                elif s == STATE_TYPE.OPP_COUNTER:
-                    for i_ps_so, p_so in enumerate(p_range):
-                        for i_q_so, q_so in enumerate(q_range):
-                            for i_p_s, p_s in enumerate(my_p_range):
-                                for i_q_s, q_s in enumerate(my_q_range):
-                                    # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                    for i_n, needs in enumerate(self.ne_range):
-                                        # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)] = dict()
-                                        q_t[
-                                            (i_p_s, i_q_s, i_ps_so, i_q_so, i_n)
-                                        ] = dict()
-                            # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                            for i_n, needs in enumerate(self.ne_range):
-                                q_t[(i_ps_so, i_q_so, i_n)] = dict()
-                else:
-                    q_t[s] = dict()
-
-            # print(unit_price_issue.min_value, unit_price_issue.max_value, self.price_res)
-            # print(quantity_issue.min_value, quantity_issue.max_value, self.quantity_res)
-
-            # initializing all values in the table
-            for i_p, p in enumerate(my_p_range):
-                # print(q_t)
-                for i_q, q in enumerate(my_q_range):
-                    # print(q_t)
-                    # print((p,q))
-                    if self.smart_init:
-                        if is_seller:
-                            if s == STATE_TYPE.INIT:
-                                # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                for i_n, needs in enumerate(self.ne_range):
-                                    # q_t[str(needs)][(p,np.ceil(q))] = self._initial_q_seller(p,np.ceil(q),needs, nmi, str(needs))#10000
-                                    q_t[str(i_n)][(i_p, i_q)] = self._initial_q_seller(
-                                        p,
-                                        np.ceil(q),
-                                        needs,
-                                        nmi,
-                                        str(needs),
-                                        None,
-                                        (i_p, i_q),
-                                    )  # 10000
-                            elif s == STATE_TYPE.OPP_COUNTER:
-                                for i_ps_so, p_so in enumerate(p_range):
-                                    for i_q_so, q_so in enumerate(q_range):
-                                        for i_p_s, p_s in enumerate(my_p_range):
-                                            for i_q_s, q_s in enumerate(my_q_range):
-
-                                                # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                                for i_n, needs in enumerate(
-                                                    self.ne_range
-                                                ):
-                                                    # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)][(p,np.ceil(q))] = self._initial_q_seller(p,np.ceil(q),needs, nmi, (p_s,np.ceil(q_s),p_so,q_so,needs))#10000
-                                                    q_t[
-                                                        (
-                                                            i_p_s,
-                                                            i_q_s,
-                                                            i_ps_so,
-                                                            i_q_so,
-                                                            i_n,
-                                                        )
-                                                    ][
-                                                        (i_p, i_q)
-                                                    ] = self._initial_q_seller(
-                                                        p,
-                                                        np.ceil(q),
-                                                        needs,
-                                                        nmi,
-                                                        (
-                                                            p_s,
-                                                            np.ceil(q_s),
-                                                            p_so,
-                                                            q_so,
-                                                            needs,
-                                                        ),
-                                                        None,
-                                                        (i_p, i_q),
-                                                    )  # 10000
-
-                                        # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                        for i_n, needs in enumerate(self.ne_range):
-                                            # q_t[(p_so,q_so,needs)][(p,np.ceil(q))] = self._initial_q_seller(p,np.ceil(q),needs, nmi, (p_so,q_so,needs))#0
-                                            q_t[(i_ps_so, i_q_so, i_n)][
-                                                (i_p, i_q)
-                                            ] = self._initial_q_seller(
-                                                p,
-                                                np.ceil(q),
-                                                needs,
-                                                nmi,
-                                                (p_so, q_so, needs),
-                                                None,
-                                                (i_p, i_q),
-                                            )  # 0
-                            else:
-                                # q_t[s][(p,np.ceil(q))] = 0#self._initial_q_seller(p,np.ceil(q),needs,nmi)
-                                q_t[s][
-                                    (i_p, i_q)
-                                ] = 0  # self._initial_q_seller(p,np.ceil(q),needs,nmi)
-                        else:
-                            if s == STATE_TYPE.INIT:
-                                # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                for i_n, needs in enumerate(self.ne_range):
-                                    # q_t[str(needs)][(p,np.ceil(q))] = self._initial_q_buyer(p,np.ceil(q),needs, nmi, str(needs))#10000
-                                    q_t[str(i_n)][(i_p, i_q)] = self._initial_q_buyer(
-                                        p,
-                                        np.ceil(q),
-                                        needs,
-                                        nmi,
-                                        str(needs),
-                                        None,
-                                        (i_p, i_q),
-                                    )  # 10000
-                            elif s == STATE_TYPE.OPP_COUNTER:
-                                for i_ps_so, p_so in enumerate(p_range):
-                                    for i_q_so, q_so in enumerate(q_range):
-                                        for i_p_s, p_s in enumerate(my_p_range):
-                                            for i_q_s, q_s in enumerate(my_q_range):
-
-                                                # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                                for i_n, needs in enumerate(
-                                                    self.ne_range
-                                                ):
-                                                    # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)][(p,np.ceil(q))] = self._initial_q_buyer(p,np.ceil(q),needs, nmi, (p_s,np.ceil(q_s),p_so,q_so,needs))#10000
-                                                    q_t[
-                                                        (
-                                                            i_p_s,
-                                                            i_q_s,
-                                                            i_ps_so,
-                                                            i_q_so,
-                                                            i_n,
-                                                        )
-                                                    ][
-                                                        (i_p, i_q)
-                                                    ] = self._initial_q_buyer(
-                                                        p,
-                                                        np.ceil(q),
-                                                        needs,
-                                                        nmi,
-                                                        (
-                                                            p_s,
-                                                            np.ceil(q_s),
-                                                            p_so,
-                                                            q_so,
-                                                            needs,
-                                                        ),
-                                                        None,
-                                                        (i_p, i_q),
-                                                    )  # 10000
-                                        # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                        for i_n, needs in enumerate(self.ne_range):
-                                            # q_t[(p_so,q_so,needs)][(p,np.ceil(q))] = self._initial_q_buyer(p,np.ceil(q),needs, nmi, (p_so,q_so,needs))#0
-                                            q_t[(i_ps_so, i_q_so, i_n)][
-                                                (i_p, i_q)
-                                            ] = self._initial_q_buyer(
-                                                p,
-                                                np.ceil(q),
-                                                needs,
-                                                nmi,
-                                                (p_so, q_so, needs),
-                                                None,
-                                                (i_p, i_q),
-                                            )  # 0
-                            else:
-                                # q_t[s][(p,np.ceil(q))] = 0#self._initial_q_buyer(p, np.ceil(q), )
-                                q_t[s][(i_p, i_q)] = 0
-                    else:
-                        if s == STATE_TYPE.INIT:
-                            # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                            for i_n, needs in enumerate(self.ne_range):
-                                # q_t[str(i_n)][(p,np.ceil(q))] = 0#10000
-                                q_t[str(i_n)][(i_p, i_q)] = 0
-                        elif s == STATE_TYPE.OPP_COUNTER:
-                            for i_ps_so, p_so in enumerate(p_range):
-                                for i_q_so, q_so in enumerate(q_range):
-                                    for i_p_s, p_s in enumerate(my_p_range):
-                                        for i_q_s, q_s in enumerate(my_q_range):
-                                            # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                            for i_n, needs in enumerate(self.ne_range):
-                                                # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)][(p,np.ceil(q))] = 0
-                                                q_t[
-                                                    (i_p_s, i_q_s, i_ps_so, i_q_so, i_n)
-                                                ][(i_p, i_q)] = 0
-                                    # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                    for i_n, needs in enumerate(self.ne_range):
-                                        # q_t[(p_so,q_so,needs)][(p,np.ceil(q))] = 0
-                                        q_t[(i_ps_so, i_q_so, i_n)][(i_p, i_q)] = 0
-                        else:
-                            # q_t[s][(p,np.ceil(q))] = 0
-                            q_t[s][(i_p, i_q)] = 0
-
-            # if s == STATE_TYPE.OPP_COUNTER:
-            # if s != STATE_TYPE.INIT:
-            if s == STATE_TYPE.OPP_COUNTER:
-                if not self.complex_state:
-                    q_t[s]["end"] = 0
-                    q_t[s]["acc"] = 0
-                else:
-                    for i_ps_so, p_so in enumerate(p_range):
-                        for i_q_so, q_so in enumerate(q_range):
-                            for i_p_s, p_s in enumerate(my_p_range):
-                                for i_q_s, q_s in enumerate(my_q_range):
-                                    # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                                    for i_n, needs in enumerate(self.ne_range):
-                                        if is_seller:
-                                            # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)]["end"] = self._initial_q_seller(p_so,q_so,needs,nmi, (p_s,np.ceil(q_s),p_so,q_so,needs), "end")
-                                            q_t[(i_p_s, i_q_s, i_ps_so, i_q_so, i_n)][
-                                                "end"
-                                            ] = self._initial_q_seller(
-                                                p_so,
-                                                q_so,
-                                                needs,
-                                                nmi,
-                                                (p_s, np.ceil(q_s), p_so, q_so, needs),
-                                                "end",
-                                            )
-                                            # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)]["acc"] = self._initial_q_seller(p_so,q_so,needs,nmi, (p_s,np.ceil(q_s),p_so,q_so,needs), "acc")#p_so*q_so-self.awi.current_exogenous_input_price
-                                            q_t[(i_p_s, i_q_s, i_ps_so, i_q_so, i_n)][
-                                                "acc"
-                                            ] = self._initial_q_seller(
-                                                p_so,
-                                                q_so,
-                                                needs,
-                                                nmi,
-                                                (p_s, np.ceil(q_s), p_so, q_so, needs),
-                                                "acc",
-                                            )  # p_so*q_so-self.awi.current_exogenous_input_price
-                                        else:
-                                            # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)]["end"] = self._initial_q_buyer(p_so,q_so,needs,nmi, (p_s,np.ceil(q_s),p_so,q_so,needs), "end")
-                                            q_t[(i_p_s, i_q_s, i_ps_so, i_q_so, i_n)][
-                                                "end"
-                                            ] = self._initial_q_buyer(
-                                                p_so,
-                                                q_so,
-                                                needs,
-                                                nmi,
-                                                (p_s, np.ceil(q_s), p_so, q_so, needs),
-                                                "end",
-                                            )
-                                            # q_t[(p_s,np.ceil(q_s),p_so,q_so,needs)]["acc"] = self._initial_q_buyer(p_so,q_so,needs,nmi, (p_s,np.ceil(q_s),p_so,q_so,needs), "acc") #self.awi.current_exogenous_input_price-(p_so-p_s)*(q_so-q_s)
-                                            q_t[(i_p_s, i_q_s, i_ps_so, i_q_so, i_n)][
-                                                "acc"
-                                            ] = self._initial_q_buyer(
-                                                p_so,
-                                                q_so,
-                                                needs,
-                                                nmi,
-                                                (p_s, np.ceil(q_s), p_so, q_so, needs),
-                                                "acc",
-                                            )  # self.awi.current_exogenous_input_price-(p_so-p_s)*(q_so-q_s)
-                            # for needs in range(-1,self.awi.n_lines+1,self.needs_res):
-                            for i_n, needs in enumerate(self.ne_range):
-                                if is_seller:
-                                    # q_t[(p_so,q_so,needs)]["end"] = self._initial_q_seller(p_so,q_so,needs,nmi, (p_so,q_so,needs), "end")
-                                    q_t[(i_ps_so, i_q_so, i_n)][
-                                        "end"
-                                    ] = self._initial_q_seller(
-                                        p_so,
-                                        q_so,
-                                        needs,
-                                        nmi,
-                                        (p_so, q_so, needs),
-                                        "end",
-                                    )
-                                    # q_t[(p_so,q_so,needs)]["acc"] = self._initial_q_seller(p_so,q_so,needs,nmi, (p_so,q_so,needs), "acc")
-                                    q_t[(i_ps_so, i_q_so, i_n)][
-                                        "acc"
-                                    ] = self._initial_q_seller(
-                                        p_so,
-                                        q_so,
-                                        needs,
-                                        nmi,
-                                        (p_so, q_so, needs),
-                                        "acc",
-                                    )
-                                else:
-                                    # q_t[(p_so,q_so,needs)]["end"] = self._initial_q_buyer(p_so,q_so,needs,nmi, (p_so,q_so,needs), "end")
-                                    q_t[(i_ps_so, i_q_so, i_n)][
-                                        "end"
-                                    ] = self._initial_q_buyer(
-                                        p_so,
-                                        q_so,
-                                        needs,
-                                        nmi,
-                                        (p_so, q_so, needs),
-                                        "end",
-                                    )
-                                    # q_t[(p_so,q_so,needs)]["acc"] = self._initial_q_buyer(p_so,q_so,needs,nmi, (p_so,q_so,needs), "acc")
-                                    q_t[(i_ps_so, i_q_so, i_n)][
-                                        "acc"
-                                    ] = self._initial_q_buyer(
-                                        p_so,
-                                        q_so,
-                                        needs,
-                                        nmi,
-                                        (p_so, q_so, needs),
-                                        "acc",
-                                    )
         # initializing the action vector
-        # action_vec = dict()
         for i_p_s, p_s in enumerate(my_p_range):
             for i_q_s, q_s in enumerate(my_q_range):
-                # action_vec.append((p,np.ceil(q)))
                 action_vec[(i_p_s, i_q_s)] = (p_s, q_s)  # (p,np.ceil(q))
-
-        # action_vec.append("end")
-        # action_vec.append("acc")
         action_vec["end"] = "end"
         action_vec["acc"] = "acc"
 
-        # print(q_t)
+        learned = None
+        if self.load_q and self.load_q_type == "exact":
+            learned = self.learned_q_seller_t if is_seller else self.learned_q_buyer_t
+        key = (
+            is_seller,
+            self.is_seller,
+            unit_price_issue.min_value,
+            unit_price_issue.max_value,
+            quantity_issue.min_value,
+            quantity_issue.max_value,
+            id(learned),
+        )
+        if key not in self._initial_q_tables:
+            q_t = self._initial_q_table(
+                p_range, my_p_range, unit_price_issue, is_seller
+            )
+            if learned is not None and self.complex_state:
+                q_range = np.linspace(
+                    quantity_issue.min_value,
+                    quantity_issue.max_value,
+                    self.quantity_res,
+                )
+                self._learned_q_values(
+                    q_t, learned, p_range, my_p_range, my_q_range, q_range
+                )
+            q_t.setflags(write=False)
+            self._initial_q_tables[key] = q_t
+        return self._initial_q_tables[key]
 
-        # for k in q_t.keys():
-        #     for a in q_t[k]:
-        #         print(q_t[k][a], a)
-        # exit()
+    """
+    Copy the values of a learned Q table to an initial one
+    The learned table is looked up with the values of prices, quantities and needs of each state (not with their
+    indexes), exactly as the agent always did.
+    :param: q_t - the initial Q table (modified in place)
+    :param: learned - the learned nested {state: {action: value}} Q table
+    :param: p_range - the opponent's offer prices
+    :param: my_p_range - my offer prices
+    :param: my_q_range - my offer quantities
+    :param: q_range - the opponent's offer quantities
+    """
 
-        # return [q_t, action_vec]
-        # print("init ", len(q_t.keys()))
+    def _learned_q_values(self, q_t, learned, p_range, my_p_range, my_q_range, q_range):
+        layout = self.q_layout
+        offers = layout.actions[:-2]
+        for i, s in enumerate(layout.states):
+            if isinstance(s, str):
+                values = learned.get(str(self.ne_range[int(s)]), None)
+                if values is not None and self.smart_init:
+                    q_t[i, :-2] = [values[a] for a in offers]
+                continue
+            if not isinstance(s, tuple):
+                continue
+            if len(s) == 5:
+                i_p_s, i_q_s, i_ps_so, i_q_so, i_n = s
+                state = (
+                    my_p_range[i_p_s],
+                    np.ceil(my_q_range[i_q_s]),
+                    p_range[i_ps_so],
+                    q_range[i_q_so],
+                    self.ne_range[i_n],
+                )
+            else:
+                i_ps_so, i_q_so, i_n = s
+                state = (p_range[i_ps_so], q_range[i_q_so], self.ne_range[i_n])
+            values = learned.get(state, None)
+            if values is None:
+                continue
+            if self.smart_init:
+                q_t[i, :-2] = [values[a] for a in offers]
+            for j, a in ((-2, "end"), (-1, "acc")):
+                if a in values:
+                    q_t[i, j] = values[a]
 
     """
     Map env's statuses to best matching state
@@ -2486,6 +2366,7 @@ class QlAgent(OneShotAgent):
     :param: nmi - the nmi object of the framework
     :return: the penalty per unit
     """
+
     # storage : buying to much == disposal, delivery : selling too much == shortfall
     def _too_much_penalty(self, nmi):
         if self._is_selling(nmi):
@@ -2514,104 +2395,43 @@ class QlAgent(OneShotAgent):
             )  # , self.awi.profile.shortfall_penalty_dev
 
     """
-    Initialize Q values for "seller" (L0)
-    :param: p - action's price
-    :param: q - action's quantity
-    :param: needs - the needs
-    :param: nmi - nmi object
-    :param: state - the state
-    :param: terminal_action - in case not known, this is the action and not (p,q)
-    :return: value to initialize in Q table for the state,action pair
-    """
-
-    def _initial_q_seller(
-        self, p, q, needs, nmi, state, terminal_action=None, a_i=None
-    ):
-        if self.load_q:
-            if self.load_q_type == "exact":
-                if state in self.learned_q_seller_t:
-                    if terminal_action == "acc":
-                        if "acc" in self.learned_q_seller_t[state]:
-                            return self.learned_q_seller_t[state]["acc"]
-                    elif terminal_action == "end":
-                        if "end" in self.learned_q_seller_t[state]:
-                            return self.learned_q_seller_t[state]["end"]
-                    elif isinstance(a_i, tuple):
-                        return self.learned_q_seller_t[state][a_i]
-                    else:
-                        if (p, q) in self.learned_q_seller_t[state]:
-                            return self.learned_q_seller_t[state][(p, q)]
-        unit_price_issue = nmi.issues[OFFER_FIELD_IDX.UNIT_PRICE]
-        mxp = unit_price_issue.max_value
-        mnp = unit_price_issue.min_value
-        # if q <= needs:
-        # return np.random.random()-0.5
-        if needs < 0:
-            if terminal_action == "end":
-                return unit_price_issue.max_value  # 1
-            else:
-                return -unit_price_issue.max_value  # -1#*(q/needs)#p*q
-        else:
-            if terminal_action == "end":
-                return -0.01 * unit_price_issue.max_value  # *(1-0.001*abs(needs-q))
-            elif terminal_action == "acc":
-                return (
-                    1.001 * p
-                )  # *(1+0.001*abs(needs-q))#1.01*(p/mxp)#1.001*1.001*(p-mnp)/(mxp-mnp) # + 0.01#1.01*p/unit_price_issue.max_value
-            else:
-                return p  # *(1+0.001*abs(needs-q))
-
-    """
-    Initialize Q values for "buyer" (L1)
-    :param: p - action's price
-    :param: q - action's quantity
-    :param: needs - the needs
-    :param: nmi - nmi object
-    :param: state - the state
-    :param: terminal_action - in case not known, this is the action and not (p,q)
-    :return: value to initialize in Q table for the state,action pair
+    Initialize the Q table (without learned values)
+    With smart init, offering (p, q) is valued p for "seller" (L0) and max price - p for "buyer" (L1), accepting
+    the opponent's offer slightly more than offering its price, and ending slightly negatively. When we already
+    have more than we need, offering and accepting are valued -max price and ending max price.
+    :param: p_range - the opponent's offer prices
+    :param: my_p_range - my offer prices
+    :param: unit_price_issue - the unit price issue
+    :param: is_seller - True if I'm "seller" (L0)
+    :return: the Q table
     """
 
-    def _initial_q_buyer(self, p, q, needs, nmi, state, terminal_action=None, a_i=None):
-        if self.load_q:
-            if self.load_q_type == "exact":
-                if state in self.learned_q_buyer_t:
-                    if terminal_action == "acc":
-                        if "acc" in self.learned_q_buyer_t[state]:
-                            return self.learned_q_buyer_t[state]["acc"]
-                    elif terminal_action == "end":
-                        if "end" in self.learned_q_buyer_t[state]:
-                            return self.learned_q_buyer_t[state]["end"]
-                    elif isinstance(a_i, tuple):
-                        return self.learned_q_buyer_t[state][a_i]
-                    else:
-                        if (p, q) in self.learned_q_buyer_t[state]:
-                            return self.learned_q_buyer_t[state][(p, q)]
-
-        unit_price_issue = nmi.issues[OFFER_FIELD_IDX.UNIT_PRICE]
+    def _initial_q_table(self, p_range, my_p_range, unit_price_issue, is_seller):
+        layout = self.q_layout
         mxp = unit_price_issue.max_value
-        mnp = unit_price_issue.min_value
-        # return np.random.random()-0.5
-        # if q <= needs:
+        q_t = np.zeros(layout.shape)
+        q_t[~layout.valid] = -np.inf
+        if not self.complex_state:
+            return q_t
+
+        # values of offering
+        rows = layout.needs_index >= 0
+        excess = self.ne_range[layout.needs_index[rows]] < 0
+        if self.smart_init:
+            price = np.repeat(my_p_range, self.quantity_res)
+            q_t[rows, :-2] = np.where(
+                excess[:, None], -mxp, price if is_seller else mxp - price
+            )
 
-        if needs < 0:
-            if terminal_action == "end":
-                return unit_price_issue.max_value
-            else:
-                return (
-                    -unit_price_issue.max_value
-                )  # *(needs/q)#q*(unit_price_issue.max_value-p)
-        else:
-            if terminal_action == "end":
-                return -0.01 * unit_price_issue.max_value  # *(1+0.001*abs(needs-q))
-            elif terminal_action == "acc":
-                # return 1.01*(unit_price_issue.max_value-p)/unit_price_issue.max_value
-                return 1.001 * (
-                    mxp - p
-                )  # *(1+0.001*abs(needs-q))#1.01*(mxp-p)/mxp#1.001*1.001*(mxp-p-mnp)/(mxp-mnp) #+ 0.01
-            else:
-                # return (unit_price_issue.max_value-p)/unit_price_issue.max_value#q*(unit_price_issue.max_value-p)#-p#q*(unit_price_issue.max_value-p)-(needs-q)*self._too_much_penalty(nmi)
-                return mxp - p  # *(1+0.001*abs(needs-q))
+        # values of ending and accepting
+        rows = layout.terminal_rows
+        excess = self.ne_range[layout.needs_index[rows]] < 0
+        p_so = p_range[layout.opp_price_index[rows]]
+        q_t[rows, -2] = np.where(excess, mxp, -0.01 * mxp)
+        q_t[rows, -1] = np.where(
+            excess, -mxp, 1.001 * p_so if is_seller else 1.001 * (mxp - p_so)
+        )
+        return q_t
 
     """
     STATUS : currently unused. here for future usage if needed. Currently "state_mapper" used instead
@@ -1,3 +1,4 @@
+from fractions import Fraction
 from statistics import mean
 from typing import List
 
@@ -21,15 +22,119 @@ def shorten_name(name: str):
     return name.split("-")[0]
 
 
+class AgreementIndex(list):
+    """
+    交渉成功した契約のリスト．
+    追加された契約を相手ごと（売る時はpartners[0]，買う時はpartners[1]）に索引し，合意価格の件数・最小・最大・合計と
+    最後に提案した者（current_proposer）ごとの件数，合意した日の集合を逐次更新するので，以下の関数は契約全体を走査せずに済む．
+    """
+
+    def __init__(self, contracts=()):
+        super().__init__()
+        # is_selling -> 相手の名前 -> その相手との契約のリスト
+        self._agreements = {True: {}, False: {}}
+        # is_selling -> 相手の名前 -> [件数, 最小価格, 最大価格, 価格の合計（厳密値）, 価格がすべて整数か]
+        self._prices = {True: {}, False: {}}
+        # is_selling -> 相手の名前 -> 最後に提案した者 -> 件数
+        self._proposers = {True: {}, False: {}}
+        # 合意した日（agreement["time"]）の集合
+        self.steps = set()
+        self.extend(contracts)
+
+    def __reduce__(self):
+        return self.__class__, (list(self),)
+
+    def append(self, contract):
+        super().append(contract)
+        price = contract.agreement["unit_price"]
+        proposer = contract.mechanism_state["current_proposer"]
+        self.steps.add(contract.agreement["time"])
+        for is_selling, name in (
+            (True, contract.partners[0]),
+            (False, contract.partners[1]),
+        ):
+            self._agreements[is_selling].setdefault(name, []).append(contract)
+            proposers = self._proposers[is_selling].setdefault(name, {})
+            proposers[proposer] = proposers.get(proposer, 0) + 1
+            stats = self._prices[is_selling].get(name, None)
+            if stats is None:
+                self._prices[is_selling][name] = [
+                    1,
+                    price,
+                    price,
+                    Fraction(price),
+                    isinstance(price, int),
+                ]
+                continue
+            stats[0] += 1
+            # min/maxと同じく，等しい場合は先に合意した価格を残す
+            if price < stats[1]:
+                stats[1] = price
+            if price > stats[2]:
+                stats[2] = price
+            stats[3] += Fraction(price)
+            stats[4] = stats[4] and isinstance(price, int)
+
+    def extend(self, contracts):
+        for contract in contracts:
+            self.append(contract)
+
+    def __iadd__(self, contracts):
+        self.extend(contracts)
+        return self
+
+    def _unsupported(self, *args, **kwargs):
+        raise TypeError("AgreementIndex only supports adding contracts")
+
+    insert = remove = pop = clear = sort = reverse = _unsupported
+    __setitem__ = __delitem__ = __imul__ = _unsupported
+
+    def agreements(self, name: str, is_selling: bool) -> list:
+        """指定された相手との契約のリスト（合意した順）"""
+        return self._agreements[is_selling].get(name, [])
+
+    def n_agreements(self, name: str, is_selling: bool) -> int:
+        """指定された相手との合意の数"""
+        stats = self._prices[is_selling].get(name, None)
+        return stats[0] if stats else 0
+
+    def n_proposed_by(self, name: str, is_selling: bool, proposer: str) -> int:
+        """指定された相手との合意のうち，最後にproposerが提案したもの（proposerが相手の提案を受け入れたもの）の数"""
+        return self._proposers[is_selling].get(name, {}).get(proposer, 0)
+
+    def min_price(self, name: str, is_selling: bool, default=None):
+        """指定された相手との合意価格の最小値．合意がない場合はdefaultを返す"""
+        stats = self._prices[is_selling].get(name, None)
+        return stats[1] if stats else default
+
+    def max_price(self, name: str, is_selling: bool, default=None):
+        """指定された相手との合意価格の最大値．合意がない場合はdefaultを返す"""
+        stats = self._prices[is_selling].get(name, None)
+        return stats[2] if stats else default
+
+    def mean_price(self, name: str, is_selling: bool, default=None):
+        """指定された相手との合意価格の平均（statistics.meanと同じ値）．合意がない場合はdefaultを返す"""
+        stats = self._prices[is_selling].get(name, None)
+        if not stats:
+            return default
+        value = stats[3] / stats[0]
+        return int(value) if stats[4] and value.denominator == 1 else float(value)
+
+
 def opponent_agreements(nmi: SAONMI, is_selling: bool, success_contracts: list) -> list:
     """指定された相手との合意（contract）を返す"""
     if is_selling:
         opponent_name = nmi.annotation["buyer"]
+    else:
+        opponent_name = nmi.annotation["seller"]
+    if isinstance(success_contracts, AgreementIndex):
+        # 索引のリストをそのまま返す（変更しないこと）
+        return success_contracts.agreements(opponent_name, is_selling)
+    if is_selling:
         success_agreements = [
             _ for _ in success_contracts if _.partners[0] == opponent_name
         ]
     else:
-        opponent_name = nmi.annotation["seller"]
         success_agreements = [
             _ for _ in success_contracts if _.partners[1] == opponent_name
         ]
@@ -48,6 +153,15 @@ def worst_opp_acc_price(
     :param success_contracts:
     :return worst_opp_acc_price:
     """
+    if isinstance(success_contracts, AgreementIndex):
+        if is_selling:
+            price = success_contracts.min_price(
+                nmi.annotation["buyer"], is_selling, float("inf")
+            )
+            return min(price, float("inf"))
+        price = success_contracts.max_price(nmi.annotation["seller"], is_selling, 0)
+        return max(price, 0)
+
     success_agreements = opponent_agreements(nmi, is_selling, success_contracts)
 
     if is_selling:
@@ -71,6 +185,11 @@ def TF_sign(x: bool):
 def opponent_rank(opponent_names: List[str], is_selling: bool, success_contract: list):
     """相手を合意価格によって順位付け"""
     rank = {}
+    if isinstance(success_contract, AgreementIndex):
+        default = 0 if is_selling else float("inf")
+        for name in opponent_names:
+            rank[name] = success_contract.mean_price(name, is_selling, default)
+        return rank
     if is_selling:
         for name in opponent_names:
             agreements = [
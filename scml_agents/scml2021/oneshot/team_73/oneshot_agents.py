@@ -221,7 +221,7 @@ class Gentle(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -352,16 +352,10 @@ class Gentle(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -375,7 +369,7 @@ class Gentle(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -399,7 +393,7 @@ class Gentle(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -589,13 +583,10 @@ class Gentle(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -252,7 +252,7 @@ class AgentT064(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -383,16 +383,10 @@ class AgentT064(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -405,7 +399,7 @@ class AgentT064(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -429,7 +423,7 @@ class AgentT064(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -622,13 +616,10 @@ class AgentT064(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -925,7 +916,7 @@ class AgentT063(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -1064,16 +1055,10 @@ class AgentT063(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -1086,7 +1071,7 @@ class AgentT063(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -1110,7 +1095,7 @@ class AgentT063(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -1314,13 +1299,10 @@ class AgentT063(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -1617,7 +1599,7 @@ class AgentT062(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -1756,16 +1738,10 @@ class AgentT062(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -1777,7 +1753,7 @@ class AgentT062(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -1801,7 +1777,7 @@ class AgentT062(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -2005,13 +1981,10 @@ class AgentT062(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -2308,7 +2281,7 @@ class AgentT061(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -2447,16 +2420,10 @@ class AgentT061(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -2468,7 +2435,7 @@ class AgentT061(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -2492,7 +2459,7 @@ class AgentT061(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -2696,13 +2663,10 @@ class AgentT061(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -2999,7 +2963,7 @@ class AgentT060(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -3138,16 +3102,10 @@ class AgentT060(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -3159,7 +3117,7 @@ class AgentT060(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -3183,7 +3141,7 @@ class AgentT060(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if accept_agreements:
+                    if n_accept_agreements:
                         pattern.append("accept_agreements")
                         if price_comparison(
                             is_selling,
@@ -3387,13 +3345,10 @@ class AgentT060(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -3690,7 +3645,7 @@ class AgentT056(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -3829,16 +3784,11 @@ class AgentT056(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -3850,7 +3800,7 @@ class AgentT056(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -3874,7 +3824,7 @@ class AgentT056(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -4070,13 +4020,10 @@ class AgentT056(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -4376,7 +4323,7 @@ class AgentT055(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -4515,16 +4462,11 @@ class AgentT055(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -4536,7 +4478,7 @@ class AgentT055(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -4560,7 +4502,7 @@ class AgentT055(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -4756,13 +4698,10 @@ class AgentT055(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -5062,7 +5001,7 @@ class AgentT054(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -5201,16 +5140,11 @@ class AgentT054(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -5222,7 +5156,7 @@ class AgentT054(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -5246,7 +5180,7 @@ class AgentT054(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -5442,13 +5376,10 @@ class AgentT054(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -5748,7 +5679,7 @@ class AgentT053(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -5887,16 +5818,11 @@ class AgentT053(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -5908,7 +5834,7 @@ class AgentT053(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -5932,7 +5858,7 @@ class AgentT053(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -6128,13 +6054,10 @@ class AgentT053(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -6434,7 +6357,7 @@ class AgentT052(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -6573,16 +6496,11 @@ class AgentT052(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -6594,7 +6512,7 @@ class AgentT052(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -6618,7 +6536,7 @@ class AgentT052(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -6814,13 +6732,10 @@ class AgentT052(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -7120,7 +7035,7 @@ class AgentT051(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -7259,16 +7174,11 @@ class AgentT051(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -7280,7 +7190,7 @@ class AgentT051(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -7304,7 +7214,7 @@ class AgentT051(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -7500,13 +7410,10 @@ class AgentT051(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -7806,7 +7713,7 @@ class AgentT050(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -7945,16 +7852,11 @@ class AgentT050(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -7966,7 +7868,7 @@ class AgentT050(AdaptiveAgent, ABC):
             if self._environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -7988,7 +7890,7 @@ class AgentT050(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -8182,13 +8084,10 @@ class AgentT050(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -8477,7 +8376,7 @@ class AgentT049(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -8623,16 +8522,11 @@ class AgentT049(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数と，こちらの提案が受け入れられた数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
+        n_offer_agreements = len(success_agreements) - n_accept_agreements
         step = state.step
         rank = opponent_rank(
             list(self.active_negotiators.keys()), is_selling, self.success_contracts
@@ -8643,7 +8537,7 @@ class AgentT049(AdaptiveAgent, ABC):
             if self.environment_factor(nmi) >= 0.5:
                 pattern.append("good_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -8665,7 +8559,7 @@ class AgentT049(AdaptiveAgent, ABC):
             else:
                 pattern.append("bad_env")
                 if success_agreements:
-                    if offer_agreements:
+                    if n_offer_agreements:
                         pattern.append("offer_agreements")
                     else:
                         pattern.append("accept_agreements")
@@ -8829,13 +8723,10 @@ class AgentT049(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -9099,7 +8990,7 @@ class AgentT048(AdaptiveAgent, ABC):
 
         # 取引情報
         self.success_list = defaultdict(lambda: list())  # 交渉成功した際の取引データ
-        self.success_contracts = []  # 交渉成功した契約のリスト
+        self.success_contracts = AgreementIndex()  # 交渉成功した契約のリスト
         self.failure_opp_list = []  # 各日の交渉失敗した相手のリスト
         self.opp_offer_list = defaultdict(lambda: list())  # 相手のOfferのリスト
         self.my_offer_list = defaultdict(lambda: list())  # 自分のOfferのリスト
@@ -9244,16 +9135,10 @@ class AgentT048(AdaptiveAgent, ABC):
         success_agreements = opponent_agreements(
             nmi, is_selling, self.success_contracts
         )
-        accept_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] == self.nego_info["my_name"]
-        ]
-        offer_agreements = [
-            _
-            for _ in success_agreements
-            if _.mechanism_state["current_proposer"] != self.nego_info["my_name"]
-        ]
+        # 相手の提案を受け入れて合意した数
+        n_accept_agreements = self.success_contracts.n_proposed_by(
+            name, is_selling, self.nego_info["my_name"]
+        )
         step = state.step
         if self.nego_info["negotiation_step"] >= nmi.n_steps - 1:
             if self.environment_factor(nmi) >= 0.5:
@@ -9435,13 +9320,10 @@ class AgentT048(AdaptiveAgent, ABC):
         w_prev, w_good = param_normalization([w_prev, w_good])
 
         # これまでの交渉成功割合
-        success_agreements = [
-            [_.agreement, _.mechanism_state["current_proposer"]]
-            for _ in self.success_contracts
-        ]
-        if success_agreements:
-            simulation_steps = {lis[0]["time"] for lis in success_agreements}
-            prev_agreement = len(simulation_steps) / (self.awi.current_step + 1)
+        if self.success_contracts:
+            prev_agreement = len(self.success_contracts.steps) / (
+                self.awi.current_step + 1
+            )
         else:
             prev_agreement = 1
 
@@ -11,7 +11,6 @@ the authors and the ANAC 2021 SCML.
 
 import itertools
 import os
-import pickle
 
 # required for running the test tournament
 import time
@@ -20,7 +19,6 @@ import time
 from typing import Any, Dict, List, Optional
 
 import numpy as np
-import pandas as pd
 from negmas import (
     AgentMechanismInterface,
     Breach,
@@ -56,16 +54,74 @@ from scml.utils import anac2020_collusion, anac2020_std, anac2021_oneshot
 from scml.scml2020.world import Failure
 from tabulate import tabulate
 
+from scml_agents.models import load_model
+
 __all__ = [
     "PDPSyncAgent",
 ]
 
+def predict(model: Any, x: np.ndarray) -> np.ndarray:
+    """Predicts for the given rows of features directly for linear regression models"""
+    if type(model).__name__ == "LinearRegression":
+        return x @ model.coef_.T + model.intercept_
+    return model.predict(x)
+
+
+class KnapsackTable:
+    """
+    The dynamic programming table of the largest total quantity of offers fitting the needs of the agent, reusing the
+    same buffers across negotiation rounds.
+    """
+
+    def __init__(self):
+        self._values = np.empty((0, 0), dtype=np.int64)
+        self._visited = np.empty((0, 0), dtype=bool)
+
+    def fill(self, quantities: List[int], capacity: int) -> np.ndarray:
+        """
+        Returns the memoization table of the recursive knapsack over the given quantities.
+
+        Entry [i][w] is the largest total quantity not exceeding w of the first i quantities for every state the
+        recursion starting at [n][capacity] visits and -1 otherwise (the recursion never stored the states with no
+        quantities or no capacity either).
+        """
+        n, width = len(quantities), max(capacity + 1, 0)
+        if self._values.shape[0] <= n or self._values.shape[1] < width:
+            shape = (
+                max(n + 1, self._values.shape[0]),
+                max(width, self._values.shape[1]),
+            )
+            self._values = np.empty(shape, dtype=np.int64)
+            self._visited = np.empty(shape, dtype=bool)
+        values, visited = self._values[: n + 1, :width], self._visited[: n + 1, :width]
+        if width == 0:
+            return values
+        values[0] = 0
+        for i, q in enumerate(quantities, 1):
+            values[i] = values[i - 1]
+            if q <= capacity:
+                np.add(values[i - 1, : width - q], q, out=values[i, q:])
+                np.maximum(values[i, q:], values[i - 1, q:], out=values[i, q:])
+        visited[:] = False
+        visited[n, capacity] = True
+        for i in range(n, 0, -1):
+            q = quantities[i - 1]
+            visited[i - 1] |= visited[i]
+            if q <= capacity:
+                visited[i - 1, : width - q] |= visited[i, q:]
+        visited[0] = False
+        visited[:, 0] = False
+        np.logical_not(visited, out=visited)
+        np.copyto(values, -1, where=visited)
+        return values
+
 
 class PDPSyncAgent(GreedySyncAgent):
     """Predictive Dynmical programming agent basd on GreedySyncAgent"""
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._input_table, self._output_table = KnapsackTable(), KnapsackTable()
 
     def counter_all(self, offers, states):
         """Respond to a set of offers given the negotiation state of each."""
@@ -90,41 +146,6 @@ class PDPSyncAgent(GreedySyncAgent):
 
         n_input = len(input_offers)
         n_output = len(output_offers)
-        t_input = [[-1 for i in range(my_input_needs + 1)] for j in range(n_input + 1)]
-        t_output = [
-            [-1 for i in range(my_output_needs + 1)] for j in range(n_output + 1)
-        ]
-
-        def knapsack_agent(t, offers, my_needs, n, isSelling):
-            """Knapscak algotrithm func. with memoization"""
-
-            sorted_offers = sorted(
-                offers.values(),
-                key=lambda x: -x[UNIT_PRICE] if isSelling else x[UNIT_PRICE],
-            )
-            # base conditions
-            if n == 0 or my_needs == 0:
-                return 0
-            if t[n][my_needs] != -1:
-                return t[n][my_needs]
-
-            # choice diagram code
-            if sorted_offers[n - 1][QUANTITY] <= my_needs:
-                t[n][my_needs] = max(
-                    sorted_offers[n - 1][QUANTITY]
-                    + knapsack_agent(
-                        t,
-                        offers,
-                        my_needs - sorted_offers[n - 1][QUANTITY],
-                        n - 1,
-                        isSelling,
-                    ),
-                    knapsack_agent(t, offers, my_needs, n - 1, isSelling),
-                )
-                return t[n][my_needs]
-            elif sorted_offers[n - 1][QUANTITY] > my_needs:
-                t[n][my_needs] = knapsack_agent(t, offers, my_needs, n - 1, isSelling)
-                return t[n][my_needs]
 
         def calc_items_idxs(t, sorted_offers, my_needs, n):
             """Recoveres offers indexes from memmoization matrix"""
@@ -162,35 +183,26 @@ class PDPSyncAgent(GreedySyncAgent):
             return items_idxs
 
         def change_threshold(is_selling):
-            if is_selling:
-                loaded_model = pickle.load(
-                    open(os.path.dirname(__file__) + "/output_model.sav", "rb")
-                )
-            else:
-                loaded_model = pickle.load(
-                    open(os.path.dirname(__file__) + "/input_model.sav", "rb")
+            loaded_model = load_model(
+                os.path.join(
+                    os.path.dirname(__file__),
+                    "output_model.sav" if is_selling else "input_model.sav",
                 )
+            )
 
-            try:
-                data = [
-                    {
-                        "day": self.awi.current_step,
-                        "price": self.awi.current_exogenous_output_price,
-                        "prev_price": self.awi.prev_exogenous_output_price,
-                    }
-                ]
-            except:
+            if not hasattr(self.awi, "prev_exogenous_output_price"):
                 self.awi.prev_exogenous_output_price = 0
-                data = [
-                    {
-                        "day": self.awi.current_step,
-                        "price": self.awi.current_exogenous_output_price,
-                        "prev_price": self.awi.prev_exogenous_output_price,
-                    }
-                ]
-
-            X_test = pd.DataFrame(data)
-            result = loaded_model.predict(X_test)
+            x = np.array(
+                [
+                    [
+                        self.awi.current_step,
+                        self.awi.current_exogenous_output_price,
+                        self.awi.prev_exogenous_output_price,
+                    ]
+                ],
+                dtype=float,
+            )
+            result = predict(loaded_model, x)
 
             result = np.around(result)
             result = result.astype(int)
@@ -229,11 +241,20 @@ class PDPSyncAgent(GreedySyncAgent):
 
         input_sorted_offers = sorted(offers.values(), key=lambda x: x[UNIT_PRICE])
         output_sorted_offers = sorted(offers.values(), key=lambda x: -x[UNIT_PRICE])
-        check_input = knapsack_agent(
-            t_input, input_offers, my_input_needs, n_input, False
+        # the knapsack only considers the offers in each direction
+        t_input = self._input_table.fill(
+            [
+                _[QUANTITY]
+                for _ in sorted(input_offers.values(), key=lambda x: x[UNIT_PRICE])
+            ],
+            my_input_needs,
         )
-        check_output = knapsack_agent(
-            t_output, output_offers, my_output_needs, n_output, True
+        t_output = self._output_table.fill(
+            [
+                _[QUANTITY]
+                for _ in sorted(output_offers.values(), key=lambda x: -x[UNIT_PRICE])
+            ],
+            my_output_needs,
         )
         input_idxs = calc_items_idxs(
             t_input, input_sorted_offers, my_input_needs, n_input
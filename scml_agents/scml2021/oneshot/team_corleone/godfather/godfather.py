@@ -449,10 +449,19 @@ class GodfatherAgent(OneShotSyncAgent):
             util_table[outcome] = 0
 
         ufun_calc = UFunCalc(self.ufun, self._is_selling())
+        other_distrs = {i: distr for i, distr in outcome_distrs.items() if i != j}
+        if not self.enable_safety_checks and all(
+            distr.draws_per_sample is not None for distr in other_distrs.values()
+        ):
+            return BilatUFunMarginalTable(
+                offer_space,
+                self._est_util_table(ufun_calc, other_distrs, list(all_outcomes)),
+            )
+
         for k in range(self._num_sample_outcomes):
             # draw outcomes
             outcomes_other_negs = {
-                i: distr.sample() for i, distr in outcome_distrs.items() if i != j
+                i: distr.sample() for i, distr in other_distrs.items()
             }
             self.update_util_table(
                 ufun_calc, util_table, outcomes_other_negs, all_outcomes
@@ -463,6 +472,42 @@ class GodfatherAgent(OneShotSyncAgent):
 
         return BilatUFunMarginalTable(offer_space, util_table)
 
+    def _est_util_table(
+        self,
+        ufun_calc: UFunCalc,
+        other_distrs: Dict[str, OutcomeDistr],
+        possible_outcomes_j: List[Outcome],
+    ) -> Dict[Outcome, float]:
+        """Vectorized equivalent of sampling other_distrs and calling update_util_table _num_sample_outcomes
+        times: consumes the same random draws in the same order and gives the same table"""
+        n_samples = self._num_sample_outcomes
+        draws = [distr.draws_per_sample for distr in other_distrs.values()]
+        x = np.random.random((n_samples, sum(draws)))
+
+        # (sample, negotiation) prices and quantities; non-offer outcomes sign nothing
+        prices = np.zeros((n_samples, len(other_distrs)))
+        quantities = np.zeros((n_samples, len(other_distrs)))
+        start = 0
+        for col, (distr, n_draws) in enumerate(zip(other_distrs.values(), draws)):
+            samples = distr.sample_from_uniform(x[:, start] if n_draws else x[:, :0])
+            start += n_draws
+            for k, o in enumerate(samples):
+                if isinstance(o, Offer):
+                    prices[k, col], quantities[k, col] = o.price, o.quantity
+
+        if self.ufun.current_balance < 0:
+            warnings.warn(
+                "We are going bankrupt; util calculation not guaranteed to be accurate"
+            )
+
+        utils = ufun_calc.ufun_table(
+            prices,
+            quantities,
+            np.array([o.price for o in possible_outcomes_j]),
+            np.array([o.quantity for o in possible_outcomes_j]),
+        )
+        return dict(zip(possible_outcomes_j, (utils.sum(axis=0) / n_samples).tolist()))
+
     def update_util_table(
         self,
         ufun_calc: UFunCalc,
@@ -1,5 +1,5 @@
 import warnings
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -7,7 +7,31 @@ from .offer import Offer
 from .spaces import *
 
 
+def sample_from_uniform(
+    x: np.ndarray,
+    outcomes: Sequence,
+    probs: Sequence[float],
+    fallback: Callable[[], Outcome],
+) -> List:
+    """Inverse transform sampling of every draw in x, matching the sequential `x -= p` scan of sample()"""
+    x = np.asarray(x, dtype=float)
+    probs = np.asarray(probs, dtype=float)
+    scan = np.empty((len(x), len(probs) + 1))
+    scan[:, 0] = x
+    scan[:, 1:] = probs
+    residuals = np.subtract.accumulate(scan, axis=1)[:, :-1]
+    hits = residuals < probs
+    idx = hits.argmax(axis=1)
+    found = hits.any(axis=1)
+    if not found.all():
+        warnings.warn("Probabilities do not sum to 1")
+    return [outcomes[i] if f else fallback() for i, f in zip(idx, found)]
+
+
 class OutcomeDistr:
+    # number of np.random.random() draws made by one call to sample, if known
+    draws_per_sample: Optional[int] = None
+
     def __init__(self, o: OutcomeSpace) -> None:
         self.outcome_space = o
 
@@ -17,6 +41,11 @@ class OutcomeDistr:
     def sample(self) -> Outcome:
         raise NotImplementedError
 
+    def sample_from_uniform(self, x: np.ndarray) -> List[Outcome]:
+        """Samples one outcome per uniform draw in x, as sample() does with np.random.random()
+        (only available when draws_per_sample is known)"""
+        raise NotImplementedError
+
     def marginalize(self) -> Tuple[List[float], float]:
         est_p = 0.0
         q_probs = [0.0] * 11
@@ -81,6 +110,8 @@ class OutcomeDistrFunc(OutcomeDistr):
 
 
 class OutcomeDistrPoint(OutcomeDistr):
+    draws_per_sample = 0
+
     def __init__(self, outcome_space: OutcomeSpace, point: Outcome):
         self.point = point
         super().__init__(outcome_space)
@@ -91,8 +122,13 @@ class OutcomeDistrPoint(OutcomeDistr):
     def sample(self) -> Outcome:
         return self.point
 
+    def sample_from_uniform(self, x: np.ndarray) -> List[Outcome]:
+        return [self.point] * len(x)
+
 
 class OutcomeDistrUniform(OutcomeDistr):
+    draws_per_sample = 1
+
     def __init__(self, outcome_space: OutcomeSpace):
         self.size = len(outcome_space.outcome_set())
         super().__init__(outcome_space)
@@ -110,8 +146,19 @@ class OutcomeDistrUniform(OutcomeDistr):
         warnings.warn("Probabilities do not sum to 1")
         return self.outcome_space.outcome_set().pop()
 
+    def sample_from_uniform(self, x: np.ndarray) -> List[Outcome]:
+        outcomes = list(self.outcome_space.outcome_set())
+        return sample_from_uniform(
+            x,
+            outcomes,
+            [1 / self.size] * len(outcomes),
+            lambda: self.outcome_space.outcome_set().pop(),
+        )
+
 
 class OutcomeDistrTable(OutcomeDistr):
+    draws_per_sample = 1
+
     def __init__(self, outcome_space: OutcomeSpace, distr: Dict[Outcome, float]):
         self.distr = distr
         super().__init__(outcome_space)
@@ -138,10 +185,20 @@ class OutcomeDistrTable(OutcomeDistr):
         warnings.warn("Probabilities do not sum to 1")
         return self.outcome_space.outcome_set().pop()
 
+    def sample_from_uniform(self, x: np.ndarray) -> List[Outcome]:
+        return sample_from_uniform(
+            x,
+            list(self.distr.keys()),
+            list(self.distr.values()),
+            lambda: self.outcome_space.outcome_set().pop(),
+        )
+
 
 class OutcomeDistrRandom(OutcomeDistr):
     """Assigns probabilities randomly to all outcomes in the space"""
 
+    draws_per_sample = 1
+
     def __init__(self, outcome_space: OutcomeSpace):
         self.distr: Dict[Outcome, float] = {}
         all_outcomes = outcome_space.outcome_set()
@@ -163,8 +220,18 @@ class OutcomeDistrRandom(OutcomeDistr):
         warnings.warn("Probabilities do not sum to 1")
         return self.outcome_space.outcome_set().pop()
 
+    def sample_from_uniform(self, x: np.ndarray) -> List[Outcome]:
+        return sample_from_uniform(
+            x,
+            list(self.distr.keys()),
+            list(self.distr.values()),
+            lambda: self.outcome_space.outcome_set().pop(),
+        )
+
 
 class OutcomeDistrMarginal(OutcomeDistr):
+    draws_per_sample = 1
+
     def __init__(self, outcome_space: OutcomeSpace, q_probs: List[float], p_est: float):
         super().__init__(outcome_space)
         if not abs(sum(q_probs) - 1) < 0.001:
@@ -188,3 +255,11 @@ class OutcomeDistrMarginal(OutcomeDistr):
             x -= prob
         warnings.warn("Probabilities do not sum to 1")
         return self.outcome_space.outcome_set().pop()
+
+    def sample_from_uniform(self, x: np.ndarray) -> List[Outcome]:
+        return sample_from_uniform(
+            x,
+            range(len(self.q_probs)),
+            self.q_probs,
+            lambda: self.outcome_space.outcome_set().pop(),
+        )
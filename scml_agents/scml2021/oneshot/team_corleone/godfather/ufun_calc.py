@@ -3,6 +3,7 @@ from collections import namedtuple
 from copy import deepcopy
 from typing import Callable, Collection, List, Optional, Tuple, Union
 
+import numpy as np
 from negmas import Contract
 from negmas.outcomes import Issue, Outcome
 from negmas.preferences import UtilityFunction, Value
@@ -161,6 +162,92 @@ class UFunCalc:
             qin, qout, producible, pin, pout_bar, input_penalty, output_penalty
         )
 
+    def ufun_table(
+        self,
+        persistent_prices: np.ndarray,
+        persistent_quantities: np.ndarray,
+        prices: np.ndarray,
+        quantities: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Batched ufun_from_offer: utilities of every new offer (prices[n], quantities[n]) given every
+        set of persistent offers (row k of persistent_prices/quantities, zero-quantity padded),
+        returned as a (k, n) array equal to set_persistent_offers followed by ufun_from_offer
+        """
+        pp = np.asarray(persistent_prices, dtype=float)[:, None, :]
+        pq = np.asarray(persistent_quantities, dtype=float)[:, None, :]
+        p = np.asarray(prices, dtype=float)[None, :]
+        q = np.asarray(quantities, dtype=float)[None, :]
+        n_lines = self.ufun.n_lines
+
+        if self.is_selling:
+            shape = np.broadcast_shapes(pp.shape[:-1], p.shape)
+            pin = np.full(shape, self.exog_p, dtype=float)
+            qin = np.full(pin.shape, self.exog_q, dtype=float)
+            producible = np.minimum(qin, n_lines)
+
+            # output offers sorted by decreasing price, new offer ahead of ties
+            n_persistent = pp.shape[-1]
+            out_p = np.concatenate(
+                (
+                    np.broadcast_to(p[..., None], shape + (1,)),
+                    np.broadcast_to(pp, shape + (n_persistent,)),
+                ),
+                axis=-1,
+            )
+            out_q = np.concatenate(
+                (
+                    np.broadcast_to(q[..., None], shape + (1,)),
+                    np.broadcast_to(pq, shape + (n_persistent,)),
+                ),
+                axis=-1,
+            )
+            order = np.argsort(-out_p, axis=-1, kind="stable")
+            out_p = np.take_along_axis(out_p, order, axis=-1)
+            out_q = np.take_along_axis(out_q, order, axis=-1)
+
+            # sell greedily to the best prices until producible is exhausted
+            sold_before = np.cumsum(out_q, axis=-1) - out_q
+            can_sell = np.clip(producible[..., None] - sold_before, 0, out_q)
+            pout_bar = (can_sell * out_p).sum(axis=-1)
+            pout = (out_p * out_q).sum(axis=-1)
+            qout = out_q.sum(axis=-1)
+        else:
+            pin = (pp * pq).sum(axis=-1) + p * q
+            qin = pq.sum(axis=-1) + q
+            producible = np.minimum(qin, n_lines)
+
+            exog_unit_price = self.exog[UNIT_PRICE]
+            pout_bar = np.minimum(producible, self.exog_q) * exog_unit_price
+            pout = np.full(pin.shape, exog_unit_price * self.exog_q, dtype=float)
+            qout = np.full(pin.shape, self.exog_q, dtype=float)
+
+        producible = np.minimum(producible, qout)
+        producible = np.minimum(np.minimum(qin, n_lines), producible)
+
+        output_penalty = self.ufun.output_penalty_scale
+        if output_penalty is None:
+            output_penalty = np.divide(
+                pout, qout, out=np.zeros_like(pout), where=qout != 0
+            )
+        output_penalty = output_penalty * (
+            self.ufun.shortfall_penalty * np.maximum(0, qout - producible)
+        )
+        input_penalty = self.ufun.input_penalty_scale
+        if input_penalty is None:
+            input_penalty = np.divide(pin, qin, out=np.zeros_like(pin), where=qin != 0)
+        input_penalty = input_penalty * (
+            self.ufun.disposal_cost * np.maximum(0, qin - producible)
+        )
+
+        return (
+            pout_bar
+            - pin
+            - self.ufun.production_cost * producible
+            - input_penalty
+            - output_penalty
+        )
+
     def from_aggregates(
         self,
         qin: int,
@@ -1,34 +1,25 @@
 # -*- coding: utf-8 -*-
-from .bossagent import *
-from .iyibiteam import *
-from .team_41 import *
-from .team_44 import *
-from .team_45 import *
-from .team_46 import *
-from .team_49 import *
-from .team_53 import *
-from .team_67 import *
-from .team_78 import *
-from .team_82 import *
-from .team_91 import *
-from .team_may import *
-from .team_mediocre import *
-from .wabisabikoalas import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = (
-    bossagent.__all__
-    + iyibiteam.__all__
-    + team_41.__all__
-    + team_44.__all__
-    + team_45.__all__
-    + team_46.__all__
-    + team_49.__all__
-    + team_53.__all__
-    + team_67.__all__
-    + team_78.__all__
-    + team_82.__all__
-    + team_91.__all__
-    + team_may.__all__
-    + team_mediocre.__all__
-    + wabisabikoalas.__all__
-)
+_EXPORTS = {
+    "CharliesAgent": ".bossagent",
+    "IYIBIAgent": ".iyibiteam",
+    "SteadyMgr": ".team_41",
+    "AugurAgent": ".team_41",
+    "SorceryAgent": ".team_41",
+    "Agent68": ".team_44",
+    "StingyAgent": ".team_45",
+    "SolidAgent": ".team_46",
+    "E3BIUagent": ".team_49",
+    "MyPaibiuAgent": ".team_53",
+    "PolymorphicAgent": ".team_67",
+    "YIYAgent": ".team_78",
+    "PerryTheAgent": ".team_82",
+    "BlueWolf": ".team_91",
+    "M4": ".team_may",
+    "Mediocre": ".team_mediocre",
+    "ArtisanKangaroo": ".wabisabikoalas",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
@@ -147,29 +147,9 @@ class BossBusinessAnalytics:
         elif agent_id in self.my_suppliers:
             agent_role = "buyer"
 
-        negotiation_bid_history = self.__parent.nego_stats.negotiation_bid_history
-
-        accepted_p = []
-        accepted_q = []
-        accepted_t = []
-
-        for day in negotiation_bid_history[agent_role].keys():
-            # print(f"================ DAY{day} ================")
-            for agent in negotiation_bid_history[agent_role][day].keys():
-                # print(f"--> AgentID: {agent}")
-                if agent == agent_id:
-                    contracts = list(
-                        negotiation_bid_history[agent_role][day][agent].values()
-                    )
-                    # print(f"----> Current agent is our agent! For day {day}, {agent} has {len(contracts)} contracts.")
-                    for contract in contracts:
-                        # print(f"------>> Contract: Has {len(contract.keys()) - 1} negotiation rounds")
-                        if ("accept" in list(contract["Acceptance"].keys())) and (
-                            contract["Acceptance"]["accept"] == 1
-                        ):
-                            accepted_p.append(contract["Acceptance"]["p"])
-                            accepted_q.append(contract["Acceptance"]["q"])
-                            accepted_t.append(contract["Acceptance"]["t"])
+        accepted_p, accepted_q, accepted_t = (
+            self.__parent.nego_stats.get_accepted_offers(agent_role, agent_id)
+        )
 
         if len(accepted_p) == 0:
             return -1, -1, -1
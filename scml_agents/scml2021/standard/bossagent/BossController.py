@@ -256,9 +256,11 @@ class SyncController(SAOSyncController):
             self.nego_history[negotiator.nmi.id]["Acceptance"] = {}
             self.ended_negotiator_ids.append(negotiator_id)
 
-        mechanism_nego_history = copy.deepcopy(self.nego_history[negotiator.nmi.id])
         self.__parent.nego_stats.set_negotiation_bid_history(
-            self.current_step, partner_id, negotiator.nmi.id, mechanism_nego_history
+            self.current_step,
+            partner_id,
+            negotiator.nmi.id,
+            self.nego_history[negotiator.nmi.id],
         )
 
     # =========================================
@@ -1,6 +1,5 @@
 # required for development
 import pathlib
-import pickle as pkl
 
 # required for running the test tournament
 import time
@@ -35,20 +34,20 @@ from scml.utils import anac2020_collusion, anac2020_std
 from scml.scml2020.world import Failure
 from tabulate import tabulate
 
+from scml_agents.models import load_model
+
 models_dir = pathlib.Path(__file__).parent / "models"
 
 
 class SklearnTradePredictionStrategy(TradePredictionStrategy):
     def trade_prediction_init(self):
         inp = self.awi.my_input_product
-        with open(
-            models_dir / f"sold_quantity_{min(inp, 5)}_predictor_init.pkl", "rb"
-        ) as file:
-            self.input_quantity_model = pkl.load(file)
-        with open(
-            models_dir / f"sold_quantity_{min(inp+1, 5)}_predictor_init.pkl", "rb"
-        ) as file:
-            self.output_quantity_model = pkl.load(file)
+        self.input_quantity_model = load_model(
+            models_dir / f"sold_quantity_{min(inp, 5)}_predictor_init.pkl"
+        )
+        self.output_quantity_model = load_model(
+            models_dir / f"sold_quantity_{min(inp+1, 5)}_predictor_init.pkl"
+        )
 
         frac_time_steps = np.linspace(0, 1, self.awi.n_steps, endpoint=False)
         X = frac_time_steps[:, None]
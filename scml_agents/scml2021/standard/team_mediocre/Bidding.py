@@ -1,8 +1,89 @@
 import random
-from itertools import product
 
 import numpy as np
-import pandas as pd
+
+# offerable bids of the bid spaces already generated (see `offerable_bid_space`)
+MAX_CACHED_BID_SPACES = 1024
+_BID_SPACES = {}
+
+BID_DTYPE = np.dtype([("q", np.float64), ("p", np.float64), ("utility", np.float64)])
+
+
+def bid_sides(q, p, M_alpha, M_zero, M_beta):
+    """
+    The side of the segments of M_alpha, M_zero and M_beta on which bids (q, p) lie (positive on the right).
+    Works for single bids and for arrays of bids.
+    """
+    d1 = (q - M_alpha[0][0]) * (M_alpha[1][1] - M_alpha[0][1]) - (p - M_alpha[0][1]) * (
+        M_alpha[1][0] - M_alpha[0][0]
+    )
+    d2 = (q - M_alpha[1][0]) * (M_alpha[2][1] - M_alpha[1][1]) - (p - M_alpha[1][1]) * (
+        M_alpha[2][0] - M_alpha[1][0]
+    )
+    d3 = (q - M_zero[0][0]) * (M_zero[1][1] - M_zero[0][1]) - (p - M_zero[0][1]) * (
+        M_zero[1][0] - M_zero[0][0]
+    )
+    d4 = (q - M_beta[0][0]) * (M_beta[1][1] - M_beta[0][1]) - (p - M_beta[0][1]) * (
+        M_beta[1][0] - M_beta[0][0]
+    )
+    d5 = (q - M_beta[1][0]) * (M_beta[2][1] - M_beta[1][1]) - (p - M_beta[1][1]) * (
+        M_beta[2][0] - M_beta[1][0]
+    )
+    return d1, d2, d3, d4, d5
+
+
+def sort_by_utility(bids):
+    """
+    Sorts bids by decreasing utility. Ties are ordered exactly as DataFrame.sort_values(ascending=False) (quicksort)
+    orders them.
+    """
+    order = np.arange(len(bids))[::-1][bids["utility"][::-1].argsort(kind="quicksort")]
+    return bids[order[::-1]]
+
+
+def offerable_bid_space(bidding, utility_grid=None, utility_key=None):
+    """
+    Returns the offerable bids of a SellBidding/BuyBidding sorted by decreasing utility (a BID_DTYPE array).
+
+    The bids are the (q, p) grid of its ranges with utilities computed by utility_grid over arrays of quantities and
+    prices (the utility_func of the bidding per bid if not given). If utility_key (identifying the utility function) is
+    given, the bid space is cached and reused by every bidding with the same bounds, alpha, beta and utility_key.
+    """
+    key = None
+    if utility_grid is not None and utility_key is not None:
+        key = (
+            type(bidding).__name__,
+            tuple(bidding.q_bounds),
+            tuple(bidding.p_bounds),
+            tuple(bidding.valid_bounds[0]),
+            tuple(bidding.valid_bounds[2]),
+            bidding.alpha,
+            bidding.beta,
+            utility_key,
+        )
+        bids = _BID_SPACES.get(key, None)
+        if bids is not None:
+            return bids
+    q, p = np.meshgrid(bidding.q_range, bidding.p_range, indexing="ij")
+    q, p = q.ravel(), p.ravel()
+    offerable = (
+        bidding.offerable_zone(q, p)
+        & np.isin(q, bidding.valid_q_range)
+        & np.isin(p, bidding.valid_p_range)
+    )
+    bids = np.zeros(int(offerable.sum()), dtype=BID_DTYPE)
+    bids["q"], bids["p"] = q[offerable], p[offerable]
+    if utility_grid is not None:
+        bids["utility"] = utility_grid(bids["q"], bids["p"])
+    else:
+        bids["utility"] = [bidding.utility_func((_["q"], _["p"])) for _ in bids]
+    bids = sort_by_utility(bids)
+    if key is not None:
+        bids.flags.writeable = False
+        if len(_BID_SPACES) >= MAX_CACHED_BID_SPACES:
+            del _BID_SPACES[next(iter(_BID_SPACES))]
+        _BID_SPACES[key] = bids
+    return bids
 
 
 class SellBidding:
@@ -16,12 +97,16 @@ class SellBidding:
         valid_bounds,
         utility_func,
         use_bid_func=True,
+        utility_grid=None,
+        utility_key=None,
     ):
         self.current_step = current_step
         self.initiator = initiator
         self.output_catalog_price = params["output_catalog_price"]
         self.traded_price = params["traded_price"]
         self.utility_func = utility_func
+        self.utility_grid = utility_grid
+        self.utility_key = utility_key
         self.eagerness = eagerness
         self.neediness = neediness
         self.concess_rates = np.linspace(1, 0.8 - max(0, self.neediness) / 10, 100)
@@ -62,52 +147,22 @@ class SellBidding:
         self.M_beta = [self.r_1, self.r_b, self.r_3]
         self.M_zero = [self.r_1, self.r_3]
 
-        bids = list(product(self.q_range, self.p_range))
-        bid_df = pd.DataFrame(
-            np.array([bids, list(map(self.find_bid_zone, bids))], dtype="object").T,
-            columns=["bid", "zone"],
-        )
-        bid_df["utility"] = bid_df["bid"].apply(self.utility_func)
-        self.bid_dict = {
-            zone: bids.values for zone, bids in bid_df.groupby("zone")["bid"]
-        }
-        arr = np.array(list(bid_df["bid"]))
-        bid_df["q"] = arr[:, 0]
-        bid_df["p"] = arr[:, 1]
-        bid_df.index = pd.MultiIndex.from_tuples(bid_df.bid)
-        self.bid_df = bid_df
-
         self.offerable_zones = ["M_alpha", "M_beta", "M_zero"]
         self.acceptable_zones = self.offerable_zones + ["above_M_alpha"]
 
-        self.offerable_bids = self.bid_df[
-            (self.bid_df["zone"].isin(self.offerable_zones))
-            & (self.bid_df["q"].isin(self.valid_q_range))
-            & (self.bid_df["p"].isin(self.valid_p_range))
-        ]
-        self.offerable_bids.sort_values("utility", ascending=False, inplace=True)
-        self.max_utility = self.offerable_bids["utility"].max()
+        self.offerable_bids = offerable_bid_space(
+            self, self.utility_grid, self.utility_key
+        )
+        self.max_utility = (
+            self.offerable_bids["utility"].max() if len(self.offerable_bids) else np.nan
+        )
 
-        return self.offerable_bids.shape[0] > 0  # to control offer availability
+        return len(self.offerable_bids) > 0  # to control offer availability
 
     def find_bid_zone(self, bid):  # finds the zone where bid places
         q, p = bid
 
-        d1 = (q - self.M_alpha[0][0]) * (self.M_alpha[1][1] - self.M_alpha[0][1]) - (
-            p - self.M_alpha[0][1]
-        ) * (self.M_alpha[1][0] - self.M_alpha[0][0])
-        d2 = (q - self.M_alpha[1][0]) * (self.M_alpha[2][1] - self.M_alpha[1][1]) - (
-            p - self.M_alpha[1][1]
-        ) * (self.M_alpha[2][0] - self.M_alpha[1][0])
-        d3 = (q - self.M_zero[0][0]) * (self.M_zero[1][1] - self.M_zero[0][1]) - (
-            p - self.M_zero[0][1]
-        ) * (self.M_zero[1][0] - self.M_zero[0][0])
-        d4 = (q - self.M_beta[0][0]) * (self.M_beta[1][1] - self.M_beta[0][1]) - (
-            p - self.M_beta[0][1]
-        ) * (self.M_beta[1][0] - self.M_beta[0][0])
-        d5 = (q - self.M_beta[1][0]) * (self.M_beta[2][1] - self.M_beta[1][1]) - (
-            p - self.M_beta[1][1]
-        ) * (self.M_beta[2][0] - self.M_beta[1][0])
+        d1, d2, d3, d4, d5 = bid_sides(q, p, self.M_alpha, self.M_zero, self.M_beta)
 
         if d3 < 0:
             if d1 >= 0 and d2 >= 0:
@@ -122,6 +177,16 @@ class SellBidding:
         else:
             return "M_zero"
 
+    def offerable_zone(self, q, p):
+        """Whether bids (arrays of q and p) are in M_alpha, M_beta or M_zero (see find_bid_zone)"""
+        d1, d2, d3, d4, d5 = bid_sides(q, p, self.M_alpha, self.M_zero, self.M_beta)
+
+        return np.where(
+            d3 < 0,
+            (d1 >= 0) & (d2 >= 0),
+            np.where(d3 > 0, (d4 <= 0) & (d5 <= 0), True),
+        )
+
     def evaluate(self, opponent_bid, nego_relative_time, opponent_behaviour_params):
         q, t, p = opponent_bid
 
@@ -206,23 +271,19 @@ class SellBidding:
             * (1 + max(0, opponent_concession))
         )
 
-        offer_set = self.offerable_bids.loc[
-            (oppo_bid_utility <= self.offerable_bids.utility)
-            & (self.offerable_bids.utility <= oppo_bid_utility + delta)
-            & (restricted_q[0] <= self.offerable_bids.q)
-            & (restricted_q[1] * 1.5 >= self.offerable_bids.q)
-            & (self.offerable_bids.p <= upper_p)
+        bids = self.offerable_bids
+        offer_set = bids[
+            (oppo_bid_utility <= bids["utility"])
+            & (bids["utility"] <= oppo_bid_utility + delta)
+            & (restricted_q[0] <= bids["q"])
+            & (restricted_q[1] * 1.5 >= bids["q"])
+            & (bids["p"] <= upper_p)
         ]
 
-        if not isinstance(offer_set, pd.Series) and offer_set.shape[0] > 0:
+        if len(offer_set) > 0:
             bid = self.bid_func(nego_relative_time, delivery_time, offer_set)
             return bid
 
-        elif isinstance(offer_set, pd.Series):
-            bid = offer_set["bid"]
-            bid = (int(bid[0]), int(delivery_time), int(bid[1]))
-            return bid
-
         # generate a bid indifferent to opponent's bid
         bid = self.bid_func(nego_relative_time, delivery_time)
         return bid
@@ -232,54 +293,46 @@ class SellBidding:
         Based on needines indicator and remaning negotiation time, a bid to be acceptable for opponent is generated.
         """
 
-        if type(offer_set) == type(None) or len(offer_set) == 0:
-            offer_set = self.offerable_bids
-
-        offer_set.sort_values("utility", ascending=False, inplace=True)
+        if offer_set is None or len(offer_set) == 0:
+            offer_set = self.offerable_bids = sort_by_utility(self.offerable_bids)
+        else:
+            offer_set = sort_by_utility(offer_set)
 
-        len_bids = offer_set.shape[0]
+        len_bids = len(offer_set)
 
         if self.neediness > 0:  # sell need
-            good_bids = offer_set.iloc[int(len_bids * self.neediness / 2) :]
+            good_bids = offer_set[int(len_bids * self.neediness / 2) :]
         else:
             good_bids = offer_set
 
-        if not isinstance(good_bids, pd.Series):
-            # Added by yasser for the unlikely case that all weights are negative
-            if "utility" not in good_bids.columns or good_bids.utility.sum() <= 0:
-                subset_good_bids = good_bids.loc[
-                    random.choices(good_bids.bid.values, k=min(len(good_bids), 5))
-                ]
-            else:
-                subset_good_bids = good_bids.loc[
-                    random.choices(
-                        good_bids.bid.values,
-                        weights=good_bids.utility,
-                        k=min(len(good_bids), 5),
-                    )
-                ]
-            subset_good_bids.sort_values("utility", ascending=False, inplace=True)
-            bid = subset_good_bids.iloc[
-                max(0, int(len(subset_good_bids) * nego_relative_time) - 1)
-            ]["bid"]
+        # Added by yasser for the unlikely case that all weights are negative
+        if good_bids["utility"].sum() <= 0:
+            chosen = random.choices(range(len(good_bids)), k=min(len(good_bids), 5))
         else:
-            bid = good_bids["bid"]
+            chosen = random.choices(
+                range(len(good_bids)),
+                weights=good_bids["utility"],
+                k=min(len(good_bids), 5),
+            )
+        subset_good_bids = sort_by_utility(good_bids[chosen])
+        bid = subset_good_bids[
+            max(0, int(len(subset_good_bids) * nego_relative_time) - 1)
+        ]
 
-        bid = (int(bid[0]), int(delivery_time), int(bid[1]))
+        bid = (int(bid["q"]), int(delivery_time), int(bid["p"]))
 
         return bid
 
     def generate_random_bid(
         self, nego_relative_time, delivery_time, offer_set=None
     ):  # NOT USED
-        if type(offer_set) == type(None):
+        if offer_set is None:
             offer_set = self.offerable_bids
 
-        bid = offer_set.loc[
-            random.choices(offer_set.bid.values, weights=offer_set.utility, k=1)[0],
-            "bid",
+        bid = offer_set[
+            random.choices(range(len(offer_set)), weights=offer_set["utility"], k=1)[0]
         ]
-        bid = (int(bid[0]), int(delivery_time), int(bid[1]))
+        bid = (int(bid["q"]), int(delivery_time), int(bid["p"]))
         return bid
 
 
@@ -294,12 +347,16 @@ class BuyBidding:
         valid_bounds,
         utility_func,
         use_bid_func=True,
+        utility_grid=None,
+        utility_key=None,
     ):
         self.current_step = current_step
         self.initiator = initiator
         self.input_catalog_price = params["input_catalog_price"]
         self.traded_price = params["traded_price"]
         self.utility_func = utility_func
+        self.utility_grid = utility_grid
+        self.utility_key = utility_key
 
         self.eagerness = eagerness
         self.neediness = neediness
@@ -340,52 +397,22 @@ class BuyBidding:
         self.M_beta = [self.r_2, self.r_b, self.r_4]
         self.M_zero = [self.r_2, self.r_4]
 
-        bids = list(product(self.q_range, self.p_range))
-        bid_df = pd.DataFrame(
-            np.array([bids, list(map(self.find_bid_zone, bids))], dtype="object").T,
-            columns=["bid", "zone"],
-        )
-        bid_df["utility"] = bid_df["bid"].apply(self.utility_func)
-        self.bid_dict = {
-            zone: bids.values for zone, bids in bid_df.groupby("zone")["bid"]
-        }
-        arr = np.array(list(bid_df["bid"]))
-        bid_df["q"] = arr[:, 0]
-        bid_df["p"] = arr[:, 1]
-        bid_df.index = pd.MultiIndex.from_tuples(bid_df.bid)
-        self.bid_df = bid_df
-
         self.offerable_zones = ["M_alpha", "M_beta", "M_zero"]
         self.acceptable_zones = self.offerable_zones + ["below_M_alpha"]
 
-        self.offerable_bids = self.bid_df[
-            (self.bid_df["zone"].isin(self.offerable_zones))
-            & (self.bid_df["q"].isin(self.valid_q_range))
-            & (self.bid_df["p"].isin(self.valid_p_range))
-        ]
-        self.offerable_bids.sort_values("utility", ascending=False, inplace=True)
-        self.max_utility = self.offerable_bids["utility"].max()
+        self.offerable_bids = offerable_bid_space(
+            self, self.utility_grid, self.utility_key
+        )
+        self.max_utility = (
+            self.offerable_bids["utility"].max() if len(self.offerable_bids) else np.nan
+        )
 
-        return self.offerable_bids.shape[0] > 0
+        return len(self.offerable_bids) > 0
 
     def find_bid_zone(self, bid):
         q, p = bid
 
-        d1 = (q - self.M_alpha[0][0]) * (self.M_alpha[1][1] - self.M_alpha[0][1]) - (
-            p - self.M_alpha[0][1]
-        ) * (self.M_alpha[1][0] - self.M_alpha[0][0])
-        d2 = (q - self.M_alpha[1][0]) * (self.M_alpha[2][1] - self.M_alpha[1][1]) - (
-            p - self.M_alpha[1][1]
-        ) * (self.M_alpha[2][0] - self.M_alpha[1][0])
-        d3 = (q - self.M_zero[0][0]) * (self.M_zero[1][1] - self.M_zero[0][1]) - (
-            p - self.M_zero[0][1]
-        ) * (self.M_zero[1][0] - self.M_zero[0][0])
-        d4 = (q - self.M_beta[0][0]) * (self.M_beta[1][1] - self.M_beta[0][1]) - (
-            p - self.M_beta[0][1]
-        ) * (self.M_beta[1][0] - self.M_beta[0][0])
-        d5 = (q - self.M_beta[1][0]) * (self.M_beta[2][1] - self.M_beta[1][1]) - (
-            p - self.M_beta[1][1]
-        ) * (self.M_beta[2][0] - self.M_beta[1][0])
+        d1, d2, d3, d4, d5 = bid_sides(q, p, self.M_alpha, self.M_zero, self.M_beta)
 
         if d3 > 0:
             if d1 <= 0 and d2 <= 0:
@@ -400,6 +427,16 @@ class BuyBidding:
         else:
             return "M_zero"
 
+    def offerable_zone(self, q, p):
+        """Whether bids (arrays of q and p) are in M_alpha, M_beta or M_zero (see find_bid_zone)"""
+        d1, d2, d3, d4, d5 = bid_sides(q, p, self.M_alpha, self.M_zero, self.M_beta)
+
+        return np.where(
+            d3 > 0,
+            (d1 <= 0) & (d2 <= 0),
+            np.where(d3 < 0, (d4 >= 0) & (d5 >= 0), True),
+        )
+
     def evaluate(self, opponent_bid, nego_relative_time, opponent_behaviour_params):
         q, t, p = opponent_bid
         o_delivery_time = np.ceil(np.mean(opponent_behaviour_params["t_bounds"]))
@@ -485,72 +522,62 @@ class BuyBidding:
             * (1 + max(0, opponent_concession))
         )
 
-        offer_set = self.offerable_bids.loc[
-            (oppo_bid_utility <= self.offerable_bids.utility)
-            & (self.offerable_bids.utility <= oppo_bid_utility + delta)
-            & (self.reasonable_q * 0.75 <= self.offerable_bids.q)
-            & (self.reasonable_q * 1.25 >= self.offerable_bids.q)
-            & (lower_p <= self.offerable_bids.p)
-            # (restricted_q[0] <= self.offerable_bids.q) & (restricted_q[1] >= self.offerable_bids.q)
+        bids = self.offerable_bids
+        offer_set = bids[
+            (oppo_bid_utility <= bids["utility"])
+            & (bids["utility"] <= oppo_bid_utility + delta)
+            & (self.reasonable_q * 0.75 <= bids["q"])
+            & (self.reasonable_q * 1.25 >= bids["q"])
+            & (lower_p <= bids["p"])
+            # (restricted_q[0] <= bids["q"]) & (restricted_q[1] >= bids["q"])
         ]
 
-        if not isinstance(offer_set, pd.Series) and offer_set.shape[0] > 0:
+        if len(offer_set) > 0:
             bid = self.bid_func(nego_relative_time, delivery_time, offer_set)
             return bid
 
-        elif isinstance(offer_set, pd.Series):
-            bid = offer_set["bid"]
-            bid = (int(bid[0]), int(delivery_time), int(bid[1]))
-            return bid
-
         # generate a bid indifferent to opponent' bid
         bid = self.bid_func(nego_relative_time, delivery_time)
         return bid
 
     def get_good_bid(self, nego_relative_time, delivery_time, offer_set=None):
-        if type(offer_set) == type(None) or len(offer_set) == 0:
-            offer_set = self.offerable_bids
-
-        offer_set.sort_values("utility", ascending=False, inplace=True)
+        if offer_set is None or len(offer_set) == 0:
+            offer_set = self.offerable_bids = sort_by_utility(self.offerable_bids)
+        else:
+            offer_set = sort_by_utility(offer_set)
 
-        len_bids = offer_set.shape[0]
+        len_bids = len(offer_set)
 
         if self.neediness < 0:  # buy need
             abs_neediness = abs(self.neediness)
-            good_bids = offer_set.iloc[int(len_bids * abs_neediness / 2) :]
+            good_bids = offer_set[int(len_bids * abs_neediness / 2) :]
         else:
             good_bids = offer_set
 
-        if not isinstance(good_bids, pd.Series):
-            subset_good_bids = good_bids.loc[
-                random.choices(
-                    good_bids["bid"].values,
-                    weights=good_bids["utility"],
-                    k=min(len(good_bids), 5),
-                )
-            ]
-            subset_good_bids.sort_values("utility", ascending=False, inplace=True)
-            bid = subset_good_bids.iloc[
-                max(0, int(len(subset_good_bids) * nego_relative_time) - 1)
-            ]["bid"]
-        else:
-            bid = good_bids["bid"]
+        chosen = random.choices(
+            range(len(good_bids)),
+            weights=good_bids["utility"],
+            k=min(len(good_bids), 5),
+        )
+        subset_good_bids = sort_by_utility(good_bids[chosen])
+        bid = subset_good_bids[
+            max(0, int(len(subset_good_bids) * nego_relative_time) - 1)
+        ]
 
         self.prod_cap
-        bid = (int(bid[0]), int(delivery_time), int(bid[1]))
+        bid = (int(bid["q"]), int(delivery_time), int(bid["p"]))
 
         return bid
 
     def generate_random_bid(
         self, nego_relative_time, delivery_time, offer_set=None
     ):  # NOT USED
-        if type(offer_set) == type(None):
+        if offer_set is None:
             offer_set = self.offerable_bids
 
-        bid = offer_set.loc[
-            random.choices(offer_set.bid.values, weights=offer_set.utility, k=1)[0],
-            "bid",
+        bid = offer_set[
+            random.choices(range(len(offer_set)), weights=offer_set["utility"], k=1)[0]
         ]
-        bid = (int(bid[0]), int(delivery_time), int(bid[1]))
+        bid = (int(bid["q"]), int(delivery_time), int(bid["p"]))
 
         return bid
@@ -0,0 +1,105 @@
+import math
+from numbers import Integral
+
+__all__ = ["ConcessionEstimator"]
+
+
+class ConcessionEstimator:
+    """
+    Estimates the behavior of an opponent from the bids it sends during a negotiation.
+
+    The concession rate is the ordinary least squares slope of the normalized utilities of the last `window` bids
+    over their rounds (both min-max scaled). The quantity, delivery time and price bounds are the mean -/+ the sample
+    standard deviation over all the bids. Statistics are kept as running sums (the window in a ring buffer) so that
+    adding a bid and getting the parameters take constant time.
+    """
+
+    def __init__(self, window=4):
+        self.window = window
+        self.n_bids = 0
+        self.last_bid = None
+        # ring buffer of the (round, normalized utility) of the last bids and their running sums
+        self._rounds = [0] * window
+        self._utilities = [0.0] * window
+        self._sum_r = self._sum_u = self._sum_rr = self._sum_ru = 0
+        # running sums (and sums of squares) of quantity, delivery time and price over all the bids
+        self._sums = [0, 0, 0]
+        self._squares = [0, 0, 0]
+
+    def __len__(self):
+        return self.n_bids
+
+    def add(self, nego_round, quantity, delivery_t, price, norm_utility):
+        """Records a bid received at the given round"""
+        i = self.n_bids % self.window
+        if self.n_bids >= self.window:
+            r, u = self._rounds[i], self._utilities[i]
+            self._sum_r -= r
+            self._sum_u -= u
+            self._sum_rr -= r * r
+            self._sum_ru -= r * u
+        self._rounds[i], self._utilities[i] = nego_round, norm_utility
+        self._sum_r += nego_round
+        self._sum_u += norm_utility
+        self._sum_rr += nego_round * nego_round
+        self._sum_ru += nego_round * norm_utility
+
+        bid = (quantity, delivery_t, price)
+        for k, x in enumerate(bid):
+            self._sums[k] += x
+            self._squares[k] += x * x
+        self.n_bids += 1
+        self.last_bid = bid
+
+    def concession_rate(self):
+        """The slope of the scaled utilities of the bids in the window over their scaled rounds (a value in [-1, 1])"""
+        m = min(self.n_bids, self.window)
+        rounds, utilities = self._rounds[:m], self._utilities[:m]
+        r_range = max(rounds) - min(rounds)
+        u_range = max(utilities) - min(utilities)
+        if not r_range or not u_range:
+            return 0.0
+        s_rr = self._sum_rr - self._sum_r * self._sum_r / m
+        s_ru = self._sum_ru - self._sum_r * self._sum_u / m
+        return s_ru / s_rr * r_range / u_range
+
+    def _mean_std(self, k):
+        n, total, squares = self.n_bids, self._sums[k], self._squares[k]
+        if isinstance(total, Integral) and isinstance(squares, Integral):
+            total, squares = int(total), int(squares)
+            variance = (n * squares - total * total) / (n * (n - 1))
+        else:
+            variance = (squares - total * total / n) / (n - 1)
+        return total / n, math.sqrt(max(variance, 0))
+
+    def behavior_params(self):
+        """The concession rate and the q, t and p bounds of the opponent (see MediocreNegotiator.get_opponent_params)"""
+        behavior_params = {}
+
+        if self.n_bids > 1:
+            (mean_q, std_q), (mean_t, std_t), (mean_p, std_p) = (
+                self._mean_std(k) for k in range(3)
+            )
+
+            behavior_params["concession_rate"] = self.concession_rate()
+            behavior_params["t_bounds"] = [
+                max(0, int(mean_t - std_t)),
+                int(mean_t + std_t),
+            ]
+            behavior_params["q_bounds"] = [
+                max(0, int(mean_q - std_q)),
+                int(mean_q + std_q),
+            ]
+            behavior_params["p_bounds"] = [
+                max(0, int(mean_p - std_p)),
+                int(mean_q + std_p),
+            ]
+
+        else:
+            q, t, p = self.last_bid
+            behavior_params["concession_rate"] = -1
+            behavior_params["t_bounds"] = [t, t]
+            behavior_params["q_bounds"] = [q, q]
+            behavior_params["p_bounds"] = [p, p]
+
+        return behavior_params
@@ -27,14 +27,22 @@ from scml.scml2020.common import QUANTITY, TIME, UNIT_PRICE
 from scml.scml2020.components.negotiation import NegotiationManager
 from scml.scml2020.components.production import ProductionStrategy
 from scml.scml2020.components.trading import TradingStrategy
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
 from .Bidding import BuyBidding, SellBidding
+from .OpponentModel import ConcessionEstimator
 
 warnings.filterwarnings("ignore")
 
 MAX_ROUNDS = 20
+BID_COLUMNS = [
+    "round",
+    "bid",
+    "quantity",
+    "delivery_t",
+    "price",
+    "utility",
+    "norm_utility",
+]
 
 
 __all__ = [
@@ -1199,22 +1207,28 @@ class MediocreNegotiator(SAONegotiator):
         self.offer_availability = None
         self.last_decision = None
         self.next_bid = None
-        self.received_bids = pd.DataFrame(
-            columns=[
-                "round",
-                "bid",
-                "quantity",
-                "delivery_t",
-                "price",
-                "utility",
-                "norm_utility",
-            ]
-        )
-        self.offered_bids = pd.DataFrame(columns=self.received_bids.columns)
+        # received bids are kept as rows (see received_bids) and summarized by the opponent model
+        self.opponent_model = ConcessionEstimator(window=math.ceil(MAX_ROUNDS / 5))
+        self._received_rows = []
+        self._received_bids = None
+        self._negotiation_end = None
+        self.offered_bids = pd.DataFrame(columns=BID_COLUMNS)
 
     def __str__(self):
         return self.negotiator_id if self.negotiator_id else str(self.q_bounds)
 
+    @property
+    def received_bids(self):
+        """The bids received in this negotiation as a DataFrame (indexed by the opponent once it ends)"""
+        if self._received_bids is None:
+            received_bids = pd.DataFrame(self._received_rows, columns=BID_COLUMNS)
+            if self._negotiation_end is not None:
+                columns = ["opponent", "is_sell", "step", "nego_no", "agree"]
+                received_bids[columns] = self._negotiation_end
+                received_bids.set_index("opponent", inplace=True)
+            self._received_bids = received_bids
+        return self._received_bids
+
     def __repr__(self):
         return str(self)
 
@@ -1235,6 +1249,20 @@ class MediocreNegotiator(SAONegotiator):
 
         return round(utility, 3)
 
+    def utility_grid(self, q, p):
+        """utility_func over arrays of quantities and prices"""
+        if self.to_sell:
+            utility = q * np.minimum(p**1.1, p * 1.5)
+        else:
+            utility = q / (np.maximum(p - self.valid_p_bounds[0], 0) + 1)
+
+        return np.round(utility, 3)
+
+    @property
+    def utility_key(self):
+        """Identifies utility_func (the bid spaces of negotiators with the same key and bounds are the same)"""
+        return ("sell",) if self.to_sell else ("buy", self.valid_p_bounds[0])
+
     def init(self):
 
         self.valid_bounds = [
@@ -1254,6 +1282,8 @@ class MediocreNegotiator(SAONegotiator):
             self.valid_bounds,
             utility_func=self.utility_func,
             use_bid_func=True,
+            utility_grid=self.utility_grid,
+            utility_key=self.utility_key,
         )
 
         self.offer_availability = self.bidding.generate_offerable_set()
@@ -1286,15 +1316,21 @@ class MediocreNegotiator(SAONegotiator):
         offer_utility = self.utility_func(offer)
         norm_offer_utility = round(offer_utility / self.max_utility, 3)
 
-        self.received_bids.loc[len(self.received_bids)] = [
-            state.step,
-            offer,
-            offer[0],
-            offer[1],
-            offer[2],
-            offer_utility,
-            norm_offer_utility,
-        ]
+        self._received_rows.append(
+            [
+                state.step,
+                offer,
+                offer[0],
+                offer[1],
+                offer[2],
+                offer_utility,
+                norm_offer_utility,
+            ]
+        )
+        self._received_bids = None
+        self.opponent_model.add(
+            state.step, offer[0], offer[1], offer[2], norm_offer_utility
+        )
 
         opponent_behavior_params = self.get_opponent_params()
         acceptance, my_bid = self.bidding.evaluate(
@@ -1349,13 +1385,14 @@ class MediocreNegotiator(SAONegotiator):
                 self.utility_func(state.agreement) / self.max_utility, 3
             )
         self.negotiator_id += "-agree=" + str(state.agreement)
-        self.received_bids[["opponent", "is_sell", "step", "nego_no", "agree"]] = (
+        self._negotiation_end = (
             self.opponent,
             self.to_sell,
             self.current_step,
             self.nego_no,
             bool(state.agreement),
         )
+        self._received_bids = None
         self.offered_bids[["opponent", "is_sell", "step", "nego_no", "agree"]] = (
             self.opponent,
             self.to_sell,
@@ -1364,49 +1401,10 @@ class MediocreNegotiator(SAONegotiator):
             bool(state.agreement),
         )
 
-        self.received_bids.set_index("opponent", inplace=True)
         self.offered_bids.set_index("opponent", inplace=True)
 
     def get_opponent_params(self):
-        behavior_params = {}
-        data = self.received_bids[
-            ["round", "quantity", "delivery_t", "price", "norm_utility"]
-        ]
-
-        if data.shape[0] > 1:
-            nego_rounds, q, t, p, utility = data.values[-MAX_ROUNDS // 5 :].T
-            scaled_y = MinMaxScaler().fit_transform(utility.reshape(-1, 1))
-            scaled_rounds = MinMaxScaler().fit_transform(nego_rounds.reshape(-1, 1))
-            reg = LinearRegression()
-            reg.fit(X=scaled_rounds, y=scaled_y)
-
-            concession_rate = reg.coef_[0][0]  # a value between -1 and 1
-
-            mean_q, mean_t, mean_p = data[["quantity", "delivery_t", "price"]].mean()
-            std_q, std_t, std_p = data[["quantity", "delivery_t", "price"]].std()
-
-            behavior_params["concession_rate"] = concession_rate
-            behavior_params["t_bounds"] = [
-                max(0, int(mean_t - std_t)),
-                int(mean_t + std_t),
-            ]
-            behavior_params["q_bounds"] = [
-                max(0, int(mean_q - std_q)),
-                int(mean_q + std_q),
-            ]
-            behavior_params["p_bounds"] = [
-                max(0, int(mean_p - std_p)),
-                int(mean_q + std_p),
-            ]
-
-        else:
-            q, t, p = data[["quantity", "delivery_t", "price"]].values[0]
-            behavior_params["concession_rate"] = -1
-            behavior_params["t_bounds"] = [t, t]
-            behavior_params["q_bounds"] = [q, q]
-            behavior_params["p_bounds"] = [p, p]
-
-        return behavior_params
+        return self.opponent_model.behavior_params()
 
     # deactivated
     def target_quantity(self, step: int, sell: bool) -> int:
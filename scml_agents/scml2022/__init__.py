@@ -1,6 +1,31 @@
 # -*- coding: utf-8 -*-
-from .oneshot import *
-from .standard import *
-from .collusion import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = standard.__all__ + oneshot.__all__ + collusion.__all__
+_EXPORTS = {
+    "M5": ".standard",
+    "CharliesAgent": ".standard",
+    "SkyAgent": ".standard",
+    "Lobster": ".standard",
+    "SalesAgent": ".standard",
+    "SmartAgent": ".standard",
+    "ArtisanKangaroo": ".standard",
+    "GentleS": ".oneshot",
+    "LearningSyncAgent": ".oneshot",
+    "MMMPersonalized": ".oneshot",
+    "AdaptivePercentile": ".oneshot",
+    "AdamAgent": ".oneshot",
+    "EVEAgent": ".oneshot",
+    "Neko": ".oneshot",
+    "LearningAdaptiveAgent": ".oneshot",
+    "AgentSAS": ".oneshot",
+    "AgentRM": ".oneshot",
+    "PatientAgent": ".oneshot",
+    "UcOneshotAgent3_4": ".oneshot",
+    "AdaptiveQlAgent": ".oneshot",
+    "Agent125": ".oneshot",
+    "M5Collusion": ".collusion",
+    "CharliesAgentCollusion": ".collusion",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
-from .team_may import *
-from .bossagent import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = team_may.__all__ + bossagent.__all__
+_EXPORTS = {
+    "M5Collusion": ".team_may",
+    "CharliesAgentCollusion": ".bossagent",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
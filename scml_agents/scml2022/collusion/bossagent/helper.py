@@ -5,29 +5,170 @@ import copy
 # =====================
 
 
+class CapacityIndex(dict):
+    """
+    A formatted schedule ({step: available line count}) that also keeps a Fenwick tree over the available lines.
+
+    Steps are 0, ..., n - 1 and available line counts must not be negative. Setting a step updates the tree in
+    O(log n) so that the capacity of a range of steps and the earliest (latest) step by which an amount can be produced
+    are found in O(log n) instead of scanning the schedule.
+    """
+
+    def __init__(self, free_lines=()):
+        free_lines = list(free_lines)
+        super().__init__(enumerate(free_lines))
+        n = len(free_lines)
+        tree = [0] + free_lines
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._top = 1 << (n.bit_length() - 1) if n else 0
+
+    def __reduce__(self):
+        return CapacityIndex, (list(self.values()),)
+
+    def copy(self):
+        return CapacityIndex(self.values())
+
+    def __setitem__(self, step, free_lines):
+        diff = free_lines - self[step]
+        super().__setitem__(step, free_lines)
+        i, n = step + 1, len(self)
+        while i <= n:
+            self._tree[i] += diff
+            i += i & -i
+
+    def update(self, *args, **kwargs):
+        for step, free_lines in dict(*args, **kwargs).items():
+            self[step] = free_lines
+
+    def _fixed_steps(self, *args, **kwargs):
+        raise TypeError("Steps cannot be added to or removed from a CapacityIndex")
+
+    __delitem__ = pop = popitem = clear = setdefault = _fixed_steps
+
+    def check(self, start, stop):
+        """Raises the KeyError that scanning steps from start to stop (excluded) in the schedule would raise"""
+        if start >= stop:
+            return
+        if start < 0:
+            raise KeyError(start)
+        if stop > len(self):
+            raise KeyError(max(start, len(self)))
+
+    def prefix(self, step):
+        """Available lines at the steps before step"""
+        total, i = 0, min(max(step, 0), len(self))
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def capacity(self, start, stop):
+        """Available lines from start to stop (excluded)"""
+        return self.prefix(stop) - self.prefix(start)
+
+    def _search(self, target, strict):
+        """The smallest j with prefix(j) >= target (> target if strict), len(self) + 1 if there is none"""
+        if target < 0 or (target == 0 and not strict):
+            return 0
+        pos, total, bit = 0, 0, self._top
+        while bit:
+            nxt = pos + bit
+            if nxt <= len(self):
+                value = total + self._tree[nxt]
+                if value < target or (strict and value == target):
+                    pos, total = nxt, value
+            bit >>= 1
+        return pos + 1
+
+    def earliest(self, amount, start, stop):
+        """
+        The first step in [start, stop) with available lines at which the lines available from start reach amount, None if
+        there is none.
+        """
+        if start >= stop:
+            return None
+        base = self.prefix(start)
+        if amount > 0:
+            step = self._search(base + amount, False) - 1
+        else:
+            step = self._search(base, True) - 1
+        return step if step < min(stop, len(self)) else None
+
+    def latest(self, amount, start, stop):
+        """
+        The last step in [start, stop) with available lines at which the lines available until stop (excluded) reach
+        amount, None if there is none.
+        """
+        if start >= stop:
+            return None
+        total = self.prefix(stop)
+        if amount > 0:
+            step = self._search(total - amount, True) - 1
+        else:
+            step = self._search(total, False) - 1
+        return step if step >= max(start, 0) else None
+
+    def steps(self, start, stop):
+        """Steps with available lines from start to stop (excluded) in order"""
+        i = self._search(self.prefix(start), True) - 1
+        while 0 <= i < min(stop, len(self)):
+            yield i
+            i = self._search(self.prefix(i + 1), True) - 1
+
+    def reserve(self, amount, start, stop):
+        """
+        Reserves lines for amount from start to stop (excluded), earliest steps first, and returns the reserved lines
+        per step. Reserves as much as possible if amount is not available.
+        """
+        last = self.earliest(amount, start, stop)
+        self.check(start, stop if last is None else last + 1)
+        reserved = {}
+        for step in list(self.steps(start, stop if last is None else last)):
+            amount -= self[step]
+            reserved[step] = self[step]
+            self[step] = 0
+        if last is not None:
+            reserved[last] = amount
+            self[last] -= amount
+        return reserved
+
+    def release(self, reserved):
+        """Releases lines reserved at every step (e.g. the output of `reserve`)"""
+        for step, amount in reserved.items():
+            self[step] += amount
+
+
+def _capacity_index(schedule):
+    if isinstance(schedule, CapacityIndex):
+        return schedule
+    return CapacityIndex(schedule[i] for i in range(len(schedule)))
+
+
 def format_schedule(schedule, max_number_of_steps):
     """
     Format the AWI schedule into dict. Where key is step, value is available day count for that step.
     E.g. {'1': 5, '2': 7}
     """
-    schedule = list(schedule)  # convert schedule to list.
-    formatted_schedule = {}
-    for i in range(0, max_number_of_steps):
-        formatted_schedule[i] = schedule.count(i)
+    free_lines = [0] * max_number_of_steps
+    for step in schedule:
+        if 0 <= step < max_number_of_steps:
+            free_lines[step] += 1
 
-    return formatted_schedule
+    return CapacityIndex(free_lines)
 
 
-def calculate_produced_quantity(formatted_schedule, step):
+def calculate_produced_quantity(formatted_schedule, step, n_lines):
     """
     Takes step and formatted schedule, calculates the produced q until that step.
     """
-    prod_q = 0
+    schedule = _capacity_index(formatted_schedule)
+    schedule.check(0, step)
 
-    for i in range(0, step):
-        prod_q += 10 - formatted_schedule[i]
-
-    return prod_q
+    return n_lines * max(step, 0) - schedule.prefix(step)
 
 
 def schedule_dispatch_production(schedule, amount, start_date, finish_date):
@@ -40,17 +181,11 @@ def schedule_dispatch_production(schedule, amount, start_date, finish_date):
 
     # Check for special keep flag, if it is then leave schedule as it is.
     if start_date != -1:
-        for step in range(start_date, finish_date):
-            possible_production_amount = schedule[step]
-            if possible_production_amount > 0:
-                if amount - possible_production_amount > 0:
-                    amount = amount - possible_production_amount
-                    schedule[step] = 0
-                    partner_schedule[step] = possible_production_amount
-                else:
-                    schedule[step] = possible_production_amount - amount
-                    partner_schedule[step] = amount
-                    break
+        index = _capacity_index(schedule)
+        partner_schedule = index.reserve(amount, start_date, finish_date)
+        if index is not schedule:
+            for step in partner_schedule:
+                schedule[step] = index[step]
 
     return schedule, partner_schedule
 
@@ -63,20 +198,20 @@ def is_schedule_available(schedule, amount, start_date, finish_date):
     if start_date == -1:
         return True, {"-1": amount}
 
+    schedule = _capacity_index(schedule)
+    last = schedule.earliest(amount, start_date, finish_date)
+    schedule.check(start_date, finish_date if last is None else last + 1)
+
     # We will keep the custom schedule that keeps this amount can be produced in closest time.
     closest_schedule = {}
+    for step in schedule.steps(start_date, finish_date if last is None else last):
+        amount -= schedule[step]
+        closest_schedule[step] = schedule[step]
+    if last is None:
+        return False, closest_schedule
+    closest_schedule[last] = amount
 
-    for step in range(start_date, finish_date):
-        possible_production_amount = schedule[step]
-        if possible_production_amount > 0:
-            if amount - possible_production_amount > 0:
-                amount = amount - possible_production_amount
-                closest_schedule[step] = possible_production_amount
-            else:
-                closest_schedule[step] = amount
-                return True, closest_schedule
-
-    return False, closest_schedule
+    return True, closest_schedule
 
 
 def buyer_closest_available_delivery(schedule, amount, start_date, end_date):
@@ -86,15 +221,12 @@ def buyer_closest_available_delivery(schedule, amount, start_date, end_date):
     if start_date == -1:
         return start_date + 1
 
-    for i in range(start_date, end_date):
-        possible_production_amount = schedule[i]
-        if possible_production_amount > 0:
-            if amount - possible_production_amount <= 0:
-                return (
-                    i + 1
-                )  # Since production completes at i. We can deliver it closest to (i + 1).
-            else:
-                amount -= possible_production_amount
+    schedule = _capacity_index(schedule)
+    last = schedule.earliest(amount, start_date, end_date)
+    schedule.check(start_date, end_date if last is None else last + 1)
+    if last is not None:
+        # Since production completes at last. We can deliver it closest to (last + 1).
+        return last + 1
     # If cant find closest, send the max instead.
     return -1
 
@@ -103,15 +235,12 @@ def seller_closest_available_delivery(schedule, amount, end_date):
     """
     Takes schedule, amount, and end_date. Calculates the seller's 'closest' delivery day when 'amount' is produced.
     """
-    date_range = reversed(range(0, end_date))
-
-    for i in date_range:
-        possible_production_amount = schedule[i]
-        if possible_production_amount > 0:
-            if amount - possible_production_amount <= 0:
-                return i  # Since production completes at i, We can deliver at i.
-            else:
-                amount -= possible_production_amount
+    schedule = _capacity_index(schedule)
+    if end_date > len(schedule):
+        raise KeyError(end_date - 1)
+    first = schedule.latest(amount, 0, end_date)
+    if first is not None:
+        return first  # Since production completes at first, We can deliver at first.
     # If cant find closest, send the min instead.
     return -1
 
@@ -120,11 +249,10 @@ def most_available_amount_in_schedule(schedule, start_date, finish_date):
     """
     Takes schedule, and dates. Checks how many product it is possible to produce in time range (start_date, finish_date)
     """
-    possible_amount = 0
-    for i in range(start_date, finish_date):
-        possible_amount += schedule[i]
+    schedule = _capacity_index(schedule)
+    schedule.check(start_date, finish_date)
 
-    return possible_amount
+    return schedule.capacity(start_date, finish_date) if start_date < finish_date else 0
 
 
 # ============================
@@ -1,29 +1,21 @@
-from .team_102 import *
-from .team_103 import *
-from .team_105 import *
-from .team_106 import *
-from .team_107 import *
-from .team_123 import *
-from .team_124 import *
-from .team_126 import *
-from .team_131 import *
-from .team_134 import *
-from .team_62 import *
-from .team_94 import *
-from .team_96 import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = (
-    team_102.__all__
-    + team_103.__all__
-    + team_105.__all__
-    + team_106.__all__
-    + team_107.__all__
-    + team_123.__all__
-    + team_124.__all__
-    + team_126.__all__
-    + team_131.__all__
-    + team_134.__all__
-    + team_62.__all__
-    + team_94.__all__
-    + team_96.__all__
-)
+_EXPORTS = {
+    "GentleS": ".team_102",
+    "LearningSyncAgent": ".team_102",
+    "MMMPersonalized": ".team_103",
+    "AdaptivePercentile": ".team_105",
+    "AdamAgent": ".team_106",
+    "EVEAgent": ".team_107",
+    "Neko": ".team_123",
+    "LearningAdaptiveAgent": ".team_124",
+    "AgentSAS": ".team_126",
+    "AgentRM": ".team_131",
+    "PatientAgent": ".team_134",
+    "UcOneshotAgent3_4": ".team_62",
+    "AdaptiveQlAgent": ".team_94",
+    "Agent125": ".team_96",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
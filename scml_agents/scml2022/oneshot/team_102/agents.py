@@ -1,4 +1,3 @@
-import itertools
 from abc import ABC
 from collections import defaultdict
 from typing import Any, Optional, Union
@@ -30,6 +29,8 @@ from scml import (
 )
 from scml.oneshot import *
 
+from scml_agents.offer_selection import best_offer_subset
+
 from .nego_utils import *
 from .tutorial_agents import *
 
@@ -528,29 +529,23 @@ class LearningSyncAgent(OneShotSyncAgent, GentleS, ABC):
         )
 
         # 効用値の良い組み合わせを探す
-        names = offers.keys()
-        best_opponents = []
+        names = list(offers.keys())
+        offer_is_selling = is_selling
         is_selling = [
             self._is_selling(self.get_nmi(_)) for _ in agreement_offers.keys()
         ]
-        if agreement_offers:
-            best_util = self.ufun.from_offers(agreement_offers.values(), is_selling)
-        else:
-            best_util = -float("inf")
         # if agreement_offers:
         #     print_log("agreement_offers", agreement_offers)
-        for n in range(1, max(len(names) + 1, 3 + 1)):
-            for comb in itertools.combinations(names, n):
-                is_sellings = [self._is_selling(self.get_nmi(_)) for _ in comb]
-                select_offers = [offers[_] for _ in comb]
-                util = self.ufun.from_offers(
-                    select_offers + list(agreement_offers.values()),
-                    is_sellings + is_selling,
-                )
 
-                if util > best_util:
-                    best_util = util
-                    best_opponents = comb
+        best_comb, best_util = best_offer_subset(
+            self.ufun,
+            [offers[_] for _ in names],
+            offer_is_selling,
+            list(agreement_offers.values()),
+            is_selling,
+            include_empty=bool(agreement_offers),
+        )
+        best_opponents = [names[_] for _ in best_comb]
 
         return best_util, dict(zip(best_opponents, [offers[_] for _ in best_opponents]))
 
@@ -1,12 +1,10 @@
 #!/usr/bin/env python
 # required for running tournaments and printing
 import time
-import statistics
 
 # required for typing
 from typing import Any, Dict, List, Optional
 
-import numpy as np
 from negmas.helpers import humanize_time
 from negmas.sao import SAOState
 
@@ -26,6 +24,8 @@ from negmas import save_stats
 from scml.scml2020.world import is_system_agent
 from collections import defaultdict
 
+from scml_agents.online_stats import QuantileSketch, RunningStats
+
 
 from negmas import (
     AgentMechanismInterface,
@@ -192,9 +192,11 @@ class AdaptiveAgent(BetterAgent):
 class AdaptivePercentile(BetterAgent):
     def before_step(self):
         super().before_step()
-        # Save the last buying/selling prices
-        self._best_selling = []
-        self._best_buying = []
+        # Summarize the best buying/selling prices (every time they improve)
+        self._best_selling = RunningStats()
+        self._best_buying = RunningStats()
+        self._selling_quantiles = QuantileSketch()
+        self._buying_quantiles = QuantileSketch()
 
     def respond(self, negotiator_id, state):
         offer = state.current_offer
@@ -202,20 +204,15 @@ class AdaptivePercentile(BetterAgent):
             return ResponseType.REJECT_OFFER
         response = super().respond(negotiator_id, state)
         nmi = self.get_nmi(negotiator_id)
+        price = offer[UNIT_PRICE]
         if self._is_selling(nmi):
-            if len(self._best_selling) > 0:
-                val = max(offer[UNIT_PRICE], max(self._best_selling))
-                if val not in self._best_selling:
-                    self._best_selling.append(val)
-            else:
-                self._best_selling.append(offer[UNIT_PRICE])
+            if not self._best_selling.count or price > self._best_selling.max:
+                self._best_selling.add(price)
+                self._selling_quantiles.add(price)
         else:
-            if len(self._best_buying) > 0:
-                val = min(offer[UNIT_PRICE], min(self._best_buying))
-                if val not in self._best_buying:
-                    self._best_buying.append(val)
-            else:
-                self._best_buying.append(offer[UNIT_PRICE])
+            if not self._best_buying.count or price < self._best_buying.min:
+                self._best_buying.add(price)
+                self._buying_quantiles.add(price)
         return response
 
     def _price_range(self, nmi):
@@ -228,18 +225,18 @@ class AdaptivePercentile(BetterAgent):
         return mn, mx
 
 
-def average(list_items, n):
-    if len(list_items) == 0:
+def average(stats, n):
+    if stats.count == 0:
         return n
     else:
-        return statistics.mean(list_items)
+        return stats.mean
 
 
-def percentile(list_items, default, p):
-    if len(list_items) == 0:
+def percentile(quantiles, default, p):
+    if quantiles.count == 0:
         return default
     else:
-        return np.percentile(list_items, p)
+        return quantiles.percentile(p)
 
 
 class MMMAgentPercentile(AdaptivePercentile):
@@ -251,9 +248,9 @@ class MMMAgentPercentile(AdaptivePercentile):
         p = 1
         mn, mx = super()._price_range(nmi)
         if self._is_selling(nmi):
-            mn = percentile(self._best_selling, mn, 20) + p
+            mn = percentile(self._selling_quantiles, mn, 20) + p
         else:
-            mx = percentile(self._best_buying, mx, 80) - p
+            mx = percentile(self._buying_quantiles, mx, 80) - p
         return mn, mx
 
 
@@ -1,8 +1,7 @@
-import pandas as pd
-
 """
 This file contains the template agents from http://www.yasserm.com/scml/scml2020docs/tutorials/02.develop_agent_scml2020_oneshot.html
 """
+
 from collections import defaultdict
 from pprint import pprint
 from random import random
@@ -19,6 +18,8 @@ from scml import (
     is_system_agent,
 )
 
+from scml_agents.online_stats import ExponentialMovingAverage
+
 __all__ = [
     "AdamAgent",
 ]
@@ -374,25 +375,62 @@ def print_type_scores(type_scores):
     pprint(sorted(tuple(type_scores.items()), key=lambda x: -x[1]))
 
 
+ALPHAS = [alpha * 0.1 for alpha in range(1, 10)]
+
+
+class AdaptiveMovingAverage:
+    """
+    Exponential moving average of the prices seen using the smoothing factor (one of ALPHAS) whose average of all
+    prices but the last was the closest to the last one.
+
+    The averages for every smoothing factor are updated as prices are added so this takes constant time per price.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._averages = [ExponentialMovingAverage(alpha) for alpha in ALPHAS]
+        # how far the average of each smoothing factor (before the last price) was from the last price
+        self._errors = None
+
+    def add(self, x):
+        if self.count:
+            self._errors = [abs(average.mean - x) for average in self._averages]
+        for average in self._averages:
+            average.add(x)
+        self.count += 1
+
+    def value(self, default):
+        if self.count == 0:
+            return default
+        best = 0
+        if self._errors is not None:
+            # ties go to the smallest smoothing factor
+            best = min(range(len(ALPHAS)), key=self._errors.__getitem__)
+        value = self._averages[best].mean
+        return default if value != value else value
+
+
 class AdamAgent(LearningAgent):
     def init(self):
         """Initialize the quantities and best prices received so far"""
         super().init()
-        self._all_acc_selling, self._all_acc_buying = [], []
-        self._all_opp_selling = defaultdict(list)
-        self._all_opp_buying = defaultdict(lambda: [])
-        self._all_opp_acc_selling = defaultdict(list)
-        self._all_opp_acc_buying = defaultdict(lambda: [])
+        self._all_acc_selling = AdaptiveMovingAverage()
+        self._all_acc_buying = AdaptiveMovingAverage()
+        self._all_opp_selling = defaultdict(AdaptiveMovingAverage)
+        self._all_opp_buying = defaultdict(AdaptiveMovingAverage)
+        self._all_opp_acc_selling = defaultdict(AdaptiveMovingAverage)
+        self._all_opp_acc_buying = defaultdict(AdaptiveMovingAverage)
 
     def before_step(self):
         super().before_step()
-        self._all_selling, self._all_buying = [], []
+        self._all_selling = AdaptiveMovingAverage()
+        self._all_buying = AdaptiveMovingAverage()
 
     def step(self):
         """Initialize the quantities and best prices received for next step"""
         super().step()
-        self._all_opp_selling = defaultdict(list)
-        self._all_opp_buying = defaultdict(lambda: [])
+        self._all_opp_selling = defaultdict(AdaptiveMovingAverage)
+        self._all_opp_buying = defaultdict(AdaptiveMovingAverage)
 
     def on_negotiation_success(self, contract, mechanism):
         """Record sales/supplies secured"""
@@ -403,12 +441,12 @@ class AdamAgent(LearningAgent):
         up = contract.agreement["unit_price"]
         if self._is_selling(mechanism):
             partner = contract.annotation["buyer"]
-            self._all_acc_selling.append(up)
-            self._all_opp_acc_selling[partner].append(up)
+            self._all_acc_selling.add(up)
+            self._all_opp_acc_selling[partner].add(up)
         else:
             partner = contract.annotation["seller"]
-            self._all_acc_buying.append(up)
-            self._all_opp_acc_buying[partner].append(up)
+            self._all_acc_buying.add(up)
+            self._all_opp_acc_buying[partner].add(up)
 
     def respond(self, negotiator_id, state):
         offer = state.current_offer
@@ -422,12 +460,12 @@ class AdamAgent(LearningAgent):
         up = offer[UNIT_PRICE]
         if self._is_selling(ami):
             partner = ami.annotation["buyer"]
-            self._all_opp_selling[partner].append(up)
-            self._all_selling.append(offer[UNIT_PRICE])
+            self._all_opp_selling[partner].add(up)
+            self._all_selling.add(offer[UNIT_PRICE])
         else:
             partner = ami.annotation["seller"]
-            self._all_opp_buying[partner].append(up)
-            self._all_buying.append(offer[UNIT_PRICE])
+            self._all_opp_buying[partner].add(up)
+            self._all_buying.add(offer[UNIT_PRICE])
         return response
 
     def _price_range(self, ami):
@@ -436,51 +474,20 @@ class AdamAgent(LearningAgent):
 
         if self._is_selling(ami):
             partner = ami.annotation["buyer"]
-            self._best_selling = mean(self._all_selling, mx)
-            self._best_acc_selling = mean(self._all_acc_selling, mx)
-            self._best_opp_selling[partner] = mean(self._all_opp_selling[partner], mx)
-            self._best_opp_acc_selling[partner] = mean(
-                self._all_opp_acc_selling[partner], mx
-            )
+            self._best_selling = self._all_selling.value(mx)
+            self._best_acc_selling = self._all_acc_selling.value(mx)
+            self._best_opp_selling[partner] = self._all_opp_selling[partner].value(mx)
+            acc_selling = self._all_opp_acc_selling[partner]
+            self._best_opp_acc_selling[partner] = acc_selling.value(mx)
         else:
             partner = ami.annotation["seller"]
-            self._best_buying = mean(self._all_buying, mn)
-            self._best_acc_buying = mean(self._all_acc_buying, mn)
-            self._best_opp_buying[partner] = mean(self._all_opp_buying[partner], mn)
-            self._best_opp_acc_buying[partner] = mean(
-                self._all_opp_acc_buying[partner], mn
-            )
+            self._best_buying = self._all_buying.value(mn)
+            self._best_acc_buying = self._all_acc_buying.value(mn)
+            self._best_opp_buying[partner] = self._all_opp_buying[partner].value(mn)
+            acc_buying = self._all_opp_acc_buying[partner]
+            self._best_opp_acc_buying[partner] = acc_buying.value(mn)
         return super()._price_range(ami)
 
 
-def mean(list_items, default):
-    if len(list_items) == 0:
-        return default
-    else:
-        alpha_for_last_value = 0.1
-        if len(list_items) >= 2:
-            # Learn the best alpha given past data
-            train, test = list_items[:-1], list_items[-1:]
-
-            best_result = None
-            for alpha in range(1, 10):
-                alpha = alpha * 0.1
-                rolling_last_value = (
-                    pd.Series(train).ewm(alpha=alpha, adjust=False).mean().iloc[-1]
-                )
-                result = abs(rolling_last_value - test) * -1
-                if best_result is None or result > best_result:
-                    best_result = result
-                    alpha_for_last_value = alpha
-
-        rolling_last_value = (
-            pd.Series(list_items)
-            .ewm(alpha=alpha_for_last_value, adjust=False)
-            .mean()
-            .iloc[-1]
-        )
-        return default if pd.isna(rolling_last_value) else rolling_last_value
-
-
 if __name__ == "__main__":
     world, ascores, tscores = try_agent(AdamAgent)
@@ -1,8 +1,8 @@
 #!/usr/bin/env python
-import statistics
-
 from scml.oneshot import OneShotAgent
 
+from scml_agents.online_stats import RunningStats
+
 QUANTITY = 0
 TIME = 1
 UNIT_PRICE = 2
@@ -133,9 +133,9 @@ class BetterAgent(SimpleAgent):
 class AgentOneOneTwo(BetterAgent):
     def before_step(self):
         super().before_step()
-        # Save the last buying/selling prices
-        self._best_selling = []
-        self._best_buying = []
+        # Summarize the best buying/selling prices (every time they improve)
+        self._best_selling = RunningStats()
+        self._best_buying = RunningStats()
 
     def respond(self, negotiator_id, state):
         offer = state.current_offer
@@ -143,20 +143,13 @@ class AgentOneOneTwo(BetterAgent):
             return ResponseType.REJECT_OFFER
         response = super().respond(negotiator_id, state)
         nmi = self.get_nmi(negotiator_id)
+        price = offer[UNIT_PRICE]
         if self._is_selling(nmi):
-            if len(self._best_selling) > 0:
-                val = max(offer[UNIT_PRICE], max(self._best_selling))
-                if val not in self._best_selling:
-                    self._best_selling.append(val)
-            else:
-                self._best_selling.append(offer[UNIT_PRICE])
+            if not self._best_selling.count or price > self._best_selling.max:
+                self._best_selling.add(price)
         else:
-            if len(self._best_buying) > 0:
-                val = min(offer[UNIT_PRICE], min(self._best_buying))
-                if val not in self._best_buying:
-                    self._best_buying.append(val)
-            else:
-                self._best_buying.append(offer[UNIT_PRICE])
+            if not self._best_buying.count or price < self._best_buying.min:
+                self._best_buying.add(price)
         return response
 
     def _price_range(self, nmi):
@@ -168,8 +161,8 @@ class AgentOneOneTwo(BetterAgent):
         return mn, mx
 
 
-def average(list_items, n):
-    if len(list_items) == 0:
+def average(stats, n):
+    if stats.count == 0:
         return n
     else:
-        return statistics.mean(list_items)
+        return stats.mean
@@ -1,9 +1,7 @@
 #!/usr/bin/env python
 from collections import defaultdict
 
-from sklearn.linear_model import LinearRegression
-import numpy as np
-import pandas as pd
+from scml_agents.online_stats import LinearTrend
 
 from .other_agents.agent_team86 import AgentOneOneTwo
 from .other_agents.agent_template import LearningAgent
@@ -21,22 +19,30 @@ __all__ = [
 
 
 class EVEAgent(AgentOneOneTwo):
+    def before_step(self):
+        super().before_step()
+        # The linear trends of the best buying/selling prices over the times they improved
+        self._selling_trend = LinearTrend()
+        self._buying_trend = LinearTrend()
+
+    def respond(self, negotiator_id, state):
+        response = super().respond(negotiator_id, state)
+        if self._best_selling.count > self._selling_trend.count:
+            self._selling_trend.add(self._best_selling.max)
+        if self._best_buying.count > self._buying_trend.count:
+            self._buying_trend.add(self._best_buying.min)
+        return response
+
     def _price_range(self, nmi):
         mn, mx = super()._price_range(nmi)
         if self._is_selling(nmi):
-            if len(self._best_selling) > 0:
-                x = np.array([i for i in range(len(self._best_selling))]).reshape(-1, 1)
-                reg = LinearRegression().fit(
-                    x, np.array(self._best_selling).reshape(-1, 1)
-                )
-                mn = max(mn, reg.predict(np.array([len(x) + 1]).reshape(-1, 1)).item())
+            if self._selling_trend.count > 0:
+                trend = self._selling_trend
+                mn = max(mn, trend.predict(trend.count + 1))
         else:
-            if len(self._best_buying) > 0:
-                x = np.array([i for i in range(len(self._best_buying))]).reshape(-1, 1)
-                reg = LinearRegression().fit(
-                    x, np.array(self._best_buying).reshape(-1, 1)
-                )
-                mx = min(mx, reg.predict(np.array([len(x) + 1]).reshape(-1, 1)).item())
+            if self._buying_trend.count > 0:
+                trend = self._buying_trend
+                mx = min(mx, trend.predict(trend.count + 1))
 
         return mn, mx
 
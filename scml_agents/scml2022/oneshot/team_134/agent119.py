@@ -1,4 +1,3 @@
-import itertools
 from math import ceil, floor
 
 import numpy as np
@@ -6,6 +5,8 @@ from negmas import ResponseType
 from scml.oneshot import *
 from scml.scml2020.common import QUANTITY, TIME, UNIT_PRICE
 
+from scml_agents.offer_selection import best_offer_subset
+
 from .tier1_agent import AdaptiveAgent
 
 __all__ = ["PatientAgent"]
@@ -336,26 +337,16 @@ class PatientAgent(AdaptiveAgent):
                 outputs=tuple(self.output * (len(self.signed_contracts) + 1)),
             )
             dis_util = max_util
-            self.best_nids = [None]
-            for L in range(1, len(self.final_offers) + 1):
-                for keys in itertools.combinations(self.final_offers, L):
-                    subset = tuple([self.final_offers[nid] for nid in keys])
-                    u = self.ufun.from_offers(
-                        subset + self.signed_contracts,
-                        outputs=tuple(self.output * (L + len(self.signed_contracts))),
-                    )
-                    if self.verbose:
-                        pass  # print(f'{subset}: {u}')
-                    if u > max_util:
-                        max_util = u
-                        self.best_nids = keys
-                    elif u == max_util:
-                        sum_balance = sum(self.balances[k][-1] for k in keys)
-                        sum_prev_balance = sum(
-                            self.balances[k][-1] for k in self.best_nids
-                        )
-                        if sum_balance < sum_prev_balance:
-                            self.best_nids = keys
+            nids = list(self.final_offers)
+            best, max_util = best_offer_subset(
+                self.ufun,
+                [self.final_offers[_] for _ in nids],
+                self.output[0],
+                self.signed_contracts,
+                self.output * len(self.signed_contracts),
+                tie_scores=[self.balances[_][-1] for _ in nids],
+            )
+            self.best_nids = tuple(nids[_] for _ in best) if best else [None]
             self.calc_final = True
             if self.verbose:
                 print(
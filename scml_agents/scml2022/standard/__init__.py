@@ -1,18 +1,15 @@
 # -*- coding: utf-8 -*-
-from .team_may import *
-from .bossagent import *
-from .team_100 import *
-from .team_137 import *
-from .team_9 import *
-from .team_99 import *
-from .wabisabikoalas import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = (
-    team_may.__all__
-    + bossagent.__all__
-    + team_100.__all__
-    + team_137.__all__
-    + team_9.__all__
-    + team_99.__all__
-    + wabisabikoalas.__all__
-)
+_EXPORTS = {
+    "M5": ".team_may",
+    "CharliesAgent": ".bossagent",
+    "SkyAgent": ".team_100",
+    "Lobster": ".team_137",
+    "SalesAgent": ".team_9",
+    "SmartAgent": ".team_99",
+    "ArtisanKangaroo": ".wabisabikoalas",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
@@ -1,7 +1,6 @@
 import math
-import copy
 
-from .helper import get_negotiable_agent_rate
+from .helper import get_negotiable_agent_rate, most_available_amount_in_schedule
 
 
 class BossBusinessStrategy:
@@ -46,16 +45,12 @@ class BossBusinessStrategy:
         Helper function that estimates THE production finish day, given schedule and max_seller_quantity,
         from (current_step + MAX_BUYER_DELIVERY_TIME) to (current_step + 1) (from latest day to earliest, last day excluded).
         """
-        temp_schedule = copy.deepcopy(self.formatted_schedule)
-
-        for i in reversed(range(start_date, finish_date)):
-            possible_amount_at_step = temp_schedule[i]
-            if possible_amount_at_step > 0:
-                if max_seller_quantity - possible_amount_at_step > 0:
-                    max_seller_quantity -= possible_amount_at_step
-                    temp_schedule[i] = 0
-                else:
-                    return i  # Return the day that we can finish this production in.
+        production_day = self.formatted_schedule.latest(
+            max_seller_quantity, start_date, finish_date
+        )
+        # Return the day that we can finish this production in.
+        if production_day is not None:
+            return production_day
 
         # If we cant produce anything (schedule is full), we simply dont need to do anything this step.
         return -1
@@ -64,14 +59,9 @@ class BossBusinessStrategy:
         """
         Helper function that calculates max available production quantity between start_date, and finish_date (excluded) from schedule.
         """
-        temp_schedule = copy.deepcopy(self.formatted_schedule)
-
-        max_available_quantity = 0
-
-        for i in range(start_date, finish_date):
-            max_available_quantity += temp_schedule[i]
-
-        return max_available_quantity
+        return most_available_amount_in_schedule(
+            self.formatted_schedule, start_date, finish_date
+        )
 
     # =====================
     #        Getters
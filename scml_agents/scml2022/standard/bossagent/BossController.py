@@ -258,9 +258,11 @@ class SyncController(SAOSyncController):
                 self.nego_history[negotiator.ami.id]["Acceptance"] = {}
                 self.ended_negotiator_ids.append(negotiator_id)
 
-            mechanism_nego_history = copy.deepcopy(self.nego_history[negotiator.ami.id])
             self.__parent.nego_stats.set_negotiation_bid_history(
-                self.current_step, partner_id, negotiator.ami.id, mechanism_nego_history
+                self.current_step,
+                partner_id,
+                negotiator.ami.id,
+                self.nego_history[negotiator.ami.id],
             )
 
     # =========================================
@@ -1,43 +1,136 @@
-import copy
-import json
-from collections import defaultdict
+import os
+from bisect import insort
 
+import numpy as np
 import pandas as pd
 
+ROLES = ("buyer", "seller")
+
+# One row per offer exchanged in a negotiation (the rounds of its history).
+BID_DTYPE = np.dtype(
+    [
+        ("negotiation", np.int32),
+        ("round", np.int32),
+        ("by_agent", np.bool_),
+        ("q", np.int64),
+        ("t", np.int64),
+        ("p", np.int64),
+    ]
+)
+# One row per negotiation (step, partner and mechanism). accept is -1 when it ended without agreement and signs are -1 until set.
+NEGOTIATION_DTYPE = np.dtype(
+    [
+        ("role", np.int8),
+        ("step", np.int32),
+        ("partner", np.int32),
+        ("start", np.int64),
+        ("stop", np.int64),
+        ("accept", np.int8),
+        ("q", np.int64),
+        ("t", np.int64),
+        ("p", np.int64),
+        ("agent_sign", np.int8),
+        ("opponent_sign", np.int8),
+    ]
+)
+# One row per action. Action is 0: rejection, 1: acceptance, -1: we did not send that turn.
+RESPOND_DTYPE = np.dtype(
+    [
+        ("role", np.int8),
+        ("step", np.int32),
+        ("partner", np.int32),
+        ("index", np.int32),
+        ("action", np.int8),
+    ]
+)
+
+
+class Records:
+    """
+    An append-only table stored in a NumPy structured array which doubles its capacity when full.
+
+    Views returned by `view` share memory with the table (no copy) until it grows.
+    """
+
+    def __init__(self, dtype, capacity=64):
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        return self._data[: self._n][index]
+
+    def __setitem__(self, index, row):
+        self._data[: self._n][index] = row
+
+    def _reserve(self, n):
+        if self._n + n <= len(self._data):
+            return
+        data = np.zeros(max(2 * len(self._data), self._n + n), dtype=self._data.dtype)
+        data[: self._n] = self._data[: self._n]
+        self._data = data
+
+    def append(self, row):
+        """Appends a row (a tuple with a value per field) and returns its index"""
+        self._reserve(1)
+        self._data[self._n] = row
+        self._n += 1
+        return self._n - 1
+
+    def extend(self, rows):
+        """Appends rows and returns the (start, stop) range of their indices"""
+        self._reserve(len(rows))
+        start = self._n
+        for row in rows:
+            self._data[self._n] = row
+            self._n += 1
+        return start, self._n
+
+    def view(self, start=0, stop=None):
+        return self._data[start : self._n if stop is None else stop]
+
 
 class BossNegoStats:
     def __init__(self, parent):
         """
         Keeps track of the negotiation history.
+
+        The history is kept in append-only tables (see `Records`) with partners and negotiations (mechanisms) indexed
+        by the order in which they are first seen. Recording costs the same at every step no matter how many steps
+        and partners the world has.
         """
         self.__parent = parent
 
-        self.negotiation_bid_history = {}
-        self.agent_respond_history = {}
-        self.opponent_respond_history = {}
-
-        self.negotiation_bid_history["buyer"] = {}
-        self.agent_respond_history["buyer"] = {}
-        self.opponent_respond_history["buyer"] = {}
-        self.negotiation_bid_history["seller"] = {}
-        self.agent_respond_history["seller"] = {}
-        self.opponent_respond_history["seller"] = {}
-
-        for step in range(0, self.__parent.max_number_of_steps):
-            self.negotiation_bid_history["buyer"][step] = {}
-            self.agent_respond_history["buyer"][step] = {}
-            self.opponent_respond_history["buyer"][step] = {}
-            self.negotiation_bid_history["seller"][step] = {}
-            self.agent_respond_history["seller"][step] = {}
-            self.opponent_respond_history["seller"][step] = {}
-            for buyer_id in self.__parent.my_consumers:
-                self.negotiation_bid_history["buyer"][step][buyer_id] = {}
-                self.agent_respond_history["buyer"][step][buyer_id] = []
-                self.opponent_respond_history["buyer"][step][buyer_id] = []
-            for seller_id in self.__parent.my_suppliers:
-                self.negotiation_bid_history["seller"][step][seller_id] = {}
-                self.agent_respond_history["seller"][step][seller_id] = []
-                self.opponent_respond_history["seller"][step][seller_id] = []
+        self.partners = []
+        self.mechanisms = []
+        self._partner_index = {}
+        self._negotiation_index = {}
+
+        self.bids = Records(BID_DTYPE)
+        self.negotiations = Records(NEGOTIATION_DTYPE)
+        self.agent_responds = Records(RESPOND_DTYPE)
+        self.opponent_responds = Records(RESPOND_DTYPE)
+
+        # negotiations per (step, partner) and accepted negotiations per (role, partner) in recording order
+        self._step_negotiations = {}
+        self._accepted = {}
+        # the latest recorded actions for every (role, step, partner) as the (start, stop) range of their rows
+        self._agent_respond_range = {}
+        self._opponent_respond_range = {}
+        # the action list last recorded for every (role, step, partner) (extended in place by the planner)
+        self._opponent_respond_list = {}
+
+    def _role(self, agentID):
+        return 0 if agentID in self.__parent.my_consumers else 1
+
+    def _partner(self, agentID):
+        index = self._partner_index.get(agentID, None)
+        if index is None:
+            index = self._partner_index[agentID] = len(self.partners)
+            self.partners.append(agentID)
+        return index
 
     # =====================================
     #   Agent Bid History Getter & Setter
@@ -46,45 +139,76 @@ class BossNegoStats:
     def set_negotiation_bid_history(
         self, step, agentID, mechanism_id, negotiation_history
     ):
-        # print("My consumers: ", self.__parent.my_consumers)
-        # print("My suppliers: ", self.__parent.my_suppliers)
-        # print("Buyer Nego bid history: ", self.negotiation_bid_history['buyer'][step])
-        # print("Seller nego bid history: ", self.negotiation_bid_history['seller'][step])
-        if agentID in self.__parent.my_consumers:
-            self.negotiation_bid_history["buyer"][step][agentID][
-                mechanism_id
-            ] = copy.deepcopy(negotiation_history)
-        else:
-            self.negotiation_bid_history["seller"][step][agentID][
-                mechanism_id
-            ] = copy.deepcopy(negotiation_history)
+        role, partner = self._role(agentID), self._partner(agentID)
+        negotiation = self._negotiation_index.get((step, agentID, mechanism_id), None)
+        if negotiation is None:
+            negotiation = self.negotiations.append(
+                (role, step, partner, 0, 0, -1, 0, 0, 0, -1, -1)
+            )
+            self._negotiation_index[(step, agentID, mechanism_id)] = negotiation
+            self.mechanisms.append(mechanism_id)
+            self._step_negotiations.setdefault((step, partner), []).append(negotiation)
+        my_id = self.__parent.id
+        start, stop = self.bids.extend(
+            [
+                (negotiation, k, bid["agentID"] == my_id, bid["q"], bid["t"], bid["p"])
+                for k, bid in negotiation_history.items()
+                if k != "Acceptance"
+            ]
+        )
+        acceptance = negotiation_history.get("Acceptance", dict())
+        accepted = acceptance.get("accept", None) == 1
+        if accepted and self.negotiations[negotiation]["accept"] != 1:
+            insort(self._accepted.setdefault((role, partner), []), negotiation)
+        self.negotiations[negotiation] = (
+            role,
+            step,
+            partner,
+            start,
+            stop,
+            1 if accepted else -1,
+            acceptance.get("q", 0),
+            acceptance.get("t", 0),
+            acceptance.get("p", 0),
+            acceptance.get("agent_sign", -1),
+            acceptance.get("opponent_sign", -1),
+        )
 
     def set_negotiation_bid_sign(
         self, step, agentID, mechanism_id, agent_sign, opponent_sign
     ):
-        try:
-            if agentID in self.__parent.my_consumers:
-                self.negotiation_bid_history["buyer"][step][agentID][mechanism_id][
-                    "Acceptance"
-                ]["agent_sign"] = agent_sign
-            else:
-                self.negotiation_bid_history["seller"][step][agentID][mechanism_id][
-                    "Acceptance"
-                ]["opponent_sign"] = opponent_sign
-        except:
+        negotiation = self._negotiation_index.get((step, agentID, mechanism_id), None)
+        if negotiation is None:
             return
-
-        # Save it as json.
-        self.save_dict(
-            dict_to_save=self.negotiation_bid_history,
-            file_name="negotiation_bid_history",
-        )
-
-    def get_negotiation_bid_history(self, step, agentID):
+        negotiation = self.negotiations[negotiation]
         if agentID in self.__parent.my_consumers:
-            return self.negotiation_bid_history["buyer"][step][agentID]
+            negotiation["agent_sign"] = agent_sign
         else:
-            return self.negotiation_bid_history["seller"][step][agentID]
+            negotiation["opponent_sign"] = opponent_sign
+
+    def get_negotiation_bid_history(self, step, agentID):
+        """
+        Returns the offers exchanged in every negotiation with the given agent at the given step (a view of the bids
+        of each negotiation by its mechanism ID).
+        """
+        partner = self._partner_index.get(agentID, None)
+        history = {}
+        for negotiation in self._step_negotiations.get((step, partner), []):
+            start, stop = self.negotiations[negotiation][["start", "stop"]]
+            history[self.mechanisms[negotiation]] = self.bids.view(start, stop)
+        return history
+
+    def get_accepted_offers(self, role, agentID):
+        """
+        Returns the agreed (p, q, t) of the negotiations with the given agent in the given role ("buyer" or "seller")
+        that ended with an agreement, as arrays in the order the negotiations were recorded.
+        """
+        negotiations = self._accepted.get(
+            (ROLES.index(role), self._partner_index.get(agentID, None)), []
+        )
+        accepted = self.negotiations[negotiations]
+        accepted = accepted[accepted["accept"] == 1]
+        return accepted["p"], accepted["q"], accepted["t"]
 
     # ============================================
     #   Opponent Respond History Getter & Setter
@@ -95,26 +219,42 @@ class BossNegoStats:
         Sets opponent's respond history given its agentID and step with the action in that time step.
         Where action is 0: rejection, 1: acceptance, -1: we did not send that turn.
         """
-        if agentID in self.__parent.my_consumers:
-            self.opponent_respond_history["buyer"][step][agentID] = copy.deepcopy(
-                action_list
+        role, partner = self._role(agentID), self._partner(agentID)
+        key = (role, step, partner)
+        start, stop = self._opponent_respond_range.get(key, (0, -1))
+        # the planner keeps appending to the same list so only the new actions are recorded
+        if (
+            self._opponent_respond_list.get(key, None) is action_list
+            and stop == len(self.opponent_responds)
+            and len(action_list) >= stop - start
+        ):
+            self.opponent_responds.extend(
+                [
+                    (role, step, partner, i, action_list[i])
+                    for i in range(stop - start, len(action_list))
+                ]
             )
         else:
-            self.opponent_respond_history["seller"][step][agentID] = copy.deepcopy(
-                action_list
+            start, _ = self.opponent_responds.extend(
+                [
+                    (role, step, partner, i, action)
+                    for i, action in enumerate(action_list)
+                ]
             )
+        self._opponent_respond_range[key] = (start, len(self.opponent_responds))
+        self._opponent_respond_list[key] = action_list
 
-        # Save it as json.
-        self.save_dict(
-            dict_to_save=self.opponent_respond_history,
-            file_name="opponent_respond_history",
-        )
-
-    def get_opponent_respond_history(self):
+    def get_opponent_respond_history(self, agentID=None, step=None):
         """
-        Return opponent's respond history given its agentID and which simulation step.
+        Return opponent's respond history given its agentID and which simulation step (a view of the actions).
+        Without an agentID and step, returns a view of every action recorded (including overwritten ones).
         """
-        return self.opponent_respond_history
+        if agentID is None:
+            return self.opponent_responds.view()
+        key = (self._role(agentID), step, self._partner_index.get(agentID, None))
+        return self.opponent_responds.view(
+            *self._opponent_respond_range.get(key, (0, 0))
+        )
 
     # ============================================
     #    Agent Respond History Getter & Setter
@@ -125,46 +265,52 @@ class BossNegoStats:
         Sets our agent's respond history given opponent's agentID and step with the action in that time step.
         Where action is 0: rejection, 1: acceptance, -1: we did not send that turn.
         """
-        if agentID in self.__parent.my_consumers:
-            self.agent_respond_history["buyer"][step][agentID] = copy.deepcopy(
-                action_list
-            )
-        else:
-            self.agent_respond_history["seller"][step][agentID] = copy.deepcopy(
-                action_list
-            )
-        # Save it as json.
-        self.save_dict(
-            dict_to_save=self.agent_respond_history, file_name="agent_respond_history"
+        role, partner = self._role(agentID), self._partner(agentID)
+        if not isinstance(action_list, (list, tuple)):
+            action_list = [action_list]
+        self._agent_respond_range[(role, step, partner)] = self.agent_responds.extend(
+            [(role, step, partner, i, action) for i, action in enumerate(action_list)]
         )
 
-    def get_agent_respond_history(self):
+    def get_agent_respond_history(self, agentID=None, step=None):
         """
-        Return agent's respond history given opponent's agentID and which simulation step.
+        Return agent's respond history given opponent's agentID and which simulation step (a view of the actions).
+        Without an agentID and step, returns a view of every action recorded (including overwritten ones).
         """
-        return self.agent_respond_history
+        if agentID is None:
+            return self.agent_responds.view()
+        key = (self._role(agentID), step, self._partner_index.get(agentID, None))
+        return self.agent_responds.view(*self._agent_respond_range.get(key, (0, 0)))
 
     # ============================================
-    #    			JSON File Saver
+    #    			File Saver
     # ============================================
 
-    def save_dict(self, dict_to_save, file_name):
-        default_dict = self.default_to_regular(dict_to_save)
-        # Save dict as json.
-        # json_file_path = self.__parent.agent_log_folder_name + '/' + file_name + '.json'
-        # with open(json_file_path, 'w') as f:
-        # 	try:
-        # 		json.dump(default_dict, f, indent=4)
-        # 	except Exception as e:
-        # 		print(f"JSON DUMP ERROR: {e}")
-
-        # Save dict as csv.
-        # csv_file_path = self.__parent.agent_log_folder_name + '/' + file_name + '.csv'
-        # df = pd.read_json(json.dumps(dict))
-        # df.to_csv(csv_file_path, index=False)
-
-    def default_to_regular(self, d):
-        """Converts default dict to regular dict."""
-        # if isinstance(d, defaultdict):
-        # 	d = {k: self.default_to_regular(v) for k, v in d.items()}
-        return ""
+    def flush(self, folder, file_format="json"):
+        """
+        Saves the history tables into the given folder as JSON (records) or Parquet files. Nothing is saved unless
+        this is called explicitly (e.g. at the end of the world).
+        """
+        os.makedirs(folder, exist_ok=True)
+        partners = np.array(self.partners, dtype=object)
+        mechanisms = np.array(self.mechanisms, dtype=object)
+        tables = dict(
+            negotiation_bid_history=self.bids.view(),
+            negotiations=self.negotiations.view(),
+            agent_respond_history=self.agent_responds.view(),
+            opponent_respond_history=self.opponent_responds.view(),
+        )
+        for file_name, records in tables.items():
+            df = pd.DataFrame(records)
+            if file_name == "negotiations":
+                df.insert(0, "mechanism", mechanisms)
+            if "negotiation" in df:
+                df["mechanism"] = mechanisms[df["negotiation"].to_numpy()]
+            if "role" in df:
+                df["role"] = np.array(ROLES, dtype=object)[df["role"].to_numpy()]
+            if "partner" in df:
+                df["partner"] = partners[df["partner"].to_numpy()]
+            if file_format == "parquet":
+                df.to_parquet(os.path.join(folder, file_name + ".parquet"))
+            else:
+                df.to_json(os.path.join(folder, file_name + ".json"), orient="records")
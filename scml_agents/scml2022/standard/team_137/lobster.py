@@ -35,6 +35,8 @@ from negmas.sao import SAOSyncController
 
 from scml.scml2020.common import is_system_agent
 
+from scml_agents import tracing
+
 __all__ = ["Lobster"]
 
 
@@ -102,7 +104,7 @@ class Lobster(SCML2020Agent):
 
     def init(self):
         """Called once after the agent-world interface is initialized"""
-        # print("debug:init")
+        tracing.record(self.id, "init")
         self.Imyinfo = myinfo(self)
         # self.controllers: Dict[str, SAOSyncController] = None
         self.controllers: Dict[str, SAOSyncController] = {
@@ -120,14 +122,14 @@ class Lobster(SCML2020Agent):
 
     def before_step(self):
         """Called at at the BEGINNING of every production step (day)"""
-        # print("debug:before_step")
+        tracing.record(self.id, "before_step")
 
         self.set_price()
         self.Imyinfo.set_need()
 
     def step(self):
         """Called at at the END of every production step (day)"""
-        # print("debug:step")
+        tracing.record(self.id, "step")
         # breachした時の在庫管理
         prices = (
             self.awi.catalog_prices
@@ -175,7 +177,7 @@ class Lobster(SCML2020Agent):
     ) -> SAONegotiator | None:
         """Called whenever an agent requests a negotiation with you.
         Return either a negotiator to accept or None (default) to reject it"""
-        # print("debug:respond_to_negotiation_request")
+        tracing.record(self.id, "respond_to_negotiation_request")
 
         # 日時が範囲外（かぶっていない）。
         if (
@@ -243,13 +245,13 @@ class Lobster(SCML2020Agent):
     ) -> None:
         """Called when a negotiation the agent is a party of ends without
         agreement"""
-        # print("debug:on_negotiation_failure")
+        tracing.record(self.id, "on_negotiation_failure")
         return None
 
     def on_negotiation_success(self, contract: Contract, mechanism: SAONMI) -> None:
         """Called when a negotiation the agent is a party of ends with
         agreement"""
-        # print("debug:on_negotiation_success")
+        tracing.record(self.id, "on_negotiation_success")
         return None
 
     # =============================
@@ -259,7 +261,7 @@ class Lobster(SCML2020Agent):
     def sign_all_contracts(self, contracts: list[Contract]) -> list[str | None]:
         """Called to ask you to sign all contracts that were concluded in
         one step (day)"""
-        # print("debug:sign_all_contracts")
+        tracing.record(self.id, "sign_all_contracts")
         self.Imyinfo.set_need()  # 一旦初期化
 
         signatures = [None] * len(contracts)
@@ -303,13 +305,29 @@ class Lobster(SCML2020Agent):
                 if flag == True:
                     signatures[indx] = self.id
                     self.controllers["B"].reg_secure((q, t, u))
-                # print(self.awi.current_step,":",contract.annotation["buyer"],":",signatures[indx],":",contract.agreement)
+                if tracing.is_enabled():
+                    tracing.record(
+                        self.id,
+                        "sign",
+                        step=self.awi.current_step,
+                        partner=contract.annotation["buyer"],
+                        signature=signatures[indx],
+                        agreement=contract.agreement,
+                    )
             else:
                 flag = self.controllers["A"]._check_timequantity((q, t, u))
                 if flag == True:
                     signatures[indx] = self.id
                     self.controllers["A"].reg_secure((q, t, u))
-                # print(self.awi.current_step,":",contract.annotation["seller"],":",signatures[indx],":",contract.agreement)
+                if tracing.is_enabled():
+                    tracing.record(
+                        self.id,
+                        "sign",
+                        step=self.awi.current_step,
+                        partner=contract.annotation["seller"],
+                        signature=signatures[indx],
+                        agreement=contract.agreement,
+                    )
         return signatures
 
     def on_contracts_finalized(
@@ -320,7 +338,7 @@ class Lobster(SCML2020Agent):
     ) -> None:
         """Called to inform you about the final status of all contracts in
         a step (day)"""
-        # print("debug:on_contracts_finalized")
+        tracing.record(self.id, "on_contracts_finalized")
         for sign in signed:
             if sign.annotation["seller"] == self.id:
                 self.Imyinfo.set_contractB(sign.agreement)
@@ -331,7 +349,7 @@ class Lobster(SCML2020Agent):
 
     def on_contract_executed(self, contract: Contract) -> None:
         """Called when a contract executes successfully and fully"""
-        # print("debug:on_contract_executed")
+        tracing.record(self.id, "on_contract_executed")
         if contract.annotation["seller"] == self.id:
             # 自分が売り手(インベントリBから移動完了)
             pass
@@ -354,7 +372,7 @@ class Lobster(SCML2020Agent):
     ) -> None:
         """Called when a breach occur. In 2020, there will be no resolution
         (i.e. resoluion is None)"""
-        # print("debug:on_contract_breached")
+        tracing.record(self.id, "on_contract_breached")
         return None
 
     # ====================
@@ -364,7 +382,7 @@ class Lobster(SCML2020Agent):
     def on_failures(self, failures: list[Failure]) -> None:
         """Called when production fails. If you are careful in
         what you order in `confirm_production`, you should never see that."""
-        # print("debug:on_failures")
+        tracing.record(self.id, "on_failures")
         return None
 
     # ==========================
@@ -4,6 +4,8 @@ from typing import List
 from negmas import Breach, Contract, Issue
 import copy
 
+from scml_agents import tracing
+
 
 class myinfo:
     def __init__(self, parent):
@@ -127,7 +129,13 @@ class myinfo:
                         self.output_needs[i + 1],
                         self.secure_inventoryB[i] - self.invB_q_blimit,
                     )
-        # print(self.secure_inventoryB)
+        if tracing.is_enabled():
+            tracing.record(
+                self.parent.id,
+                "needs",
+                secure_inventory=list(self.secure_inventoryB),
+                output_needs=list(self.output_needs),
+            )
 
     def set_contractA(self, agreement):
         n_steps = self.parent.awi.n_steps
@@ -149,8 +157,9 @@ class myinfo:
                 break
             d += 1
         if q_t > 0:
-            # print("error:myinfo/toolargecontract(A)")
-            pass
+            tracing.record(
+                self.parent.id, "too_large_contract", agreement=agreement, unused=q_t
+            )
 
     def set_contractB(self, agreement):
         n_steps = self.parent.awi.n_steps
@@ -1,6 +1,24 @@
 # -*- coding: utf-8 -*-
-from .oneshot import *
-from .standard import *
-from .collusion import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = standard.__all__ + oneshot.__all__ + collusion.__all__
+_EXPORTS = {
+    "AgentVSC": ".collusion",
+    "AgentSDH": ".collusion",
+    "RLIndAgent": ".oneshot",
+    "AgentNeko23": ".oneshot",
+    "AgentNeko23Random": ".oneshot",
+    "AgentSAS": ".oneshot",
+    "PHLA": ".oneshot",
+    "MatchingAgent": ".oneshot",
+    "TwoOneFive": ".oneshot",
+    "KanbeAgent": ".oneshot",
+    "CCAgent": ".oneshot",
+    "ForestAgent": ".oneshot",
+    "AgentVSCforOneShot": ".oneshot",
+    "Shochan": ".oneshot",
+    "NegoAgent": ".oneshot",
+    "QuantityOrientedAgent": ".oneshot",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
-from .team_140 import *
-from .team_150 import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = team_140.__all__ + team_150.__all__
+_EXPORTS = {
+    "AgentVSC": ".team_140",
+    "AgentSDH": ".team_150",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
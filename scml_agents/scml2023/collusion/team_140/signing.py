@@ -0,0 +1,84 @@
+import random
+from typing import List, Optional, Sequence
+
+__all__ = ["select_output_contracts"]
+
+
+def _sign_counts(quantities: Sequence[int], max_quantity: int) -> List[int]:
+    """Number of subsets of the quantities summing to every total up to max_quantity"""
+    counts = [1] + [0] * max_quantity
+    for q in quantities:
+        for total in range(max_quantity, q - 1, -1):
+            counts[total] += counts[total - q]
+    return counts
+
+
+def select_output_contracts(
+    quantities: Sequence[int],
+    prices: Sequence[float],
+    rates: Sequence[float],
+    target_quantity: int,
+    price_weight: float,
+    rate_weight: float,
+    friends: Optional[Sequence[bool]] = None,
+) -> List[int]:
+    """
+    Selects the sell contracts of a single delivery step to sign.
+
+    Args:
+        quantities: The (positive) quantity of each contract
+        prices: The unit price of each contract
+        rates: The sign rate of the buyer of each contract
+        target_quantity: The maximum total quantity to sign
+        price_weight: The weight of the unit price (relative to the highest candidate price) in the value of a contract
+        rate_weight: The weight of the sign rate in the value of a contract
+        friends: Whether the buyer of each contract is a friend. If given, combinations with at least one friend are
+                 preferred to any combination without friends.
+
+    Returns:
+        The indices of the combination with the largest total quantity not exceeding target_quantity and, among those,
+        the highest total value. Ties in value are broken randomly. Empty if no combination fits.
+
+    Remarks:
+        - This gives the same choice as scanning every combination of contracts (up to ties) using dynamic programs
+          over the total quantity which take a time linear in the number of contracts times target_quantity.
+    """
+    n = len(quantities)
+    max_quantity = min(target_quantity, sum(quantities))
+    if max_quantity <= 0:
+        return []
+    counts = _sign_counts(quantities, max_quantity)
+    target = max(_ for _ in range(max_quantity + 1) if counts[_])
+    if target <= 0:
+        return []
+    # the highest price is taken over the contracts of all combinations reaching the target. A contract is in one of
+    # them if some combination of the others reaches the rest of the target (found by removing it from the counts)
+    max_up = None
+    for i, q in enumerate(quantities):
+        if q > target:
+            continue
+        without = counts[: target - q + 1]
+        for total in range(q, target - q + 1):
+            without[total] -= without[total - q]
+        if without[target - q] and (max_up is None or prices[i] > max_up):
+            max_up = prices[i]
+    values = [
+        price_weight * p / max_up + rate_weight * r for p, r in zip(prices, rates)
+    ]
+    if friends is None:
+        friends = [False] * n
+    # the best (value, indices) for every total quantity and whether it includes a friend
+    best = {(0, False): (0, tuple())}
+    order = list(range(n))
+    random.shuffle(order)
+    for i in order:
+        for (total, has_friend), (value, selected) in list(best.items()):
+            key = (total + quantities[i], has_friend or friends[i])
+            if key[0] > target:
+                continue
+            value += values[i]
+            current = best.get(key, None)
+            if current is None or value > current[0]:
+                best[key] = (value, selected + (i,))
+    value, selected = best.get((target, True), None) or best[(target, False)]
+    return sorted(selected)
@@ -1,30 +1,22 @@
 # -*- coding: utf-8 -*-
-from .team_102 import *
-from .team_123 import *
-from .team_126 import *
-from .team_127 import *
-from .team_134 import *
-from .team_139 import *
-from .team_143 import *
-from .team_144 import *
-from .team_145 import *
-from .team_148 import *
-from .team_149 import *
-from .team_151 import *
-from .team_poli_usp import *
+from scml_agents.lazy import lazy_getattr
 
-__all__ = (
-    team_102.__all__
-    + team_123.__all__
-    + team_126.__all__
-    + team_127.__all__
-    + team_134.__all__
-    + team_139.__all__
-    + team_143.__all__
-    + team_144.__all__
-    + team_145.__all__
-    + team_148.__all__
-    + team_149.__all__
-    + team_151.__all__
-    + team_poli_usp.__all__
-)
+_EXPORTS = {
+    "RLIndAgent": ".team_102",
+    "AgentNeko23": ".team_123",
+    "AgentNeko23Random": ".team_123",
+    "AgentSAS": ".team_126",
+    "PHLA": ".team_127",
+    "MatchingAgent": ".team_134",
+    "TwoOneFive": ".team_139",
+    "KanbeAgent": ".team_143",
+    "CCAgent": ".team_144",
+    "ForestAgent": ".team_145",
+    "AgentVSCforOneShot": ".team_148",
+    "Shochan": ".team_149",
+    "NegoAgent": ".team_151",
+    "QuantityOrientedAgent": ".team_poli_usp",
+}
+
+__all__ = list(_EXPORTS)
+__getattr__ = lazy_getattr(__name__, _EXPORTS)
@@ -16,7 +16,7 @@ from .rl.action import (
     SyncActionManager,
     SyncMultiDiscreteAM,
 )
-from .rl.model import OneshotPPO
+from .rl.model import FrozenOneshotPolicy, OneshotPPO
 from .rl.observe import (
     IndMultiDiscreteOM,
     IndObserveManager,
@@ -81,16 +81,23 @@ class RLSyncAgent(SyncAgent):
             self.action_manager = SyncMultiDiscreteAM()
         if self.observe_manager is None:
             self.observe_manager = SyncMultiDiscreteOM()
-        self.ppo = OneshotPPO(
-            state_dim=self.observe_manager.state_dim,
-            action_dim=self.action_manager.action_space,
-            lr_actor=self.lr_actor,
-            lr_critic=self.lr_critic,
-            gamma=self.gamma,
-            K_epochs=self.k_epochs,
-            eps_clip=self.eps_clip,
-            net_arch=self.net_arch,
-        )
+
+        # a pretrained model that is neither trained, saved nor logged is only used for inference:
+        # it is shared frozen by all agents and nothing is buffered or written to disk
+        self.inference = bool(model_name) and not (update_model or save_model or tb_log)
+        self.policy: FrozenOneshotPolicy = None
+        self.ppo: OneshotPPO = None
+        if not self.inference:
+            self.ppo = OneshotPPO(
+                state_dim=self.observe_manager.state_dim,
+                action_dim=self.action_manager.action_space,
+                lr_actor=self.lr_actor,
+                lr_critic=self.lr_critic,
+                gamma=self.gamma,
+                K_epochs=self.k_epochs,
+                eps_clip=self.eps_clip,
+                net_arch=self.net_arch,
+            )
         self.model_name = model_name
         self.checkpoint_path = None
         self.obs = [0, None, None]
@@ -127,7 +134,15 @@ class RLSyncAgent(SyncAgent):
         directory = os.path.join(directory, env_name)
         if self.model_name:
             self.checkpoint_path = os.path.join(directory, "models", self.model_name)
-            self.ppo.load(self.checkpoint_path)
+            if self.inference:
+                self.policy = FrozenOneshotPolicy.get(
+                    self.checkpoint_path,
+                    self.observe_manager.state_dim,
+                    self.action_manager.action_space,
+                    self.net_arch,
+                )
+            else:
+                self.ppo.load(self.checkpoint_path)
         else:
             os.makedirs(directory, exist_ok=True)
             self.checkpoint_path = os.path.join(
@@ -137,11 +152,14 @@ class RLSyncAgent(SyncAgent):
             )
         # print("save checkpoint path : " + self.checkpoint_path)
 
+        self.balances.append(self.awi.current_balance)
+        if self.inference:
+            return
+
         if RLSyncAgent.writer[self.idx] is None:
             d_path = os.path.join(directory, "tb_log", self.now)
             os.makedirs(d_path, exist_ok=True)
             RLSyncAgent.writer[self.idx] = SummaryWriter(log_dir=d_path)
-        self.balances.append(self.awi.current_balance)
 
         self.ppo.set_writer(RLSyncAgent.writer[self.idx], self.idx)
 
@@ -164,7 +182,7 @@ class RLSyncAgent(SyncAgent):
         reward = profit
 
         # record reward
-        if self.ppo.buffer.rewards:
+        if not self.inference and self.ppo.buffer.rewards:
             self.ppo.buffer.rewards[-1] = reward
         if len(self.round_rewards):
             self.round_rewards[-1] = reward
@@ -173,10 +191,11 @@ class RLSyncAgent(SyncAgent):
         # step reward
         step_reward = sum(self.round_rewards)
         self.step_rewards.append(step_reward)
-        RLSyncAgent.step_rewards.append(step_reward)
+        if not self.inference:
+            RLSyncAgent.step_rewards.append(step_reward)
 
         # is terminated
-        if self.ppo.buffer.is_terminals:
+        if not self.inference and self.ppo.buffer.is_terminals:
             if not self.episode_as_simulation:
                 self.ppo.buffer.is_terminals[-1] = True
             elif self.awi.current_step == self.awi.n_steps - 1:
@@ -204,7 +223,7 @@ class RLSyncAgent(SyncAgent):
                 )
 
         # update model using replay buffer
-        if len(self.ppo.buffer.rewards) >= self.update_freq and self.update_model:
+        if self.update_model and len(self.ppo.buffer.rewards) >= self.update_freq:
             self.ppo.update()
 
         RLSyncAgent.step_count[self.idx] += 1
@@ -266,9 +285,11 @@ class RLSyncAgent(SyncAgent):
 
         # select action
 
-        action = self.ppo.select_action(
-            self.observe_manager.encode(offers, states, my_needs, nmi)
-        )
+        state = self.observe_manager.encode(offers, states, my_needs, nmi)
+        if self.inference:
+            action = self.policy.select_action(state)
+        else:
+            action = self.ppo.select_action(state)
 
         # decode action to responses
         responses = self.action_manager.decode(
@@ -289,8 +310,9 @@ class RLSyncAgent(SyncAgent):
 
         # add buffer and log
         reward = self.cont_reward
-        self.ppo.buffer.rewards.append(reward)
-        self.ppo.buffer.is_terminals.append(False)
+        if not self.inference:
+            self.ppo.buffer.rewards.append(reward)
+            self.ppo.buffer.is_terminals.append(False)
         self.round_rewards.append(reward)
         self.round_actions.append(responses)
 
@@ -348,16 +370,23 @@ class RLIndAgent(SimpleAgent):
             self.action_manager = IndMultiDiscreteAM()
         if self.observe_manager is None:
             self.observe_manager = IndMultiDiscreteOM()
-        self.ppo = OneshotPPO(
-            state_dim=self.observe_manager.state_dim,
-            action_dim=self.action_manager.action_space,
-            lr_actor=self.lr_actor,
-            lr_critic=self.lr_critic,
-            gamma=self.gamma,
-            K_epochs=self.k_epochs,
-            eps_clip=self.eps_clip,
-            net_arch=self.net_arch,
-        )
+
+        # a pretrained model that is neither trained, saved nor logged is only used for inference:
+        # it is shared frozen by all agents and nothing is buffered or written to disk
+        self.inference = bool(model_name) and not (update_model or save_model or tb_log)
+        self.policy: FrozenOneshotPolicy = None
+        self.ppo: OneshotPPO = None
+        if not self.inference:
+            self.ppo = OneshotPPO(
+                state_dim=self.observe_manager.state_dim,
+                action_dim=self.action_manager.action_space,
+                lr_actor=self.lr_actor,
+                lr_critic=self.lr_critic,
+                gamma=self.gamma,
+                K_epochs=self.k_epochs,
+                eps_clip=self.eps_clip,
+                net_arch=self.net_arch,
+            )
         self.model_name = model_name
         self.checkpoint_path = None
         self.obs = [0, None, None]
@@ -396,7 +425,15 @@ class RLIndAgent(SimpleAgent):
         directory = os.path.join(directory, env_name)
         if self.model_name:
             self.checkpoint_path = os.path.join(directory, "models", self.model_name)
-            self.ppo.load(self.checkpoint_path)
+            if self.inference:
+                self.policy = FrozenOneshotPolicy.get(
+                    self.checkpoint_path,
+                    self.observe_manager.state_dim,
+                    self.action_manager.action_space,
+                    self.net_arch,
+                )
+            else:
+                self.ppo.load(self.checkpoint_path)
         else:
             os.makedirs(directory, exist_ok=True)
             self.checkpoint_path = os.path.join(
@@ -406,11 +443,14 @@ class RLIndAgent(SimpleAgent):
             )
         # print("save checkpoint path : " + self.checkpoint_path)
 
+        self.balances.append(self.awi.current_balance)
+        if self.inference:
+            return
+
         if RLIndAgent.writer[self.idx] is None:
             d_path = os.path.join(directory, "tb_log", self.now)
             os.makedirs(d_path, exist_ok=True)
             RLIndAgent.writer[self.idx] = SummaryWriter(log_dir=d_path)
-        self.balances.append(self.awi.current_balance)
 
         self.ppo.set_writer(RLIndAgent.writer[self.idx], self.idx)
 
@@ -434,7 +474,7 @@ class RLIndAgent(SimpleAgent):
         reward = profit
 
         # record reward
-        if self.ppo.buffer.rewards:
+        if not self.inference and self.ppo.buffer.rewards:
             self.ppo.buffer.rewards[-1] = reward
         if len(self.round_rewards):
             self.round_rewards[-1] = reward
@@ -443,10 +483,11 @@ class RLIndAgent(SimpleAgent):
         # step reward
         step_reward = sum(self.round_rewards)
         self.step_rewards.append(step_reward)
-        RLSyncAgent.step_rewards.append(step_reward)
+        if not self.inference:
+            RLSyncAgent.step_rewards.append(step_reward)
 
         # is terminated
-        if self.ppo.buffer.is_terminals:
+        if not self.inference and self.ppo.buffer.is_terminals:
             if not self.episode_as_simulation:
                 self.ppo.buffer.is_terminals[-1] = True
             elif self.awi.current_step == self.awi.n_steps - 1:
@@ -474,7 +515,7 @@ class RLIndAgent(SimpleAgent):
                 )
 
         # update model using replay buffer
-        if len(self.ppo.buffer.rewards) >= self.update_freq and self.update_model:
+        if self.update_model and len(self.ppo.buffer.rewards) >= self.update_freq:
             self.ppo.update()
 
         RLIndAgent.step_count[self.idx] += 1
@@ -530,9 +571,12 @@ class RLIndAgent(SimpleAgent):
         nmi = self.get_nmi(negotiator_id)
 
         # select action
-        action = self.ppo.select_action(
-            self.observe_manager.encode(offer, state, my_needs, nmi)
-        )
+        if self.inference:
+            action = self._infer_action(offer, state, my_needs, nmi)
+        else:
+            action = self.ppo.select_action(
+                self.observe_manager.encode(offer, state, my_needs, nmi)
+            )
 
         # decode action to responses
         response = self.action_manager.decode(action, nmi, self.awi.current_step)
@@ -540,8 +584,9 @@ class RLIndAgent(SimpleAgent):
 
         # add buffer and log
         reward = self.cont_reward
-        self.ppo.buffer.rewards.append(reward)
-        self.ppo.buffer.is_terminals.append(False)
+        if not self.inference:
+            self.ppo.buffer.rewards.append(reward)
+            self.ppo.buffer.is_terminals.append(False)
         self.round_rewards.append(reward)
         self.round_actions.append(response)
 
@@ -552,3 +597,14 @@ class RLIndAgent(SimpleAgent):
             if offer[QUANTITY] <= my_needs * self.needs_coef
             else ResponseType.REJECT_OFFER
         )
+
+    def _infer_action(self, offer, state, my_needs, nmi):
+        """Samples the frozen policy using the batched actor outputs of the observation grid when possible"""
+        if isinstance(self.observe_manager, IndMultiDiscreteOM):
+            outputs = self.policy.grid_outputs(self.observe_manager, offer[TIME])
+            return self.policy.sample(
+                outputs[self.observe_manager.grid_index(offer, state, my_needs, nmi)]
+            )
+        return self.policy.select_action(
+            self.observe_manager.encode(offer, state, my_needs, nmi)
+        )
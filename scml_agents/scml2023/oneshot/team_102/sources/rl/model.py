@@ -1,5 +1,6 @@
 import os, sys
 from statistics import mean
+from typing import Dict
 
 from torch.utils.tensorboard import SummaryWriter
 
@@ -211,3 +212,78 @@ class OneshotPPO(PPO):
 
         # increment count
         OneshotPPO._n_update[self._idx] += 1
+
+
+class FrozenOneshotPolicy:
+    """
+    Inference-only actor of a trained OneshotPPO: weights are loaded once per process and the policy is
+    shared by every agent using them, nothing is stored for rollouts and autograd is never recorded
+    """
+    _loaded: Dict[tuple, "FrozenOneshotPolicy"] = {}
+
+    def __init__(
+            self,
+            checkpoint_path: str,
+            state_dim: int,
+            action_dim: int | List[int],
+            net_arch: List[int],
+    ):
+        self.multi_discrete = isinstance(action_dim, list)
+        self.action_dim = action_dim
+
+        policy = OneshotActorCritic(state_dim, action_dim, net_arch)
+        policy.load_state_dict(torch.load(checkpoint_path, map_location=lambda storage, loc: storage))
+        policy.eval()
+        policy.requires_grad_(False)
+        self.actor = policy.actor
+
+        # actor outputs over whole observation grids, see grid_outputs
+        self._grid_outputs: Dict[tuple, torch.Tensor] = {}
+
+    @classmethod
+    def get(
+            cls,
+            checkpoint_path: str,
+            state_dim: int,
+            action_dim: int | List[int],
+            net_arch: List[int],
+    ) -> "FrozenOneshotPolicy":
+        """Returns the shared policy for these weights, loading them on first use"""
+        key = (
+            os.path.abspath(checkpoint_path),
+            state_dim,
+            tuple(action_dim) if isinstance(action_dim, list) else action_dim,
+            tuple(net_arch),
+        )
+        if key not in cls._loaded:
+            cls._loaded[key] = cls(checkpoint_path, state_dim, action_dim, net_arch)
+        return cls._loaded[key]
+
+    def actor_outputs(self, states: torch.Tensor) -> torch.Tensor:
+        """Actor outputs for one state or a batch of states (one forward pass)"""
+        with torch.inference_mode():
+            return self.actor(states)
+
+    def sample(self, actor_output: torch.Tensor):
+        """Samples an action from the actor output of one state, as PPO.select_action does"""
+        if self.multi_discrete:
+            dist = [Categorical(logits=split) for split in torch.split(actor_output, tuple(self.action_dim), dim=0)]
+            return torch.stack([d.sample() for d in dist], dim=0).numpy().flatten()
+        return Categorical(actor_output).sample().item()
+
+    def select_action(self, state: torch.Tensor):
+        return self.sample(self.actor_outputs(state))
+
+    def select_actions(self, states: torch.Tensor) -> list:
+        """Samples one action per row of states with a single forward pass"""
+        return [self.sample(output) for output in self.actor_outputs(states)]
+
+    def grid_outputs(self, observe_manager, offer_time: int) -> torch.Tensor:
+        """
+        Actor outputs for every row of observe_manager.encode_grid(offer_time), computed in one batch the
+        first time an offer made at offer_time is seen and reused afterwards (the policy is frozen)
+        """
+        key = (str(observe_manager), observe_manager.state_dim, min(max(offer_time, 0), observe_manager.n_rounds - 1))
+        if key not in self._grid_outputs:
+            self._grid_outputs[key] = self.actor_outputs(observe_manager.encode_grid(offer_time))
+        return self._grid_outputs[key]
@@ -302,6 +302,49 @@ class IndMultiDiscreteOM(IndObserveManager):
 
         return obs
 
+    def encode_grid(self, offer_time: int) -> torch.Tensor:
+        """
+        Every observation of an offer made at offer_time, one row per (round, needs, quantity, price)
+        in the order used by grid_index
+        """
+        rounds, needs, quantities, prices = torch.meshgrid(
+            torch.arange(self.n_rounds),
+            torch.arange(self.n_needs),
+            torch.arange(self.n_quantity),
+            torch.arange(self.n_prices),
+            indexing="ij",
+        )
+        offer_time = np.clip(offer_time, a_min=0, a_max=self.n_rounds - 1)
+        times = torch.full_like(rounds.flatten(), offer_time)
+
+        return torch.cat(
+            [
+                torch.eye(self.n_rounds)[rounds.flatten()],
+                torch.eye(self.n_needs)[needs.flatten()],
+                torch.eye(self.n_quantity)[quantities.flatten()],
+                torch.eye(self.n_rounds)[times],
+                torch.eye(self.n_prices)[prices.flatten()],
+            ],
+            dim=1,
+        )
+
+    def grid_index(
+        self,
+        offer: tuple,
+        state: MechanismState,
+        needs: int,
+        nmi: SAONMI,
+    ) -> int:
+        """Row of encode_grid(offer[TIME]) equal to encode(offer, state, needs, nmi)"""
+        price = 0 if offer[UNIT_PRICE] == nmi.issues[UNIT_PRICE].max_value else 1
+        idx = np.clip(state.step, a_min=0, a_max=self.n_rounds - 1)
+        idx = idx * self.n_needs + np.clip(needs, a_min=0, a_max=self.n_needs - 1)
+        idx = idx * self.n_quantity + np.clip(
+            offer[QUANTITY], a_min=0, a_max=self.n_quantity - 1
+        )
+        idx = idx * self.n_prices + np.clip(price, a_min=0, a_max=self.n_prices - 1)
+        return int(idx)
+
     def decode(
         self,
         state: torch.Tensor,
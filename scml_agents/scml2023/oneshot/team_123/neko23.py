@@ -11,8 +11,10 @@ from negmas import (
 )
 from scml import QUANTITY, UNIT_PRICE
 
+from scml_agents.offer_selection import best_offer_subset, subsets_by_quantity
+
 from .base_oneshot import BaseAgent
-from .utils.math import powerset, weighted_sample
+from .utils.math import weighted_sample
 from .utils.negutil import get_outcome
 
 __all__ = ["AgentNeko23", "AgentNeko23Random"]
@@ -109,22 +111,17 @@ class AgentNeko23(BaseAgent):
     ) -> set[str]:
         if ultimatum:
             # accept offers to get as much utility as possible
-            best_utility = -float("inf")
-            best_set = set()
-            for partner_ids in powerset(states.keys()):
-                temp_offers = list(self.contracts[self.awi.current_step].values()) + [
-                    offers[partner_id] for partner_id in partner_ids
-                ]
-                outputs = [self.is_seller] * len(temp_offers)
-                utility = self.ufun.from_offers(  # noqa
-                    tuple(temp_offers), tuple(outputs)
-                )
-                if best_utility < utility:
-                    best_utility = utility
-                    best_set = set(partner_ids)
-                self.awi.logdebug_agent(
-                    f"{best_set} {best_utility} {temp_offers} {utility}"
-                )
+            partner_ids = list(states.keys())
+            contract_offers = list(self.contracts[self.awi.current_step].values())
+            best_subset, best_utility = best_offer_subset(
+                self.ufun,
+                [offers[_] for _ in partner_ids],
+                self.is_seller,
+                contract_offers,
+                [self.is_seller] * len(contract_offers),
+            )
+            best_set = set(partner_ids[i] for i in best_subset)
+            self.awi.logdebug_agent(f"{best_set} {best_utility}")
             return best_set
 
         if self.is_advantageous:
@@ -135,28 +132,30 @@ class AgentNeko23(BaseAgent):
             else:
                 candidate_offers = [t for t in offers.items() if t[1][UNIT_PRICE] <= mn]
 
-            for offers_set in powerset(candidate_offers):
-                quantity = sum([offer[1][QUANTITY] for offer in offers_set])
-                if quantity == self.needed_quantity():
-                    return set([offer[0] for offer in offers_set])
+            subsets = subsets_by_quantity(
+                [offer[1][QUANTITY] for offer in candidate_offers],
+                self.needed_quantity(),
+            )
+            if self.needed_quantity() in subsets:
+                return set(
+                    [candidate_offers[i][0] for i in subsets[self.needed_quantity()]]
+                )
             return set()  # reject all offers
 
         else:
-            best_set: set[str] = set()
-            best_quantity = -1
-            for offers_set in powerset(offers.items()):
-                quantity = sum([offer[1][QUANTITY] for offer in offers_set])
-                if quantity > self.needed_quantity():
-                    continue
-                if (
-                    quantity < self.needed_quantity() * self.QUANTITY_THRESHOLD
-                    and not self.has_conclusion
-                ):
-                    continue
-                if best_quantity < quantity:
-                    best_quantity = quantity
-                    best_set = set([offer[0] for offer in offers_set])
-            return best_set
+            partners = list(offers.keys())
+            subsets = subsets_by_quantity(
+                [offers[_][QUANTITY] for _ in partners], self.needed_quantity()
+            )
+            quantities = [
+                quantity
+                for quantity in subsets
+                if quantity >= self.needed_quantity() * self.QUANTITY_THRESHOLD
+                or self.has_conclusion
+            ]
+            if not quantities:
+                return set()
+            return set([partners[i] for i in subsets[max(quantities)]])
 
     def _counter_all(
         self, offers: dict[str, Outcome], states: dict[str, SAOState]
@@ -4,6 +4,8 @@ from negmas import ResponseType
 from scml.oneshot import *
 from scml.scml2020.common import QUANTITY, TIME, UNIT_PRICE
 
+from scml_agents.offer_selection import subsets_by_quantity
+
 __all__ = ["MatchingAgent"]
 
 
@@ -375,52 +377,14 @@ class TestAgent(OneShotAgent):
         return ResponseType.REJECT_OFFER
 
 
-# Created by chatGPT
-def find_combinations(qs, ps, target, current_sum=0, current_combination=None, index=0):
-    if current_combination is None:
-        current_combination = []
-
-    if index == len(qs):
-        if current_sum <= target:
-            return [current_combination]
-        else:
-            return []
-    else:
-        without_current = find_combinations(
-            qs, ps, target, current_sum, current_combination, index + 1
-        )
-        with_current = find_combinations(
-            qs,
-            ps,
-            target,
-            current_sum + qs[index],
-            current_combination + [index],
-            index + 1,
-        )
-        return without_current + with_current
-
-
 def best_combination(qs, ps, target, maximize_p=False, require_target=False):
-    combinations = find_combinations(qs, ps, target)
-    valid_combinations = [
-        comb for comb in combinations if sum(qs[i] for i in comb) <= target
-    ]
-    if not valid_combinations:
+    subsets = subsets_by_quantity(
+        qs, target, [ps if maximize_p else [-p for p in ps]], order="binary"
+    )
+    if not subsets:
         return None
-    highest_sum = max(sum(qs[i] for i in comb) for comb in valid_combinations)
-    highest_sum_combinations = [
-        comb for comb in valid_combinations if sum(qs[i] for i in comb) == highest_sum
-    ]
-
-    if maximize_p:
-        best_comb = max(
-            highest_sum_combinations, key=lambda comb: sum(ps[i] for i in comb)
-        )
-    else:
-        best_comb = min(
-            highest_sum_combinations, key=lambda comb: sum(ps[i] for i in comb)
-        )
+    highest_sum = max(subsets)
     if require_target:
         if highest_sum < target:
             return []
-    return best_comb
+    return list(subsets[highest_sum])
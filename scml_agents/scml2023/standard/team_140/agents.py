@@ -1,6 +1,5 @@
 import math
 import random
-from itertools import combinations
 from typing import *
 
 # from .negotiation_control_strategy import *
@@ -23,6 +22,8 @@ from scml.scml2020.components.production import (
 )
 from scml.scml2020.components.trading import PredictionBasedTradingStrategy
 
+from .signing import select_output_contracts
+
 __all__ = ["AgentVSC"]
 
 MAX_INVENTORY = 50
@@ -192,138 +193,32 @@ class AgentVSC(SCML2020Agent):
                 sum(self.step_input_quantities[:t]) - total_output
             )  # t-1日目までの総入荷量-総出荷(予定)量 (製品の生産は契約の実行より後のフェーズのため入荷品を生産して使えるのは翌日から)
 
-            contract_combinations = []
-            for l in range(len(output_contracts_by_step[t])):
-                contract_combinations += list(
-                    combinations(output_contracts_by_step[t], l + 1)
-                )
-
-            candidates = []
-            while candidates == [] and target_quantity > 0:
-                for contract_combination in contract_combinations:
-                    # print(self.awi.current_step,t,[contract.agreement["quantity"] for contract in contract_combination])
-                    if (
-                        sum(
-                            [
-                                contract.agreement["quantity"]
-                                for contract in contract_combination
-                            ]
-                        )
-                        == target_quantity
-                    ):
-                        candidates.append(contract_combination)
-                target_quantity -= 1
-
-            if candidates == []:
-                continue
-
-            random.shuffle(candidates)
-
-            signed_combination = candidates[0]  # 後でもうちょっとちゃんと選ぶように改良する
-            # 署名する売りの契約の組み合わせの候補(candidates)から，相手の署名率*契約単価を最大化する契約の組み合わせを選択
-            # val = sum([contract.agreement["unit_price"]*self.opp_sign_rates[1][contract.annotation['buyer']] for contract in signed_combination])
-            max_up = max(
-                [
-                    max([contract.agreement["unit_price"] for contract in candidate])
-                    for candidate in candidates
-                ]
+            # 署名する売りの契約の組み合わせ: 総量がtarget_quantity以下で最大の組み合わせのうち，価値(合意単価/最高合意単価と相手の署名率の，シミュレーションの終盤ほど署名率重視になるように重み付けした線形和)が最大のもの
+            step_contracts = output_contracts_by_step[t]
+            weight = np.sin(
+                (self.awi.current_step / (self.awi.n_steps - 1) - 0.5) * np.pi
             )
-            # val = sum([contract.agreement["unit_price"]/max_up + self.opp_sign_rates[1][contract.annotation['buyer']] for contract in signed_combination])
-            # val = sum([(1-self.awi.current_step/(self.awi.n_steps-1))*contract.agreement["unit_price"]/max_up + (self.awi.current_step/(self.awi.n_steps-1))*self.opp_sign_rates[1][contract.annotation['buyer']] for contract in signed_combination])
-            val = sum(
+            selected = select_output_contracts(
+                [contract.agreement["quantity"] for contract in step_contracts],
+                [contract.agreement["unit_price"] for contract in step_contracts],
                 [
-                    (
-                        0.5
-                        - 0.5
-                        * np.sin(
-                            (self.awi.current_step / (self.awi.n_steps - 1) - 0.5)
-                            * np.pi
-                        )
-                    )
-                    * contract.agreement["unit_price"]
-                    / max_up
-                    + (
-                        0.5
-                        + 0.5
-                        * np.sin(
-                            (self.awi.current_step / (self.awi.n_steps - 1) - 0.5)
-                            * np.pi
-                        )
-                    )
-                    * self.opp_sign_rates[1][contract.annotation["buyer"]]
-                    for contract in signed_combination
-                ]
+                    self.opp_sign_rates[1][contract.annotation["buyer"]]
+                    for contract in step_contracts
+                ],
+                target_quantity,
+                0.5 - 0.5 * weight,
+                0.5 + 0.5 * weight,
+                # 組み合わせにフレンドが含まれる場合を優先
+                friends=[
+                    contract.annotation["buyer"] in self.my_friends
+                    for contract in step_contracts
+                ],
             )
 
-            for candidate in candidates[1:]:
-                # candidate_val = sum([contract.agreement["unit_price"]*self.opp_sign_rates[1][contract.annotation['buyer']] for contract in candidate]) # 合意単価と相手の署名率の積で価値を算出
-                # candidate_val = sum([contract.agreement["unit_price"]/max_up + self.opp_sign_rates[1][contract.annotation['buyer']] for contract in candidate]) # 合意単価/最高合意単価と相手の署名率の和で価値を算出
-                # candidate_val = sum([(1-self.awi.current_step/(self.awi.n_steps-1))*contract.agreement["unit_price"]/max_up + (self.awi.current_step/(self.awi.n_steps-1))*self.opp_sign_rates[1][contract.annotation['buyer']] for contract in candidate]) # 合意単価/最高合意単価と相手の署名率の，シミュレーションの終盤ほど署名率重視になるように重み付けした線形和で価値を算出
-                candidate_val = sum(
-                    [
-                        (
-                            0.5
-                            - 0.5
-                            * np.sin(
-                                (self.awi.current_step / (self.awi.n_steps - 1) - 0.5)
-                                * np.pi
-                            )
-                        )
-                        * contract.agreement["unit_price"]
-                        / max_up
-                        + (
-                            0.5
-                            + 0.5
-                            * np.sin(
-                                (self.awi.current_step / (self.awi.n_steps - 1) - 0.5)
-                                * np.pi
-                            )
-                        )
-                        * self.opp_sign_rates[1][contract.annotation["buyer"]]
-                        for contract in candidate
-                    ]
-                )  # 合意単価/最高合意単価と相手の署名率の，シミュレーションの終盤ほど署名率重視になるように重み付けした線形和で価値を算出
+            if not selected:
+                continue
 
-                # 現在の契約の組み合わせの候補にフレンドが含まれる場合，新たな組み合わせ候補にフレンドが含まれ，かつ評価値が高い場合のみ更新
-                if (
-                    sum(
-                        [
-                            contract.annotation["buyer"] in self.my_friends
-                            for contract in signed_combination
-                        ]
-                    )
-                    != 0
-                ):
-                    if (
-                        sum(
-                            [
-                                contract.annotation["buyer"] in self.my_friends
-                                for contract in candidate
-                            ]
-                        )
-                        != 0
-                    ):
-                        if candidate_val > val:
-                            signed_combination = candidate
-                            val = candidate_val
-                # 現在の契約の組み合わせの候補にフレンドが含まれない場合，
-                else:
-                    # 新たな組み合わせ候補にフレンドが含まれるか，
-                    if (
-                        sum(
-                            [
-                                contract.annotation["buyer"] in self.my_friends
-                                for contract in candidate
-                            ]
-                        )
-                        != 0
-                    ):
-                        signed_combination = candidate
-                        val = candidate_val
-                    # 新たな組み合わせ候補にもフレンドが含まれないが評価値が高い場合に更新
-                    elif candidate_val > val:
-                        signed_combination = candidate
-                        val = candidate_val
+            signed_combination = [step_contracts[_] for _ in selected]
 
             for i, contract in enumerate(contracts):
                 t, p, q, is_seller = (
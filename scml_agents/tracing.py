@@ -0,0 +1,213 @@
+"""
+A process wide recorder of structured debugging events emitted by the agents.
+
+Agents used to print their internal state (or dump it to files) while they run. They record events here instead: an
+event is the ID of the agent (or any other source), the name of the event and a few fields. Recording is off by default
+and costs a single attribute check when it is off. Agents guard anything expensive to compute with `is_enabled`.
+
+When enabled, events go to a bounded ring buffer (older events are dropped once it is full) which can be saved as
+newline delimited JSON or Parquet with `flush`, for example at the end of a world. Setting the ``SCML_AGENTS_TRACE``
+environment variable enables recording when this module is imported. If its value is a file path, events are also
+saved to it when the process exits.
+
+Example:
+
+    >>> from scml_agents import tracing
+    >>> tracing.enable(capacity=1000)
+    >>> tracing.record("agent", "step", step=3, balance=100.5)
+    >>> [(e.source, e.event, e.fields) for e in tracing.events()]
+    [('agent', 'step', {'step': 3, 'balance': 100.5})]
+    >>> tracing.disable()
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+__all__ = [
+    "TRACE_ENV",
+    "TraceEvent",
+    "Tracer",
+    "TRACER",
+    "enable",
+    "disable",
+    "is_enabled",
+    "record",
+    "message",
+    "events",
+    "flush",
+    "clear",
+]
+
+TRACE_ENV = "SCML_AGENTS_TRACE"
+"""The environment variable that enables recording when set (to 1 or to the path to save events to at exit)"""
+
+
+@dataclass(frozen=True)
+class TraceEvent:
+    """A recorded event"""
+
+    time: float
+    """Seconds since the epoch when the event was recorded"""
+    source: str
+    """Who recorded the event (usually the ID of an agent)"""
+    event: str
+    """The name of the event"""
+    fields: dict[str, Any] = field(default_factory=dict)
+    """Anything else recorded with the event"""
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(time=self.time, source=self.source, event=self.event, **self.fields)
+
+    def __str__(self):
+        fields = " ".join(f"{k}={v}" for k, v in self.fields.items())
+        return f"[{self.source}] {self.event} {fields}".rstrip()
+
+
+class Tracer:
+    """
+    Records events in a ring buffer of the given capacity.
+
+    Args:
+        capacity: The maximum number of events kept (the oldest ones are dropped first)
+        echo: Print every event as it is recorded (in addition to keeping it)
+    """
+
+    def __init__(self, capacity: int = 100_000, echo: bool = False):
+        self.enabled = False
+        self.echo = echo
+        self._events: deque[TraceEvent] = deque(maxlen=capacity)
+        self._dropped = 0
+        self._exit_paths: set[Path] = set()
+
+    @property
+    def capacity(self) -> int:
+        return self._events.maxlen
+
+    @property
+    def dropped(self) -> int:
+        """The number of events dropped because the buffer was full"""
+        return self._dropped
+
+    def enable(
+        self,
+        capacity: int | None = None,
+        echo: bool | None = None,
+        path: str | os.PathLike | None = None,
+    ) -> None:
+        """
+        Starts recording.
+
+        Args:
+            capacity: If given, changes the size of the buffer (keeping the latest events)
+            echo: If given, whether to print every event as it is recorded
+            path: If given, events are saved to this file (see `flush`) when the process exits
+        """
+        if capacity is not None and capacity != self.capacity:
+            self._events = deque(self._events, maxlen=capacity)
+        if echo is not None:
+            self.echo = echo
+        if path is not None and Path(path).resolve() not in self._exit_paths:
+            self._exit_paths.add(Path(path).resolve())
+            atexit.register(self.flush, path)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stops recording (recorded events are kept)"""
+        self.enabled = False
+
+    def record(self, source: str, event: str, **fields: Any) -> None:
+        """Records an event (does nothing unless enabled)"""
+        if not self.enabled:
+            return
+        e = TraceEvent(time.time(), str(source), event, fields)
+        if len(self._events) == self._events.maxlen:
+            self._dropped += 1
+        self._events.append(e)
+        if self.echo:
+            print(e)
+
+    def message(self, source: str, *args: Any, event: str = "message") -> None:
+        """Records what ``print(*args)`` would print as the text of an event (does nothing unless enabled)"""
+        if not self.enabled:
+            return
+        self.record(source, event, text=" ".join(str(_) for _ in args))
+
+    def events(self) -> list[TraceEvent]:
+        """The events in the buffer (oldest first)"""
+        return list(self._events)
+
+    def clear(self) -> None:
+        """Drops every recorded event"""
+        self._events.clear()
+        self._dropped = 0
+
+    def flush(self, path: str | os.PathLike, file_format: str | None = None) -> int:
+        """
+        Appends the recorded events to a file and clears the buffer.
+
+        Args:
+            path: The file to save to
+            file_format: "ndjson" (one JSON object per line) or "parquet" (needs pyarrow or fastparquet). By default
+                         it is guessed from the extension of the path (ndjson unless it ends with .parquet).
+
+        Returns:
+            The number of events saved.
+
+        Remarks:
+            - Fields that cannot be represented in JSON (or Parquet) are saved as their string representation.
+            - Parquet files are overwritten instead of appended to.
+        """
+        path = Path(path)
+        if file_format is None:
+            file_format = "parquet" if path.suffix == ".parquet" else "ndjson"
+        if file_format not in ("ndjson", "parquet"):
+            raise ValueError(f"Unknown trace file format {file_format}")
+        records = [e.as_dict() for e in self._events]
+        if not records:
+            return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if file_format == "parquet":
+            import pandas as pd
+
+            df = pd.DataFrame.from_records(records)
+            for column in df.columns[df.dtypes == object]:
+                df[column] = [
+                    _ if _ is None or isinstance(_, str) else str(_) for _ in df[column]
+                ]
+            df.to_parquet(path)
+        else:
+            with open(path, "a") as f:
+                for r in records:
+                    f.write(json.dumps(r, default=str) + "\n")
+        self.clear()
+        return len(records)
+
+
+TRACER = Tracer()
+"""The recorder used by the agents"""
+
+enable = TRACER.enable
+disable = TRACER.disable
+record = TRACER.record
+message = TRACER.message
+events = TRACER.events
+flush = TRACER.flush
+clear = TRACER.clear
+
+
+def is_enabled() -> bool:
+    """Whether events are being recorded"""
+    return TRACER.enabled
+
+
+_env = os.environ.get(TRACE_ENV, "")
+if _env and _env.lower() not in ("0", "false", "no"):
+    TRACER.enable(path=None if _env.lower() in ("1", "true", "yes") else _env)
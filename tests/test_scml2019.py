@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from scml.scml2019.factory_managers.builtins import GreedyFactoryManager
 from scml.scml2019.utils import anac2019_collusion, anac2019_sabotage, anac2019_std
@@ -5,6 +6,7 @@ from scml.scml2019.world import SCML2019World
 
 from scml_agents import get_agents
 from scml_agents.scml2019 import *
+from scml_agents.scml2019.nvm import mp_nvp, mp_nvp_lp, newsvendor
 
 from .switches import (
     SCMLAGENTS_RUN2019,
@@ -113,5 +115,320 @@ def test_can_run_sabotage_tournament():
     )
 
 
+def solve_mpnvm_by_enumeration(
+    sols, q_min_out, q_min_in, prices_out, prices_in, production_cost
+):
+    optimal_sol, optimal_sol_revenue, positive_solutions = None, 0.0, []
+    T = sols.shape[1] // 3
+    for row in map(tuple, sols.tolist()):
+        value = sum(
+            prices_out[t] * q_min_out[t]["min_" + str(row[(t * 3) + 1])]
+            - prices_in[t] * q_min_in[t]["min_" + str(row[t * 3])]
+            - production_cost * row[(t * 3) + 2]
+            for t in range(T)
+        )
+        if value > optimal_sol_revenue:
+            optimal_sol_revenue, optimal_sol = value, row
+        if value > 0:
+            positive_solutions.append((row, value))
+    return optimal_sol_revenue, optimal_sol, positive_solutions
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_mpnvm_matches_enumeration(seed):
+    rng = np.random.default_rng(seed)
+    size = 20
+    sols = mp_nvp.load_qtty_feasible_domain(4, size)
+    distributions = [
+        {str(q): p for q, p in enumerate(rng.dirichlet(np.ones(size)))}
+        for _ in range(8)
+    ]
+    q_min_out = {
+        t: newsvendor.compute_min_expectation(d, size)
+        for t, d in enumerate(distributions[:4])
+    }
+    q_min_in = {
+        t: newsvendor.compute_min_expectation(d, size)
+        for t, d in enumerate(distributions[4:])
+    }
+    prices_out = {t: rng.uniform(5, 40) for t in range(4)}
+    prices_in = {t: rng.uniform(1, 20) for t in range(4)}
+    cost = rng.uniform(0, 5)
+    expected = solve_mpnvm_by_enumeration(
+        sols, q_min_out, q_min_in, prices_out, prices_in, cost
+    )
+    assert (
+        mp_nvp.solve_mpnvm(sols, q_min_out, q_min_in, prices_out, prices_in, cost)
+        == expected
+    )
+    value, sol, top = mp_nvp.solve_mpnvm(
+        sols, q_min_out, q_min_in, prices_out, prices_in, cost, top_k=5
+    )
+    assert (value, sol) == expected[:2]
+    assert top == sorted(expected[2], key=lambda x: -x[1])[:5]
+    assert mp_nvp.solve_mpnvm(
+        sols, q_min_out, q_min_in, prices_in, prices_out, 100.0
+    ) == solve_mpnvm_by_enumeration(
+        sols, q_min_out, q_min_in, prices_in, prices_out, 100.0
+    )
+
+
+@pytest.mark.parametrize("cost", [40, np.int64(40), 40.0])
+def test_mpnvm_integer_production_cost(cost):
+    rng = np.random.default_rng(0)
+    size = 20
+    sols = mp_nvp.load_qtty_feasible_domain(4, size)
+    assert sols.dtype == np.uint8
+    q_min_out, q_min_in = (
+        {
+            t: newsvendor.compute_min_expectation(
+                {str(q): p for q, p in enumerate(rng.dirichlet(np.ones(size)))},
+                size,
+            )
+            for t in range(4)
+        }
+        for _ in range(2)
+    )
+    prices_out = {t: rng.uniform(50, 100) for t in range(4)}
+    prices_in = {t: rng.uniform(1, 10) for t in range(4)}
+    value, sol, _ = mp_nvp.solve_mpnvm(
+        sols, q_min_out, q_min_in, prices_out, prices_in, cost
+    )
+    expected_value, expected_sol, _ = solve_mpnvm_by_enumeration(
+        sols, q_min_out, q_min_in, prices_out, prices_in, cost
+    )
+    assert value == pytest.approx(expected_value) and sol == expected_sol
+
+
+def test_qtty_feasible_domain_binary_cache(tmp_path, monkeypatch):
+    import shutil
+
+    shutil.copy(mp_nvp.get_qtty_domain_location(4, 20), tmp_path)
+    expected = mp_nvp.read_qtty_feasible_domain(4, 20).to_numpy()
+    monkeypatch.setattr(mp_nvp, "QTTY_DOMAIN_DIR", str(tmp_path))
+    monkeypatch.setattr(mp_nvp, "_qtty_feasible_domains", {})
+    # Without the binary version, the csv is read
+    sols = mp_nvp.load_qtty_feasible_domain(4, 20)
+    assert sols.dtype == np.uint8 and not isinstance(sols, np.memmap)
+    assert (sols == expected).all()
+    assert mp_nvp.load_qtty_feasible_domain(4, 20) is sols
+    # Once converted, the binary version is memory-mapped
+    mp_nvp.convert_qtty_feasible_domain(4, 20)
+    monkeypatch.setattr(mp_nvp, "_qtty_feasible_domains", {})
+    sols = mp_nvp.load_qtty_feasible_domain(4, 20)
+    assert isinstance(sols, np.memmap) and not sols.flags.writeable
+    assert (sols == expected).all()
+
+
 if __name__ == "__main__":
     pytest.main(args=[__file__])
+
+
+def random_mp_nvp_lp_problem(rng, time_horizon):
+    return dict(
+        p_out={t: rng.uniform(5, 30) for t in range(time_horizon)},
+        p_inn={t: rng.uniform(1, 20) for t in range(time_horizon)},
+        q_out={t: rng.uniform(0, 8) for t in range(time_horizon)},
+        q_inn={t: rng.uniform(0, 8) for t in range(time_horizon)},
+        input_offers={
+            t: [(rng.uniform(1, 20), rng.randint(1, 6), t)] * rng.choice([0, 0, 1, 2])
+            for t in range(time_horizon)
+        },
+        output_offers={
+            t: [(rng.uniform(5, 30), rng.randint(1, 6), t)] * rng.choice([0, 0, 0, 1])
+            for t in range(time_horizon)
+        },
+        production_capacity=10,
+        production_cost=rng.uniform(0, 5),
+        time_horizon=time_horizon,
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_mp_nvp_flow_matches_lp(seed):
+    import random
+
+    rng = random.Random(seed)
+    problem = random_mp_nvp_lp_problem(rng, rng.randint(1, 10))
+    expected = mp_nvp_lp.solve_mp_nvp_lp(**problem)
+    value = mp_nvp_lp.solve_mp_nvp_flow(**problem)
+    if expected == float("-inf"):
+        assert value == expected
+    else:
+        assert value == pytest.approx(expected, rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_mp_nvp_flow_incremental_contract_matches_resolve(seed):
+    import random
+
+    rng = random.Random(seed)
+    problem = random_mp_nvp_lp_problem(rng, rng.randint(1, 10))
+    base = mp_nvp_lp.MPNVPFlow(**problem)
+    base.solve()
+    for _ in range(5):
+        t = rng.randrange(problem["time_horizon"])
+        is_buy = rng.random() < 0.5
+        contract = (rng.uniform(1, 30), rng.randint(1, 6), t)
+        offers = problem["input_offers" if is_buy else "output_offers"]
+        expected = mp_nvp_lp.solve_mp_nvp_flow(
+            **{
+                **problem,
+                "input_offers" if is_buy else "output_offers": {
+                    **offers,
+                    t: offers[t] + [contract],
+                },
+            }
+        )
+        value = base.with_contract(t, contract[0], contract[1], is_buy).solve()
+        if expected == float("-inf"):
+            assert value == expected
+        else:
+            assert value == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_saha_price_history_matches_list(seed):
+    import random
+
+    from scml_agents.scml2019.saha import PriceHistory
+
+    rng = random.Random(seed)
+    history, expected = PriceHistory(), []
+    for _ in range(200):
+        if len(expected) > 1 and rng.random() < 0.2:
+            if rng.random() < 0.5:
+                expected.remove(min(expected))
+                history.remove_min()
+            else:
+                expected.remove(max(expected))
+                history.remove_max()
+        else:
+            price = rng.choice([rng.randint(1, 30), rng.uniform(1, 30)])
+            if price not in expected:
+                expected.append(price)
+            history.add(price)
+        assert list(history) == sorted(expected)
+        assert (history.min(), history.max()) == (min(expected), max(expected))
+        assert all(_ in history for _ in expected)
+
+
+def test_saha_publishes_a_single_sell_cfp_per_product():
+    from types import SimpleNamespace
+
+    from scml_agents.scml2019.saha import ProductData, SAHAFactoryManager
+
+    cfps = []
+    manager = SAHAFactoryManager()
+    manager.awi = SimpleNamespace(
+        current_step=3,
+        n_steps=50,
+        state=SimpleNamespace(storage=dict()),
+        register_cfp=cfps.append,
+    )
+    manager.producing = {1: [], 2: []}
+    manager.consuming = {}
+    manager.cfp_records = {
+        1: ProductData(1, 2, 0.3, 10, 10),
+        2: ProductData(2, 2, 0.3, 20, 20),
+    }
+    manager.cfp_records[1].stock, manager.cfp_records[2].stock = 7, 1
+    manager.step()
+    assert [(_.product, _.is_buy, _.min_quantity, _.max_quantity) for _ in cfps] == [
+        (1, False, 1, 7),
+        (2, False, 1, 1),
+    ]
+
+
+def _trial_can_produce(manager, cfp, assume_no_further_negotiations=False):
+    # the trial schedule GreedyFactoryManager.can_produce runs for every CFP
+    from negmas import Contract
+    from scml.scml2019.common import SCMLAgreement
+    from scml.scml2019.simulators import temporary_transaction
+
+    if cfp.product not in manager.producing.keys():
+        return False
+    agreement = SCMLAgreement(
+        time=cfp.max_time, unit_price=cfp.max_unit_price, quantity=cfp.min_quantity
+    )
+    min_concluded_at = (
+        manager.awi.current_step + 1 - int(manager.immediate_negotiations)
+    )
+    min_sign_at = min_concluded_at + manager.awi.default_signing_delay
+    if cfp.max_time < min_sign_at + 1:
+        return False
+    with temporary_transaction(manager.scheduler):
+        schedule = manager.scheduler.schedule(
+            contracts=[
+                Contract(
+                    partners=[manager.id, cfp.publisher],
+                    agreement=agreement,
+                    annotation=manager._create_annotation(cfp=cfp),
+                    issues=cfp.issues,
+                    signed_at=min_sign_at,
+                    concluded_at=min_concluded_at,
+                )
+            ],
+            ensure_storage_for=manager.transportation_delay,
+            assume_no_further_negotiations=assume_no_further_negotiations,
+            start_at=min_sign_at,
+        )
+    return schedule.valid and manager.can_secure_needs(
+        schedule=schedule, step=manager.awi.current_step
+    )
+
+
+@pytest.mark.parametrize(
+    "fm",
+    [
+        RaptFactoryManager,
+        CheapBuyerFactoryManager,
+        InsuranceFraudFactoryManager,
+        FJ2FactoryManager,
+    ],
+)
+def test_feasibility_oracle_matches_trial_schedule(fm, tmp_path, monkeypatch):
+    import random
+
+    from scml.scml2019.common import CFP
+
+    # CheapBuyerFactoryManager writes files to the working directory
+    monkeypatch.chdir(tmp_path)
+    nice = {"negotiator_type": "negmas.sao.NiceNegotiator"}
+    world = SCML2019World.chain_world(
+        n_intermediate_levels=1,
+        log_file_name="",
+        n_steps=6,
+        manager_types=(GreedyFactoryManager, fm),
+        manager_params=(nice, dict() if fm is CheapBuyerFactoryManager else nice),
+        n_factories_per_level=2,
+        default_signing_delay=0,
+        ignore_agent_exceptions=True,
+        ignore_negotiation_exceptions=True,
+        ignore_contract_execution_exceptions=True,
+        consumer_kwargs=nice,
+        miner_kwargs=nice,
+    )
+    managers = [_ for _ in world.agents.values() if isinstance(_, fm)]
+    rng = random.Random(0)
+    n_true = 0
+    for _ in range(world.n_steps - 1):
+        world.step()
+        for manager in managers:
+            step = manager.awi.current_step
+            for _ in range(10):
+                q = rng.randint(1, 20)
+                assume = rng.random() < 0.3
+                cfp = CFP(
+                    is_buy=True,
+                    publisher="buyer",
+                    product=rng.choice(list(manager.producing.keys())),
+                    time=rng.randint(step, manager.awi.n_steps - 1),
+                    unit_price=(1, rng.randint(1, 20)),
+                    quantity=(q, q + 2),
+                )
+                expected = _trial_can_produce(manager, cfp, assume)
+                n_true += expected
+                for _ in range(2):
+                    assert manager.feasibility.can_produce(cfp, assume) == expected
+    assert n_true > 0
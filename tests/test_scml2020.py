@@ -1,9 +1,23 @@
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
+import torch
 from scml.scml2020 import SCML2020World
 
 from scml_agents import get_agents
 from scml_agents.scml2020 import *
 from scml_agents.scml2020.monty_hall import MontyHall
+from scml_agents.scml2020.monty_hall.nvm_lib.nvm_lib import NVMLib
+from scml_agents.scml2020.monty_hall.nvm_lib2.nvm_lib2 import NVMLib2, UncertaintyModel
+from scml_agents.scml2020.past_frauds.mhirano_agent import (
+    MhiranoAgent,
+    MhiranoController,
+    MhiranoNegotiator,
+)
+from scml_agents.scml2020.team_10 import negotiation as team_10_negotiation
+from scml_agents.scml2020.team_10.hyperparameters import RESPONSE_UTILITY
+from scml_agents.scml2020.team_10.neg_model import load_seller_neg_model
 
 from .switches import (
     SCMLAGENTS_RUN2020,
@@ -32,6 +46,391 @@ def test_can_run(fm):
     do_run(fm)
 
 
+def plan_profit(nvm, buy_plan, sell_plan, T, q_max, current_time):
+    model = UncertaintyModel.get(nvm.num_intermediate_products, nvm.game_length)
+    p_inn = model.prices[nvm.input_product_index]
+    p_out = model.prices[nvm.output_product_index]
+    inn, out = nvm.compute_minima(
+        T,
+        q_max,
+        model.quantities[nvm.input_product_index],
+        model.quantities[nvm.output_product_index],
+    )
+    return sum(
+        out[t][sell_plan[t]] * p_out[t] - inn[t][buy_plan[t]] * p_inn[t]
+        for t in range(current_time, current_time + T)
+    )
+
+
+@pytest.mark.parametrize("n_products,game_length", [(3, 50), (5, 100)])
+def test_nvm_lib2_minima_match_json_distributions(n_products, game_length):
+    # compute_minima must give exactly what compute_min_expectation gives on the distributions of the json files
+    # (whose quantities are stored as strings)
+    qtty = NVMLib2.get_json_dict(
+        str(UncertaintyModel.qtty_path(n_products, game_length))
+    )
+    model = UncertaintyModel.get(n_products, game_length)
+    T, q_max = 5, 10
+    nvm = NVMLib2.__new__(NVMLib2)
+    for current_time in (0, 17, game_length - T):
+        nvm.current_time = current_time
+        for process in range(n_products):
+            inn, out = nvm.compute_minima(
+                T,
+                q_max,
+                model.quantities[process],
+                model.quantities[process + 1],
+            )
+            for minima, product in ((inn, process), (out, process + 1)):
+                assert minima == {
+                    t: NVMLib2.compute_min_expectation(
+                        qtty[f"p{product}"][str(t)], q_max
+                    )
+                    for t in range(current_time, current_time + T)
+                }
+
+
+@pytest.mark.parametrize("n_products,game_length", [(3, 50), (4, 60), (5, 100)])
+@pytest.mark.parametrize("current_time", [0, 47])
+@pytest.mark.parametrize("current_inventory", [0, 40])
+def test_nvm_lib2_dp_is_as_good_as_ilp(
+    n_products, game_length, current_time, current_inventory
+):
+    for process in range(n_products):
+        kwargs = dict(
+            mpnvp_number_of_periods=5,
+            mpnvp_quantities_domain_size=20,
+            game_length=game_length,
+            input_product_index=process,
+            output_product_index=process + 1,
+            num_intermediate_products=n_products,
+            production_cost=1.0,
+            current_inventory=current_inventory,
+            current_time=current_time,
+        )
+        dp = NVMLib2(backend="dp", **kwargs)
+        ilp = NVMLib2(backend="ilp", **kwargs)
+        T, q_max = dp.mpnvp_number_of_periods, 10
+        assert plan_profit(
+            dp, dp.buy_plan, dp.sell_plan, T, q_max, current_time
+        ) == pytest.approx(
+            plan_profit(ilp, ilp.buy_plan, ilp.sell_plan, T, q_max, current_time)
+        )
+        inventory = current_inventory
+        for t in range(current_time, current_time + T):
+            assert 0 <= dp.sell_plan[t] <= inventory
+            inventory += dp.buy_plan[t] - dp.sell_plan[t]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_nvm_lib2_dp_matches_ilp_on_random_problems(seed):
+    # With strictly positive probabilities and random prices the optimal plan is unique.
+    rng = np.random.default_rng(seed)
+    T, q_max, current_time = 5, 10, int(rng.integers(0, 10))
+    current_inventory = int(rng.integers(0, 3 * q_max))
+    nvm = NVMLib2.__new__(NVMLib2)
+    nvm.current_time = current_time
+    times = range(current_time, current_time + T)
+    pmf_inn, pmf_out = rng.dirichlet(np.ones(2 * q_max), size=(2, T))
+    inn_minima = NVMLib2.compute_min_expectations(pmf_inn, q_max)
+    out_minima = NVMLib2.compute_min_expectations(pmf_out, q_max)
+    inn = {t: dict(enumerate(row)) for t, row in zip(times, inn_minima.tolist())}
+    out = {t: dict(enumerate(row)) for t, row in zip(times, out_minima.tolist())}
+    p_inn = {t: rng.uniform(7, 12) for t in times}
+    p_out = {t: rng.uniform(10, 15) for t in times}
+    dp_buy, dp_sell, *_ = nvm.solve_DP(
+        T, q_max, inn, out, p_inn, p_out, current_inventory
+    )
+    ilp_buy, ilp_sell, *_ = nvm.construct_ILP(
+        T, q_max, inn, out, p_inn, p_out, current_inventory
+    )
+    assert dp_buy == ilp_buy
+    assert dp_sell == ilp_sell
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nvm_lib_vectorized_mpnvm_matches_enumeration(seed):
+    rng = np.random.default_rng(seed)
+    T, size = 3, 10
+    sols = rng.integers(0, size, size=(2000, 3 * T))
+    q_min_out, q_min_in = (
+        {
+            t: NVMLib.compute_min_expectation(
+                {str(q): p for q, p in enumerate(rng.dirichlet(np.ones(size)))}, size
+            )
+            for t in range(T)
+        }
+        for _ in range(2)
+    )
+    prices_out = {t: rng.uniform(5, 40) for t in range(T)}
+    prices_in = {t: rng.uniform(1, 20) for t in range(T)}
+    cost = rng.uniform(0, 5)
+    best_value, best_row, positive_solutions = 0.0, None, []
+    for row in map(tuple, sols.tolist()):
+        value = sum(
+            prices_out[t] * q_min_out[t]["min_" + str(row[(t * 3) + 1])]
+            - prices_in[t] * q_min_in[t]["min_" + str(row[t * 3])]
+            - cost * row[(t * 3) + 2]
+            for t in range(T)
+        )
+        if value > best_value:
+            best_value, best_row = value, row
+        if value > 0:
+            positive_solutions.append((row, value))
+    value, plan, positives = NVMLib.solve_mpnvm(
+        sols, q_min_out, q_min_in, prices_out, prices_in, cost
+    )
+    assert value == best_value
+    assert str(plan) == str(NVMLib.pandas_tuple_to_nvm_plan(best_row, T))
+    assert positives == positive_solutions
+
+
+@pytest.mark.parametrize("cost", [40, np.int64(40)])
+def test_nvm_lib_mpnvm_integer_production_cost_on_binary_tables(cost):
+    rng = np.random.default_rng(0)
+    T, size = 3, 10
+    sols = rng.integers(0, size, size=(2000, 3 * T))
+    q_min_out, q_min_in = (
+        {
+            t: NVMLib.compute_min_expectation(
+                {str(q): p for q, p in enumerate(rng.dirichlet(np.ones(size)))}, size
+            )
+            for t in range(T)
+        }
+        for _ in range(2)
+    )
+    prices_out = {t: rng.uniform(50, 100) for t in range(T)}
+    prices_in = {t: rng.uniform(1, 10) for t in range(T)}
+    expected = NVMLib.solve_mpnvm(
+        sols, q_min_out, q_min_in, prices_out, prices_in, float(cost)
+    )
+    value, plan, positives = NVMLib.solve_mpnvm(
+        sols.astype(np.uint8), q_min_out, q_min_in, prices_out, prices_in, cost
+    )
+    assert value == pytest.approx(expected[0])
+    assert str(plan) == str(expected[1])
+    assert len(positives) == len(expected[2])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_team_10_cached_history_state_matches_full_lstm_pass(seed):
+    rng = np.random.default_rng(seed)
+    model = load_seller_neg_model()
+    model.eval()
+    negotiator = SimpleNamespace(_history_state=(None, 0, None))
+    history = []
+    for _ in range(6):
+        candidates = [list(rng.normal(0, 10, RESPONSE_UTILITY + 1)) for _ in range(7)]
+        state = team_10_negotiation.MyFixedUtilityNegotiator.history_state(
+            negotiator, history, model
+        )
+        predicted = team_10_negotiation.predict_candidates(state, candidates, model)
+        for candidate, outcome in zip(candidates, predicted):
+            with torch.no_grad():
+                expected = team_10_negotiation.MyFixedUtilityNegotiator.predict_outcome(
+                    None, history + [candidate], model
+                )[-1]
+            assert outcome == pytest.approx(expected, rel=1e-4, abs=1e-3)
+        history += [list(rng.normal(0, 10, RESPONSE_UTILITY + 1)) for _ in range(2)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("is_seller", [True, False])
+def test_team_10_lockstep_price_search_matches_sequential(seed, is_seller):
+    rng = np.random.default_rng(seed)
+    outcomes = {}
+    price_ranges = {}
+    for time in range(3):
+        for quantity in range(1, rng.integers(1, 6)):
+            start = int(rng.integers(-5, 20))
+            price_ranges[time, quantity] = (start, start + int(rng.integers(-1, 12)))
+            for price in range(start - 1, start + 13):
+                outcomes[time, quantity, price] = float(
+                    rng.choice([-1000.0, rng.normal()])
+                )
+
+    expected = {}
+    for key, (start, end) in price_ranges.items():
+        expected[key] = []
+        while start < end:
+            price = (start + end) // 2
+            outcome = outcomes[(*key, price)]
+            expected[key].append((price, price * 2, outcome))
+            if (outcome < -900) == is_seller:
+                end = price - 1
+            else:
+                start = price + 1
+
+    n_rounds = []
+
+    def score(candidates):
+        n_rounds.append(len(candidates))
+        return [c[2] * 2 for c in candidates], [outcomes[c] for c in candidates]
+
+    assert team_10_negotiation.search_prices(price_ranges, is_seller, score) == expected
+    assert sum(n_rounds) == sum(len(probes) for probes in expected.values())
+
+
+def _mhirano_reference_evaluation(controller, is_seller, offers):
+    # every offer evaluated on its own with Python loops and scipy
+    from scipy.stats import poisson
+
+    awi, parent = controller.parent.awi, controller.parent
+    usage = [int(sum(commands != -1)) for commands in awi.state.commands]
+    diff = parent.inputs_signed - np.array(usage)
+    diff[: awi.current_step - 1] = 0
+    diff[awi.current_step] += awi.state.inventory[awi.my_input_product]
+    for q, t, _ in controller._agreements["sell"]:
+        usage[t - 1] += q
+        diff[t - 1] -= q
+    for i in range(awi.n_steps - 1, awi.current_step - 1, -1):
+        if usage[i] > awi.n_lines:
+            usage[i - 1] += usage[i] - awi.n_lines
+            usage[i] = awi.n_lines
+    for q, t, _ in controller._agreements["buy"]:
+        diff[t] += q
+    t_min = awi.current_step
+    agreements = [
+        max(0, x if is_seller else -x) for x in diff[t_min : t_min + 10].tolist()
+    ]
+    opponents = [
+        (
+            max(q for q, _, _ in data["current_space"]),
+            np.array(list({(t, up) for _, t, up in data["current_space"]})),
+        )
+        for data in controller._negotiating.values()
+        if data["is_seller"] != is_seller
+    ]
+    all_q = sum(agreements) + sum(q for q, _ in opponents)
+    cost = min(awi.profile.costs[0]) * 1.5
+    input_price, output_price = awi.catalog_prices[:2]
+    results = []
+    for q, t, up in offers:
+        ev = [0.0] * q
+        if all_q and not is_seller:
+            agreed = sum(agreements[max(t - t_min, 0) :]) if up <= input_price else 0
+            ev = [min(agreed, i + 1) / all_q for i in range(q)]
+        elif all_q and up >= output_price:
+            starts = [
+                i
+                for i in range(min(t, awi.n_steps - 1) - 1, t_min - 1, -1)
+                for _ in range(awi.n_lines - usage[i])
+            ][:q]
+            starts += [-1] * (q - len(starts))
+            for j, start in enumerate(starts):
+                if start >= t_min and sum(agreements[: start - t_min + 1]) > j + 1:
+                    ev[j] = j / all_q
+        for q_target, t_up in opponents:
+            probs = poisson.pmf(t_up[:, 1], output_price if is_seller else input_price)
+            probs = probs / probs.sum()
+            if is_seller:
+                covered = (t_up[:, 0] <= t) * (t_up[:, 1] < up - cost)
+            else:
+                covered = (t_up[:, 0] >= t) * (t_up[:, 1] > up + cost)
+            for i in range(min(q, q_target)):
+                ev[i] += sum(covered * probs) / all_q
+        results.append(sum(ev[: q - 1]))
+    return results
+
+
+def _mhirano_controller(rng, n_negotiations):
+    n_steps, n_lines, step = 40, 5, int(rng.integers(0, 25))
+    commands = np.where(rng.random((n_steps, n_lines)) < 0.4, 0, -1)
+    awi = SimpleNamespace(
+        current_step=step,
+        n_steps=n_steps,
+        n_lines=n_lines,
+        state=SimpleNamespace(
+            commands=commands, inventory=rng.integers(0, 20, 3), n_lines=n_lines
+        ),
+        catalog_prices=np.array([int(rng.integers(5, 20)), 25, 40]),
+        my_input_product=0,
+        my_output_product=1,
+        profile=SimpleNamespace(costs=np.full((n_lines, 2), 2)),
+    )
+    parent = SimpleNamespace(awi=awi, inputs_signed=rng.integers(0, 8, n_steps))
+    MhiranoAgent.update_line_usage(parent)
+    controller = MhiranoController(
+        parent=parent, default_negotiator_type=MhiranoNegotiator
+    )
+    for side in ("sell", "buy"):
+        controller._agreements[side] = [
+            (int(rng.integers(1, 10)), int(rng.integers(step + 1, n_steps)), 20)
+            for _ in range(rng.integers(0, 3))
+        ]
+    for k in range(n_negotiations):
+        q, t, p = (
+            rng.integers(1, 12),
+            rng.integers(step + 1, n_steps - 8),
+            rng.integers(1, 40),
+        )
+        space = [
+            (int(q_), int(t_), int(p_))
+            for q_ in range(1, q + 1)
+            for t_ in range(t, t + rng.integers(1, 8))
+            for p_ in range(p, p + rng.integers(1, 20))
+        ]
+        controller._negotiating[str(k)] = dict(
+            is_seller=bool(rng.random() < 0.5),
+            current_space=controller._slim_outcomes(space),
+        )
+    return controller
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_mhirano_evaluation_matches_offer_by_offer(seed):
+    rng = np.random.default_rng(seed)
+    controller = _mhirano_controller(rng, 12)
+    for k, data in list(controller._negotiating.items())[:4]:
+        offers = data["current_space"]
+        sample = rng.choice(len(offers), min(len(offers), 30), replace=False)
+        expected = _mhirano_reference_evaluation(
+            controller, data["is_seller"], [offers[i] for i in sample]
+        )
+        # exact equality: ties between offers decide what is proposed
+        evaluation = controller._get_current_eval_all(k, data["is_seller"], offers)
+        assert [evaluation[i] for i in sample] == expected
+        assert [
+            controller._get_current_eval(k, data["is_seller"], offers[i])
+            for i in sample[:5]
+        ] == expected[:5]
+
+
+@pytest.mark.parametrize("n_negotiations", [10, 20])
+def test_mhirano_evaluation_is_faster_than_offer_by_offer(n_negotiations):
+    import time
+
+    rng = np.random.default_rng(0)
+    controller = _mhirano_controller(rng, n_negotiations)
+    calls = [
+        (k, data["is_seller"], data["current_space"][:30])
+        for k, data in controller._negotiating.items()
+    ]
+    for k, is_seller, offers in calls:
+        # warm the per step tables as the agent does on its first call of a step
+        controller._get_current_eval_all(k, is_seller, offers)
+
+    def per_call(evaluate, repeats):
+        # the best of a few rounds to be robust to other load on the machine
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                for k, is_seller, offers in calls:
+                    evaluate(k, is_seller, offers)
+            times.append((time.perf_counter() - start) / (repeats * len(calls)))
+        return min(times)
+
+    tabulated = per_call(controller._get_current_eval_all, 10)
+    reference = per_call(
+        lambda _, is_seller, offers: _mhirano_reference_evaluation(
+            controller, is_seller, offers
+        ),
+        1,
+    )
+    assert reference / tabulated >= 20
+
+
 # def test_can_run_agent30():
 #     from negmas.helpers.types import get_class
 #     do_run(get_class("scml_agents.scml2020.team_25.Agent30"))
@@ -1,11 +1,34 @@
+from types import SimpleNamespace
+
+import numpy as np
 import pytest
 from pytest import mark
-from scml.oneshot import SCML2020OneShotWorld
+from scml.oneshot import OneShotUFun, SCML2020OneShotWorld
+from scml.oneshot.agents import GreedyOneShotAgent
 from scml.scml2020 import SCML2021World
 
-from scml_agents import get_agents
+from scml_agents import get_agents, models
 from scml_agents.scml2020 import *
+from scml_agents.scml2021.oneshot.team_51 import qlagent_extended_state
+from scml_agents.scml2021.oneshot.team_73 import nego_utils as gentle_utils
 from scml_agents.scml2021.oneshot.team_73.oneshot_agents import Gentle
+from scml_agents.scml2021.oneshot.team_90 import run as team_90
+from scml_agents.scml2021.oneshot.team_corleone.godfather import (
+    godfather,
+    outcome_distr,
+)
+from scml_agents.scml2021.oneshot.team_corleone.godfather.offer import Offer
+from scml_agents.scml2021.oneshot.team_corleone.godfather.spaces import (
+    OfferSpace,
+    OutcomeSpace,
+)
+from scml_agents.scml2021.standard.bossagent import helper as boss_helper
+from scml_agents.scml2021.standard.bossagent.BossNegoStats import BossNegoStats
+from scml_agents.scml2021.standard.team_mediocre import Bidding as mediocre_bidding
+from scml_agents.scml2021.standard.team_mediocre.OpponentModel import (
+    ConcessionEstimator,
+)
+from scml_agents.scml2021.standard.team_mediocre.mediocre import MediocreNegotiator
 from scml_agents.scml2021.standard.team_67.polymorphic_agent import PolymorphicAgent
 from scml_agents.scml2021.standard.team_82.perry import PerryTheAgent
 
@@ -91,5 +114,457 @@ def test_can_run_oneshot(fm):
     assert sum(world.stats["n_contracts_concluded"]) >= 0
 
 
+def test_ql_agent_reads_learned_q_tables_from_working_directory(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    monkeypatch.chdir(tmp_path)
+    assert not qlagent_extended_state.QlAgent().load_q
+
+    # learned tables are looked up with the values of the state (here, the needs of INIT states)
+    learned = {"2.0": {(i, j): 7.0 for i in range(5) for j in range(5)}}
+    (tmp_path / "q_seller.txt").write_text(str(learned))
+    (tmp_path / "q_buyer.txt").write_text("{}")
+    agent = qlagent_extended_state.QlAgent()
+    assert agent.load_q and agent.learned_q_seller_t == learned
+    agent.ne_range = np.arange(-1.0, 5.0)
+    agent.is_seller = True
+    issue = SimpleNamespace(min_value=10, max_value=20)
+    nmi = SimpleNamespace(issues=[issue, None, issue])
+    q = agent._q_learning_q_init(issue, issue, dict(), True, nmi)
+    layout = agent.q_layout
+    assert (q[layout.state_index["3"], :-2] == 7.0).all()
+    assert (q[layout.state_index["2"], :-2] != 7.0).all()
+
+
+def test_ql_agent_reads_converted_learned_q_tables(tmp_path, monkeypatch):
+    import os
+
+    monkeypatch.chdir(tmp_path)
+    layout = qlagent_extended_state.QTableLayout.get(2, 2, 3)
+    rng = np.random.default_rng(0)
+    learned = layout.to_dict(rng.uniform(-10, 10, layout.shape))
+    (tmp_path / "q_seller.txt").write_text(str(learned))
+    assert qlagent_extended_state.convert_learned_q_table("q_seller.txt", 2, 2, 3) == (
+        "q_seller.npz"
+    )
+    assert qlagent_extended_state.load_learned_q_table("q_seller.txt") == learned
+    # a changed text file is read instead of its outdated conversion
+    changed = layout.to_dict(np.zeros(layout.shape))
+    (tmp_path / "q_seller.txt").write_text(str(changed) + "\n")
+    assert qlagent_extended_state.load_learned_q_table("q_seller.txt") == changed
+    # the conversion is enough on its own
+    os.remove("q_seller.txt")
+    assert qlagent_extended_state.load_learned_q_table("q_seller.txt") == learned
+
+
+def test_ql_agent_learned_q_table_conversions_are_up_to_date():
+    import hashlib
+    from pathlib import Path
+
+    for path in Path(qlagent_extended_state.__file__).parent.glob("q_*.txt"):
+        with np.load(qlagent_extended_state.learned_q_table_binary(str(path))) as data:
+            assert str(data["source"]) == hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def test_ql_agent_q_table_layout_rejects_partial_tables():
+    layout = qlagent_extended_state.QTableLayout.get(2, 2, 3)
+    q_t = layout.to_dict(np.zeros(layout.shape))
+    del q_t[(0, 0, 0)]["acc"]
+    with pytest.raises(ValueError):
+        layout.from_dict(q_t)
+    with pytest.raises(ValueError):
+        layout.from_dict({(9, 9, 9): {}})
+
+
+def godfather_estimator(rng, is_selling, n_samples, enable_safety_checks=False):
+    """A stand-in for GodfatherAgent carrying only what _est_bilat_ufun reads"""
+    ex_q, ex_p = int(rng.integers(0, 12)), int(rng.integers(5, 40))
+    ufun = OneShotUFun(
+        ex_pin=ex_q * ex_p if is_selling else 0,
+        ex_qin=ex_q if is_selling else 0,
+        ex_pout=0 if is_selling else ex_q * ex_p,
+        ex_qout=0 if is_selling else ex_q,
+        input_product=0 if is_selling else 1,
+        input_agent=is_selling,
+        output_agent=not is_selling,
+        production_cost=float(rng.uniform(0, 3)),
+        disposal_cost=float(rng.uniform(0, 1)),
+        shortfall_penalty=float(rng.uniform(0, 2)),
+        input_penalty_scale=None if rng.random() < 0.5 else float(rng.uniform(1, 5)),
+        output_penalty_scale=None if rng.random() < 0.5 else float(rng.uniform(1, 5)),
+        n_input_negs=4,
+        n_output_negs=4,
+        current_step=0,
+        n_lines=int(rng.integers(3, 12)),
+    )
+    min_p = int(rng.integers(5, 20))
+    offer_space = OfferSpace(min_p, min_p + 3, 0, 10, Offer(0, 0))
+    outcome_space = OutcomeSpace(offer_space)
+    agent = SimpleNamespace(
+        ufun=ufun,
+        awi=SimpleNamespace(current_step=0),
+        enable_safety_checks=enable_safety_checks,
+        _num_sample_outcomes=n_samples,
+        _is_selling=lambda: is_selling,
+        _get_offer_space=lambda j: offer_space,
+        _get_outcome_space=lambda j: outcome_space,
+    )
+    for name in ("_est_bilat_ufun", "_est_util_table", "update_util_table"):
+        setattr(agent, name, getattr(godfather.GodfatherAgent, name).__get__(agent))
+    q_probs = rng.dirichlet(np.ones(11)).tolist()
+    q_probs[-1] = 1 - sum(q_probs[:-1])
+    distrs = {
+        "point": outcome_distr.OutcomeDistrPoint(
+            outcome_space, Offer(min_p + 1, int(rng.integers(0, 11)))
+        ),
+        "uniform": outcome_distr.OutcomeDistrUniform(outcome_space),
+        "random": outcome_distr.OutcomeDistrRandom(outcome_space),
+        "marginal": outcome_distr.OutcomeDistrMarginal(outcome_space, q_probs, min_p),
+        "j": outcome_distr.OutcomeDistrUniform(outcome_space),
+    }
+    return agent, distrs
+
+
+@mark.parametrize("seed", range(10))
+@mark.parametrize("is_selling", [True, False])
+def test_godfather_vectorized_util_table_matches_sampling_loop(seed, is_selling):
+    rng = np.random.default_rng(seed)
+    agent, distrs = godfather_estimator(
+        rng, is_selling, n_samples=int(rng.integers(1, 20))
+    )
+    np.random.seed(seed)
+    fast = agent._est_bilat_ufun("j", distrs)
+    after_fast = np.random.random()
+    agent.enable_safety_checks = True  # takes the sample by sample path
+    np.random.seed(seed)
+    slow = agent._est_bilat_ufun("j", distrs)
+    assert np.random.random() == after_fast
+    assert fast._util_table.keys() == slow._util_table.keys()
+    for outcome, util in slow._util_table.items():
+        assert fast._util_table[outcome] == pytest.approx(util, rel=1e-12, abs=1e-9)
+
+
+def test_pdp_sync_agent_knapsack_table_matches_memoized_recursion():
+    def knapsack(t, quantities, needs, n):
+        if n == 0 or needs == 0:
+            return 0
+        if t[n][needs] != -1:
+            return t[n][needs]
+        t[n][needs] = knapsack(t, quantities, needs, n - 1)
+        if quantities[n - 1] <= needs:
+            t[n][needs] = max(
+                t[n][needs],
+                quantities[n - 1]
+                + knapsack(t, quantities, needs - quantities[n - 1], n - 1),
+            )
+        return t[n][needs]
+
+    rng = np.random.default_rng(0)
+    table = team_90.KnapsackTable()
+    for _ in range(500):
+        n, needs = int(rng.integers(0, 8)), int(rng.integers(0, 15))
+        quantities = rng.integers(1, 10, n).tolist()
+        expected = [[-1] * (needs + 1) for _ in range(n + 1)]
+        knapsack(expected, quantities, needs, n)
+        assert table.fill(quantities, needs).tolist() == expected
+
+
+@pytest.mark.skipif(not SCMLAGENTS_RUN2021, reason="Skipping 2021")
+def test_pdp_sync_agent_round_latency(monkeypatch):
+    import pickle
+    import time
+
+    loads, times = [], []
+    load = pickle.load
+    monkeypatch.setattr(models, "_MODELS", dict())
+    monkeypatch.setattr(models, "_LOADS", dict())
+    monkeypatch.setattr(pickle, "load", lambda f: loads.append(f.name) or load(f))
+    counter_all = team_90.PDPSyncAgent.counter_all
+
+    def timed(self, offers, states):
+        start = time.perf_counter()
+        responses = counter_all(self, offers, states)
+        times.append(time.perf_counter() - start)
+        return responses
+
+    monkeypatch.setattr(team_90.PDPSyncAgent, "counter_all", timed)
+    world = SCML2020OneShotWorld(
+        **SCML2020OneShotWorld.generate(
+            agent_types=[team_90.PDPSyncAgent, GreedyOneShotAgent], n_steps=10
+        ),
+        compact=True,
+        no_logs=True,
+    )
+    world.run()
+    assert times
+    assert len(loads) == len(set(loads)) <= 2
+    # about a millisecond per round once the models are loaded (loose to keep slow machines green)
+    assert np.median(times) < 0.05
+
+
+def test_boss_nego_stats_history(tmp_path):
+    import json
+
+    stats = BossNegoStats(SimpleNamespace(id="me", my_consumers=["c0", "c1"]))
+
+    def history(by, accept=None):
+        bids = {
+            0: dict(agentID=by, q=2, t=5, p=10),
+            1: dict(agentID="me", q=3, t=5, p=9),
+        }
+        if accept is not None:
+            bids["Acceptance"] = dict(accept=accept, q=3, t=6, p=accept * 11)
+        return bids
+
+    stats.set_negotiation_bid_history(0, "c0", "m0", history("c0", 1))
+    stats.set_negotiation_bid_history(0, "s0", "m1", history("s0", 1))
+    stats.set_negotiation_bid_history(1, "c0", "m2", history("c0"))
+    stats.set_negotiation_bid_history(2, "c0", "m3", history("c0", 2))
+    # recording a negotiation again replaces its bids and agreement
+    stats.set_negotiation_bid_history(2, "c0", "m3", history("c0", 1))
+    stats.set_negotiation_bid_sign(2, "c0", "m3", 1, 0)
+    stats.set_negotiation_bid_sign(0, "s0", "m1", 1, 0)
+
+    bids = stats.get_negotiation_bid_history(2, "c0")
+    assert list(bids) == ["m3"]
+    assert bids["m3"]["p"].tolist() == [10, 9]
+    assert bids["m3"]["by_agent"].tolist() == [False, True]
+    assert stats.get_negotiation_bid_history(3, "c0") == dict()
+    p, q, t = stats.get_accepted_offers("buyer", "c0")
+    assert (p.tolist(), q.tolist(), t.tolist()) == ([11, 11], [3, 3], [6, 6])
+    assert stats.get_accepted_offers("seller", "c0")[0].tolist() == []
+    signs = stats.negotiations.view()[["agent_sign", "opponent_sign"]].tolist()
+    assert signs == [(-1, -1), (-1, 0), (-1, -1), (1, -1)]
+
+    # the planner extends the same action list within a step
+    actions = [0, -1]
+    stats.set_opponent_respond_history("s0", 0, actions)
+    actions.append(1)
+    stats.set_opponent_respond_history("s0", 0, actions)
+    stats.set_agent_respond_history("c1", 0, 1)
+    assert stats.get_opponent_respond_history("s0", 0)["action"].tolist() == [0, -1, 1]
+    assert len(stats.get_opponent_respond_history()) == 3
+    assert stats.get_agent_respond_history("c1", 0)["action"].tolist() == [1]
+    assert len(stats.get_agent_respond_history("c1", 1)) == 0
+
+    stats.flush(tmp_path)
+    negotiations = json.loads((tmp_path / "negotiations.json").read_text())
+    assert [_["mechanism"] for _ in negotiations] == ["m0", "m1", "m2", "m3"]
+    assert [_["role"] for _ in negotiations] == ["buyer", "seller", "buyer", "buyer"]
+    responds = json.loads((tmp_path / "opponent_respond_history.json").read_text())
+    assert {_["partner"] for _ in responds} == {"s0"}
+
+    # the controller keeps updating its history dicts after recording them
+    live = history("s0")
+    stats.set_negotiation_bid_history(3, "s0", "m4", live)
+    live[0]["p"] = 99
+    live["Acceptance"] = dict(accept=1, q=1, t=1, p=1)
+    assert stats.get_negotiation_bid_history(3, "s0")["m4"]["p"].tolist() == [10, 9]
+    assert stats.get_accepted_offers("seller", "s0")[0].tolist() == [11]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_boss_capacity_index_matches_schedule_scans(seed):
+    def dispatch(schedule, amount, start, finish):
+        reserved = {}
+        for step in range(start, finish):
+            if schedule[step] > 0:
+                if amount - schedule[step] > 0:
+                    amount -= schedule[step]
+                    reserved[step], schedule[step] = schedule[step], 0
+                else:
+                    schedule[step] -= amount
+                    reserved[step] = amount
+                    return True, reserved
+        return False, reserved
+
+    def seller_closest(schedule, amount, end):
+        for step in reversed(range(end)):
+            if schedule[step] > 0:
+                if amount - schedule[step] <= 0:
+                    return step
+                amount -= schedule[step]
+        return -1
+
+    rng = np.random.default_rng(seed)
+    for _ in range(200):
+        n, n_lines = int(rng.integers(1, 20)), int(rng.integers(1, 10))
+        awi = rng.integers(0, n, int(rng.integers(0, n * n_lines))).tolist()
+        schedule = boss_helper.format_schedule(awi, n)
+        expected = {i: awi.count(i) for i in range(n)}
+        assert schedule == expected
+        for _ in range(10):
+            amount = int(rng.integers(-1, 3 * n_lines))
+            start = int(rng.integers(0, n))
+            finish = int(rng.integers(start, n + 1))
+            available, reserved = dispatch(dict(expected), amount, start, finish)
+            assert boss_helper.is_schedule_available(
+                schedule, amount, start, finish
+            ) == (available, reserved)
+            assert boss_helper.buyer_closest_available_delivery(
+                schedule, amount, start, finish
+            ) == (max(reserved) + 1 if available else -1)
+            assert boss_helper.seller_closest_available_delivery(
+                schedule, amount, finish
+            ) == seller_closest(expected, amount, finish)
+            assert boss_helper.most_available_amount_in_schedule(
+                schedule, start, finish
+            ) == sum(expected[i] for i in range(start, finish))
+            assert boss_helper.calculate_produced_quantity(
+                schedule, start, n_lines
+            ) == sum(n_lines - expected[i] for i in range(start))
+            # reserving updates the index as dispatching does on the dict
+            _, partner_schedule = boss_helper.schedule_dispatch_production(
+                schedule, amount, start, finish
+            )
+            dispatch(expected, amount, start, finish)
+            assert partner_schedule == reserved and schedule == expected
+            assert [schedule.prefix(i) for i in range(n + 1)] == [
+                sum(expected[j] for j in range(i)) for i in range(n + 1)
+            ]
+            if rng.random() < 0.5:
+                schedule.release(partner_schedule)
+                for step, quantity in partner_schedule.items():
+                    expected[step] += quantity
+                assert schedule == expected
+
+
+@pytest.mark.parametrize("to_sell", [True, False])
+def test_mediocre_bid_space_matches_bid_by_bid_evaluation(to_sell):
+    from itertools import product
+
+    rng = np.random.default_rng(0)
+    bidding = mediocre_bidding.SellBidding if to_sell else mediocre_bidding.BuyBidding
+    for _ in range(50):
+        qmin, pmin = rng.integers(0, 5), rng.integers(1, 20)
+        qmax = qmin + rng.choice([rng.integers(0, 15), rng.integers(90, 130)])
+        pmax = pmin + rng.integers(0, 25)
+        valid_q = sorted(rng.integers(qmin, qmax + 1, 2))
+        valid_p = sorted(rng.integers(max(0, pmin - 3), pmax + 4, 2))
+        params = dict(
+            q_bounds=[qmin, qmax],
+            p_bounds=[pmin, pmax],
+            t_bounds=[1, 5],
+            output_catalog_price=pmax,
+            input_catalog_price=pmin,
+            traded_price=pmin,
+            alpha=rng.choice([-1, -0.75, -0.5]),
+            beta=round(rng.uniform(0.25, 1), 3),
+            reasonable_q=(qmin + qmax) / 2,
+            prod_cap=10,
+        )
+        negotiator = SimpleNamespace(to_sell=to_sell, valid_p_bounds=valid_p)
+
+        def make():
+            return bidding(
+                0,
+                True,
+                0.5,
+                0,
+                params,
+                [valid_q, [1, 5], valid_p],
+                lambda bid: MediocreNegotiator.utility_func(negotiator, bid),
+                utility_grid=lambda q, p: MediocreNegotiator.utility_grid(
+                    negotiator, q, p
+                ),
+                utility_key=(to_sell, valid_p[0]),
+            )
+
+        first, second = make(), make()
+        if not first.generate_offerable_set():
+            continue
+        assert second.generate_offerable_set()
+        assert second.offerable_bids is first.offerable_bids
+        expected = sorted(
+            (-first.utility_func(bid), *bid)
+            for bid in product(first.q_range, first.p_range)
+            if first.find_bid_zone(bid) in first.offerable_zones
+            and valid_q[0] <= bid[0] <= valid_q[1]
+            and valid_p[0] <= bid[1] <= valid_p[1]
+        )
+        bids = first.offerable_bids
+        assert sorted(zip(-bids["utility"], bids["q"], bids["p"])) == expected
+        assert (np.diff(bids["utility"]) <= 0).all()
+        assert first.max_utility == -expected[0][0]
+
+
+def test_mediocre_concession_estimator_matches_regression():
+    from sklearn.linear_model import LinearRegression
+    from sklearn.preprocessing import MinMaxScaler
+
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        estimator = ConcessionEstimator(window=4)
+        bids = []
+        for nego_round in np.cumsum(rng.integers(1, 3, rng.integers(1, 30))):
+            bid = rng.integers(0, 12), rng.integers(0, 30), rng.integers(1, 40)
+            utility = round(rng.choice([rng.random(), rng.integers(0, 4) / 3]), 3)
+            bids.append((nego_round, *bid, utility))
+            estimator.add(nego_round, *bid, utility)
+            params = estimator.behavior_params()
+            data = np.array(bids, dtype=float)
+            if len(bids) == 1:
+                assert params["concession_rate"] == -1
+                assert params["q_bounds"] == [bid[0], bid[0]]
+                continue
+            window = data[-4:]
+            reg = LinearRegression().fit(
+                MinMaxScaler().fit_transform(window[:, :1]),
+                MinMaxScaler().fit_transform(window[:, 4:]),
+            )
+            assert params["concession_rate"] == pytest.approx(reg.coef_[0][0], abs=1e-9)
+            mean, std = data.mean(axis=0), data.std(axis=0, ddof=1)
+            assert params["q_bounds"] == [
+                max(0, int(mean[1] - std[1])),
+                int(mean[1] + std[1]),
+            ]
+            assert params["t_bounds"] == [
+                max(0, int(mean[2] - std[2])),
+                int(mean[2] + std[2]),
+            ]
+
+
+def test_gentle_agreement_index_matches_contract_scans():
+    rng = np.random.default_rng(0)
+    names = ["a", "b", "c"]
+    contracts, index = [], gentle_utils.AgreementIndex()
+    for _ in range(40):
+        contract = SimpleNamespace(
+            partners=list(rng.choice(names, 2)),
+            agreement=dict(
+                unit_price=int(rng.integers(0, 30)), time=int(rng.integers(0, 10))
+            ),
+            mechanism_state=dict(current_proposer=str(rng.choice(names))),
+        )
+        contracts.append(contract)
+        index.append(contract)
+        assert index.steps == {_.agreement["time"] for _ in contracts}
+        for is_selling in (True, False):
+            for name in names + ["d"]:
+                nmi = SimpleNamespace(annotation=dict(buyer=name, seller=name))
+                agreements = gentle_utils.opponent_agreements(
+                    nmi, is_selling, contracts
+                )
+                for proposer in names:
+                    assert index.n_proposed_by(name, is_selling, proposer) == len(
+                        [
+                            _
+                            for _ in agreements
+                            if _.mechanism_state["current_proposer"] == proposer
+                        ]
+                    )
+                for f in (
+                    gentle_utils.opponent_agreements,
+                    gentle_utils.worst_opp_acc_price,
+                ):
+                    assert f(nmi, is_selling, index) == f(nmi, is_selling, contracts)
+            assert gentle_utils.opponent_rank(
+                names + ["d"], is_selling, index
+            ) == gentle_utils.opponent_rank(names + ["d"], is_selling, contracts)
+    assert list(index) == contracts
+    with pytest.raises(TypeError):
+        index.pop()
+
+
 if __name__ == "__main__":
     pytest.main(args=[__file__])
@@ -1,3 +1,9 @@
+import random
+import statistics
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
 import pytest
 from pytest import mark
 from scml.oneshot import SCML2020OneShotWorld
@@ -5,6 +11,14 @@ from scml.scml2020 import SCML2022World
 
 from scml_agents import get_agents
 from scml_agents.scml2020 import *
+from scml_agents.scml2022.oneshot.team_105.agent import (
+    AdaptivePercentile,
+    MMMAgentPercentile,
+)
+from scml_agents.scml2022.oneshot.team_106.moving_average_agent import (
+    AdaptiveMovingAverage,
+)
+from scml_agents.scml2022.oneshot.team_107.regression_agent import EVEAgent
 from scml_agents.scml2022.oneshot.team_134.agent119 import PatientAgent
 
 # from scml_agents.scml2022.oneshot.team102 import GentleS as Gentle
@@ -93,5 +107,101 @@ def test_can_run_oneshot(fm):
     assert sum(world.stats["n_contracts_concluded"]) >= 0
 
 
+def _ewm_mean(prices, default):
+    # how AdamAgent averaged the whole price history before using streaming stats
+    if not prices:
+        return default
+    best_alpha, best_error = 0.1, None
+    for alpha in (_ * 0.1 for _ in range(1, 10)):
+        if len(prices) < 2:
+            break
+        mean = pd.Series(prices[:-1]).ewm(alpha=alpha, adjust=False).mean().iloc[-1]
+        if best_error is None or abs(mean - prices[-1]) < best_error:
+            best_alpha, best_error = alpha, abs(mean - prices[-1])
+    return pd.Series(prices).ewm(alpha=best_alpha, adjust=False).mean().iloc[-1]
+
+
+def test_adaptive_moving_average_matches_history_scan():
+    rng = random.Random(0)
+    for _ in range(20):
+        average, prices = AdaptiveMovingAverage(), []
+        assert average.value(7) == 7
+        for _ in range(rng.randint(1, 25)):
+            price = rng.choice([rng.randint(5, 40), rng.uniform(5, 40)])
+            average.add(price)
+            prices.append(price)
+            assert average.value(7) == _ewm_mean(prices, 7)
+
+
+def _expected_price_range(agent_type, prices, selling):
+    # how the agents computed their price range from the list of best prices before using streaming stats
+    from sklearn.linear_model import LinearRegression
+
+    mn, mx = 10, 30
+    if agent_type is EVEAgent:
+        if prices:
+            x = np.arange(len(prices)).reshape(-1, 1)
+            reg = LinearRegression().fit(x, np.array(prices))
+            trend = reg.predict(np.array([[len(prices) + 1]])).item()
+            if selling:
+                mn = max(mn, statistics.mean(prices), trend)
+            else:
+                mx = min(mx, statistics.mean(prices), trend)
+        return pytest.approx((mn, mx), abs=1e-9)
+    if selling:
+        mn = (statistics.mean(prices) if prices else mn) + 1
+    else:
+        mx = (statistics.mean(prices) if prices else mx) - 1
+    if agent_type is MMMAgentPercentile:
+        if selling:
+            mn = (np.percentile(prices, 20) if prices else mn) + 1
+        else:
+            mx = (np.percentile(prices, 80) if prices else mx) - 1
+    return mn, mx
+
+
+@mark.parametrize("agent_type", [AdaptivePercentile, MMMAgentPercentile, EVEAgent])
+def test_adaptive_price_agents_match_history_scan(agent_type):
+    rng = random.Random(0)
+    nmis = {
+        partner: SimpleNamespace(
+            annotation=dict(product=int(partner == "buyer")),
+            issues=[
+                SimpleNamespace(min_value=1, max_value=10),
+                SimpleNamespace(min_value=0, max_value=0),
+                SimpleNamespace(min_value=10, max_value=30),
+            ],
+            n_steps=20,
+        )
+        for partner in ("buyer", "seller")
+    }
+    agent = agent_type()
+    agent._awi = SimpleNamespace(
+        current_exogenous_input_quantity=5,
+        current_exogenous_output_quantity=5,
+        my_output_product=1,
+        current_step=0,
+    )
+    agent.get_nmi = nmis.get
+    for _ in range(5):
+        agent.before_step()
+        # the best selling (buying) prices received every time they improved
+        best = dict(buyer=[], seller=[])
+        for _ in range(30):
+            partner = rng.choice(["buyer", "seller"])
+            price = rng.randint(10, 30)
+            offer = (rng.randint(1, 10), 0, price)
+            agent.respond(partner, SimpleNamespace(current_offer=offer, step=0))
+            better = max if partner == "buyer" else min
+            if not best[partner] or better(price, better(best[partner])) != better(
+                best[partner]
+            ):
+                best[partner].append(price)
+            for name, nmi in nmis.items():
+                assert agent._price_range(nmi) == _expected_price_range(
+                    agent_type, best[name], name == "buyer"
+                )
+
+
 if __name__ == "__main__":
     pytest.main(args=[__file__])
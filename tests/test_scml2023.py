@@ -1,10 +1,24 @@
+import itertools
+import pathlib
+import sys
+from types import SimpleNamespace
+
 import pytest
+import torch
 from pytest import mark
 from scml.oneshot import SCML2020OneShotWorld
 from scml.scml2020 import SCML2023World
 
 from scml_agents import get_agents
 from scml_agents.scml2020 import *
+from scml_agents.scml2023.oneshot.team_102 import RLIndAgent
+from scml_agents.scml2023.oneshot.team_102.sources.rl.action import IndMultiDiscreteAM
+from scml_agents.scml2023.oneshot.team_102.sources.rl.model import (
+    FrozenOneshotPolicy,
+)
+from scml_agents.scml2023.oneshot.team_102.sources.rl.observe import (
+    IndMultiDiscreteOM,
+)
 from scml_agents.scml2023.oneshot.team_poli_usp import QuantityOrientedAgent
 
 from .switches import (
@@ -90,5 +104,90 @@ def test_can_run_oneshot(fm):
     assert sum(world.stats["n_contracts_concluded"]) >= 0
 
 
+def test_rl_ind_agent_frozen_policy_grid_matches_single_observations():
+    om, am = IndMultiDiscreteOM(), IndMultiDiscreteAM()
+    path = str(
+        pathlib.Path(sys.modules[RLIndAgent.__module__].__file__).parent.parent
+        / "PPO_preTrained/OneShot-Seller/models/Ind_PPO_I-MD-AM_I-MD-OM_64-32-32_BEST.pth"
+    )
+    policy = FrozenOneshotPolicy.get(path, om.state_dim, am.action_space, [64, 32, 32])
+    assert policy is FrozenOneshotPolicy.get(
+        path, om.state_dim, am.action_space, [64, 32, 32]
+    )
+    assert not any(p.requires_grad for p in policy.actor.parameters())
+
+    nmi = SimpleNamespace(
+        issues=[None, None, SimpleNamespace(min_value=9, max_value=11)]
+    )
+    for offer_time in (0, 7, 30):
+        grid = policy.grid_outputs(om, offer_time)
+        for step, needs, quantity, price in itertools.product(
+            range(0, 25, 4), range(-2, 14, 3), range(0, 13, 3), (9, 11)
+        ):
+            offer = (quantity, offer_time, price)
+            state = SimpleNamespace(step=step)
+            assert torch.allclose(
+                grid[om.grid_index(offer, state, needs, nmi)],
+                policy.actor_outputs(om.encode(offer, state, needs, nmi)),
+                atol=1e-5,
+            )
+
+
+@mark.parametrize("with_friends", [False, True])
+def test_team_140_contract_selection_matches_enumeration(with_friends):
+    import random
+
+    from scml_agents.scml2023.standard.team_140.signing import (
+        select_output_contracts,
+    )
+
+    rng = random.Random(0)
+    for _ in range(300):
+        n = rng.randint(0, 7)
+        quantities = [rng.randint(1, 6) for _ in range(n)]
+        prices = [rng.randint(8, 12) for _ in range(n)]
+        rates = [rng.choice([0.5, 1.0]) for _ in range(n)]
+        friends = [rng.random() < 0.3 for _ in range(n)] if with_friends else None
+        target_quantity = target = rng.randint(-2, 25)
+        weight = rng.uniform(-1, 1)
+        price_weight, rate_weight = 0.5 - 0.5 * weight, 0.5 + 0.5 * weight
+
+        # the original search: the combinations with the largest total quantity up
+        # to the target then the most valuable one preferring those with friends
+        combinations = [
+            c for r in range(1, n + 1) for c in itertools.combinations(range(n), r)
+        ]
+        candidates = []
+        while not candidates and target > 0:
+            candidates = [
+                c for c in combinations if sum(quantities[_] for _ in c) == target
+            ]
+            target -= 1
+        selected = select_output_contracts(
+            quantities,
+            prices,
+            rates,
+            target_quantity,
+            price_weight,
+            rate_weight,
+            friends,
+        )
+        if not candidates:
+            assert selected == []
+            continue
+        max_up = max(prices[_] for c in candidates for _ in c)
+
+        def key(c):
+            value = sum(
+                price_weight * prices[_] / max_up + rate_weight * rates[_] for _ in c
+            )
+            return (friends is not None and any(friends[_] for _ in c), value)
+
+        expected = max(key(c) for c in candidates)
+        found = key(selected)
+        assert sum(quantities[_] for _ in selected) == target + 1
+        assert found[0] == expected[0] and found[1] == pytest.approx(expected[1])
+
+
 if __name__ == "__main__":
     pytest.main(args=[__file__])
@@ -1,3 +1,4 @@
+import pytest
 from pytest import mark
 
 from scml_agents import get_agents
@@ -204,3 +205,432 @@ def test_winners_2020():
     assert len(agents) == 2
     agents = get_agents(2020, track="all", winners_only=True)
     assert len(agents) == 4
+
+
+def test_get_agents_names_import_no_agents():
+    import json
+    import subprocess
+    import sys
+
+    code = (
+        "import json, sys, time\n"
+        "_start = time.perf_counter()\n"
+        "from scml_agents import get_agents\n"
+        "_imported = time.perf_counter()\n"
+        "names = get_agents('all', as_class=False)\n"
+        "print(json.dumps(dict(\n"
+        "    n=len(names),\n"
+        "    import_seconds=_imported - _start,\n"
+        "    get_agents_seconds=time.perf_counter() - _imported,\n"
+        "    modules=sorted(sys.modules),\n"
+        ")))\n"
+    )
+    result = json.loads(
+        subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout.splitlines()[-1]
+    )
+    assert result["n"] > 0
+    # importing every agent takes several seconds while the names alone take milliseconds
+    assert result["import_seconds"] < 1.0
+    assert result["get_agents_seconds"] < 0.5
+    # the interpreter itself and scml_agents' own modules only (importing the agents takes thousands)
+    assert len(result["modules"]) < 300
+    for module in result["modules"]:
+        assert not module.startswith("scml_agents.scml20"), module
+        assert module.split(".")[0] not in ("negmas", "scml", "torch", "tensorflow")
+
+
+def test_agent_tables_match_team_packages():
+    import pkgutil
+    from importlib import import_module
+
+    from scml_agents import agents
+
+    tracks = ["scml2020"] + [
+        f"scml{year}.{track}"
+        for year in (2021, 2022, 2023)
+        for track in ("standard", "collusion", "oneshot")
+    ]
+    teams = {
+        f"{track}.{_.name}"
+        for track in tracks
+        if track != "scml2021.collusion"
+        for _ in pkgutil.iter_modules(import_module(f"scml_agents.{track}").__path__)
+        if _.ispkg
+    }
+    assert set(agents._TEAM_AGENTS) == teams
+    for team, names in agents._TEAM_AGENTS.items():
+        package = import_module(f"scml_agents.{team}")
+        assert agents._import_agent(names) == tuple(
+            getattr(package, _) for _ in package.__all__
+        ), team
+    scml2019 = import_module("scml_agents.scml2019")
+    for team, name in agents._MAIN_AGENTS.items():
+        package = import_module(f"scml_agents.{team}")
+        # 2019 teams are exported by scml_agents.scml2019 instead
+        expected = getattr(
+            package, "MAIN_AGENT", getattr(scml2019, name.rpartition(".")[-1], None)
+        )
+        assert agents._import_agent(name) is expected, team
+
+
+def test_get_agents_imports_only_requested_agents():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from negmas.helpers import get_full_type_name\n"
+        "from scml_agents import get_agents\n"
+        "names = get_agents(2021, track='oneshot', winners_only=True, as_class=False)\n"
+        "classes = get_agents(2021, track='oneshot', winners_only=True, as_class=True)\n"
+        "assert names == tuple(tuple(get_full_type_name(_) for _ in c) for c in classes)\n"
+        "print(sorted(_ for _ in sys.modules if _.startswith('scml_agents.scml20') and _.count('.') == 3))\n"
+    )
+    teams = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    ).stdout.splitlines()[-1]
+    assert teams == str(
+        [
+            "scml_agents.scml2021.oneshot.team_50",
+            "scml_agents.scml2021.oneshot.team_62",
+            "scml_agents.scml2021.oneshot.team_73",
+            "scml_agents.scml2021.oneshot.team_86",
+        ]
+    )
+
+
+@mark.parametrize(
+    "version", ["scml2019", "scml2020", "scml2021", "scml2022", "scml2023"]
+)
+def test_lazy_year_exports(version):
+    import importlib
+
+    module = importlib.import_module(f"scml_agents.{version}")
+    for name in module.__all__:
+        assert getattr(module, name).__name__ == name
+
+
+def test_subsets_by_quantity_matches_enumeration():
+    import itertools
+    import random
+
+    from scml_agents.offer_selection import subsets_by_quantity
+
+    rng = random.Random(0)
+    for _ in range(200):
+        n = rng.randint(0, 7)
+        quantities = [rng.randint(1, 6) for _ in range(n)]
+        prices = [rng.randint(1, 4) for _ in range(n)]
+        max_quantity = rng.randint(0, 20)
+        powerset = [
+            c for r in range(n + 1) for c in itertools.combinations(range(n), r)
+        ]
+        binary = [
+            tuple(i for i in range(n) if mask & (1 << (n - 1 - i)))
+            for mask in range(1 << n)
+        ]
+        for order, subsets in (("powerset", powerset), ("binary", binary)):
+            expected = dict()
+            for subset in subsets:
+                total = sum(quantities[_] for _ in subset)
+                price = sum(prices[_] for _ in subset)
+                if total > max_quantity:
+                    continue
+                if total not in expected or price > expected[total][0]:
+                    expected[total] = (price, subset)
+            found = subsets_by_quantity(quantities, max_quantity, [prices], order)
+            assert found == {k: v[1] for k, v in expected.items()}
+
+
+@mark.parametrize("is_selling", [True, False])
+def test_best_offer_subset_matches_enumeration(is_selling):
+    import itertools
+
+    import numpy as np
+    from scml.oneshot.ufun import OneShotUFun
+
+    from scml_agents.offer_selection import best_offer_subset
+
+    for seed in range(300):
+        rng = np.random.default_rng(seed)
+        ex_q, ex_p = int(rng.integers(0, 12)), int(rng.integers(5, 40))
+        ufun = OneShotUFun(
+            ex_pin=ex_q * ex_p if is_selling else 0,
+            ex_qin=ex_q if is_selling else 0,
+            ex_pout=0 if is_selling else ex_q * ex_p,
+            ex_qout=0 if is_selling else ex_q,
+            input_product=0 if is_selling else 1,
+            input_agent=is_selling,
+            output_agent=not is_selling,
+            production_cost=float(rng.uniform(0, 3)),
+            disposal_cost=float(rng.uniform(0, 3)),
+            shortfall_penalty=float(rng.uniform(0, 4)),
+            input_penalty_scale=None if seed % 5 else float(rng.uniform(1, 10)),
+            output_penalty_scale=None if seed % 5 else float(rng.uniform(1, 10)),
+            n_input_negs=4,
+            n_output_negs=4,
+            current_step=0,
+            n_lines=int(rng.integers(3, 12)),
+            current_balance=float(rng.uniform(-20, 200)) if seed % 3 else float("inf"),
+        )
+        n, p = int(rng.integers(1, 8)), int(rng.integers(5, 20))
+        offers = [
+            (int(rng.integers(1, ufun.n_lines + 1)), 0, int(rng.integers(p, p + 30)))
+            for _ in range(n)
+        ]
+        fixed_offers = [
+            (int(rng.integers(1, 5)), 0, int(rng.integers(p, p + 30)))
+            for _ in range(int(rng.integers(0, 3)))
+        ]
+        fixed_outputs = [bool(rng.integers(0, 2)) for _ in fixed_offers]
+        ties = [int(rng.integers(-2, 3)) for _ in range(n)]
+
+        def utility(subset):
+            return ufun.from_offers(
+                [offers[_] for _ in subset] + fixed_offers,
+                [is_selling] * len(subset) + fixed_outputs,
+            )
+
+        for tie_scores, include_empty in ((None, False), (ties, True)):
+            expected, best = None, None
+            for r in range(0 if include_empty else 1, n + 1):
+                for subset in itertools.combinations(range(n), r):
+                    key = (utility(subset),)
+                    if tie_scores is not None:
+                        key += (-sum(tie_scores[_] for _ in subset),)
+                    if best is None or key > best:
+                        expected, best = subset, key
+            found, u = best_offer_subset(
+                ufun,
+                offers,
+                is_selling,
+                fixed_offers,
+                fixed_outputs,
+                tie_scores,
+                include_empty,
+            )
+            assert (found, u) == (expected, best[0])
+
+
+def test_best_offer_subset_sells_to_the_best_pair_above_capacity():
+    from scml.oneshot.ufun import OneShotUFun
+
+    from scml_agents.offer_selection import best_offer_subset
+
+    ufun = OneShotUFun(
+        ex_pin=152,
+        ex_qin=4,
+        ex_pout=0,
+        ex_qout=0,
+        input_product=0,
+        input_agent=True,
+        output_agent=False,
+        production_cost=1.0,
+        disposal_cost=3.0,
+        shortfall_penalty=2.8,
+        input_penalty_scale=None,
+        output_penalty_scale=None,
+        n_input_negs=4,
+        n_output_negs=4,
+        current_step=0,
+        n_lines=3,
+    )
+    offers = [(2, 0, 57), (2, 0, 28), (2, 0, 15), (2, 0, 59)]
+    # neither the cheapest, the most expensive nor the first pair: the shortfall penalty favors the cheaper pair
+    # (2, 3) that still sells its producible quantity to the most expensive offer
+    assert best_offer_subset(ufun, offers, True) == (
+        (2, 3),
+        ufun.from_offers([offers[2], offers[3]], [True, True]),
+    )
+
+
+@mark.parametrize("level", [0, 1, 2])
+def test_leave_one_out_utilities_match_from_offers(level):
+    import numpy as np
+    from scml.oneshot.ufun import OneShotUFun
+
+    from scml_agents.marginal_utility import leave_one_out_utilities
+
+    for seed in range(200):
+        rng = np.random.default_rng(seed)
+        ex_q, ex_p = int(rng.integers(0, 12)), int(rng.integers(5, 40))
+        ufun = OneShotUFun(
+            ex_pin=ex_q * ex_p if level == 0 else 0,
+            ex_qin=ex_q if level == 0 else 0,
+            ex_pout=ex_q * ex_p if level == 2 else 0,
+            ex_qout=ex_q if level == 2 else 0,
+            input_product=level,
+            input_agent=level == 0,
+            output_agent=level == 2,
+            production_cost=float(rng.uniform(0, 3)),
+            disposal_cost=float(rng.uniform(0, 1)),
+            shortfall_penalty=float(rng.uniform(0, 2)),
+            input_penalty_scale=None,
+            output_penalty_scale=None,
+            n_input_negs=4,
+            n_output_negs=4,
+            current_step=0,
+            n_lines=int(rng.integers(1, 12)),
+            current_balance=(float("inf"), int(rng.integers(0, 400)), -5)[seed % 3],
+        )
+        n, p = int(rng.integers(0, 9)), int(rng.integers(5, 20))
+        offers = [
+            (int(rng.integers(0, 10)), 0, int(rng.integers(p - 3, p + 4)))
+            for _ in range(n)
+        ]
+        outputs = [
+            bool(rng.random() < 0.5) if level == 1 else level == 0 for _ in offers
+        ]
+
+        u, others = leave_one_out_utilities(ufun, offers, outputs)
+        assert u == pytest.approx(ufun.from_offers(offers, outputs))
+        for i, found in enumerate(others):
+            expected = ufun.from_offers(
+                offers[:i] + offers[i + 1 :], outputs[:i] + outputs[i + 1 :]
+            )
+            assert found == pytest.approx(expected)
+
+
+def test_model_registry_loads_each_artifact_once(monkeypatch):
+    import numpy as np
+
+    from scml_agents import models
+
+    monkeypatch.setattr(models, "_MODELS", dict())
+    monkeypatch.setattr(models, "_LOADS", dict())
+    path = "scml2021/oneshot/team_90/input_model.sav"
+    model = models.load_model(path)
+    assert models.load_model(models.model_path(path)) is model
+    assert (
+        models.load_model(f"scml2021/oneshot/team_90/../team_90/{path[-15:]}") is model
+    )
+    assert not model.coef_.flags.writeable
+    with pytest.raises(ValueError):
+        model.coef_[0] = 0
+    assert model.predict(np.zeros((1, model.coef_.shape[-1]))).shape[0] == 1
+    (load,) = models.model_report()
+    assert (
+        load.path == models.model_path(path) and load.seconds >= 0 and load.memory > 0
+    )
+
+
+def test_model_registry_preloads_artifacts(monkeypatch):
+    from scml_agents import models
+
+    monkeypatch.setattr(models, "_MODELS", dict())
+    monkeypatch.setattr(models, "_LOADS", dict())
+    paths = ["scml2021/oneshot/team_90/input_model.sav", "missing_model.pkl"]
+    loads = models.preload_models(paths)
+    assert [_.path for _ in loads] == [models.model_path(paths[0])]
+    assert models.model_report() == loads
+    with pytest.raises(FileNotFoundError):
+        models.load_model(paths[1])
+
+
+def test_online_stats_match_batch_statistics():
+    import random
+    import statistics
+
+    import numpy as np
+    import pandas as pd
+
+    from scml_agents.online_stats import (
+        ExponentialMovingAverage,
+        LinearTrend,
+        MovingAverage,
+        QuantileSketch,
+        RunningStats,
+    )
+
+    rng = random.Random(0)
+    for _ in range(30):
+        values = [
+            rng.choice([rng.randint(0, 40), rng.uniform(-5, 50)])
+            for _ in range(rng.randint(1, 30))
+        ]
+        stats, trend, quantiles = RunningStats(), LinearTrend(), QuantileSketch()
+        window, ewm = MovingAverage(5), ExponentialMovingAverage(0.3)
+        for k, x in enumerate(values):
+            for summary in (stats, trend, quantiles, window, ewm):
+                summary.add(x)
+            seen = values[: k + 1]
+            assert stats.mean == statistics.mean(seen)
+            assert (stats.min, stats.max) == (min(seen), max(seen))
+            if k:
+                assert stats.variance == statistics.variance(seen)
+                slope, intercept = np.polyfit(range(k + 1), seen, 1)
+                assert trend.slope == pytest.approx(slope, abs=1e-9)
+                assert trend.predict(k + 2) == pytest.approx(
+                    intercept + slope * (k + 2), abs=1e-9
+                )
+            for p in (0, 20, 50, 80, 100):
+                assert quantiles.percentile(p) == np.percentile(seen, p)
+            assert window.mean == pytest.approx(statistics.mean(seen[-5:]))
+            assert (
+                ewm.mean == pd.Series(seen).ewm(alpha=0.3, adjust=False).mean().iloc[-1]
+            )
+
+
+def test_quantile_sketch_stays_bounded_beyond_capacity():
+    import numpy as np
+
+    from scml_agents.online_stats import QuantileSketch
+
+    values = np.random.default_rng(0).normal(size=5000)
+    quantiles = QuantileSketch(capacity=64)
+    for x in values:
+        quantiles.add(float(x))
+    assert not quantiles.exact and len(quantiles._values) <= 64
+    for p in (10, 50, 90):
+        assert quantiles.percentile(p) == pytest.approx(
+            np.percentile(values, p), abs=0.1
+        )
+
+
+def test_tracer_keeps_the_latest_events_only_when_enabled():
+    from scml_agents.tracing import Tracer
+
+    tracer = Tracer(capacity=3)
+    tracer.record("a", "step", step=0)
+    assert not tracer.events()
+    tracer.enable()
+    for step in range(5):
+        tracer.record("a", "step", step=step)
+    tracer.message("b", "balance:", 10, [1, 2])
+    assert [e.fields for e in tracer.events()] == [
+        dict(step=3),
+        dict(step=4),
+        dict(text="balance: 10 [1, 2]"),
+    ]
+    assert tracer.dropped == 3
+    tracer.enable(capacity=2)
+    assert [e.source for e in tracer.events()] == ["a", "b"]
+    tracer.disable()
+    tracer.record("a", "step", step=5)
+    assert len(tracer.events()) == 2
+
+
+def test_tracer_flushes_events_as_ndjson(tmp_path):
+    import json
+
+    from scml_agents.tracing import Tracer
+
+    tracer = Tracer()
+    tracer.enable()
+    tracer.record("a", "sign", agreement=dict(quantity=3), partner=None)
+    tracer.record("b", "needs", inventory=range(2))
+    path = tmp_path / "trace" / "events.ndjson"
+    assert tracer.flush(path) == 2
+    assert not tracer.events() and tracer.flush(path) == 0
+    tracer.record("a", "step")
+    assert tracer.flush(path) == 1
+    records = [json.loads(_) for _ in path.read_text().splitlines()]
+    assert [{k: v for k, v in r.items() if k != "time"} for r in records] == [
+        dict(source="a", event="sign", agreement=dict(quantity=3), partner=None),
+        dict(source="b", event="needs", inventory="range(0, 2)"),
+        dict(source="a", event="step"),
+    ]
+    with pytest.raises(ValueError):
+        tracer.flush(path, file_format="csv")